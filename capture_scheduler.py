@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Drift-free fixed-rate scheduling for periodic capture
+
+A timer that waits "interval" seconds after each capture finishes stretches
+the sample period by however long the capture, OCR and file writes took, so
+the samples wander. FixedRateScheduler instead pins tick n to the absolute
+deadline t0 + n * interval on a monotonic clock:
+
+• the wait before each tick is recomputed from the deadline, so the time
+  spent working never accumulates into drift
+• deadlines that pass while the caller is busy are detected and counted as
+  missed ticks
+• overdue ticks are handled by policy: 'skip' drops them and fires only if
+  the latest deadline is still within the late tolerance, 'coalesce' fires
+  one catch-up tick that stands in for all of them
+• the lateness of every fired tick is kept for jitter statistics
+
+The scheduler does not own a thread or timer; callers ask how long to wait
+(time_until_next), then call poll() when the wait is over. wait() does both
+for plain worker threads.
+"""
+
+import math
+import time
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Callable
+
+
+@dataclass
+class Tick:
+    """One fired tick of a FixedRateScheduler"""
+    index: int  # Deadline number n (t0 + n * interval)
+    deadline: float
+    fired_at: float
+    missed: int = 0  # Deadlines that passed without a tick of their own since the previous tick
+
+    @property
+    def lateness(self) -> float:
+        """Seconds between the deadline and the moment the tick fired"""
+        return self.fired_at - self.deadline
+
+
+class FixedRateScheduler:
+    """Absolute-deadline scheduler with missed-tick accounting and jitter stats"""
+
+    POLICIES = ('skip', 'coalesce')
+
+    def __init__(self, interval: float, overdue_policy: str = 'skip', late_tolerance: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic, history: int = 256):
+        """
+        Args:
+            interval: Seconds between deadlines
+            overdue_policy: 'skip' or 'coalesce' (see module docstring)
+            late_tolerance: With 'skip', how late a tick may fire before it is
+                dropped too; defaults to half an interval
+            clock: Monotonic time source in seconds
+            history: Number of recent tick latenesses kept for jitter statistics
+        """
+        if overdue_policy not in self.POLICIES:
+            raise ValueError(f"Unknown overdue policy: {overdue_policy} (expected one of {', '.join(self.POLICIES)})")
+        self.overdue_policy = overdue_policy
+        self._late_tolerance = late_tolerance
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._lateness = deque(maxlen=history)
+        self._origin = None
+        self._next_index = 0
+        self.interval = 0.0
+        self.set_interval(interval)
+        self.stats = {
+            'fired': 0,
+            'missed': 0,
+            'skipped_late': 0,
+            'max_lateness': 0.0
+        }
+
+    @property
+    def late_tolerance(self) -> float:
+        return self.interval / 2.0 if self._late_tolerance is None else self._late_tolerance
+
+    @property
+    def running(self) -> bool:
+        return self._origin is not None
+
+    def set_interval(self, interval: float, now: Optional[float] = None):
+        """Change the interval; a running schedule restarts from the current tick"""
+        if interval <= 0:
+            raise ValueError(f"Interval must be greater than 0 (got {interval})")
+        with self._lock:
+            self.interval = float(interval)
+            if self._origin is not None:
+                # Re-anchor so the next deadline is one new interval from now
+                self._origin = self.clock() if now is None else now
+                self._next_index = 1
+
+    def start(self, now: Optional[float] = None, immediate: bool = False):
+        """Anchor t0 at ``now``; the first tick is due at t0 if immediate, else at t0 + interval"""
+        with self._lock:
+            self._origin = self.clock() if now is None else now
+            self._next_index = 0 if immediate else 1
+
+    def stop(self):
+        """Stop the schedule (statistics are kept)"""
+        with self._lock:
+            self._origin = None
+
+    def next_deadline(self) -> Optional[float]:
+        """Clock time of the next deadline, or None when stopped"""
+        with self._lock:
+            if self._origin is None:
+                return None
+            return self._origin + self._next_index * self.interval
+
+    def time_until_next(self, now: Optional[float] = None) -> float:
+        """Seconds until the next deadline (0 if it has already passed)"""
+        deadline = self.next_deadline()
+        if deadline is None:
+            return 0.0
+        now = self.clock() if now is None else now
+        return max(0.0, deadline - now)
+
+    def poll(self, now: Optional[float] = None) -> Optional[Tick]:
+        """Fire the current tick if its deadline has passed
+
+        Returns:
+            Tick to act on, or None if nothing is due (early wake-up, stopped
+            schedule, or an overdue tick dropped by the 'skip' policy)
+        """
+        now = self.clock() if now is None else now
+        with self._lock:
+            if self._origin is None:
+                return None
+            if now < self._origin + self._next_index * self.interval:
+                return None
+
+            # Latest deadline that has already passed
+            due = max(self._next_index, int(math.floor((now - self._origin) / self.interval)))
+            missed = due - self._next_index
+            deadline = self._origin + due * self.interval
+            self._next_index = due + 1
+            self.stats['missed'] += missed
+
+            if self.overdue_policy == 'skip' and now - deadline > self.late_tolerance:
+                self.stats['missed'] += 1
+                self.stats['skipped_late'] += 1
+                return None
+
+            tick = Tick(due, deadline, now, missed)
+            self.stats['fired'] += 1
+            self.stats['max_lateness'] = max(self.stats['max_lateness'], tick.lateness)
+            self._lateness.append(tick.lateness)
+            return tick
+
+    def wait(self, stop_event: Optional[threading.Event] = None) -> Optional[Tick]:
+        """Block until the next tick fires; returns None if stopped first
+
+        Args:
+            stop_event: Event that aborts the wait when set
+        """
+        while self.running:
+            delay = self.time_until_next()
+            if stop_event is not None:
+                if stop_event.wait(delay):
+                    return None
+            elif delay > 0:
+                time.sleep(delay)
+            tick = self.poll()
+            if tick is not None:
+                return tick
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return tick counters and jitter (lateness) statistics in milliseconds"""
+        with self._lock:
+            stats = dict(self.stats)
+            samples = list(self._lateness)
+        stats['interval'] = self.interval
+        stats['policy'] = self.overdue_policy
+        stats['max_lateness_ms'] = stats.pop('max_lateness') * 1000.0
+        if samples:
+            mean = sum(samples) / len(samples)
+            variance = sum((sample - mean) ** 2 for sample in samples) / len(samples)
+            ordered = sorted(samples)
+            stats['jitter_mean_ms'] = mean * 1000.0
+            stats['jitter_std_ms'] = math.sqrt(variance) * 1000.0
+            stats['jitter_p95_ms'] = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] * 1000.0
+        else:
+            stats['jitter_mean_ms'] = stats['jitter_std_ms'] = stats['jitter_p95_ms'] = 0.0
+        total = stats['fired'] + stats['missed']
+        stats['miss_ratio'] = (stats['missed'] / total) if total else 0.0
+        return stats
+
+    def reset_stats(self):
+        """Reset the counters and the jitter history"""
+        with self._lock:
+            for name in self.stats:
+                self.stats[name] = 0.0 if name == 'max_lateness' else 0
+            self._lateness.clear()
+
+
+def format_schedule_report(stats: Dict[str, Any]) -> str:
+    """One-line human readable summary of FixedRateScheduler.get_stats()"""
+    return (f"{stats['fired']} ticks, {stats['missed']} missed ({stats['policy']}), "
+            f"jitter {stats['jitter_mean_ms']:.1f} ms avg / ±{stats['jitter_std_ms']:.1f} ms / "
+            f"max {stats['max_lateness_ms']:.1f} ms")
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Persistent screen capture session for Grace
+
+Shared by the PyQt5 application (main.py) and the CLI client
+(grace-cli-client/grace_cli.py).
+
+Creating an ``mss.mss()`` context opens a display connection and sets up the
+grab machinery, so doing it once per screenshot adds that cost to every
+frame. A CaptureSession keeps one mss instance per thread for the lifetime of
+the process, reuses it for every grab and transparently reconnects when the
+display goes away or the monitor layout changes.
+
+Regions reaching past the virtual screen (windows dragged partly off-screen,
+maximized Windows windows at -8,-8) are clipped to it; the clipped-off part
+is black in grab_image(). Before clipping, a layout older than
+``layout_max_age`` seconds is re-read (reconnect), so a window on a monitor
+that was attached or resized since is grabbed whole instead of padded.
+"""
+
+import time
+import threading
+from typing import Optional, Dict, Any, List, Tuple
+
+try:
+    import mss
+    MSS_AVAILABLE = True
+except ImportError:
+    mss = None
+    MSS_AVAILABLE = False
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+class CaptureSession:
+    """Long-lived, thread-aware wrapper around mss
+
+    mss instances are not safe to share between threads (the X11 backend in
+    particular keeps a per-connection display handle), so every thread gets
+    its own instance, created lazily on first use and kept until close().
+    Instances are only closed on the thread that opened them (or once that
+    thread has exited): close() marks the others, which their threads close
+    on their next grab.
+    """
+
+    def __init__(self, layout_max_age: float = 5.0):
+        """
+        Args:
+            layout_max_age: Seconds a monitor layout is trusted for clipping; an
+                older one is re-read before a region is clipped
+        """
+        self.layout_max_age = layout_max_age
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._instances: List[Tuple[threading.Thread, Any]] = []  # (owning thread, mss instance)
+        self._generation = 0  # Bumped by close(); older instances are closed by their thread
+        self.stats = {
+            'grabs': 0,
+            'connects': 0,
+            'reconnects': 0,
+            'failures': 0
+        }
+
+    def _connect(self):
+        """Open a new mss instance for the calling thread"""
+        sct = mss.mss()
+        with self._lock:
+            self._instances.append((threading.current_thread(), sct))
+            self.stats['connects'] += 1
+            self._local.generation = self._generation
+        self._local.sct = sct
+        self._local.layout = self._layout_of(sct)
+        self._local.layout_read_at = time.monotonic()
+        return sct
+
+    def _disconnect(self):
+        """Close the calling thread's mss instance, if any"""
+        sct = getattr(self._local, 'sct', None)
+        if sct is None:
+            return
+        self._local.sct = None
+        self._local.layout = None
+        with self._lock:
+            self._instances = [item for item in self._instances if item[1] is not sct]
+        try:
+            sct.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _layout_of(sct) -> Tuple:
+        """Hashable signature of the monitor layout seen by an mss instance"""
+        try:
+            return tuple(
+                (m['left'], m['top'], m['width'], m['height']) for m in sct.monitors
+            )
+        except Exception:
+            return ()
+
+    @staticmethod
+    def _clip(layout: Tuple, region: Dict[str, int]) -> Optional[Dict[str, int]]:
+        """The part of a region inside the virtual screen of a layout, or None if nothing is"""
+        if not layout:
+            return region  # Layout unknown - rely on grab errors to trigger a reconnect
+        left, top, width, height = layout[0]  # monitors[0] is the union of all monitors
+        x0, y0 = max(region['left'], left), max(region['top'], top)
+        x1 = min(region['left'] + region['width'], left + width)
+        y1 = min(region['top'] + region['height'], top + height)
+        if x1 <= x0 or y1 <= y0:
+            return None
+        return {"top": y0, "left": x0, "width": x1 - x0, "height": y1 - y0}
+
+    def _session(self):
+        """Return the calling thread's mss instance (a fresh one after close())"""
+        sct = getattr(self._local, 'sct', None)
+        if sct is not None and getattr(self._local, 'generation', None) != self._generation:
+            self._disconnect()
+            sct = None
+        return self._connect() if sct is None else sct
+
+    def _visible(self, region: Dict[str, int]):
+        """Session and clipped region; a stale layout is re-read (reconnect) before anything is clipped"""
+        sct = self._session()
+        clipped = self._clip(self._local.layout, region)
+        stale = time.monotonic() - self._local.layout_read_at >= self.layout_max_age
+        if clipped != region and stale:
+            # Part of it is off the screen we know about: a monitor may have been
+            # attached, moved or resized since the layout was read.
+            self._disconnect()
+            with self._lock:
+                self.stats['reconnects'] += 1
+            sct = self._connect()
+            clipped = self._clip(self._local.layout, region)
+        if clipped is None:
+            raise ValueError(f"Region {region} lies outside the screen")
+        return sct, clipped
+
+    def reset(self):
+        """Force the calling thread to reconnect on its next grab"""
+        self._disconnect()
+
+    @property
+    def available(self) -> bool:
+        """Whether mss is installed"""
+        return MSS_AVAILABLE
+
+    def grab(self, left: int, top: int, width: int, height: int):
+        """Grab a screen region and return the raw mss ScreenShot
+
+        The region is clipped to the virtual screen (``ScreenShot.left/top/size``
+        give the part grabbed). Retries once on a fresh connection if the grab
+        fails, which covers display restarts and X server resets during long
+        sessions.
+        """
+        if not MSS_AVAILABLE:
+            raise RuntimeError("mss not available. Please install: pip install mss")
+
+        region = {"top": top, "left": left, "width": width, "height": height}
+
+        try:
+            sct, clipped = self._visible(region)
+            sct_img = sct.grab(clipped)
+        except ValueError:
+            with self._lock:
+                self.stats['failures'] += 1
+            raise
+        except Exception:
+            self._disconnect()
+            with self._lock:
+                self.stats['reconnects'] += 1
+            try:
+                sct, clipped = self._visible(region)
+                sct_img = sct.grab(clipped)
+            except Exception:
+                with self._lock:
+                    self.stats['failures'] += 1
+                raise
+
+        with self._lock:
+            self.stats['grabs'] += 1
+        return sct_img
+
+    def grab_image(self, left: int, top: int, width: int, height: int):
+        """Grab a screen region as an RGB PIL Image"""
+        if Image is None:
+            raise RuntimeError("PIL not available. Please install: pip install Pillow")
+        sct_img = self.grab(left, top, width, height)
+        img = Image.frombytes("RGB", sct_img.size, sct_img.bgra, "raw", "BGRX")
+        if tuple(sct_img.size) == (width, height):
+            return img
+        # Clipped at the screen edge: keep the requested geometry, off-screen part black
+        full = Image.new("RGB", (width, height))
+        full.paste(img, (sct_img.left - left, sct_img.top - top))
+        return full
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return a snapshot of the session counters"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['open_connections'] = len(self._instances)
+        return stats
+
+    def close(self):
+        """Close the mss instances of the calling thread and of exited threads
+
+        Instances of other live threads are tied to them (X11/GDI handles);
+        they are closed by their own thread on its next grab.
+        """
+        current = threading.current_thread()
+        with self._lock:
+            self._generation += 1
+            closing = [sct for thread, sct in self._instances if thread is current or not thread.is_alive()]
+            self._instances = [item for item in self._instances if item[1] not in closing]
+        self._local.sct = None
+        self._local.layout = None
+        for sct in closing:
+            try:
+                sct.close()
+            except Exception:
+                pass
+
+
+_capture_session = None
+_capture_session_lock = threading.Lock()
+
+
+def get_capture_session() -> CaptureSession:
+    """Return the process-wide capture session"""
+    global _capture_session
+    with _capture_session_lock:
+        if _capture_session is None:
+            _capture_session = CaptureSession()
+        return _capture_session
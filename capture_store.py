@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+SQLite capture store for Grace
+
+History used to live only in an ever-growing auto_data.csv plus one JSON file
+per capture, so every "last hour of this device" question meant scanning all
+of it. CaptureStore keeps captures in a single SQLite database instead:
+
+• WAL journal mode: the GUI/CLI writer never blocks readers (exports, queries)
+• indexes on timestamp, window_title and image hash for range, per-device
+  and duplicate-image lookups
+• the full OCR payload is stored zlib-compressed next to the plain raw text,
+  and the typed metrics extracted from it (metric_rules.py) as a JSON column
+• one row per capture, keyed on an autoincrement id with a millisecond
+  timestamp, so two captures of a window within one second stay apart
+• imports are keyed on their source (CSV file + row, JSON file, log +
+  capture ID): re-importing updates instead of duplicating, and the CSV row
+  and JSON dump of one capture (same time, window and text) merge
+
+It is an additional backend next to the CSV/JSON writers (STORAGE_BACKENDS)
+and import_csv()/import_json_files() bulk-load existing history.
+"""
+
+import os
+import csv
+import json
+import zlib
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Iterable, Iterator, Tuple
+
+
+# Backends a capture record can be written to
+STORAGE_BACKENDS = ('csv', 'json', 'sqlite')
+
+_COLUMNS = ('timestamp', 'timestamp_ms', 'window_title', 'raw_text', 'image_path', 'image_hash', 'payload', 'source',
+            'metrics', 'source_key')
+
+_INSERT = ("INSERT INTO captures (" + ", ".join(_COLUMNS) + ") VALUES (" + ", ".join('?' * len(_COLUMNS)) + ")")
+
+# An imported record fills in what the matched row is missing
+_MERGE = (
+    "UPDATE captures SET"
+    " image_path = COALESCE(?, image_path),"
+    " image_hash = COALESCE(?, image_hash),"
+    " payload = COALESCE(?, payload),"
+    " metrics = COALESCE(?, metrics),"
+    " source_key = COALESCE(source_key, ?)"
+    " WHERE id = ?"
+)
+
+# The same capture recorded by another kind of source (or live, without a key)
+_MATCH = (
+    "SELECT id FROM captures WHERE timestamp = ? AND window_title = ? AND raw_text = ?"
+    " AND (source_key IS NULL OR source_key NOT LIKE ?) ORDER BY id LIMIT 1"
+)
+
+
+def parse_storage_backends(value: str) -> Tuple[str, ...]:
+    """Parse a comma separated backend list such as ``"csv,json,sqlite"``
+
+    Raises:
+        ValueError: On an unknown backend name
+    """
+    backends = tuple(name.strip().lower() for name in value.split(',') if name.strip())
+    unknown = [name for name in backends if name not in STORAGE_BACKENDS]
+    if unknown:
+        raise ValueError(f"Unknown storage backend(s): {', '.join(unknown)} "
+                         f"(expected any of {', '.join(STORAGE_BACKENDS)})")
+    return backends
+
+
+def file_sha256(path: Optional[str]) -> Optional[str]:
+    """SHA-256 of a file's bytes, or None if there is no such file"""
+    if not path or not os.path.isfile(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as image_file:
+        for chunk in iter(lambda: image_file.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compress_payload(payload: Optional[Dict[str, Any]]) -> Optional[bytes]:
+    if payload is None:
+        return None
+    return zlib.compress(json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+
+
+def decompress_payload(blob: Optional[bytes]) -> Optional[Dict[str, Any]]:
+    if blob is None:
+        return None
+    return json.loads(zlib.decompress(blob).decode('utf-8'))
+
+
+def timestamp_to_ms(value: Any) -> Optional[int]:
+    """Epoch milliseconds of a ``YYYY-MM-DD HH:MM:SS[.fff]`` / ISO 8601 local timestamp; None if unparseable"""
+    try:
+        return int(datetime.fromisoformat(str(value)).timestamp() * 1000)
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
+
+
+def _capture_record(data: Dict[str, Any], source: str, source_key: Optional[str] = None) -> Dict[str, Any]:
+    """``add()`` arguments for a JSON capture record"""
+    payload = data.get('full_ocr_result', data.get('ocr_result'))
+    image_path = data.get('image_path')
+    return {
+        'timestamp': data['timestamp'],
+        'timestamp_ms': data.get('timestamp_ms'),
+        'window_title': data.get('window_title', ''),
+        'raw_text': data.get('raw_text', ''),
+        'image_path': image_path,
+        'image_hash': file_sha256(image_path),
+        'payload': payload if isinstance(payload, dict) else None,
+        'source': source,
+        'metrics': data.get('metrics') if isinstance(data.get('metrics'), dict) else None,
+        'source_key': source_key
+    }
+
+
+class CaptureStore:
+    """Thread-safe SQLite store of capture records"""
+
+    def __init__(self, db_path: str):
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")  # Durable at checkpoints; WAL keeps it consistent
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS captures ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " timestamp TEXT NOT NULL,"
+            " timestamp_ms INTEGER,"
+            " window_title TEXT NOT NULL,"
+            " raw_text TEXT NOT NULL DEFAULT '',"
+            " image_path TEXT,"
+            " image_hash TEXT,"
+            " payload BLOB,"
+            " source TEXT,"
+            " metrics TEXT,"
+            " source_key TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_captures_timestamp ON captures (timestamp, window_title)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_captures_window_title ON captures (window_title, timestamp)")
+        self._conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_captures_source_key ON captures (source_key)"
+            " WHERE source_key IS NOT NULL"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_captures_image_hash ON captures (image_hash)")
+        self._conn.commit()
+        self.stats = {
+            'writes': 0,
+            'imported': 0,
+            'errors': 0
+        }
+
+    @staticmethod
+    def _row(timestamp: str, window_title: str, raw_text: str = '', image_path: Optional[str] = None,
+             image_hash: Optional[str] = None, payload: Optional[Dict[str, Any]] = None,
+             source: Optional[str] = None, metrics: Optional[Dict[str, Any]] = None,
+             timestamp_ms: Optional[int] = None, source_key: Optional[str] = None) -> Tuple[Any, ...]:
+        """Column values in _COLUMNS order"""
+        return (timestamp, timestamp_ms if timestamp_ms is not None else timestamp_to_ms(timestamp),
+                window_title or 'Unknown', raw_text or '', image_path, image_hash, compress_payload(payload), source,
+                json.dumps(metrics, ensure_ascii=False) if metrics else None, source_key)
+
+    def add(self, timestamp: str, window_title: str, raw_text: str = '', image_path: Optional[str] = None,
+            image_hash: Optional[str] = None, payload: Optional[Dict[str, Any]] = None,
+            source: str = 'auto', metrics: Optional[Dict[str, Any]] = None, timestamp_ms: Optional[int] = None):
+        """Insert one capture as a new row
+
+        Args:
+            timestamp: Capture time as ``YYYY-MM-DD HH:MM:SS``
+            image_hash: Hex digest of the screenshot bytes (see file_sha256)
+            payload: Full OCR result, stored compressed
+            source: Where the record came from ('auto', 'manual', 'cli', 'csv', 'json')
+            metrics: Typed fields extracted from the OCR result, stored as JSON
+            timestamp_ms: Capture time in epoch milliseconds (parsed from ``timestamp`` if omitted)
+        """
+        row = self._row(timestamp, window_title, raw_text, image_path, image_hash, payload, source, metrics,
+                        timestamp_ms)
+        with self._lock:
+            try:
+                self._conn.execute(_INSERT, row)
+                self._conn.commit()
+            except sqlite3.Error:
+                self.stats['errors'] += 1
+                raise
+            self.stats['writes'] += 1
+
+    def add_many(self, rows: Iterable[Dict[str, Any]], batch_size: int = 500) -> int:
+        """Bulk import ``add()`` keyword dicts, one transaction per batch; returns rows written
+
+        A dict may carry a ``source_key`` identifying it in its source: a key seen
+        before updates its row, and a keyed record also merges into the row of the
+        same capture (timestamp, window and text) from another kind of source.
+        """
+        written = 0
+        batch = []
+        for record in rows:
+            batch.append(self._row(**record))
+            if len(batch) >= batch_size:
+                written += self._write_batch(batch)
+                batch = []
+        if batch:
+            written += self._write_batch(batch)
+        return written
+
+    def _write_batch(self, batch: List[Tuple[Any, ...]]) -> int:
+        with self._lock:
+            try:
+                with self._conn:
+                    for row in batch:
+                        self._import_row(row)
+            except sqlite3.Error:
+                self.stats['errors'] += 1
+                raise
+            self.stats['imported'] += len(batch)
+        return len(batch)
+
+    def _import_row(self, row: Tuple[Any, ...]):
+        """Insert one _row() tuple, or merge it into the row it was imported as before"""
+        record = dict(zip(_COLUMNS, row))
+        source_key = record['source_key']
+        if source_key is None:
+            self._conn.execute(_INSERT, row)
+            return
+        existing = self._conn.execute("SELECT id FROM captures WHERE source_key = ?", (source_key,)).fetchone()
+        if existing is None:
+            kind = source_key.split(':', 1)[0]
+            existing = self._conn.execute(
+                _MATCH, (record['timestamp'], record['window_title'], record['raw_text'], kind + ':%')
+            ).fetchone()
+        if existing is None:
+            self._conn.execute(_INSERT, row)
+        else:
+            self._conn.execute(_MERGE, (record['image_path'], record['image_hash'], record['payload'],
+                                        record['metrics'], source_key, existing[0]))
+
+    def update_metrics(self, records: Iterable[Dict[str, Any]], source: str = 'reprocess') -> int:
+        """Set the metrics of captures, one transaction for all records; returns records written
+
+        Args:
+            records: Dicts with timestamp, window_title, raw_text and metrics; every stored
+                row of that reading is updated
+        """
+        batch = [(json.dumps(record.get('metrics') or {}, ensure_ascii=False), record['timestamp'],
+                  record.get('window_title') or 'Unknown', record.get('raw_text') or '') for record in records]
+        with self._lock:
+            try:
+                with self._conn:
+                    for metrics, timestamp, window_title, raw_text in batch:
+                        # Every row of this reading gets the metrics; a capture not stored yet is added
+                        updated = self._conn.execute(
+                            "UPDATE captures SET metrics = ? WHERE timestamp = ? AND window_title = ? AND raw_text = ?",
+                            (metrics, timestamp, window_title, raw_text)
+                        ).rowcount
+                        if not updated:
+                            self._conn.execute(_INSERT, (timestamp, timestamp_to_ms(timestamp), window_title,
+                                                         raw_text, None, None, None, source, metrics, None))
+            except sqlite3.Error:
+                self.stats['errors'] += 1
+                raise
+            self.stats['writes'] += len(batch)
+        return len(batch)
+
+    def import_csv(self, csv_path: str, batch_size: int = 500) -> int:
+        """Import an auto_data.csv style file (timestamp, window_title, raw_text), keyed by file and row"""
+        key = os.path.abspath(csv_path)
+        with open(csv_path, newline='', encoding='utf-8') as csv_file:
+            records = (
+                {
+                    'timestamp': row.get('timestamp', ''),
+                    'window_title': row.get('window_title', ''),
+                    'raw_text': (row.get('raw_text') or '').replace(' | ', '\n'),
+                    'source': 'csv',
+                    'source_key': f"csv:{key}:{number}"
+                }
+                for number, row in enumerate(csv.DictReader(csv_file), 1) if row.get('timestamp')
+            )
+            return self.add_many(records, batch_size)
+
+    def import_json_files(self, json_paths: Iterable[str], batch_size: int = 500) -> Tuple[int, int]:
+        """Import per-capture JSON dumps; returns (imported, skipped unreadable files)
+
+        Both the GUI layout (``full_ocr_result``) and the CLI layout
+        (``ocr_result``) are understood.
+        """
+        skipped = 0
+
+        def records():
+            nonlocal skipped
+            for path in json_paths:
+                try:
+                    with open(path, encoding='utf-8') as json_file:
+                        data = json.load(json_file)
+                    if not isinstance(data, dict) or not data.get('timestamp'):
+                        raise ValueError("not a capture record")
+                except (OSError, ValueError) as e:
+                    print(f"DEBUG: Skipping {path}: {e}")
+                    skipped += 1
+                    continue
+                yield _capture_record(data, 'json', f"json:{os.path.abspath(path)}")
+
+        imported = self.add_many(records(), batch_size)
+        return imported, skipped
+
+    def import_records(self, records: Iterable[Dict[str, Any]], source: str = 'json_log',
+                       origin: Optional[str] = None, batch_size: int = 500) -> int:
+        """Import capture dicts in the JSON dump layout, e.g. the records of a segment log
+
+        Args:
+            origin: Identity of the record stream (such as the log folder and prefix);
+                with each record's ``capture_id`` it keys re-imports
+        """
+        def source_key(data: Dict[str, Any]) -> Optional[str]:
+            if origin is None or data.get('capture_id') is None:
+                return None
+            return f"{source}:{origin}:{data['capture_id']}"
+
+        return self.add_many(
+            (_capture_record(data, source, source_key(data))
+             for data in records if isinstance(data, dict) and data.get('timestamp')),
+            batch_size
+        )
+
+    def query(self, window_title: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None,
+              limit: Optional[int] = None, with_payload: bool = False) -> Iterator[Dict[str, Any]]:
+        """Captures in timestamp order, streamed
+
+        Rows are read in chunks over a separate connection (WAL lets it run
+        next to the writer), so large histories never sit in memory at once.
+
+        Args:
+            window_title: Substring of the window title (case-insensitive)
+            since / until: Inclusive ``YYYY-MM-DD HH:MM:SS`` bounds (prefixes such as a date work too)
+            with_payload: Decompress and include the full OCR result
+        """
+        clauses, params = [], []
+        if window_title:
+            clauses.append("window_title LIKE ?")
+            params.append(f"%{window_title}%")
+        if since:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until:
+            clauses.append("timestamp <= ?")
+            # A prefix bound such as '2024-05-01' includes the whole day
+            params.append(until + '\uffff' if len(until) < 19 else until)
+        columns = ('id',) + tuple(name for name in _COLUMNS if with_payload or name != 'payload')
+        sql = "SELECT " + ", ".join(columns) + " FROM captures"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY timestamp, timestamp_ms, id"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        reader = sqlite3.connect(self.db_path)
+        try:
+            cursor = reader.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(1000)
+                if not rows:
+                    break
+                for row in rows:
+                    record = dict(zip(columns, row))
+                    if with_payload:
+                        record['payload'] = decompress_payload(record['payload'])
+                    record['metrics'] = json.loads(record['metrics']) if record['metrics'] else {}
+                    yield record
+        finally:
+            reader.close()
+
+    def find_by_image_hash(self, image_hash: str) -> List[Dict[str, Any]]:
+        """Captures whose screenshot had exactly these bytes"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, timestamp, window_title, raw_text, image_path FROM captures WHERE image_hash = ?"
+                " ORDER BY timestamp", (image_hash,)
+            ).fetchall()
+        return [dict(zip(('id', 'timestamp', 'window_title', 'raw_text', 'image_path'), row)) for row in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM captures").fetchone()[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return write counters plus the row count and compressed payload size"""
+        with self._lock:
+            stats = dict(self.stats)
+            count, payload_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(payload)), 0) FROM captures"
+            ).fetchone()
+        stats['captures'] = count
+        stats['payload_bytes'] = payload_bytes
+        return stats
+
+    def reset_stats(self):
+        with self._lock:
+            for name in self.stats:
+                self.stats[name] = 0
+
+    def close(self):
+        """Checkpoint the WAL and close the database"""
+        with self._lock:
+            try:
+                self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            except sqlite3.Error:
+                pass
+            self._conn.close()
+
+
+_stores: Dict[str, CaptureStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_capture_store(db_path: str) -> CaptureStore:
+    """Shared store for a database file (opened on first use)"""
+    key = os.path.abspath(str(db_path))
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = CaptureStore(str(db_path))
+            _stores[key] = store
+        return store
+
+
+def close_all_stores():
+    """Close every shared store"""
+    with _stores_lock:
+        stores = list(_stores.values())
+        _stores.clear()
+    for store in stores:
+        try:
+            store.close()
+        except Exception as e:
+            print(f"DEBUG: Failed to close capture store {store.db_path}: {e}")
@@ -7,6 +7,10 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
+# Shared settings files default to this folder (the repo root, as in the CLI),
+# not the working directory
+CONFIG_DIR = os.path.dirname(os.path.abspath(__file__))
+
 # Azure Computer Vision API Configuration
 # Load Azure credentials from environment variables
 AZURE_API_KEY = os.getenv('AZURE_API_KEY')
@@ -28,6 +32,97 @@ DETECT_ORIENTATION = os.getenv('DETECT_ORIENTATION', 'true').lower() == 'true'
 # Set to 'false' to preserve screenshots and improve USB stability
 ENABLE_AUTO_DELETE_SCREENSHOTS = os.getenv('ENABLE_AUTO_DELETE_SCREENSHOTS', 'false').lower() == 'true'
 
+# Frame Change Detection Settings
+# Skip OCR for auto-captures whose frame matches the last OCR'd frame of the same window
+# Method 'diff': largest gray-level change of any block of a 64x64 grid (threshold 0-255)
+# Method 'phash': 64-bit difference hash (threshold = number of differing bits)
+CHANGE_DETECTION_ENABLED = os.getenv('CHANGE_DETECTION_ENABLED', 'false').lower() == 'true'
+CHANGE_DETECTION_METHOD = os.getenv('CHANGE_DETECTION_METHOD', 'diff')
+CHANGE_DETECTION_THRESHOLD = float(os.getenv('CHANGE_DETECTION_THRESHOLD', '1.0'))
+
+# OCR HTTP Client Settings
+# Connect/read timeouts (seconds) for the pooled keep-alive Azure OCR session
+OCR_CONNECT_TIMEOUT = float(os.getenv('OCR_CONNECT_TIMEOUT', '5'))
+OCR_READ_TIMEOUT = float(os.getenv('OCR_READ_TIMEOUT', '30'))
+
+# OCR Pipeline Settings
+# Concurrent OCR calls, and captures allowed to wait for a free slot
+OCR_MAX_IN_FLIGHT = int(os.getenv('OCR_MAX_IN_FLIGHT', '2'))
+OCR_MAX_QUEUED = int(os.getenv('OCR_MAX_QUEUED', '4'))
+
+# Auto-Capture Scheduling
+# Captures fire on fixed deadlines; overdue ticks are either skipped or coalesced
+AUTO_CAPTURE_OVERDUE_POLICY = os.getenv('AUTO_CAPTURE_OVERDUE_POLICY', 'skip').lower()
+
+# USB I/O Governor Settings
+# Global budgets for background file I/O (0 = unlimited)
+IO_GOVERNOR_BYTES_PER_SEC = int(os.getenv('IO_GOVERNOR_BYTES_PER_SEC', str(4 * 1024 * 1024)))
+IO_GOVERNOR_OPS_PER_SEC = float(os.getenv('IO_GOVERNOR_OPS_PER_SEC', '20'))
+
+# CSV Group Commit Settings
+# auto_data.csv rows are buffered and written (with one fsync) once any threshold is hit
+CSV_FLUSH_ROWS = int(os.getenv('CSV_FLUSH_ROWS', '50'))
+CSV_FLUSH_BYTES = int(os.getenv('CSV_FLUSH_BYTES', str(64 * 1024)))
+CSV_FLUSH_INTERVAL = float(os.getenv('CSV_FLUSH_INTERVAL', '2.0'))
+
+# Capture Storage Settings
+# Where auto-capture records go: any of csv, json, sqlite (comma separated)
+CAPTURE_STORAGE_BACKENDS = os.getenv('CAPTURE_STORAGE_BACKENDS', 'csv,json')
+CAPTURE_DB_PATH = os.getenv('CAPTURE_DB_PATH', os.path.join(SCREENSHOTS_FOLDER, 'captures.db'))
+
+# JSON Capture Log Settings
+# Auto-capture JSON records are appended to rotating JSONL segments (json/auto_log)
+JSON_LOG_MAX_SEGMENT_MB = int(os.getenv('JSON_LOG_MAX_SEGMENT_MB', '64'))
+JSON_LOG_MAX_SEGMENT_AGE = float(os.getenv('JSON_LOG_MAX_SEGMENT_AGE', '3600'))  # seconds, 0 = no limit
+JSON_LOG_COMPRESSION = os.getenv('JSON_LOG_COMPRESSION', 'gzip').lower()  # none, gzip or zstd
+JSON_LOG_KEEP_SEGMENTS = int(os.getenv('JSON_LOG_KEEP_SEGMENTS', '0'))  # 0 = keep all
+
+# Parquet History Export Settings
+# Capture history is exported to a day/device partitioned Parquet dataset (needs pyarrow)
+PARQUET_EXPORT_DIR = os.getenv('PARQUET_EXPORT_DIR', os.path.join(SCREENSHOTS_FOLDER, 'parquet'))
+PARQUET_BATCH_ROWS = int(os.getenv('PARQUET_BATCH_ROWS', '50000'))
+
+# Metric Extraction Settings
+# Typed fields (steps, heart rate, ...) are extracted from OCR text by rules;
+# per-device rule sets are read from this JSON file when it exists
+METRIC_RULES_FILE = os.getenv('METRIC_RULES_FILE', os.path.join(CONFIG_DIR, 'metric_rules.json'))
+
+# Window Tracking Settings
+# On X11, follow window events (python-xlib) instead of polling the window list
+X11_EVENT_TRACKING = os.getenv('X11_EVENT_TRACKING', 'true').lower() == 'true'
+# Extra device keywords and categories for device discovery (JSON, optional)
+DEVICE_RULES_FILE = os.getenv('DEVICE_RULES_FILE', os.path.join(CONFIG_DIR, 'device_rules.json'))
+# Capture tracked windows through MIT-SHM shared memory (zero-copy frames, opt-in)
+SHM_CAPTURE_ENABLED = os.getenv('SHM_CAPTURE_ENABLED', 'false').lower() == 'true'
+
+# ROI Cropping Settings
+# Named crop rectangles per window title (editable in Settings > ROI Profiles)
+ROI_CROPPING_ENABLED = os.getenv('ROI_CROPPING_ENABLED', 'true').lower() == 'true'
+ROI_PROFILES_FILE = os.getenv('ROI_PROFILES_FILE', os.path.join(CONFIG_DIR, 'roi_profiles.json'))
+
+# In-Memory Capture Settings
+# Send background captures straight to OCR from memory; screenshots are only
+# written (asynchronously) when auto-delete is off
+IN_MEMORY_CAPTURE = os.getenv('IN_MEMORY_CAPTURE', 'false').lower() == 'true'
+
+# OCR Upload Preprocessing Settings
+# Shrinks captures in memory before upload (grayscale, downscale, contrast, encode)
+OCR_PREPROCESS_ENABLED = os.getenv('OCR_PREPROCESS_ENABLED', 'false').lower() == 'true'
+OCR_PREPROCESS_GRAYSCALE = os.getenv('OCR_PREPROCESS_GRAYSCALE', 'true').lower() == 'true'
+OCR_PREPROCESS_SOURCE_DPI = int(os.getenv('OCR_PREPROCESS_SOURCE_DPI', '96'))
+OCR_PREPROCESS_TARGET_DPI = int(os.getenv('OCR_PREPROCESS_TARGET_DPI', '0'))  # 0 = keep resolution
+OCR_PREPROCESS_CONTRAST = os.getenv('OCR_PREPROCESS_CONTRAST', 'true').lower() == 'true'
+OCR_PREPROCESS_BINARIZE = os.getenv('OCR_PREPROCESS_BINARIZE', 'false').lower() == 'true'
+OCR_PREPROCESS_FORMAT = os.getenv('OCR_PREPROCESS_FORMAT', 'jpeg').lower()  # jpeg, webp or png
+OCR_PREPROCESS_JPEG_QUALITY = int(os.getenv('OCR_PREPROCESS_JPEG_QUALITY', '85'))
+
+# OCR Result Cache Settings
+# Results are cached on disk by image content + OCR parameters and survive restarts
+OCR_CACHE_ENABLED = os.getenv('OCR_CACHE_ENABLED', 'true').lower() == 'true'
+OCR_CACHE_DIR = os.getenv('OCR_CACHE_DIR', os.path.join(SCREENSHOTS_FOLDER, 'cache'))
+OCR_CACHE_MAX_ENTRIES = int(os.getenv('OCR_CACHE_MAX_ENTRIES', '5000'))
+OCR_CACHE_MAX_MB = int(os.getenv('OCR_CACHE_MAX_MB', '100'))
+
 # Validate required environment variables
 if not AZURE_API_KEY:
     print("ERROR: AZURE_API_KEY not set in .env file")
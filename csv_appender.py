@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Buffered, batched CSV appender for capture logs
+
+Appending one row per capture meant: check the file exists, open it, build a
+csv.DictWriter, write one line, flush, close - hundreds of small synchronous
+writes at high capture rates. BufferedCSVAppender keeps the file open and
+group-commits rows instead:
+
+• rows are formatted into an in-memory buffer
+• the buffer is written in one write() once it holds ``max_rows`` rows or
+  ``max_bytes`` bytes, or its oldest row is ``max_delay`` seconds old
+• each group commit ends with a single flush + fsync
+• close() (GUI closeEvent, CLI exit/SIGTERM) commits whatever is buffered
+
+Appenders are shared per file through get_csv_appender(), and
+close_all_appenders() commits every open one.
+"""
+
+import io
+import os
+import csv
+import time
+import threading
+from typing import Optional, Dict, Any, List, Callable
+
+
+class BufferedCSVAppender:
+    """Long-lived CSV appender with row/byte/time group commits"""
+
+    def __init__(self, path: str, fieldnames: List[str], max_rows: int = 50, max_bytes: int = 64 * 1024,
+                 max_delay: float = 2.0, fsync: bool = True,
+                 before_write: Optional[Callable[[int], Any]] = None):
+        """
+        Args:
+            path: CSV file (created with a header row if missing or empty)
+            fieldnames: Column order
+            max_rows: Commit once this many rows are buffered
+            max_bytes: Commit once the buffer reaches this size
+            max_delay: Commit rows at the latest this many seconds after they
+                were appended (0 disables the background timer)
+            fsync: fsync the file after every group commit
+            before_write: Called with the byte count just before each commit
+                (e.g. to charge an I/O budget)
+        """
+        self.path = str(path)
+        self.fieldnames = list(fieldnames)
+        self.max_rows = max(1, max_rows)
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+        self.fsync = fsync
+        self.before_write = before_write
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._buffer = io.StringIO()
+        self._writer = csv.DictWriter(self._buffer, fieldnames=self.fieldnames, extrasaction='ignore')
+        self._buffered_rows = 0
+        self._oldest = None
+        self._file = None
+        self._closed = False
+        self.stats = {
+            'rows': 0,
+            'commits': 0,
+            'bytes': 0,
+            'errors': 0
+        }
+        self._timer = None
+        if max_delay > 0:
+            self._timer = threading.Thread(target=self._run_timer, name="csv-appender", daemon=True)
+            self._timer.start()
+
+    def _open(self):
+        """Open the file for appending, queueing a header for new files (lock held)"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        needs_header = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        self._file = open(self.path, 'a', newline='', encoding='utf-8')
+        if needs_header:
+            header = io.StringIO()
+            csv.DictWriter(header, fieldnames=self.fieldnames).writeheader()
+            self._file.write(header.getvalue())
+
+    def append(self, row: Dict[str, Any]):
+        """Buffer one row; commits when a row or byte threshold is reached"""
+        with self._lock:
+            if self._closed:
+                raise ValueError(f"CSV appender for {self.path} is closed")
+            self._writer.writerow(row)
+            self._buffered_rows += 1
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+                self._wakeup.notify()
+            if self._buffered_rows >= self.max_rows or self._buffer.tell() >= self.max_bytes:
+                self._commit()
+
+    def _commit(self) -> int:
+        """Write the buffer in one go and fsync once (lock held); returns rows committed"""
+        if not self._buffered_rows:
+            return 0
+        data = self._buffer.getvalue()
+        rows = self._buffered_rows
+        try:
+            if self.before_write is not None:
+                self.before_write(len(data.encode('utf-8')))
+            if self._file is None:
+                self._open()
+            self._file.write(data)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+        except Exception:
+            # Keep the rows buffered for the next attempt; reopen the file next time
+            self.stats['errors'] += 1
+            self._close_file()
+            raise
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._buffered_rows = 0
+        self._oldest = None
+        self.stats['rows'] += rows
+        self.stats['commits'] += 1
+        self.stats['bytes'] += len(data)
+        return rows
+
+    def flush(self) -> int:
+        """Commit buffered rows now; returns the number of rows written"""
+        with self._lock:
+            return self._commit()
+
+    def _run_timer(self):
+        """Commit rows that have waited ``max_delay`` seconds"""
+        with self._lock:
+            while not self._closed:
+                if self._oldest is None:
+                    self._wakeup.wait()
+                    continue
+                remaining = self._oldest + self.max_delay - time.monotonic()
+                if remaining > 0:
+                    self._wakeup.wait(remaining)
+                    continue
+                try:
+                    self._commit()
+                except Exception as e:
+                    print(f"DEBUG: CSV group commit to {self.path} failed: {e}")
+                    # Retry after another delay instead of spinning
+                    self._oldest = time.monotonic()
+
+    def _close_file(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except Exception:
+                pass
+            self._file = None
+
+    @property
+    def buffered_rows(self) -> int:
+        with self._lock:
+            return self._buffered_rows
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return commit counters"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['buffered'] = self._buffered_rows
+        stats['rows_per_commit'] = (stats['rows'] / stats['commits']) if stats['commits'] else 0.0
+        return stats
+
+    def close(self):
+        """Commit the remaining rows and close the file"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._wakeup.notify_all()
+            try:
+                self._commit()
+            finally:
+                self._close_file()
+        if self._timer is not None:
+            self._timer.join(timeout=1.0)
+
+
+_appenders: Dict[str, BufferedCSVAppender] = {}
+_appenders_lock = threading.Lock()
+
+
+def get_csv_appender(path: str, fieldnames: List[str], **kwargs) -> BufferedCSVAppender:
+    """Shared appender for a CSV file (created on first use with ``kwargs``)"""
+    key = os.path.abspath(str(path))
+    with _appenders_lock:
+        appender = _appenders.get(key)
+        if appender is None or appender._closed:
+            appender = BufferedCSVAppender(path, fieldnames, **kwargs)
+            _appenders[key] = appender
+        return appender
+
+
+def close_all_appenders():
+    """Commit and close every shared appender"""
+    with _appenders_lock:
+        appenders = list(_appenders.values())
+        _appenders.clear()
+    for appender in appenders:
+        try:
+            appender.close()
+        except Exception as e:
+            print(f"DEBUG: Failed to close CSV appender {appender.path}: {e}")
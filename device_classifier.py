@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Device classification of window titles
+
+Device discovery used to rebuild a ~150 entry keyword list on every call,
+test every keyword against every title with ``in`` and then scan five more
+keyword lists to pick a category - and the CLI carried its own copy of the
+category lists. DeviceClassifier compiles all of it once:
+
+• device keywords and category keywords form one vocabulary, compiled into
+  a single alternation regex (longest terms first) that is tried at every
+  position of the lowercased title - one pass per title
+• keywords that are prefixes of a longer match ('galaxy' in 'galaxy watch')
+  are resolved from a precomputed table, so the result is exactly the set of
+  keywords contained in the title, as with the old substring checks
+• the category is the first category rule (in order) with a keyword in the
+  title; titles without one are 'unknown_devices'
+• results are memoized per title string
+• keywords and categories can be extended from a JSON file
+  (``DEVICE_RULES_FILE``, see load_device_classifier)
+"""
+
+import os
+import re
+import json
+import threading
+from typing import Optional, List, Dict, Any, Iterable, Tuple, NamedTuple
+
+UNKNOWN_CATEGORY = 'unknown_devices'
+
+# Keywords that mark a window as a (mirrored / emulated) device
+DEFAULT_DEVICE_KEYWORDS = [
+    # Samsung devices (all models)
+    'sm-', 'galaxy', 'samsung', 'note', 'tab s', 'galaxy watch', 'galaxy buds',
+
+    # Apple devices
+    'iphone', 'ipad', 'apple watch', 'airpods', 'macbook', 'imac',
+
+    # Google devices
+    'pixel', 'nexus', 'chromebook', 'nest', 'google tv',
+
+    # Chinese brands (major players)
+    'xiaomi', 'redmi', 'poco', 'mi band', 'mi watch', 'mi pad',
+    'huawei', 'honor', 'mate', 'p30', 'p40', 'p50', 'p60', 'nova',
+    'oneplus', 'nord', 'oppo', 'find', 'reno', 'a series',
+    'vivo', 'iqoo', 'x series', 'y series', 'v series',
+    'realme', 'gt series', 'narzo',
+
+    # Other major brands
+    'sony', 'xperia', 'lg', 'wing', 'velvet',
+    'motorola', 'moto', 'edge', 'razr',
+    'nokia', 'htc', 'asus', 'rog phone', 'zenfone',
+    'lenovo', 'legion phone', 'blackberry',
+
+    # Wearables and IoT
+    'fitbit', 'garmin', 'amazfit', 'zepp', 'huami',
+    'wear os', 'tizen',
+
+    # Tablets and 2-in-1s
+    'surface', 'tab', 'tablet', 'kindle', 'fire tablet',
+
+    # Gaming devices
+    'steam deck', 'nintendo switch', 'rog ally', 'legion go',
+
+    # Emulators and dev tools
+    'scrcpy', 'android', 'adb', 'usb debugging', 'emulator',
+    'bluestacks', 'nox', 'memu', 'ldplayer', 'gameloop', 'smartgaga',
+    'android studio', 'vysor', 'mirroring',
+
+    # Generic terms
+    'phone', 'mobile', 'device', 'smart', 'wearable'
+]
+
+# Category rules, checked in order - the first with a keyword in the title wins
+DEFAULT_CATEGORIES = [
+    ('mobile_phones', ['phone', 'sm-', 'iphone', 'pixel', 'oneplus', 'xiaomi', 'huawei', 'oppo', 'vivo']),
+    ('tablets', ['tablet', 'ipad', 'tab', 'surface']),
+    ('wearables', ['watch', 'band', 'fitbit', 'garmin', 'amazfit']),
+    ('emulators', ['emulator', 'bluestacks', 'nox', 'memu', 'ldplayer']),
+    ('dev_tools', ['scrcpy', 'adb', 'vysor', 'android studio']),
+    ('browsers', ['chrome', 'firefox', 'safari', 'edge', 'browser'])
+]
+
+
+class DeviceClassification(NamedTuple):
+    """Result of classifying one window title"""
+    keywords: Tuple[str, ...]  # Device keywords contained in the title, in keyword-list order
+    category: str  # First matching category rule, or UNKNOWN_CATEGORY
+
+    @property
+    def is_device(self) -> bool:
+        return bool(self.keywords)
+
+
+def _terms(words: Iterable[str]) -> Tuple[str, ...]:
+    """Lowercased, de-duplicated, non-empty terms in their original order"""
+    return tuple(dict.fromkeys(word.strip().lower() for word in words if word and word.strip()))
+
+
+class DeviceClassifier:
+    """Device keywords and category rules compiled into one pattern; classify() is memoized per title"""
+
+    def __init__(self, keywords: Iterable[str] = DEFAULT_DEVICE_KEYWORDS,
+                 categories: Iterable[Tuple[str, Iterable[str]]] = DEFAULT_CATEGORIES,
+                 max_cached_titles: int = 4096):
+        """
+        Args:
+            keywords: Device keywords (substrings, case-insensitive)
+            categories: ``(name, keywords)`` rules, checked in order
+            max_cached_titles: Memoized titles before the memo is cleared
+        """
+        self.keywords = _terms(keywords)
+        self.categories = [(name, _terms(words)) for name, words in categories]
+        self.max_cached_titles = max_cached_titles
+        self._keyword_rank = {keyword: rank for rank, keyword in enumerate(self.keywords)}
+        self._term_category: Dict[str, int] = {}
+        for index, (_, words) in enumerate(self.categories):
+            for word in words:
+                self._term_category.setdefault(word, index)
+        vocabulary = set(self.keywords) | set(self._term_category)
+        # Longest first: at each position the alternation reports the longest term that starts there
+        ordered = sorted(vocabulary, key=lambda term: (-len(term), term))
+        self._pattern = re.compile('(?=(' + '|'.join(map(re.escape, ordered)) + '))') if ordered else None
+        # Shorter terms starting at the same position are prefixes of the reported one
+        self._implied = {term: tuple(other for other in vocabulary if term.startswith(other)) for term in vocabulary}
+        self._lock = threading.Lock()
+        self._memo: Dict[str, DeviceClassification] = {}
+        self.stats = {
+            'classified': 0,
+            'memo_hits': 0
+        }
+
+    @property
+    def category_names(self) -> List[str]:
+        """Category names in rule order, followed by UNKNOWN_CATEGORY"""
+        return [name for name, _ in self.categories] + [UNKNOWN_CATEGORY]
+
+    def _classify(self, title: str) -> DeviceClassification:
+        found = set()
+        if self._pattern is not None:
+            for match in self._pattern.finditer(title.lower()):
+                found.update(self._implied[match.group(1)])
+        keywords = tuple(sorted((term for term in found if term in self._keyword_rank),
+                                key=self._keyword_rank.__getitem__))
+        ranks = [self._term_category[term] for term in found if term in self._term_category]
+        category = self.categories[min(ranks)][0] if ranks else UNKNOWN_CATEGORY
+        return DeviceClassification(keywords, category)
+
+    def classify(self, title: str) -> DeviceClassification:
+        """Device keywords and category of a window title"""
+        title = title or ''
+        with self._lock:
+            result = self._memo.get(title)
+            if result is not None:
+                self.stats['memo_hits'] += 1
+                return result
+        result = self._classify(title)
+        with self._lock:
+            if len(self._memo) >= self.max_cached_titles:
+                self._memo.clear()
+            self._memo[title] = result
+            self.stats['classified'] += 1
+        return result
+
+    def categorize(self, items: Iterable[Any], title=lambda item: item.title,
+                   devices_only: bool = False) -> Dict[str, List[Any]]:
+        """Items (windows, snapshots, ...) grouped by category, every category present
+
+        Args:
+            title: Title of an item
+            devices_only: Leave out items without a device keyword
+        """
+        groups = {name: [] for name in self.category_names}
+        for item in items:
+            result = self.classify(title(item))
+            if devices_only and not result.is_device:
+                continue
+            groups[result.category].append(item)
+        return groups
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats['memoized_titles'] = len(self._memo)
+        return stats
+
+    def reset_stats(self):
+        with self._lock:
+            for name in self.stats:
+                self.stats[name] = 0
+
+
+def load_device_classifier(path: Optional[str] = None) -> DeviceClassifier:
+    """Built-in rules extended by a JSON file; a missing file means the built-in rules only
+
+    File format::
+
+        {"keywords": ["whoop", "oura"],
+         "categories": [{"name": "wearables", "keywords": ["whoop", "oura"]},
+                        {"name": "lab_equipment", "keywords": ["spectrometer"]}],
+         "replace_defaults": false}
+
+    Keywords of a category that already exists are added to it; new
+    categories are checked before the built-in ones. With
+    ``replace_defaults`` the built-in keywords and categories are dropped.
+    """
+    keywords = list(DEFAULT_DEVICE_KEYWORDS)
+    categories = [(name, list(words)) for name, words in DEFAULT_CATEGORIES]
+    if path and os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as rules_file:
+            data = json.load(rules_file)
+        if data.get('replace_defaults', False):
+            keywords, categories = [], []
+        keywords.extend(data.get('keywords', []))
+        existing = {name: words for name, words in categories}
+        added = []
+        for entry in data.get('categories', []):
+            name, words = entry['name'], list(entry.get('keywords', []))
+            if name in existing:
+                existing[name].extend(words)
+            else:
+                existing[name] = words
+                added.append((name, words))
+        categories = added + [(name, words) for name, words in categories]
+    return DeviceClassifier(keywords, categories)
+
+
+_classifiers: Dict[str, DeviceClassifier] = {}
+_classifiers_lock = threading.Lock()
+
+
+def get_device_classifier(rules_path: Optional[str] = None) -> DeviceClassifier:
+    """Shared classifier with the built-in rules plus those of ``rules_path``
+
+    A rules file that cannot be parsed is reported and ignored.
+    """
+    key = os.path.abspath(rules_path) if rules_path else ''
+    with _classifiers_lock:
+        classifier = _classifiers.get(key)
+        if classifier is None:
+            try:
+                classifier = load_device_classifier(rules_path)
+            except Exception as e:
+                print(f"DEBUG: Could not load device rules from {rules_path}: {e}")
+                classifier = DeviceClassifier()
+            _classifiers[key] = classifier
+        return classifier
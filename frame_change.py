@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Frame change detection for Grace
+
+Mirrored device screens (Gadgetbridge dashboards, Mi Band companion apps)
+often stay identical for minutes at a time. Sending every one of those frames
+to Azure costs an API call and a network round-trip for text we already have.
+
+FrameChangeDetector keeps a small signature of the last frame that was
+actually OCR'd for each window and compares new frames against it:
+
+• "diff"  - the frame is area-averaged into a 64x64 grid of grayscale
+            blocks; the distance is the largest change of any block (gray
+            levels, 0-255), so one changed digit of a reading is enough
+• "phash" - 64-bit difference hash (threshold in differing bits, 0-64);
+            coarse - it tolerates small edits such as a single digit
+
+Frames under the threshold are reported as unchanged so the caller can reuse
+the previous OCR result instead of calling the API again.
+
+BGRX NumPy arrays (shared-memory capture views) are averaged in place, no
+PIL image or full-frame copy is made. PIL images go through the same
+averaging, so a window whose captures alternate between the shared-memory
+engine and a fallback never reads as changed.
+"""
+
+import threading
+from typing import Optional, Dict, Any, Tuple, Union
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+DIFF_GRID_SIZE = (64, 64)
+PHASH_SIZE = (9, 8)  # 9 columns -> 8 horizontal gradients per row, 8 rows -> 64 bits
+
+
+class FrameChangeDetector:
+    """Per-window comparison of new frames against the last OCR'd frame"""
+
+    METHODS = ('diff', 'phash')
+
+    def __init__(self, method: str = 'diff', threshold: float = 1.0, enabled: bool = True):
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown change detection method: {method} (expected one of {', '.join(self.METHODS)})")
+        self.method = method
+        self.threshold = threshold
+        self.enabled = enabled and NUMPY_AVAILABLE and Image is not None
+        self._lock = threading.Lock()
+        self._references: Dict[str, Tuple[Any, Any]] = {}  # window key -> (signature, ocr payload)
+        self.stats = {
+            'checked': 0,
+            'unchanged': 0,
+            'changed': 0
+        }
+
+    @staticmethod
+    def _block_gray(pixels, size: Tuple[int, int], bgr: bool = True):
+        """Mean gray level of each block of a (columns, rows) grid over a BGR(X) array (RGB unless ``bgr``)
+
+        Every pixel counts (area averaging), so a change confined to a few
+        pixels still moves the mean of its block.
+        """
+        height, width = pixels.shape[:2]
+        columns, rows = min(size[0], width), min(size[1], height)
+        row_edges = np.arange(rows) * height // rows
+        column_edges = np.arange(columns) * width // columns
+        channels = pixels[..., :3] if pixels.ndim == 3 else pixels
+        sums = np.add.reduceat(np.add.reduceat(channels, row_edges, axis=0, dtype=np.int64), column_edges, axis=1)
+        counts = np.outer(np.diff(np.append(row_edges, height)), np.diff(np.append(column_edges, width)))
+        if sums.ndim == 2:
+            return sums / counts
+        blue, red = (sums[..., 0], sums[..., 2]) if bgr else (sums[..., 2], sums[..., 0])
+        # ITU-R 601 luma, as PIL's convert('L')
+        return (red * 0.299 + sums[..., 1] * 0.587 + blue * 0.114) / counts
+
+    def signature(self, image: Union[str, 'Image.Image', Any]):
+        """Compute the comparison signature of an image, image path or BGRX array"""
+        if isinstance(image, str):
+            with Image.open(image) as opened:
+                return self.signature(opened)
+
+        bgr = hasattr(image, 'shape')
+        pixels = image if bgr else np.asarray(image.convert('RGB'))
+        if self.method == 'phash':
+            gray = self._block_gray(pixels, PHASH_SIZE, bgr)
+            return (gray[:, 1:] > gray[:, :-1]).flatten()
+        return self._block_gray(pixels, DIFF_GRID_SIZE, bgr)
+
+    def distance(self, first, second) -> float:
+        """Distance between two signatures in the units of the configured method"""
+        if first.shape != second.shape:
+            return float('inf')
+        if self.method == 'phash':
+            return float(np.count_nonzero(first != second))
+        # The most changed block decides: a new digit must not be averaged away by the unchanged rest
+        return float(np.abs(first - second).max())
+
+    def check(self, key: str, image: Union[str, 'Image.Image', Any]) -> Tuple[bool, Any, float]:
+        """Compare a frame against the reference for ``key``
+
+        Returns:
+            tuple: (changed, signature, distance). ``signature`` should be passed
+            to commit() once the frame has been OCR'd. ``distance`` is inf when
+            there is no reference yet.
+        """
+        signature = self.signature(image)
+
+        with self._lock:
+            self.stats['checked'] += 1
+            reference = self._references.get(key)
+
+            if reference is None:
+                self.stats['changed'] += 1
+                return True, signature, float('inf')
+
+            distance = self.distance(signature, reference[0])
+            changed = distance > self.threshold
+            self.stats['changed' if changed else 'unchanged'] += 1
+            return changed, signature, distance
+
+    def commit(self, key: str, signature, ocr_payload: Any):
+        """Make an OCR'd frame the new reference for ``key``"""
+        if signature is None:
+            return
+        with self._lock:
+            self._references[key] = (signature, ocr_payload)
+
+    def last_result(self, key: str) -> Optional[Any]:
+        """Return the OCR payload stored with the reference frame for ``key``"""
+        with self._lock:
+            reference = self._references.get(key)
+        return reference[1] if reference else None
+
+    def forget(self, key: Optional[str] = None):
+        """Drop the reference for one window, or for all windows"""
+        with self._lock:
+            if key is None:
+                self._references.clear()
+            else:
+                self._references.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return a snapshot of the detection counters"""
+        with self._lock:
+            stats = dict(self.stats)
+        checked = stats['checked']
+        stats['skip_rate'] = (stats['unchanged'] / checked) if checked else 0.0
+        return stats
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+In-memory capture frames and asynchronous frame persistence
+
+The classic capture path writes every grab to a PNG and the OCR worker then
+reads the same file back. With in-memory capture the grabbed image travels as
+a CapturedFrame instead: it is encoded once into a bytes buffer for upload,
+and writing it to disk becomes an optional side effect handled by
+AsyncFrameWriter on its own thread, off the capture/OCR hot path.
+
+A frame grabbed through the shared-memory engine carries ``pixels`` (a BGRX
+NumPy view of the capture segment) instead of a PIL image: it is encoded
+straight from the array and only turned into a PIL image if something asks
+for one. detach() copies the pixels before the frame outlives the next grab.
+"""
+
+import io
+import os
+import time
+import queue
+import threading
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, Callable
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+@dataclass
+class CapturedFrame:
+    """A grabbed window image that has not necessarily been written to disk"""
+    image: Any  # PIL.Image.Image, or None for a frame held as ``pixels``
+    path: str  # Where the frame is written if it is persisted
+    window_title: str = ""
+    captured_at: float = field(default_factory=time.time)
+    persisted: bool = False
+    pixels: Any = field(default=None, repr=False)  # (height, width, 4) BGRX NumPy array
+    _png: Optional[bytes] = field(default=None, repr=False)
+
+    def encode_png(self) -> bytes:
+        """PNG bytes of the frame, encoded once and reused for upload and disk"""
+        if self._png is None:
+            if self.image is None and self.pixels is not None and CV2_AVAILABLE:
+                bgr = cv2.cvtColor(np.ascontiguousarray(self.pixels), cv2.COLOR_BGRA2BGR)
+                ok, encoded = cv2.imencode('.png', bgr, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+                if not ok:
+                    raise ValueError(f"PNG encoding failed for {self.path}")
+                self._png = encoded.tobytes()
+            else:
+                buffer = io.BytesIO()
+                self.to_image().save(buffer, format='PNG', compress_level=1)
+                self._png = buffer.getvalue()
+        return self._png
+
+    @property
+    def content(self):
+        """The pixels if the frame has them, else the PIL image (for change detection and cropping)"""
+        return self.pixels if self.pixels is not None else self.image
+
+    def to_image(self):
+        """PIL image of the frame, converted (copied) from ``pixels`` on first use"""
+        if self.image is None and self.pixels is not None:
+            if Image is None:
+                raise RuntimeError("PIL not available. Please install: pip install Pillow")
+            height, width = self.pixels.shape[:2]
+            self.image = Image.frombuffer('RGB', (width, height), np.ascontiguousarray(self.pixels),
+                                          'raw', 'BGRX', 0, 1)
+        return self.image
+
+    def detach(self) -> 'CapturedFrame':
+        """Own a copy of ``pixels`` if they are a view of a capture buffer that the next grab overwrites"""
+        if self.pixels is not None and self.pixels.base is not None:
+            self.pixels = self.pixels.copy()
+        return self
+
+
+def persist_frame(frame: CapturedFrame) -> int:
+    """Write a frame to its path, reusing its PNG encoding; returns the bytes written"""
+    directory = os.path.dirname(frame.path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    data = frame.encode_png()
+    with open(frame.path, 'wb') as image_file:
+        image_file.write(data)
+    frame.persisted = True
+    return len(data)
+
+
+class AsyncFrameWriter:
+    """Single background thread writing CapturedFrames to disk
+
+    The queue is bounded: if the disk cannot keep up, new frames are dropped
+    (and counted) rather than piling up in memory.
+    """
+
+    def __init__(self, max_queue: int = 16):
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="frame-writer", daemon=True)
+        self._closed = False
+        self.stats = {
+            'written': 0,
+            'failed': 0,
+            'dropped': 0,
+            'bytes': 0
+        }
+        self._thread.start()
+
+    def submit(self, frame: CapturedFrame, on_done: Optional[Callable[[CapturedFrame, bool], None]] = None) -> bool:
+        """Queue a frame for writing; returns False if it was dropped"""
+        if self._closed:
+            return False
+        try:
+            self._queue.put_nowait((frame, on_done))
+            return True
+        except queue.Full:
+            with self._lock:
+                self.stats['dropped'] += 1
+            return False
+
+    def _run(self):
+        """Writer loop"""
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                frame, on_done = item
+                success = self._write(frame)
+                if on_done is not None:
+                    try:
+                        on_done(frame, success)
+                    except Exception as e:
+                        print(f"DEBUG: Frame writer callback error: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, frame: CapturedFrame) -> bool:
+        """Write one frame, reusing its PNG encoding if it already has one"""
+        try:
+            written = persist_frame(frame)
+            with self._lock:
+                self.stats['written'] += 1
+                self.stats['bytes'] += written
+            return True
+        except Exception as e:
+            print(f"DEBUG: Failed to persist frame {frame.path}: {e}")
+            with self._lock:
+                self.stats['failed'] += 1
+            return False
+
+    def flush(self):
+        """Block until every queued frame has been written"""
+        self._queue.join()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return a snapshot of the writer counters"""
+        with self._lock:
+            stats = dict(self.stats)
+        stats['queued'] = self._queue.qsize()
+        return stats
+
+    def close(self):
+        """Write the remaining frames and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
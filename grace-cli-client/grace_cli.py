@@ -25,13 +25,14 @@ import os
 import sys
 import time
 import json
-import csv
 import glob
 import random
 import asyncio
+import atexit
+import signal
 import threading
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
 from pathlib import Path
 
 # Rich imports for beautiful CLI
@@ -113,6 +114,33 @@ try:
 except ImportError:
     print("⚠️ Warning: python-dotenv not available. Using environment variables directly.")
 
+# Shared capture/OCR modules live at the repository root (next to main.py)
+_REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(_REPO_ROOT) not in sys.path:
+    sys.path.append(str(_REPO_ROOT))
+
+from capture_session import get_capture_session
+from frame_change import FrameChangeDetector
+from ocr_cache import OCRResultCache, make_cache_key
+from ocr_client import get_ocr_client
+from image_preprocess import ImagePreprocessor, format_preprocess_report
+from frame_store import CapturedFrame, AsyncFrameWriter
+from roi_profiles import ROIProfileStore
+from capture_scheduler import FixedRateScheduler, format_schedule_report
+from csv_appender import get_csv_appender, close_all_appenders
+from capture_store import CaptureStore, get_capture_store, close_all_stores, parse_storage_backends, file_sha256
+from segment_log import SegmentLog, read_segment_log
+from history_export import PYARROW_AVAILABLE, HistoryParquetWriter, iter_csv_history, filter_history
+from metric_rules import get_metric_extractor
+from ocr_layout import get_layout
+from retention import RetentionIndex, delete_files
+from window_registry import get_window_registry
+from device_classifier import get_device_classifier
+from x11_capture import get_x11_capture, x11_capture_available, x11_window_id
+from reprocess import (
+    JSONLMetricsSink, ReprocessCheckpoint, SQLiteMetricsSink, discover_corpus, rules_fingerprint, run_reprocess
+)
+
 # Platform detection
 import platform
 PLATFORM = platform.system().lower()
@@ -160,7 +188,6 @@ if PLATFORM == 'linux':
     try:
         subprocess.run(['which', 'xdotool'], check=True, capture_output=True)
         subprocess.run(['which', 'wmctrl'], check=True, capture_output=True)
-        subprocess.run(['which', 'scrot'], check=True, capture_output=True)
         LINUX_TOOLS_AVAILABLE = True
     except (subprocess.CalledProcessError, FileNotFoundError):
         pass
@@ -181,11 +208,73 @@ class Config:
         # Auto-capture settings
         self.auto_capture_enabled = False
         self.auto_capture_interval = 5  # seconds
+        # Overdue fixed-rate ticks: 'skip' or 'coalesce'
+        self.auto_capture_overdue_policy = os.getenv('AUTO_CAPTURE_OVERDUE_POLICY', 'skip').lower()
         
         # UI settings
         self.show_debug = False
         self.max_screenshots = 5
         
+        # Frame change detection (skip OCR when the screen has not changed)
+        self.change_detection_enabled = os.getenv('CHANGE_DETECTION_ENABLED', 'false').lower() == 'true'
+        self.change_detection_method = os.getenv('CHANGE_DETECTION_METHOD', 'diff')
+        self.change_detection_threshold = float(os.getenv('CHANGE_DETECTION_THRESHOLD', '1.0'))
+        
+        # OCR result cache (answer identical images without calling Azure)
+        self.ocr_cache_enabled = os.getenv('OCR_CACHE_ENABLED', 'true').lower() == 'true'
+        self.ocr_cache_dir = Path(os.getenv('OCR_CACHE_DIR', str(self.screenshots_dir / 'cache')))
+        self.ocr_cache_max_entries = int(os.getenv('OCR_CACHE_MAX_ENTRIES', '5000'))
+        self.ocr_cache_max_mb = int(os.getenv('OCR_CACHE_MAX_MB', '100'))
+        
+        # OCR HTTP client timeouts (seconds)
+        self.ocr_connect_timeout = float(os.getenv('OCR_CONNECT_TIMEOUT', '5'))
+        self.ocr_read_timeout = float(os.getenv('OCR_READ_TIMEOUT', '30'))
+        
+        # OCR upload preprocessing (shrink captures in memory before upload)
+        self.ocr_preprocess_enabled = os.getenv('OCR_PREPROCESS_ENABLED', 'false').lower() == 'true'
+        self.ocr_preprocess_grayscale = os.getenv('OCR_PREPROCESS_GRAYSCALE', 'true').lower() == 'true'
+        self.ocr_preprocess_source_dpi = int(os.getenv('OCR_PREPROCESS_SOURCE_DPI', '96'))
+        self.ocr_preprocess_target_dpi = int(os.getenv('OCR_PREPROCESS_TARGET_DPI', '0'))
+        self.ocr_preprocess_contrast = os.getenv('OCR_PREPROCESS_CONTRAST', 'true').lower() == 'true'
+        self.ocr_preprocess_binarize = os.getenv('OCR_PREPROCESS_BINARIZE', 'false').lower() == 'true'
+        self.ocr_preprocess_format = os.getenv('OCR_PREPROCESS_FORMAT', 'jpeg').lower()
+        self.ocr_preprocess_jpeg_quality = int(os.getenv('OCR_PREPROCESS_JPEG_QUALITY', '85'))
+        
+        # In-memory capture (upload frames without an intermediate PNG)
+        self.in_memory_capture = os.getenv('IN_MEMORY_CAPTURE', 'false').lower() == 'true'
+        
+        # ROI cropping profiles (shared JSON file with the GUI)
+        self.roi_cropping_enabled = os.getenv('ROI_CROPPING_ENABLED', 'true').lower() == 'true'
+        self.roi_profiles_file = os.getenv('ROI_PROFILES_FILE', str(_REPO_ROOT / 'roi_profiles.json'))
+        
+        # Buffered CSV appends (group commit with one fsync per batch)
+        self.csv_flush_rows = int(os.getenv('CSV_FLUSH_ROWS', '50'))
+        self.csv_flush_bytes = int(os.getenv('CSV_FLUSH_BYTES', str(64 * 1024)))
+        self.csv_flush_interval = float(os.getenv('CSV_FLUSH_INTERVAL', '2.0'))
+        
+        # Capture storage backends (csv, json, sqlite) and the SQLite database
+        try:
+            self.storage_backends = parse_storage_backends(os.getenv('CAPTURE_STORAGE_BACKENDS', 'csv,json'))
+        except ValueError as e:
+            console.print(f"[yellow]{e} - using csv,json[/yellow]")
+            self.storage_backends = ('csv', 'json')
+        self.capture_db_path = Path(os.getenv('CAPTURE_DB_PATH', str(self.screenshots_dir / 'captures.db')))
+        
+        # JSON capture log (rotating JSONL segments, shared folder with the GUI)
+        self.json_log_dir = self.screenshots_dir / 'json' / 'auto_log'
+        self.json_log_max_segment_mb = int(os.getenv('JSON_LOG_MAX_SEGMENT_MB', '64'))
+        self.json_log_max_segment_age = float(os.getenv('JSON_LOG_MAX_SEGMENT_AGE', '3600'))
+        self.json_log_compression = os.getenv('JSON_LOG_COMPRESSION', 'gzip').lower()
+        self.json_log_keep_segments = int(os.getenv('JSON_LOG_KEEP_SEGMENTS', '0'))
+        
+        # Parquet history export
+        self.parquet_export_dir = Path(os.getenv('PARQUET_EXPORT_DIR', str(self.screenshots_dir / 'parquet')))
+        self.parquet_batch_rows = int(os.getenv('PARQUET_BATCH_ROWS', '50000'))
+        
+        # Metric extraction rules (shared JSON file with the GUI)
+        self.metric_rules_file = os.getenv('METRIC_RULES_FILE', str(_REPO_ROOT / 'metric_rules.json'))
+        self.device_rules_file = os.getenv('DEVICE_RULES_FILE', str(_REPO_ROOT / 'device_rules.json'))
+        
     def is_azure_configured(self) -> bool:
         """Check if Azure OCR is properly configured"""
         return bool(self.azure_endpoint and self.azure_key)
@@ -202,6 +291,102 @@ class Config:
 
 config = Config()
 
+frame_change_detector = FrameChangeDetector(
+    config.change_detection_method,
+    config.change_detection_threshold,
+    config.change_detection_enabled
+)
+
+ocr_cache = None
+if config.ocr_cache_enabled:
+    try:
+        ocr_cache = OCRResultCache(
+            str(config.ocr_cache_dir),
+            config.ocr_cache_max_entries,
+            config.ocr_cache_max_mb * 1024 * 1024
+        )
+    except Exception as e:
+        console.print(f"[yellow]OCR cache unavailable: {e}[/yellow]")
+
+image_preprocessor = None
+if config.ocr_preprocess_enabled:
+    try:
+        image_preprocessor = ImagePreprocessor(
+            grayscale=config.ocr_preprocess_grayscale,
+            target_dpi=config.ocr_preprocess_target_dpi,
+            source_dpi=config.ocr_preprocess_source_dpi,
+            contrast=config.ocr_preprocess_contrast,
+            binarize=config.ocr_preprocess_binarize,
+            image_format=config.ocr_preprocess_format,
+            jpeg_quality=config.ocr_preprocess_jpeg_quality
+        )
+    except ValueError as e:
+        console.print(f"[yellow]OCR preprocessing disabled: {e}[/yellow]")
+
+# Background writer for in-memory frames that the retention policy keeps
+frame_writer = AsyncFrameWriter()
+atexit.register(frame_writer.close)
+
+# Buffered CSV rows are committed on every exit path (normal exit, Ctrl+C, SIGTERM)
+atexit.register(close_all_appenders)
+atexit.register(close_all_stores)
+
+# JSON capture log of this process, opened on first use
+_json_log: Optional[SegmentLog] = None
+
+def get_json_log() -> SegmentLog:
+    """Segment log for auto-capture JSON records (own prefix, so it never shares a segment with the GUI)"""
+    global _json_log
+    if _json_log is None:
+        _json_log = SegmentLog(
+            str(config.json_log_dir), "cli_capture",
+            max_segment_bytes=config.json_log_max_segment_mb * 1024 * 1024,
+            max_segment_age=config.json_log_max_segment_age,
+            compression=None if config.json_log_compression == 'none' else config.json_log_compression,
+            keep_segments=config.json_log_keep_segments
+        )
+        atexit.register(_json_log.close)
+    return _json_log
+
+def _exit_on_sigterm(signum, frame):
+    """Turn SIGTERM into a normal exit so atexit handlers commit buffered data"""
+    raise SystemExit(128 + signum)
+
+# Ordered index of foreground screenshots, opened on first use
+_retention: Optional[RetentionIndex] = None
+
+def get_retention_index() -> RetentionIndex:
+    """Retention index of screenshot_*.png (rebuilt from one folder scan if its journal is missing)"""
+    global _retention
+    if _retention is None:
+        _retention = RetentionIndex(
+            str(config.screenshots_dir / 'retention.journal'), [str(config.screenshots_dir)],
+            extensions=('.png',), prefix='screenshot_'
+        )
+        atexit.register(_retention.close)
+    return _retention
+
+# Region-of-interest cropping profiles per window title
+roi_profiles = ROIProfileStore(config.roi_profiles_file)
+
+# Cached window enumeration (one getAllWindows() per second at most, shared by all commands)
+window_registry = get_window_registry(gw.getAllWindows if WINDOW_MANAGER_AVAILABLE else (lambda: []))
+
+# Rule-based metric extraction (built-in rules plus per-device rule sets)
+metric_extractor = get_metric_extractor(config.metric_rules_file)
+
+# Device keywords and categories, compiled once (built-in plus DEVICE_RULES_FILE)
+device_classifier = get_device_classifier(config.device_rules_file)
+
+def extract_metrics(raw_text: str, ocr_result: Optional[Dict[str, Any]], window_title: str) -> Dict[str, Any]:
+    """Typed metrics of one capture; extraction problems never fail a capture"""
+    try:
+        return metric_extractor.extract(raw_text, ocr_result, window_title)
+    except Exception as e:
+        if config.show_debug:
+            console.print(f"[yellow]Metric extraction failed: {e}[/yellow]")
+        return {}
+
 class WindowManager:
     """Cross-platform window management"""
     
@@ -212,7 +397,7 @@ class WindowManager:
             return []
         
         try:
-            all_windows = gw.getAllWindows()
+            window_infos = window_registry.snapshots()
             visible_windows = []
             
             # Platform-specific system window exclusions
@@ -222,13 +407,13 @@ class WindowManager:
             elif PLATFORM == 'darwin':  # macOS
                 excluded_titles.extend(['Dock', 'Menu Bar', 'Spotlight'])
             
-            for window in all_windows:
-                if (window.title and window.title.strip() and 
-                    window.title not in excluded_titles and
-                    window.width > 0 and window.height > 0):
-                    visible_windows.append(window)
+            for info in window_infos:
+                if (info.title.strip() and 
+                    info.title not in excluded_titles and
+                    info.width > 0 and info.height > 0):
+                    visible_windows.append(info)
             
-            return sorted(visible_windows, key=lambda w: w.title.lower())
+            return [info.window for info in sorted(visible_windows, key=lambda info: info.title.lower())]
             
         except Exception as e:
             console.print(f"[red]Error getting windows: {e}[/red]")
@@ -236,36 +421,8 @@ class WindowManager:
     
     @staticmethod
     def categorize_windows(windows: List[Any]) -> Dict[str, List[Any]]:
-        """Categorize windows by device type"""
-        categories = {
-            'mobile_phones': [],
-            'tablets': [],
-            'wearables': [],
-            'emulators': [],
-            'dev_tools': [],
-            'browsers': [],
-            'unknown_devices': []
-        }
-        
-        for window in windows:
-            title_lower = window.title.lower()
-            
-            if any(kw in title_lower for kw in ['phone', 'sm-', 'iphone', 'pixel', 'oneplus', 'xiaomi', 'huawei', 'oppo', 'vivo']):
-                categories['mobile_phones'].append(window)
-            elif any(kw in title_lower for kw in ['tablet', 'ipad', 'tab', 'surface']):
-                categories['tablets'].append(window)
-            elif any(kw in title_lower for kw in ['watch', 'band', 'fitbit', 'garmin', 'amazfit']):
-                categories['wearables'].append(window)
-            elif any(kw in title_lower for kw in ['emulator', 'bluestacks', 'nox', 'memu', 'ldplayer']):
-                categories['emulators'].append(window)
-            elif any(kw in title_lower for kw in ['scrcpy', 'adb', 'vysor', 'android studio']):
-                categories['dev_tools'].append(window)
-            elif any(kw in title_lower for kw in ['chrome', 'firefox', 'safari', 'edge', 'browser']):
-                categories['browsers'].append(window)
-            else:
-                categories['unknown_devices'].append(window)
-        
-        return categories
+        """Categorize windows by device type (shared, memoized classifier)"""
+        return device_classifier.categorize(windows)
     
     @staticmethod
     def activate_window(window: Any) -> bool:
@@ -485,56 +642,34 @@ class ScreenshotCapture:
                             width += 2 * crop_padding
                             height += 2 * crop_padding
                         
-                        with mss.mss() as sct:
-                            monitor = {
-                                "top": top,
-                                "left": left,
-                                "width": width,
-                                "height": height
-                            }
-                            
-                            sct_img = sct.grab(monitor)
-                            if sct_img:
-                                img = Image.frombytes("RGB", sct_img.size, sct_img.bgra, "raw", "BGRX")
-                                
-                                # Check if image is not blank
-                                extrema = img.getextrema()
-                                is_blank = all(channel == (0, 0) for channel in extrema)
-                                
-                                if not is_blank:
-                                    img.save(filepath)
-                                    console.print(f"[green]✓[/green] Background capture successful: {filename}")
-                                    return str(filepath)
-                                else:
-                                    console.print("[yellow]MSS captured blank image[/yellow]")
+                        img = get_capture_session().grab_image(left, top, width, height)
+                        
+                        # Check if image is not blank
+                        extrema = img.getextrema()
+                        is_blank = all(channel == (0, 0) for channel in extrema)
+                        
+                        if not is_blank:
+                            img.save(filepath)
+                            console.print(f"[green]✓[/green] Background capture successful: {filename}")
+                            return str(filepath)
+                        else:
+                            console.print("[yellow]MSS captured blank image[/yellow]")
                             
                 except Exception as e:
                     if config.show_debug:
                         console.print(f"[yellow]MSS background capture failed: {e}[/yellow]")
             
-            # Method 3: Linux - Use xwd for background capture
-            if PLATFORM == 'linux' and LINUX_TOOLS_AVAILABLE:
+            # Method 3: Linux - read the window's pixels by XID (XGetImage, no subprocess or temp file)
+            if PLATFORM == 'linux' and x11_capture_available():
                 try:
-                    # Get window ID
-                    result = subprocess.run(['xdotool', 'search', '--name', window.title], 
-                                          capture_output=True, text=True)
-                    if result.returncode == 0 and result.stdout.strip():
-                        window_id = result.stdout.strip().split('\n')[0]
-                        
-                        # Use xwd to capture window
-                        xwd_cmd = ['xwd', '-id', window_id, '-out', str(filepath.with_suffix('.xwd'))]
-                        result = subprocess.run(xwd_cmd, capture_output=True)
-                        
-                        if result.returncode == 0:
-                            # Convert xwd to png using ImageMagick
-                            convert_cmd = ['convert', str(filepath.with_suffix('.xwd')), str(filepath)]
-                            result = subprocess.run(convert_cmd, capture_output=True)
-                            
-                            if result.returncode == 0 and filepath.exists():
-                                # Clean up xwd file
-                                filepath.with_suffix('.xwd').unlink(missing_ok=True)
-                                console.print(f"[green]✓[/green] Background capture successful: {filename}")
-                                return str(filepath)
+                    # XID is the native handle cached by the window registry - no title search
+                    window_id = x11_window_id(window_registry.lookup(window) or window)
+                    if window_id is not None:
+                        img = get_x11_capture().grab_window_image(window_id)
+                        if img.getextrema() != ((0, 0), (0, 0), (0, 0)):
+                            img.save(filepath)
+                            console.print(f"[green]✓[/green] Background capture successful: {filename}")
+                            return str(filepath)
                             
                 except Exception as e:
                     if config.show_debug:
@@ -598,19 +733,11 @@ class ScreenshotCapture:
             # Try MSS first (fastest and most reliable for background capture)
             if mss:
                 try:
-                    with mss.mss() as sct:
-                        monitor = {
-                            "top": top,
-                            "left": left,
-                            "width": width,
-                            "height": height
-                        }
-                        sct_img = sct.grab(monitor)
-                        img = Image.frombytes("RGB", sct_img.size, sct_img.bgra, "raw", "BGRX")
-                        
-                        if img.getextrema() != ((0, 0), (0, 0), (0, 0)):
-                            img.save(filepath)
-                            return str(filepath)
+                    img = get_capture_session().grab_image(left, top, width, height)
+                    
+                    if img.getextrema() != ((0, 0), (0, 0), (0, 0)):
+                        img.save(filepath)
+                        return str(filepath)
                 except Exception:
                     pass
             
@@ -629,8 +756,12 @@ class ScreenshotCapture:
             return None
     
     @staticmethod
-    def capture_window(window: Any) -> Optional[str]:
-        """Capture screenshot of specified window"""
+    def capture_window(window: Any, in_memory: bool = False) -> Optional[Union[str, CapturedFrame]]:
+        """Capture screenshot of specified window
+        
+        With ``in_memory`` the DXcam/MSS grabs are returned as a CapturedFrame
+        instead of being saved; the PyAutoGUI fallback still returns a path.
+        """
         try:
             # Generate unique filename
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -682,6 +813,11 @@ class ScreenshotCapture:
             
             console.print(f"[dim]Capturing window '{window.title}' at ({left}, {top}) {width}x{height}[/dim]")
             
+            # Crop to the regions of a matching ROI profile before OCR
+            roi_profile = roi_profiles.match(window.title) if config.roi_cropping_enabled else None
+            if roi_profile and config.show_debug:
+                console.print(f"[dim]Using ROI profile '{roi_profile.name}' ({len(roi_profile.regions)} regions)[/dim]")
+            
             # Method 1: Try DXcam (Windows only)
             if DXCAM_AVAILABLE and PLATFORM == 'windows':
                 try:
@@ -692,8 +828,12 @@ class ScreenshotCapture:
                         if frame is not None and frame.size > 0:
                             img = Image.fromarray(frame)
                             if img.getextrema() != ((0, 0), (0, 0), (0, 0)):
-                                img.save(filepath)
                                 camera.release()
+                                if roi_profile:
+                                    img = roi_profile.crop(img)
+                                if in_memory:
+                                    return CapturedFrame(img, str(filepath), window.title)
+                                img.save(filepath)
                                 return str(filepath)
                         camera.release()
                 except Exception as e:
@@ -703,32 +843,36 @@ class ScreenshotCapture:
             # Method 2: MSS (cross-platform)
             if mss:
                 try:
-                    with mss.mss() as sct:
-                        monitor = {
-                            "top": top,
-                            "left": left,
-                            "width": width,
-                            "height": height
-                        }
-                        sct_img = sct.grab(monitor)
-                        img = Image.frombytes("RGB", sct_img.size, sct_img.bgra, "raw", "BGRX")
-                        if img.getextrema() != ((0, 0), (0, 0), (0, 0)):
-                            img.save(filepath)
-                            return str(filepath)
+                    # With an ROI profile only the bounding box of its regions is grabbed
+                    if roi_profile:
+                        img = get_capture_session().grab_image(*roi_profile.grab_rect(left, top, width, height))
+                    else:
+                        img = get_capture_session().grab_image(left, top, width, height)
+                    if img.getextrema() != ((0, 0), (0, 0), (0, 0)):
+                        if roi_profile:
+                            img = roi_profile.crop(img, roi_profile.bounds())
+                        if in_memory:
+                            return CapturedFrame(img, str(filepath), window.title)
+                        img.save(filepath)
+                        return str(filepath)
                 except Exception as e:
                     if config.show_debug:
                         console.print(f"[yellow]MSS failed: {e}[/yellow]")
             
-            # Method 3: Linux scrot
-            if PLATFORM == 'linux' and LINUX_TOOLS_AVAILABLE:
+            # Method 3: Linux - native XGetImage of the screen region (no scrot subprocess)
+            if PLATFORM == 'linux' and x11_capture_available():
                 try:
-                    scrot_cmd = ["scrot", "-a", f"{left},{top},{width},{height}", str(filepath)]
-                    result = subprocess.run(scrot_cmd, capture_output=True, text=True)
-                    if result.returncode == 0 and filepath.exists():
+                    img = get_x11_capture().grab_screen_image(left, top, width, height)
+                    if img.getextrema() != ((0, 0), (0, 0), (0, 0)):
+                        if roi_profile:
+                            img = roi_profile.crop(img)
+                        if in_memory:
+                            return CapturedFrame(img, str(filepath), window.title)
+                        img.save(filepath)
                         return str(filepath)
                 except Exception as e:
                     if config.show_debug:
-                        console.print(f"[yellow]scrot failed: {e}[/yellow]")
+                        console.print(f"[yellow]X11 capture failed: {e}[/yellow]")
             
             # Method 4: PyAutoGUI fallback
             if pyautogui:
@@ -750,9 +894,16 @@ class ScreenshotCapture:
 class AzureOCR:
     """Azure Computer Vision OCR integration"""
     
+    API_VERSION = 'v3.2'
+    LANGUAGE = 'unk'
+    DETECT_ORIENTATION = True
+    
     @staticmethod
-    def process_image(image_path: str) -> Dict[str, Any]:
-        """Process image with Azure OCR"""
+    def process_image(image_path: Union[str, CapturedFrame]) -> Dict[str, Any]:
+        """Process image with Azure OCR
+        
+        Accepts an image file path or an in-memory CapturedFrame.
+        """
         if not config.is_azure_configured():
             return {
                 'success': False,
@@ -768,30 +919,61 @@ class AzureOCR:
             }
         
         try:
-            # Read image file
-            with open(image_path, 'rb') as image_file:
-                image_data = image_file.read()
-            
-            # Azure OCR API call
-            headers = {
-                'Ocp-Apim-Subscription-Key': config.azure_key,
-                'Content-Type': 'application/octet-stream'
-            }
-            
-            url = f"{config.azure_endpoint}/vision/v3.2/ocr"
-            params = {'language': 'unk', 'detectOrientation': 'true'}
-            
-            response = requests.post(url, headers=headers, params=params, data=image_data, timeout=30)
+            # Read image file, shrinking it in memory first if preprocessing is enabled
+            preprocess_report = None
+            if isinstance(image_path, CapturedFrame):
+                if image_preprocessor is not None and image_preprocessor.available:
+                    image_data, preprocess_report = image_preprocessor.process(image_path.image)
+                else:
+                    image_data = image_path.encode_png()
+            elif image_preprocessor is not None and image_preprocessor.available:
+                image_data, preprocess_report = image_preprocessor.process_file(image_path)
+            else:
+                with open(image_path, 'rb') as image_file:
+                    image_data = image_file.read()
+            
+            # Check the OCR cache before going to the network
+            cache_key = None
+            if ocr_cache is not None:
+                cache_key = make_cache_key(image_data, AzureOCR.LANGUAGE, AzureOCR.DETECT_ORIENTATION, AzureOCR.API_VERSION)
+                cached_result = ocr_cache.get(cache_key)
+                if cached_result is not None:
+                    if config.show_debug:
+                        console.print("[dim]OCR cache hit[/dim]")
+                    return {
+                        'success': True,
+                        'result': cached_result,
+                        'raw_text': AzureOCR.extract_text_from_result(cached_result),
+                        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                        'cached': True
+                    }
+            
+            # Azure OCR API call over the shared keep-alive session
+            request_start = time.time()
+            response = get_ocr_client(config.ocr_connect_timeout, config.ocr_read_timeout).recognize(
+                config.azure_endpoint,
+                config.azure_key,
+                image_data,
+                language=AzureOCR.LANGUAGE,
+                detect_orientation=AzureOCR.DETECT_ORIENTATION,
+                api_version=AzureOCR.API_VERSION
+            )
             
             if response.status_code == 200:
                 ocr_result = response.json()
+                if cache_key is not None:
+                    ocr_cache.put(cache_key, ocr_result)
                 raw_text = AzureOCR.extract_text_from_result(ocr_result)
                 
+                if preprocess_report and config.show_debug:
+                    console.print(f"[dim]Upload: {format_preprocess_report(preprocess_report, time.time() - request_start)}[/dim]")
+                
                 return {
                     'success': True,
                     'result': ocr_result,
                     'raw_text': raw_text,
-                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    'preprocess': preprocess_report
                 }
             else:
                 return {
@@ -809,18 +991,9 @@ class AzureOCR:
     
     @staticmethod
     def extract_text_from_result(ocr_result: Dict[str, Any]) -> str:
-        """Extract text from Azure OCR result"""
+        """Extract text from Azure OCR result (parsed once into the shared layout)"""
         try:
-            raw_text_lines = []
-            
-            if 'regions' in ocr_result:
-                for region in ocr_result['regions']:
-                    for line in region.get('lines', []):
-                        line_text = ' '.join([word.get('text', '') for word in line.get('words', [])])
-                        if line_text.strip():
-                            raw_text_lines.append(line_text)
-            
-            return '\n'.join(raw_text_lines) if raw_text_lines else ''
+            return get_layout(ocr_result).text
             
         except Exception as e:
             return f"Error extracting text: {str(e)}"
@@ -829,24 +1002,25 @@ class DataExporter:
     """Data export functionality"""
     
     @staticmethod
-    def save_to_csv(data: Dict[str, Any], filename: str = "auto_data.csv") -> bool:
-        """Save data to CSV file"""
+    def save_to_csv(data: Dict[str, Any], filename: str = "auto_data.csv", flush: bool = False) -> bool:
+        """Save data to CSV file
+        
+        Rows go through a shared buffered appender and are group-committed;
+        ``flush`` commits immediately (explicit exports).
+        """
         try:
-            csv_path = config.screenshots_dir / filename
-            file_exists = csv_path.exists()
-            
-            with open(csv_path, 'a', newline='', encoding='utf-8') as csvfile:
-                fieldnames = ['timestamp', 'window_title', 'raw_text']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                
-                if not file_exists:
-                    writer.writeheader()
-                
-                writer.writerow({
-                    'timestamp': data.get('timestamp', ''),
-                    'window_title': data.get('window_title', ''),
-                    'raw_text': data.get('raw_text', '').replace('\n', ' | ')
-                })
+            appender = get_csv_appender(
+                config.screenshots_dir / filename, ['timestamp', 'window_title', 'raw_text'],
+                max_rows=config.csv_flush_rows, max_bytes=config.csv_flush_bytes,
+                max_delay=config.csv_flush_interval
+            )
+            appender.append({
+                'timestamp': data.get('timestamp', ''),
+                'window_title': data.get('window_title', ''),
+                'raw_text': data.get('raw_text', '').replace('\n', ' | ')
+            })
+            if flush:
+                appender.flush()
             
             return True
             
@@ -874,24 +1048,61 @@ class DataExporter:
             return False
     
     @staticmethod
-    def cleanup_old_screenshots():
-        """Clean up old screenshots, keeping only the last N files"""
+    def save_to_sqlite(data: Dict[str, Any]) -> bool:
+        """Save data to the SQLite capture database"""
         try:
-            screenshot_files = list(config.screenshots_dir.glob("screenshot_*.png"))
-            
-            if len(screenshot_files) <= config.max_screenshots:
-                return
+            image_path = data.get('image_path')
+            get_capture_store(config.capture_db_path).add(
+                data.get('timestamp', ''), data.get('window_title', ''), data.get('raw_text', ''),
+                image_path=str(image_path) if image_path else None,
+                image_hash=file_sha256(str(image_path)) if image_path else None,
+                payload=None if data.get('unchanged') else data.get('ocr_result'),
+                source='cli', metrics=data.get('metrics'), timestamp_ms=data.get('timestamp_ms')
+            )
+            return True
             
-            # Sort by modification time (newest first)
-            screenshot_files.sort(key=lambda x: x.stat().st_mtime, reverse=True)
+        except Exception as e:
+            console.print(f"[red]Database export error: {e}[/red]")
+            return False
+    
+    @staticmethod
+    def save_to_log(data: Dict[str, Any]) -> bool:
+        """Append data to the JSON capture log"""
+        try:
+            record = {key: str(value) if isinstance(value, Path) else value for key, value in data.items()}
+            get_json_log().append(record)
+            return True
             
-            # Delete old files
-            for old_file in screenshot_files[config.max_screenshots:]:
-                try:
-                    old_file.unlink()
-                except Exception as e:
-                    if config.show_debug:
-                        console.print(f"[yellow]Could not delete {old_file}: {e}[/yellow]")
+        except Exception as e:
+            console.print(f"[red]JSON log error: {e}[/red]")
+            return False
+    
+    @staticmethod
+    def store_capture(data: Dict[str, Any]) -> bool:
+        """Record an auto-capture sample in the configured backends (CSV, JSON log, SQLite)"""
+        success = True
+        if 'csv' in config.storage_backends:
+            success = DataExporter.save_to_csv(data) and success
+        if 'json' in config.storage_backends and not data.get('unchanged'):
+            success = DataExporter.save_to_log(data) and success
+        if 'sqlite' in config.storage_backends:
+            success = DataExporter.save_to_sqlite(data) and success
+        return success
+    
+    @staticmethod
+    def cleanup_old_screenshots():
+        """Clean up old screenshots, keeping only the last N files
+        
+        The oldest files come from the retention index; the folder is not scanned.
+        """
+        try:
+            retention = get_retention_index()
+            evicted = retention.evict(max_count=config.max_screenshots)
+            _, failed = delete_files(evicted)
+            retention.restore({path: evicted[path] for path in failed})  # Retry on a later pass
+            for old_file in failed:
+                if config.show_debug:
+                    console.print(f"[yellow]Could not delete {old_file}[/yellow]")
                         
         except Exception as e:
             if config.show_debug:
@@ -905,6 +1116,8 @@ class GraceCLI:
         self.selected_window = None
         self.auto_capture_running = False
         self.auto_capture_thread = None
+        self.auto_capture_stop = threading.Event()
+        self.capture_scheduler = None
         self.last_ocr_result = None
     
     def show_banner(self):
@@ -957,8 +1170,8 @@ class GraceCLI:
             methods.append("DXcam")
         if mss:
             methods.append("MSS")
-        if LINUX_TOOLS_AVAILABLE:
-            methods.append("scrot")
+        if PLATFORM == 'linux' and x11_capture_available():
+            methods.append("X11 (XGetImage)")
         if pyautogui:
             methods.append("PyAutoGUI")
         
@@ -989,10 +1202,26 @@ class GraceCLI:
                 "[yellow]⚠ Not configured[/yellow]",
                 message
             )
-        
+
+        # OCR result cache
+        if ocr_cache is not None:
+            cache_stats = ocr_cache.get_stats()
+            status_table.add_row(
+                "OCR Cache",
+                "[green]✓ Enabled[/green]",
+                f"{cache_stats['entries']} entries, {cache_stats['bytes'] / (1024 * 1024):.1f} MB, "
+                f"{cache_stats['hits']} hits / {cache_stats['misses']} misses this session"
+            )
+        else:
+            status_table.add_row(
+                "OCR Cache",
+                "[yellow]⚠ Disabled[/yellow]",
+                "Set OCR_CACHE_ENABLED=true to enable"
+            )
+
         console.print(status_table)
         console.print()
-    
+
     def list_windows(self, show_categories: bool = True) -> List[Any]:
         """List all available windows"""
         with Status("[bold blue]Scanning for windows...", console=console):
@@ -1060,8 +1289,16 @@ class GraceCLI:
                 console.print("\n[yellow]Selection cancelled[/yellow]")
                 return None
     
-    def capture_window(self, window: Any) -> Optional[Dict[str, Any]]:
-        """Capture and process a window"""
+    def capture_window(self, window: Any, skip_unchanged: bool = False,
+                       keep_screenshot: bool = True) -> Optional[Dict[str, Any]]:
+        """Capture and process a window
+        
+        With ``skip_unchanged`` the frame is compared against the last OCR'd
+        frame of the same window and OCR is skipped if the screen has not changed.
+        Without ``keep_screenshot`` the caller deletes the screenshot after
+        storing the result: in-memory frames are then never written and
+        screenshot files are not added to retention.
+        """
         console.print(f"\n[bold blue]Capturing window: {window.title}[/bold blue]")
         
         with Progress(
@@ -1076,22 +1313,58 @@ class GraceCLI:
             task1 = progress.add_task("Taking screenshot...", total=100)
             progress.update(task1, advance=30)
             
-            image_path = ScreenshotCapture.capture_window(window)
+            capture = ScreenshotCapture.capture_window(window, in_memory=config.in_memory_capture)
             progress.update(task1, advance=70)
             
-            if not image_path:
+            if not capture:
                 progress.update(task1, completed=100)
                 console.print("[red]✗ Screenshot failed[/red]")
                 return None
             
             progress.update(task1, completed=100)
-            console.print(f"[green]✓ Screenshot saved: {Path(image_path).name}[/green]")
+            
+            # In-memory frames are persisted in the background only if screenshots are kept
+            if isinstance(capture, CapturedFrame):
+                image_path = None
+                if keep_screenshot and config.max_screenshots > 0 and frame_writer.submit(
+                        capture, on_done=lambda frame, ok: ok and get_retention_index().track(frame.path)):
+                    image_path = capture.path
+                console.print(f"[green]✓ Frame captured in memory: {window.title}[/green]")
+            else:
+                image_path = capture
+                if keep_screenshot:
+                    get_retention_index().track(image_path)
+                console.print(f"[green]✓ Screenshot saved: {Path(image_path).name}[/green]")
+            
+            # Skip OCR if the screen has not changed since the last OCR'd frame
+            signature = None
+            if skip_unchanged and frame_change_detector.enabled:
+                try:
+                    changed, signature, distance = frame_change_detector.check(
+                        window.title, capture.image if isinstance(capture, CapturedFrame) else capture
+                    )
+                    previous = frame_change_detector.last_result(window.title)
+                    if not changed and previous is not None:
+                        console.print(f"[dim]♻ Screen unchanged (difference {distance:.2f}), reusing previous OCR result[/dim]")
+                        self.last_ocr_result = {
+                            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                            'window_title': window.title,
+                            'raw_text': previous['raw_text'],
+                            'image_path': image_path,
+                            'ocr_result': previous['ocr_result'],
+                            'metrics': previous.get('metrics', {}),
+                            'unchanged': True
+                        }
+                        return self.last_ocr_result
+                except Exception as e:
+                    if config.show_debug:
+                        console.print(f"[yellow]Change detection failed: {e}[/yellow]")
             
             # Step 2: OCR processing
             task2 = progress.add_task("Processing with OCR...", total=100)
             progress.update(task2, advance=20)
             
-            ocr_result = AzureOCR.process_image(image_path)
+            ocr_result = AzureOCR.process_image(capture)
             progress.update(task2, advance=80)
             
             if not ocr_result['success']:
@@ -1107,9 +1380,12 @@ class GraceCLI:
                 'window_title': window.title,
                 'raw_text': ocr_result['raw_text'],
                 'image_path': image_path,
-                'ocr_result': ocr_result['result']
+                'ocr_result': ocr_result['result'],
+                'metrics': extract_metrics(ocr_result['raw_text'], ocr_result['result'], window.title)
             }
             
+            frame_change_detector.commit(window.title, signature, result_data)
+            
             self.last_ocr_result = result_data
             
             # Display results
@@ -1166,7 +1442,8 @@ class GraceCLI:
                 'image_path': image_path,
                 'capture_method': 'background',
                 'crop_padding': crop_padding,
-                'ocr_result': ocr_result['result']
+                'ocr_result': ocr_result['result'],
+                'metrics': extract_metrics(ocr_result['raw_text'], ocr_result['result'], window.title)
             }
             
             self.last_ocr_result = result_data
@@ -1191,6 +1468,8 @@ class GraceCLI:
             title_text += " [dim](Background Capture)[/dim]"
         
         subtitle_parts = [f"Captured at: {data['timestamp']}"]
+        if data.get('ocr_result'):
+            subtitle_parts.append(f"{len(get_layout(data['ocr_result']).lines)} lines")
         if background and 'crop_padding' in data:
             subtitle_parts.append(f"Padding: {data['crop_padding']}px")
         
@@ -1202,29 +1481,41 @@ class GraceCLI:
         )
         
         console.print(results_panel)
+        
+        if data.get('metrics'):
+            metrics_table = Table(title="Extracted Metrics", box=box.SIMPLE)
+            metrics_table.add_column("Metric", style="cyan")
+            metrics_table.add_column("Value", style="bold")
+            for name, value in data['metrics'].items():
+                metrics_table.add_row(name, str(value))
+            console.print(metrics_table)
         console.print()
     
     def auto_capture_worker(self):
-        """Auto-capture worker thread"""
+        """Auto-capture worker thread (captures fire at start + n * interval)"""
+        scheduler = FixedRateScheduler(config.auto_capture_interval, config.auto_capture_overdue_policy)
+        self.capture_scheduler = scheduler
+        scheduler.start(immediate=True)
         while self.auto_capture_running:
+            # Wait for the next deadline, not a whole interval after the work finished
+            tick = scheduler.wait(self.auto_capture_stop)
+            if tick is None:
+                break
+            if tick.missed and config.show_debug:
+                console.print(f"[yellow]Auto-capture fell behind: {tick.missed} tick(s) missed[/yellow]")
             if self.selected_window:
                 try:
-                    result = self.capture_window(self.selected_window)
+                    result = self.capture_window(self.selected_window, skip_unchanged=True, keep_screenshot=False)
                     if result:
-                        # Auto-save to CSV
-                        DataExporter.save_to_csv(result)
+                        # Auto-save to CSV / capture database
+                        DataExporter.store_capture(result)
                         # Clean up screenshot
                         if result['image_path'] and Path(result['image_path']).exists():
                             Path(result['image_path']).unlink()
                         DataExporter.cleanup_old_screenshots()
                 except Exception as e:
                     console.print(f"[red]Auto-capture error: {e}[/red]")
-            
-            # Wait for next capture
-            for _ in range(config.auto_capture_interval):
-                if not self.auto_capture_running:
-                    break
-                time.sleep(1)
+        scheduler.stop()
     
     def start_auto_capture(self):
         """Start auto-capture mode"""
@@ -1248,6 +1539,7 @@ class GraceCLI:
         
         config.auto_capture_interval = interval
         self.auto_capture_running = True
+        self.auto_capture_stop.clear()
         
         self.auto_capture_thread = threading.Thread(target=self.auto_capture_worker, daemon=True)
         self.auto_capture_thread.start()
@@ -1262,10 +1554,13 @@ class GraceCLI:
             return
         
         self.auto_capture_running = False
+        self.auto_capture_stop.set()
         if self.auto_capture_thread:
             self.auto_capture_thread.join(timeout=2)
         
         console.print("[green]✓ Auto-capture stopped[/green]")
+        if self.capture_scheduler is not None:
+            console.print(f"[dim]Schedule: {format_schedule_report(self.capture_scheduler.get_stats())}[/dim]")
     
     def export_last_result(self):
         """Export the last OCR result"""
@@ -1277,13 +1572,14 @@ class GraceCLI:
         console.print("1. CSV format")
         console.print("2. JSON format")
         console.print("3. Both formats")
+        console.print("4. Capture database (SQLite)")
         
-        choice = IntPrompt.ask("Select export format", choices=["1", "2", "3"], default="3")
+        choice = IntPrompt.ask("Select export format", choices=["1", "2", "3", "4"], default="3")
         
         success = False
         
         if choice in ["1", "3"]:
-            if DataExporter.save_to_csv(self.last_ocr_result):
+            if DataExporter.save_to_csv(self.last_ocr_result, flush=True):
                 console.print("[green]✓ Exported to CSV[/green]")
                 success = True
         
@@ -1292,6 +1588,11 @@ class GraceCLI:
                 console.print("[green]✓ Exported to JSON[/green]")
                 success = True
         
+        if choice == "4":
+            if DataExporter.save_to_sqlite(self.last_ocr_result):
+                console.print(f"[green]✓ Saved to {config.capture_db_path}[/green]")
+            return
+        
         if success:
             console.print(f"[dim]Files saved to: {config.screenshots_dir}[/dim]")
     
@@ -1488,8 +1789,213 @@ class GraceCLI:
             console.print("\n[yellow]Exiting Grace CLI...[/yellow]")
         finally:
             self.stop_auto_capture()
+            get_capture_session().close()
             console.print("[green]Thank you for using Grace CLI![/green]")
 
+class CaptureDaemon:
+    """Headless asyncio capture loop for unattended capture stations
+    
+    • capture fires on absolute deadlines (start + n * interval) from a
+      FixedRateScheduler, so the sample rate does not stretch by the OCR latency;
+      missed deadlines and jitter are reported in the summary
+    • OCR runs in worker threads over the shared keep-alive OCR client, at most
+      ``concurrency`` calls at a time; when every slot is busy and the backlog
+      is full the sample is skipped and counted instead of queueing forever
+    • a single writer task stores results in capture order
+    • SIGTERM / SIGINT stop the schedule and drain in-flight OCR before exit
+    """
+    
+    def __init__(self, window: Any, interval: float, concurrency: int = 2,
+                 duration: Optional[float] = None, max_backlog: int = 4):
+        self.window = window
+        self.interval = interval
+        self.concurrency = max(1, concurrency)
+        self.duration = duration
+        self.max_backlog = max_backlog
+        self.stop_event = None
+        self.scheduler = None
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            'ticks': 0,
+            'missed_ticks': 0,
+            'captured': 0,
+            'capture_failed': 0,
+            'skipped_busy': 0,
+            'ocr_ok': 0,
+            'ocr_failed': 0,
+            'unchanged': 0,
+            'written': 0
+        }
+    
+    def _count(self, name: str):
+        """Increment a counter (called from worker threads too)"""
+        with self._stats_lock:
+            self.stats[name] += 1
+    
+    def request_stop(self):
+        """Stop scheduling new captures (in-flight OCR is still drained)"""
+        if self.stop_event is not None and not self.stop_event.is_set():
+            console.print("\n[yellow]Stop requested - draining in-flight OCR...[/yellow]")
+            self.stop_event.set()
+    
+    def _install_signal_handlers(self, loop):
+        """Route SIGTERM/SIGINT to request_stop"""
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, self.request_stop)
+            except (NotImplementedError, RuntimeError):
+                # Windows event loops have no add_signal_handler
+                signal.signal(sig, lambda signum, frame: loop.call_soon_threadsafe(self.request_stop))
+    
+    @staticmethod
+    def _in_thread(func, *args):
+        """Run a blocking call in the default executor (asyncio.to_thread needs Python 3.9)"""
+        return asyncio.get_running_loop().run_in_executor(None, func, *args)
+    
+    def _recognize(self, capture: Union[str, CapturedFrame], captured_at: str) -> Optional[Dict[str, Any]]:
+        """Change detection + OCR for one sample (runs in a worker thread)"""
+        image = capture.image if isinstance(capture, CapturedFrame) else capture
+        image_path = None if isinstance(capture, CapturedFrame) else capture
+        
+        signature = None
+        if frame_change_detector.enabled:
+            try:
+                changed, signature, distance = frame_change_detector.check(self.window.title, image)
+                previous = frame_change_detector.last_result(self.window.title)
+                if not changed and previous is not None:
+                    self._count('unchanged')
+                    return dict(previous, timestamp=captured_at, image_path=image_path, unchanged=True)
+            except Exception as e:
+                if config.show_debug:
+                    console.print(f"[yellow]Change detection failed: {e}[/yellow]")
+        
+        ocr_result = AzureOCR.process_image(capture)
+        if not ocr_result['success']:
+            console.print(f"[red]✗ OCR failed: {ocr_result['error']}[/red]")
+            self._count('ocr_failed')
+            return None
+        
+        self._count('ocr_ok')
+        result_data = {
+            'timestamp': captured_at,
+            'window_title': self.window.title,
+            'raw_text': ocr_result['raw_text'],
+            'image_path': image_path,
+            'ocr_result': ocr_result['result']
+        }
+        frame_change_detector.commit(self.window.title, signature, result_data)
+        return result_data
+    
+    async def _process(self, sample_id: int, capture, captured_at: str, semaphore, results):
+        """OCR one sample and hand it to the writer (always, to keep the order intact)"""
+        result = None
+        try:
+            async with semaphore:
+                result = await self._in_thread(self._recognize, capture, captured_at)
+        except Exception as e:
+            console.print(f"[red]Sample {sample_id} failed: {e}[/red]")
+        await results.put((sample_id, result))
+    
+    async def _writer(self, results):
+        """Single storage writer; commits samples strictly in capture order"""
+        pending = {}
+        next_id = 1
+        while True:
+            item = await results.get()
+            if item is None:
+                break
+            sample_id, result = item
+            pending[sample_id] = result
+            while next_id in pending:
+                result = pending.pop(next_id)
+                next_id += 1
+                if result is None:
+                    continue
+                await self._in_thread(self._store, result)
+                self.stats['written'] += 1
+    
+    @staticmethod
+    def _store(result: Dict[str, Any]):
+        """Write one sample and apply screenshot retention"""
+        DataExporter.store_capture(result)
+        if result.get('image_path') and Path(result['image_path']).exists():
+            Path(result['image_path']).unlink()
+        DataExporter.cleanup_old_screenshots()
+    
+    async def run(self):
+        """Run until the duration elapses or a stop signal arrives"""
+        loop = asyncio.get_running_loop()
+        self.stop_event = asyncio.Event()
+        self._install_signal_handlers(loop)
+        
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = asyncio.Queue()
+        writer = asyncio.create_task(self._writer(results))
+        in_flight = set()
+        sample_id = 0
+        self.scheduler = FixedRateScheduler(self.interval, config.auto_capture_overdue_policy, clock=loop.time)
+        self.scheduler.start(immediate=True)
+        start = loop.time()
+        
+        while not self.stop_event.is_set():
+            # Sleep until the next absolute deadline (wakes early on stop)
+            delay = self.scheduler.time_until_next()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self.stop_event.wait(), timeout=delay)
+                    break
+                except asyncio.TimeoutError:
+                    pass
+            
+            if self.duration and loop.time() - start >= self.duration:
+                break
+            
+            # Deadlines that passed while we were busy are counted, never replayed
+            tick = self.scheduler.poll()
+            self.stats['missed_ticks'] = self.scheduler.stats['missed']
+            if tick is None:
+                continue
+            self.stats['ticks'] += 1
+            
+            if len(in_flight) >= self.concurrency + self.max_backlog:
+                self.stats['skipped_busy'] += 1
+                if config.show_debug:
+                    console.print("[yellow]OCR backlog full - sample skipped[/yellow]")
+                continue
+            
+            captured_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            capture = await self._in_thread(ScreenshotCapture.capture_window, self.window,
+                                           config.in_memory_capture)
+            if not capture:
+                self.stats['capture_failed'] += 1
+                continue
+            self.stats['captured'] += 1
+            
+            sample_id += 1
+            task = asyncio.create_task(self._process(sample_id, capture, captured_at, semaphore, results))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        
+        # Drain: finish in-flight OCR, then let the writer flush everything
+        if in_flight:
+            await asyncio.gather(*in_flight, return_exceptions=True)
+        await results.put(None)
+        await writer
+    
+    def print_summary(self):
+        """Print the daemon counters"""
+        table = Table(title="Capture Daemon Summary", box=box.ROUNDED)
+        table.add_column("Metric", style="cyan")
+        table.add_column("Value", style="green")
+        for name, value in self.stats.items():
+            table.add_row(name.replace('_', ' ').title(), str(value))
+        if self.scheduler is not None:
+            schedule_stats = self.scheduler.get_stats()
+            table.add_row("Jitter Avg", f"{schedule_stats['jitter_mean_ms']:.1f} ms")
+            table.add_row("Jitter Std Dev", f"{schedule_stats['jitter_std_ms']:.1f} ms")
+            table.add_row("Jitter Max", f"{schedule_stats['max_lateness_ms']:.1f} ms")
+        console.print(table)
+
 # Command-line interface using Click/Typer
 app = typer.Typer(
     name="grace-cli",
@@ -1517,7 +2023,8 @@ def capture(
     background: bool = typer.Option(False, "--background", "-b", help="Capture window in background without bringing to foreground"),
     crop_padding: int = typer.Option(0, "--padding", "-p", help="Additional padding around window bounds (pixels)"),
     export_csv: bool = typer.Option(False, "--csv", help="Export to CSV"),
-    export_json: bool = typer.Option(False, "--json", help="Export to JSON")
+    export_json: bool = typer.Option(False, "--json", help="Export to JSON"),
+    export_db: bool = typer.Option(False, "--db", help="Save to the SQLite capture database")
 ):
     """Capture a specific window"""
     cli = GraceCLI()
@@ -1531,11 +2038,13 @@ def capture(
                     result = cli.capture_window_background(selected, crop_padding)
                 else:
                     result = cli.capture_window(selected)
-                if result and (export_csv or export_json):
+                if result and (export_csv or export_json or export_db):
                     if export_csv:
                         DataExporter.save_to_csv(result)
                     if export_json:
                         DataExporter.save_to_json(result)
+                    if export_db:
+                        DataExporter.save_to_sqlite(result)
         return
     
     # Find window by title
@@ -1565,18 +2074,21 @@ def capture(
     else:
         result = cli.capture_window(selected)
         
-    if result and (export_csv or export_json):
+    if result and (export_csv or export_json or export_db):
         if export_csv:
             DataExporter.save_to_csv(result)
         if export_json:
             DataExporter.save_to_json(result)
+        if export_db:
+            DataExporter.save_to_sqlite(result)
 
 @app.command()
 def background_capture(
     window_title: str = typer.Argument(..., help="Window title to capture"),
     crop_padding: int = typer.Option(10, "--padding", "-p", help="Additional padding around window bounds (pixels)"),
     export_csv: bool = typer.Option(False, "--csv", help="Export to CSV"),
-    export_json: bool = typer.Option(False, "--json", help="Export to JSON")
+    export_json: bool = typer.Option(False, "--json", help="Export to JSON"),
+    export_db: bool = typer.Option(False, "--db", help="Save to the SQLite capture database")
 ):
     """Capture a window in the background without bringing it to foreground"""
     cli = GraceCLI()
@@ -1605,11 +2117,13 @@ def background_capture(
     
     result = cli.capture_window_background(selected, crop_padding)
     
-    if result and (export_csv or export_json):
+    if result and (export_csv or export_json or export_db):
         if export_csv:
             DataExporter.save_to_csv(result)
         if export_json:
             DataExporter.save_to_json(result)
+        if export_db:
+            DataExporter.save_to_sqlite(result)
 
 @app.command()
 def auto_capture(
@@ -1641,32 +2155,275 @@ def auto_capture(
     console.print("[dim]Press Ctrl+C to stop[/dim]")
     
     cli.auto_capture_running = True
-    start_time = time.time()
+    scheduler = FixedRateScheduler(interval, config.auto_capture_overdue_policy)
+    scheduler.start(immediate=True)
+    start_time = time.monotonic()
     
     try:
         while cli.auto_capture_running:
-            result = cli.capture_window(selected)
+            # Sleep until the next absolute deadline (start + n * interval)
+            tick = scheduler.wait()
+            if tick is None:
+                break
+            if tick.missed and config.show_debug:
+                console.print(f"[yellow]Capture fell behind: {tick.missed} tick(s) missed[/yellow]")
+            
+            result = cli.capture_window(selected, skip_unchanged=True, keep_screenshot=False)
             if result:
-                DataExporter.save_to_csv(result)
+                DataExporter.store_capture(result)
                 # Clean up screenshot
                 if result['image_path'] and Path(result['image_path']).exists():
                     Path(result['image_path']).unlink()
                 DataExporter.cleanup_old_screenshots()
             
             # Check duration
-            if duration and (time.time() - start_time) >= duration:
+            if duration and (time.monotonic() - start_time) >= duration:
                 break
-            
-            # Wait for next capture
-            for _ in range(interval):
-                if not cli.auto_capture_running:
-                    break
-                time.sleep(1)
                 
     except KeyboardInterrupt:
         console.print("\n[yellow]Auto-capture stopped[/yellow]")
     finally:
         cli.auto_capture_running = False
+        scheduler.stop()
+        console.print(f"[dim]Schedule: {format_schedule_report(scheduler.get_stats())}[/dim]")
+
+@app.command()
+def daemon(
+    window_title: str = typer.Option(..., "--window", "-w", help="Window title to capture"),
+    interval: float = typer.Option(5.0, "--interval", "-i", help="Capture interval in seconds"),
+    concurrency: int = typer.Option(2, "--concurrency", "-c", help="Maximum concurrent OCR requests"),
+    duration: int = typer.Option(None, "--duration", "-d", help="Duration in seconds (default: run until stopped)")
+):
+    """Run headless fixed-rate capture (SIGTERM or Ctrl+C drains in-flight OCR)"""
+    if interval <= 0:
+        console.print("[red]Interval must be greater than 0[/red]")
+        raise typer.Exit(1)
+    
+    windows = WindowManager.get_all_windows()
+    matching_windows = [w for w in windows if window_title.lower() in w.title.lower()]
+    if not matching_windows:
+        console.print(f"[red]No windows found matching '{window_title}'[/red]")
+        raise typer.Exit(1)
+    
+    selected = matching_windows[0]
+    console.print(f"[green]Starting capture daemon for: {selected.title}[/green]")
+    console.print(f"[dim]Interval: {interval}s, OCR concurrency: {concurrency}, "
+                  f"Duration: {'until stopped' if not duration else f'{duration}s'}[/dim]")
+    
+    capture_daemon = CaptureDaemon(selected, interval, concurrency, duration)
+    try:
+        asyncio.run(capture_daemon.run())
+    finally:
+        get_capture_session().close()
+        capture_daemon.print_summary()
+
+@app.command()
+def migrate(
+    source: Path = typer.Option(None, "--source", "-s", help="Folder with existing CSV/JSON captures (default: screenshots folder)"),
+    database: Path = typer.Option(None, "--db", help="SQLite capture database (default: CAPTURE_DB_PATH)")
+):
+    """Import existing CSV, JSON and JSON log captures into the SQLite capture database"""
+    source = source or config.screenshots_dir
+    database = database or config.capture_db_path
+    if not source.exists():
+        console.print(f"[red]Source folder not found: {source}[/red]")
+        raise typer.Exit(1)
+    
+    cache_dir = config.ocr_cache_dir.resolve()
+    csv_files = sorted(source.rglob("*.csv"))
+    json_files = sorted(
+        path for path in source.rglob("*.json") if cache_dir not in path.resolve().parents
+    )
+    # Segment logs, as (folder, prefix) of their index files
+    json_logs = sorted({(path.parent, path.stem.rsplit('-', 1)[0]) for path in source.rglob("*-*.idx")})
+    console.print(f"[blue]Importing {len(csv_files)} CSV file(s), {len(json_files)} JSON file(s) and "
+                  f"{len(json_logs)} JSON log(s) into {database}[/blue]")
+    
+    store = CaptureStore(str(database))
+    csv_rows = 0
+    failed = 0
+    try:
+        # Re-imports are keyed by file/row and log capture ID; the JSON dump of a CSV row's capture adds its OCR payload
+        for csv_path in csv_files:
+            try:
+                csv_rows += store.import_csv(str(csv_path))
+            except Exception as e:
+                failed += 1
+                console.print(f"[yellow]Skipped {csv_path}: {e}[/yellow]")
+        json_rows, skipped = store.import_json_files(str(path) for path in json_files)
+        for log_dir, prefix in json_logs:
+            try:
+                json_rows += store.import_records(read_segment_log(str(log_dir), prefix),
+                                                  origin=os.path.join(str(log_dir.resolve()), prefix))
+            except Exception as e:
+                failed += 1
+                console.print(f"[yellow]Skipped JSON log {log_dir / prefix}: {e}[/yellow]")
+        captures = store.count()
+    finally:
+        store.close()
+    
+    table = Table(title="Migration Summary", box=box.ROUNDED)
+    table.add_column("Item", style="cyan")
+    table.add_column("Count", style="green")
+    table.add_row("CSV rows", str(csv_rows))
+    table.add_row("JSON / JSON log captures", str(json_rows))
+    table.add_row("Skipped files", str(failed + skipped))
+    table.add_row("Captures in database", str(captures))
+    console.print(table)
+
+def _history_records(source: str, input_path: Optional[Path], since: Optional[str] = None,
+                     until: Optional[str] = None, window_title: Optional[str] = None):
+    """Filtered capture history of an export source ('sqlite', 'csv' or 'log') as a record iterator"""
+    if source == 'sqlite':
+        database = input_path or config.capture_db_path
+        if not database.exists():
+            raise FileNotFoundError(f"Capture database not found: {database}")
+        store = CaptureStore(str(database))
+        try:
+            # Filters run in SQL on the timestamp / window indexes
+            yield from store.query(window_title, since, until)
+        finally:
+            store.close()
+    elif source == 'csv':
+        csv_path = input_path or config.screenshots_dir / 'auto_data.csv'
+        if not csv_path.exists():
+            raise FileNotFoundError(f"CSV history not found: {csv_path}")
+        yield from filter_history(iter_csv_history(str(csv_path)), since, until, window_title)
+    else:
+        log_dir = input_path or config.json_log_dir
+        prefixes = sorted({path.stem.rsplit('-', 1)[0] for path in log_dir.glob("*-*.idx")})
+        if not prefixes:
+            raise FileNotFoundError(f"No JSON capture log found in {log_dir}")
+        for prefix in prefixes:
+            yield from filter_history(read_segment_log(str(log_dir), prefix), since, until, window_title)
+
+@app.command()
+def export(
+    source: str = typer.Option("auto", "--source", "-s", help="History source: auto, sqlite, csv or log"),
+    input_path: Path = typer.Option(None, "--input", "-i", help="Database, CSV file or log folder to read (default: per source)"),
+    out_dir: Path = typer.Option(None, "--out", "-o", help="Parquet dataset folder (default: PARQUET_EXPORT_DIR)"),
+    since: str = typer.Option(None, "--since", help="First timestamp to include, e.g. 2024-05-01 or '2024-05-01 10:00:00'"),
+    until: str = typer.Option(None, "--until", help="Last timestamp (prefix) to include"),
+    window_title: str = typer.Option(None, "--window", "-w", help="Only windows whose title contains this text"),
+    batch_rows: int = typer.Option(None, "--batch-rows", help="Rows held in memory before a row group is written"),
+    compression: str = typer.Option("snappy", "--compression", help="Parquet codec: snappy, zstd, gzip or none")
+):
+    """Export capture history to Parquet, partitioned by day and device"""
+    if not PYARROW_AVAILABLE:
+        console.print("[red]Parquet export needs pyarrow. Install it with: pip install pyarrow[/red]")
+        raise typer.Exit(1)
+    
+    source = source.lower()
+    if source == 'auto':
+        if config.capture_db_path.exists():
+            source = 'sqlite'
+        elif (config.screenshots_dir / 'auto_data.csv').exists():
+            source = 'csv'
+        else:
+            source = 'log'
+    if source not in ('sqlite', 'csv', 'log'):
+        console.print(f"[red]Unknown source '{source}' (expected auto, sqlite, csv or log)[/red]")
+        raise typer.Exit(1)
+    
+    out_dir = out_dir or config.parquet_export_dir
+    writer = HistoryParquetWriter(str(out_dir), batch_rows=batch_rows or config.parquet_batch_rows,
+                                  compression=compression, metric_extractor=metric_extractor.numeric_metrics,
+                                  replace_partitions=not (since or until or window_title))
+    records = _history_records(source, input_path, since, until, window_title)
+    
+    started = time.perf_counter()
+    try:
+        with console.status(f"[blue]Exporting {source} history to {out_dir}...[/blue]"):
+            stats = writer.write_all(records)
+    except FileNotFoundError as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(1)
+    
+    table = Table(title="Parquet Export", box=box.ROUNDED)
+    table.add_column("Item", style="cyan")
+    table.add_column("Value", style="green")
+    table.add_row("Source", source)
+    table.add_row("Rows", str(stats['rows']))
+    table.add_row("Skipped (bad timestamp)", str(stats['skipped']))
+    table.add_row("Partitions (day/device)", str(stats['partitions']))
+    if not writer.replace_partitions:
+        table.add_row("Existing rows kept", str(stats['kept_rows']))
+    table.add_row("Files / row groups", f"{stats['files']} / {stats['row_groups']}")
+    table.add_row("Time", f"{time.perf_counter() - started:.1f}s")
+    table.add_row("Folder", str(out_dir))
+    console.print(table)
+
+@app.command()
+def reprocess(
+    source: Path = typer.Option(None, "--source", "-s", help="Folder with CSV/JSON captures and JSON logs (default: screenshots folder)"),
+    store: str = typer.Option("auto", "--store", help="Where results go: auto, sqlite or jsonl"),
+    database: Path = typer.Option(None, "--db", help="SQLite capture database (default: CAPTURE_DB_PATH)"),
+    out_path: Path = typer.Option(None, "--out", "-o", help="JSONL output file (default: screenshots/metrics_backfill.jsonl)"),
+    workers: int = typer.Option(None, "--workers", "-j", help="Worker processes (default: CPU count, 0 = no pool)"),
+    batch_size: int = typer.Option(500, "--batch-size", help="Captures per batch (one checkpoint per batch)"),
+    checkpoint_path: Path = typer.Option(None, "--checkpoint", help="Progress file (default: screenshots/reprocess.checkpoint)"),
+    restart: bool = typer.Option(False, "--restart", help="Ignore saved progress and start over")
+):
+    """Recompute metrics for the whole capture history with the current rules, without OCR"""
+    source = source or config.screenshots_dir
+    if not source.exists():
+        console.print(f"[red]Source folder not found: {source}[/red]")
+        raise typer.Exit(1)
+    store = store.lower()
+    if store == 'auto':
+        store = 'sqlite' if 'sqlite' in config.storage_backends or config.capture_db_path.exists() else 'jsonl'
+    if store not in ('sqlite', 'jsonl'):
+        console.print(f"[red]Unknown store '{store}' (expected auto, sqlite or jsonl)[/red]")
+        raise typer.Exit(1)
+    
+    checkpoint_path = checkpoint_path or config.screenshots_dir / 'reprocess.checkpoint'
+    checkpoint = ReprocessCheckpoint(str(checkpoint_path), rules_fingerprint(config.metric_rules_file))
+    if checkpoint.stale:
+        console.print("[yellow]Metric rules changed since the saved progress - starting over[/yellow]")
+    if restart or checkpoint.stale:
+        checkpoint.clear()
+    
+    sources = discover_corpus(str(source), exclude_dirs=[str(config.ocr_cache_dir), str(config.parquet_export_dir)])
+    if store == 'sqlite':
+        database = database or config.capture_db_path
+        capture_store = CaptureStore(str(database))
+        sink = SQLiteMetricsSink(capture_store)
+        target = str(database)
+    else:
+        capture_store = None
+        out_path = out_path or config.screenshots_dir / 'metrics_backfill.jsonl'
+        sink = JSONLMetricsSink(str(out_path))
+        target = str(out_path)
+    console.print(f"[blue]Reprocessing {len(sources)} source(s) from {source} into {target}[/blue]")
+    
+    started = time.perf_counter()
+    try:
+        with console.status("[blue]Extracting metrics...[/blue]") as status_line:
+            def show_progress(stats):
+                rate = stats['records'] / max(time.perf_counter() - started, 1e-6)
+                status_line.update(f"[blue]Extracting metrics... {stats['records']} captures ({rate:.0f}/s)[/blue]")
+            
+            stats = run_reprocess(sources, sink, checkpoint, rules_path=config.metric_rules_file, workers=workers,
+                                  batch_size=batch_size, progress=show_progress)
+    except KeyboardInterrupt:
+        console.print(f"[yellow]Interrupted - progress saved to {checkpoint_path}, run again to resume[/yellow]")
+        raise typer.Exit(130)
+    finally:
+        if capture_store is not None:
+            capture_store.close()
+    elapsed = time.perf_counter() - started
+    
+    table = Table(title="Reprocess Summary", box=box.ROUNDED)
+    table.add_column("Item", style="cyan")
+    table.add_column("Value", style="green")
+    table.add_row("Sources", str(stats['sources']))
+    table.add_row("Captures processed", str(stats['records']))
+    table.add_row("Already done (resumed)", str(stats['resumed']))
+    table.add_row("Unreadable / no timestamp", str(stats['invalid']))
+    table.add_row("Captures with metrics", str(stats['with_metrics']))
+    table.add_row("Time", f"{elapsed:.1f}s ({stats['records'] / max(elapsed, 1e-6):.0f} captures/s)")
+    table.add_row("Results", target)
+    console.print(table)
 
 @app.command()
 def configure(
@@ -1706,4 +2463,5 @@ def version():
     console.print("Platform: " + PLATFORM.title())
 
 if __name__ == "__main__":
+    signal.signal(signal.SIGTERM, _exit_on_sigterm)
     app()
\ No newline at end of file
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script for the fixed-rate capture scheduler
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from capture_scheduler import FixedRateScheduler
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_deadlines_do_not_drift():
+    """Work done between ticks does not push later deadlines back"""
+    clock = FakeClock()
+    scheduler = FixedRateScheduler(5.0, clock=clock)
+    scheduler.start()
+    assert scheduler.time_until_next() == 5.0
+    assert scheduler.poll() is None  # Nothing due yet
+
+    for n in range(1, 4):
+        clock.now = 100.0 + n * 5.0 + 0.25  # Fire a little late every time
+        tick = scheduler.poll()
+        assert tick.index == n and tick.missed == 0
+        assert abs(tick.lateness - 0.25) < 1e-9
+        clock.now += 3.0  # Capture + OCR work
+        assert abs(scheduler.time_until_next() - 1.75) < 1e-9
+
+    stats = scheduler.get_stats()
+    assert stats['fired'] == 3 and stats['missed'] == 0
+    assert abs(stats['jitter_mean_ms'] - 250.0) < 1e-6
+    assert stats['jitter_std_ms'] < 1e-6
+
+
+def test_overdue_ticks_skip_or_coalesce():
+    """Overdue deadlines are counted; 'skip' drops very late ticks, 'coalesce' fires once"""
+    clock = FakeClock()
+    skip = FixedRateScheduler(2.0, overdue_policy='skip', clock=clock)
+    coalesce = FixedRateScheduler(2.0, overdue_policy='coalesce', clock=clock)
+    skip.start(immediate=True)
+    coalesce.start(immediate=True)
+    assert skip.poll().index == 0 and coalesce.poll().index == 0
+
+    # Blocked for 7.5s: deadlines 1, 2 and 3 have passed, 3 by 1.5s
+    clock.now = 107.5
+    assert skip.poll() is None
+    tick = coalesce.poll()
+    assert tick.index == 3 and tick.missed == 2
+    assert skip.get_stats()['missed'] == 3 and skip.get_stats()['skipped_late'] == 1
+    assert coalesce.get_stats()['missed'] == 2
+
+    # Both continue on the original grid
+    assert skip.next_deadline() == coalesce.next_deadline() == 108.0
+
+
+def test_set_interval_reanchors_running_schedule():
+    """Changing the interval restarts the grid from the current time"""
+    clock = FakeClock()
+    scheduler = FixedRateScheduler(5.0, clock=clock)
+    scheduler.start()
+    clock.now = 102.0
+    scheduler.set_interval(1.0)
+    assert scheduler.next_deadline() == 103.0
+    scheduler.stop()
+    assert scheduler.poll() is None and not scheduler.running
+
+
+if __name__ == "__main__":
+    test_deadlines_do_not_drift()
+    test_overdue_ticks_skip_or_coalesce()
+    test_set_interval_reanchors_running_schedule()
+    print("All capture scheduler tests passed")
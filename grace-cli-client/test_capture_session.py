@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test script for the persistent capture session's screen clipping
+"""
+
+import sys
+import os
+import types
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import capture_session
+from capture_session import CaptureSession
+
+# monitors[0] spans two 1920x1080 screens side by side
+LAYOUT = ((0, 0, 3840, 1080), (0, 0, 1920, 1080), (1920, 0, 1920, 1080))
+
+
+def test_regions_are_clipped_to_the_virtual_screen():
+    """Partly off-screen windows are clipped (no reconnect); only fully off-screen ones are None"""
+    inside = {"top": 100, "left": 100, "width": 400, "height": 300}
+    assert CaptureSession._clip(LAYOUT, inside) == inside
+    # Maximized Windows window at (-8, -8)
+    maximized = {"top": -8, "left": -8, "width": 1936, "height": 1096}
+    assert CaptureSession._clip(LAYOUT, maximized) == {"top": 0, "left": 0, "width": 1928, "height": 1080}
+    dragged = {"top": 900, "left": 3700, "width": 400, "height": 400}
+    assert CaptureSession._clip(LAYOUT, dragged) == {"top": 900, "left": 3700, "width": 140, "height": 180}
+    assert CaptureSession._clip(LAYOUT, {"top": 0, "left": 4000, "width": 100, "height": 100}) is None
+    assert CaptureSession._clip((), dragged) == dragged
+
+
+def test_layout_change_is_read_before_clipping():
+    """A window on a monitor attached after connecting is grabbed whole once the stale layout is re-read"""
+    monitors = [{'left': 0, 'top': 0, 'width': 1920, 'height': 1080}]
+
+    class FakeMSS:
+        def __init__(self):
+            self.monitors = [dict(monitor) for monitor in monitors]
+
+        def grab(self, region):
+            return types.SimpleNamespace(left=region['left'], top=region['top'],
+                                         size=(region['width'], region['height']))
+
+        def close(self):
+            pass
+
+    saved = capture_session.mss, capture_session.MSS_AVAILABLE
+    capture_session.mss, capture_session.MSS_AVAILABLE = types.SimpleNamespace(mss=FakeMSS), True
+    try:
+        # A fresh layout is trusted: the part right of the screen is clipped without reconnecting
+        session = CaptureSession(layout_max_age=60)
+        assert session.grab(1800, 100, 400, 300).size == (120, 300)
+        assert session.grab(1800, 100, 400, 300).size == (120, 300)
+        assert session.get_stats()['reconnects'] == 0
+
+        # Second monitor attached: a stale layout is re-read before clipping
+        session = CaptureSession(layout_max_age=0)
+        assert session.grab(1800, 100, 400, 300).size == (120, 300)
+        monitors[0]['width'] = 3840
+        assert session.grab(1800, 100, 400, 300).size == (400, 300)
+        assert session.grab(1800, 100, 400, 300).size == (400, 300)
+        assert session.get_stats()['reconnects'] == 2  # Only grabs that needed clipping re-read the layout
+    finally:
+        capture_session.mss, capture_session.MSS_AVAILABLE = saved
+
+
+if __name__ == "__main__":
+    test_regions_are_clipped_to_the_virtual_screen()
+    test_layout_change_is_read_before_clipping()
+    print("All capture session tests passed")
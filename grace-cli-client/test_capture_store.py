@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test script for the SQLite capture store
+"""
+
+import sys
+import os
+import csv
+import json
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from capture_store import CaptureStore, parse_storage_backends, file_sha256
+
+
+def test_queries_by_window_and_time_range():
+    """Captures come back in timestamp order, filtered by window and inclusive bounds"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CaptureStore(os.path.join(tmp, "captures.db"))
+        store.add('2024-05-01 10:00:00', 'SM-N950F', 'HR 72', payload={'regions': [{'lines': []}]},
+                  metrics={'heart_rate': 72})
+        store.add('2024-05-01 10:30:00', 'Mi Band', 'Steps 1200')
+        store.add('2024-05-01 11:15:00', 'SM-N950F', 'HR 75')
+        store.add('2024-05-02 09:00:00', 'SM-N950F', 'HR 80')
+
+        hour = list(store.query('sm-n950f', since='2024-05-01 10:00:00', until='2024-05-01 11:00:00',
+                                with_payload=True))
+        assert [row['raw_text'] for row in hour] == ['HR 72']
+        assert hour[0]['payload'] == {'regions': [{'lines': []}]}
+        assert hour[0]['metrics'] == {'heart_rate': 72}
+        day = [row['raw_text'] for row in store.query('SM-N950F', since='2024-05-01', until='2024-05-01')]
+        assert day == ['HR 72', 'HR 75']
+        assert store.count() == 4
+        store.close()
+
+
+def test_captures_within_one_second_stay_separate():
+    """Two captures of a window in the same second are two rows, ordered by their milliseconds"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CaptureStore(os.path.join(tmp, "captures.db"))
+        store.add('2024-05-01 10:00:00', 'SM-N950F', 'HR 73', timestamp_ms=1714557600700)
+        store.add('2024-05-01 10:00:00', 'SM-N950F', 'HR 72', timestamp_ms=1714557600100)
+        store.update_metrics([{'timestamp': '2024-05-01 10:00:00', 'window_title': 'SM-N950F',
+                               'raw_text': 'HR 73', 'metrics': {'heart_rate': 73}}])
+        rows = list(store.query())
+        assert [(row['raw_text'], row['metrics']) for row in rows] == [('HR 72', {}), ('HR 73', {'heart_rate': 73})]
+        store.close()
+
+
+def test_migration_merges_csv_and_json_of_the_same_capture():
+    """Importing the CSV row and JSON dump of one capture (twice) yields one complete row"""
+    with tempfile.TemporaryDirectory() as tmp:
+        image_path = os.path.join(tmp, "screenshot.png")
+        with open(image_path, 'wb') as image_file:
+            image_file.write(b"png-bytes")
+        csv_path = os.path.join(tmp, "auto_data.csv")
+        with open(csv_path, 'w', newline='', encoding='utf-8') as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=['timestamp', 'window_title', 'raw_text'])
+            writer.writeheader()
+            writer.writerow({'timestamp': '2024-05-01 10:00:00', 'window_title': 'Mi Band', 'raw_text': 'HR | 72'})
+            writer.writerow({'timestamp': '2024-05-01 10:00:05', 'window_title': 'Mi Band', 'raw_text': 'HR | 73'})
+        json_path = os.path.join(tmp, "auto_capture_2024-05-01_10-00-00.json")
+        with open(json_path, 'w', encoding='utf-8') as json_file:
+            json.dump({'timestamp': '2024-05-01 10:00:00', 'window_title': 'Mi Band', 'raw_text': 'HR\n72',
+                       'full_ocr_result': {'language': 'en'}, 'image_path': image_path}, json_file)
+        broken_path = os.path.join(tmp, "broken.json")
+        with open(broken_path, 'w', encoding='utf-8') as json_file:
+            json_file.write("{")
+
+        store = CaptureStore(os.path.join(tmp, "captures.db"))
+        for _ in range(2):
+            assert store.import_csv(csv_path) == 2
+            assert store.import_json_files([json_path, broken_path]) == (1, 1)
+
+        rows = list(store.query(with_payload=True))
+        assert len(rows) == 2
+        assert rows[0]['source_key'].startswith('csv:') and rows[1]['source_key'].startswith('csv:')
+        assert rows[0]['raw_text'] == 'HR\n72'
+        assert rows[0]['payload'] == {'language': 'en'}
+        assert rows[0]['image_hash'] == file_sha256(image_path)
+        assert rows[1]['payload'] is None
+        assert [row['id'] for row in store.find_by_image_hash(file_sha256(image_path))] == [rows[0]['id']]
+        store.close()
+
+
+def test_parse_storage_backends():
+    assert parse_storage_backends(' CSV, sqlite ') == ('csv', 'sqlite')
+    try:
+        parse_storage_backends('csv,parquet')
+    except ValueError as e:
+        assert 'parquet' in str(e)
+    else:
+        raise AssertionError("unknown backend accepted")
+
+
+if __name__ == "__main__":
+    test_queries_by_window_and_time_range()
+    test_captures_within_one_second_stay_separate()
+    test_migration_merges_csv_and_json_of_the_same_capture()
+    test_parse_storage_backends()
+    print("All capture store tests passed")
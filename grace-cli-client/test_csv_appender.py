@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test script for the buffered CSV appender
+"""
+
+import sys
+import os
+import csv
+import time
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from csv_appender import BufferedCSVAppender, get_csv_appender, close_all_appenders
+
+FIELDS = ['timestamp', 'window_title', 'raw_text']
+
+
+def read_rows(path):
+    with open(path, newline='', encoding='utf-8') as csv_file:
+        return list(csv.DictReader(csv_file))
+
+
+def test_rows_are_group_committed():
+    """Rows stay buffered until the row threshold, then land in one commit"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "auto_data.csv")
+        charged = []
+        appender = BufferedCSVAppender(path, FIELDS, max_rows=3, max_delay=0, before_write=charged.append)
+        appender.append({'timestamp': '1', 'window_title': 'scrcpy', 'raw_text': 'HR 72'})
+        appender.append({'timestamp': '2', 'window_title': 'scrcpy', 'raw_text': 'HR 73'})
+        assert not os.path.exists(path) and appender.buffered_rows == 2
+
+        appender.append({'timestamp': '3', 'window_title': 'scrcpy', 'raw_text': 'HR, "74"'})
+        assert [row['raw_text'] for row in read_rows(path)] == ['HR 72', 'HR 73', 'HR, "74"']
+        stats = appender.get_stats()
+        assert stats['commits'] == 1 and stats['rows'] == 3 and len(charged) == 1
+
+        # Reopening an existing file appends without a second header
+        appender.append({'timestamp': '4', 'window_title': 'scrcpy', 'raw_text': 'HR 75'})
+        appender.close()
+        again = BufferedCSVAppender(path, FIELDS, max_delay=0)
+        again.append({'timestamp': '5', 'window_title': 'scrcpy', 'raw_text': 'HR 76'})
+        again.close()
+        assert [row['timestamp'] for row in read_rows(path)] == ['1', '2', '3', '4', '5']
+
+
+def test_time_threshold_and_shared_appenders():
+    """Buffered rows are committed after max_delay; close_all_appenders commits the rest"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "auto_data.csv")
+        appender = get_csv_appender(path, FIELDS, max_rows=100, max_delay=0.05)
+        assert get_csv_appender(path, FIELDS) is appender
+        appender.append({'timestamp': '1', 'window_title': 'w', 'raw_text': 'a'})
+        deadline = time.time() + 2.0
+        while appender.buffered_rows and time.time() < deadline:
+            time.sleep(0.01)
+        assert len(read_rows(path)) == 1
+
+        appender.append({'timestamp': '2', 'window_title': 'w', 'raw_text': 'b'})
+        close_all_appenders()
+        assert len(read_rows(path)) == 2
+
+
+if __name__ == "__main__":
+    test_rows_are_group_committed()
+    test_time_threshold_and_shared_appenders()
+    print("All CSV appender tests passed")
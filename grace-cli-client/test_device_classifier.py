@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test script for the compiled device classifier
+"""
+
+import sys
+import os
+import json
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from device_classifier import (DEFAULT_CATEGORIES, DEFAULT_DEVICE_KEYWORDS, UNKNOWN_CATEGORY, DeviceClassifier,
+                               load_device_classifier)
+
+TITLES = [
+    'scrcpy - Galaxy Watch 6', 'SM-G991B', 'Pixel 7 Pro', 'Mi Band 8 - scrcpy', 'iPad Air', 'Tablet mode',
+    'BlueStacks App Player', 'Android Studio - emulator-5554', 'Chrome - Samsung Internet', 'Terminal', '',
+    'Fire Tablet (Kindle)', 'Legion Phone Duel', 'Microsoft Edge'
+]
+
+
+def _naive(title):
+    """The substring checks device discovery used before"""
+    title_lower = title.lower()
+    keywords = [kw for kw in dict.fromkeys(DEFAULT_DEVICE_KEYWORDS) if kw in title_lower]
+    category = next((name for name, words in DEFAULT_CATEGORIES if any(kw in title_lower for kw in words)),
+                    UNKNOWN_CATEGORY)
+    return tuple(keywords), category
+
+
+def test_single_pass_matches_substring_checks():
+    """Keywords (including overlapping prefixes) and categories equal the old per-keyword scan"""
+    classifier = DeviceClassifier()
+    for title in TITLES:
+        assert tuple(classifier.classify(title)) == _naive(title), title
+    result = classifier.classify('scrcpy - Galaxy Watch 6')
+    assert result.keywords == ('galaxy', 'galaxy watch', 'scrcpy') and result.category == 'wearables'
+    assert not classifier.classify('Terminal').is_device
+
+    classifier.classify('Pixel 7 Pro')
+    assert classifier.get_stats()['memo_hits'] == 3
+
+    groups = classifier.categorize(TITLES, title=lambda title: title, devices_only=True)
+    assert 'Terminal' not in sum(groups.values(), []) and groups['mobile_phones'][0] == 'SM-G991B'
+
+
+def test_rules_file_extends_keywords_and_categories():
+    """User keywords/categories from the rules file are compiled in; new categories are checked first"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "device_rules.json")
+        with open(path, 'w', encoding='utf-8') as rules_file:
+            json.dump({'keywords': ['Whoop', 'oura'],
+                       'categories': [{'name': 'wearables', 'keywords': ['whoop']},
+                                      {'name': 'rings', 'keywords': ['oura']}]}, rules_file)
+        classifier = load_device_classifier(path)
+        assert classifier.classify('WHOOP 4.0').category == 'wearables'
+        assert classifier.classify('Oura phone sync') == (('phone', 'oura'), 'rings')
+        assert classifier.category_names[0] == 'rings' and classifier.category_names[-1] == UNKNOWN_CATEGORY
+        assert load_device_classifier(os.path.join(tmp, "missing.json")).classify('oura').category == UNKNOWN_CATEGORY
+
+
+if __name__ == "__main__":
+    test_single_pass_matches_substring_checks()
+    test_rules_file_extends_keywords_and_categories()
+    print("All device classifier tests passed")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test script for frame change detection on PIL images and BGRX arrays
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from frame_change import FrameChangeDetector
+
+
+def test_block_gray_averages_every_pixel():
+    """Each block is the area mean of its pixels, converted with 601 luma"""
+    np = pytest.importorskip('numpy')
+    pixels = np.zeros((4, 4, 4), dtype=np.uint8)
+    pixels[3, 3] = (0, 0, 255, 0)  # One red (BGRX) pixel in the bottom-right block
+    gray = FrameChangeDetector._block_gray(pixels, (2, 2))
+    assert np.allclose(gray, [[0, 0], [0, 255 * 0.299 / 4]])
+    rgb = pixels[..., ::-1][..., 1:]
+    assert np.allclose(FrameChangeDetector._block_gray(rgb, (2, 2), bgr=False), gray)
+
+
+def test_one_digit_change_is_detected():
+    """A reading going from 8123 to 8124 on a tall phone frame is a change at the default threshold"""
+    pytest.importorskip('numpy')
+    pytest.importorskip('PIL')
+    from PIL import Image, ImageDraw, ImageFont
+    try:
+        font = ImageFont.load_default(size=48)
+    except TypeError:
+        pytest.skip("Pillow without scalable default font")
+    frames = []
+    for reading in ("8123", "8124"):
+        frame = Image.new('RGB', (1080, 2340), 'white')
+        ImageDraw.Draw(frame).text((300, 1000), reading, fill='black', font=font)
+        frames.append(frame)
+    detector = FrameChangeDetector('diff')
+    changed, signature, _ = detector.check('SM-N950F', frames[0])
+    detector.commit('SM-N950F', signature, {'raw_text': '8123'})
+    changed, _, distance = detector.check('SM-N950F', frames[1])
+    assert changed and distance > 10
+    assert not detector.check('SM-N950F', frames[0].copy())[0]
+
+
+def test_pil_and_array_frames_of_one_screen_are_unchanged():
+    """A window alternating between shared-memory (array) and fallback (PIL) grabs never reads as changed"""
+    np = pytest.importorskip('numpy')
+    pytest.importorskip('PIL')
+    from x11_capture import to_image
+    pixels = np.random.default_rng(3).integers(0, 256, size=(300, 200, 4), dtype=np.uint8)
+    for method in FrameChangeDetector.METHODS:
+        detector = FrameChangeDetector(method, threshold=0)
+        assert np.array_equal(detector.signature(pixels), detector.signature(to_image(pixels)))
+        changed, signature, _ = detector.check('Mi Band', pixels)
+        detector.commit('Mi Band', signature, {'raw_text': 'HR 72'})
+        assert detector.check('Mi Band', to_image(pixels))[0] is False
+        assert detector.check('Mi Band', pixels)[0] is False
+
+
+if __name__ == "__main__":
+    test_block_gray_averages_every_pixel()
+    test_one_digit_change_is_detected()
+    test_pil_and_array_frames_of_one_screen_are_unchanged()
+    print("All frame change tests passed")
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Test script for in-memory captured frames held as BGRX pixels
+"""
+
+import io
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from frame_store import CapturedFrame
+
+
+def test_detach_copies_a_view_of_the_capture_buffer():
+    """A frame that outlives the next grab owns its pixels; an owned array is not copied again"""
+    np = pytest.importorskip('numpy')
+    segment = np.zeros((4, 6, 4), dtype=np.uint8)
+    frame = CapturedFrame(None, 'frame.png', pixels=segment[:, :5]).detach()
+    segment[:] = 255  # The next grab overwrites the segment
+    assert not frame.pixels.any()
+    owned = frame.pixels
+    assert frame.detach().pixels is owned
+
+
+def test_encode_png_from_pixels():
+    """PNG bytes decode back to the frame's RGB pixels, and are encoded once"""
+    np = pytest.importorskip('numpy')
+    Image = pytest.importorskip('PIL.Image')
+    pixels = np.zeros((3, 2, 4), dtype=np.uint8)
+    pixels[0, 0] = (10, 20, 30, 0)
+    frame = CapturedFrame(None, 'frame.png', pixels=pixels)
+    png = frame.encode_png()
+    assert frame.encode_png() is png
+    with Image.open(io.BytesIO(png)) as decoded:
+        assert decoded.size == (2, 3)
+        assert decoded.convert('RGB').getpixel((0, 0)) == (30, 20, 10)
+    assert frame.to_image().getpixel((0, 0)) == (30, 20, 10)
+
+
+if __name__ == "__main__":
+    test_detach_copies_a_view_of_the_capture_buffer()
+    test_encode_png_from_pixels()
+    print("All frame store tests passed")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test script for the Parquet history export
+"""
+
+import sys
+import os
+import csv
+import tempfile
+
+import pytest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from history_export import HistoryParquetWriter, filter_history, iter_csv_history, partition_value
+
+
+def test_csv_history_is_streamed_and_filtered():
+    """CSV rows come back with their line breaks restored and filter by time prefix and window"""
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "auto_data.csv")
+        with open(csv_path, 'w', newline='', encoding='utf-8') as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=['timestamp', 'window_title', 'raw_text'])
+            writer.writeheader()
+            writer.writerow({'timestamp': '2024-05-01 23:59:59', 'window_title': 'SM-N950F', 'raw_text': 'HR | 72'})
+            writer.writerow({'timestamp': '2024-05-02 00:00:01', 'window_title': 'Mi Band', 'raw_text': 'No text detected'})
+            writer.writerow({'timestamp': '2024-05-02 08:00:00', 'window_title': 'SM-N950F', 'raw_text': 'HR | 80'})
+
+        records = list(iter_csv_history(csv_path))
+        assert records[0]['raw_text'] == 'HR\n72' and records[1]['raw_text'] == ''
+        selected = list(filter_history(records, since='2024-05-02', until='2024-05-02', window_title='sm-n950f'))
+        assert [record['raw_text'] for record in selected] == ['HR\n80']
+        assert partition_value('scrcpy: SM-N950F') == 'scrcpy_SM-N950F'
+
+
+def test_parquet_dataset_is_partitioned_by_day_and_device():
+    """Rows land in day=/device= folders with typed columns (requires pyarrow)"""
+    pytest.importorskip("pyarrow")
+    import pyarrow.dataset as ds
+    with tempfile.TemporaryDirectory() as out_dir:
+        writer = HistoryParquetWriter(out_dir, batch_rows=2, max_open_files=1)
+        stats = writer.write_all([
+            {'timestamp': '2024-05-01 10:00:00', 'window_title': 'SM-N950F', 'raw_text': 'HR 72'},
+            {'timestamp': '2024-05-01 10:00:01', 'window_title': 'Mi Band', 'raw_text': 'Steps 10'},
+            {'timestamp': '2024-05-02 10:00:00', 'window_title': 'SM-N950F', 'raw_text': 'HR 75'},
+            {'timestamp': 'not a time', 'window_title': 'SM-N950F', 'raw_text': ''}
+        ])
+        assert stats['rows'] == 3 and stats['skipped'] == 1 and stats['partitions'] == 3
+        table = ds.dataset(out_dir, format='parquet', partitioning='hive').to_table()
+        rows = sorted(table.to_pylist(), key=lambda row: row['timestamp'])
+        assert [(str(row['day']), row['device']) for row in rows] == [
+            ('2024-05-01', 'SM-N950F'), ('2024-05-01', 'Mi_Band'), ('2024-05-02', 'SM-N950F')
+        ]
+        assert rows[0]['metrics'] == [('heart_rate', 72.0)]
+
+
+def test_export_replaces_partitions_instead_of_duplicating():
+    """A second export replaces the partitions it writes; a cancelled one leaves the dataset alone"""
+    pytest.importorskip("pyarrow")
+    import pyarrow.dataset as ds
+    records = [
+        {'timestamp': '2024-05-01 10:00:00', 'window_title': 'SM-N950F', 'raw_text': 'HR 72'},
+        {'timestamp': '2024-05-02 10:00:00', 'window_title': 'SM-N950F', 'raw_text': 'HR 75'}
+    ]
+    with tempfile.TemporaryDirectory() as out_dir:
+        HistoryParquetWriter(out_dir).write_all(records)
+        HistoryParquetWriter(out_dir).write_all(records + [
+            {'timestamp': '2024-05-02 11:00:00', 'window_title': 'SM-N950F', 'raw_text': 'HR 78'}
+        ])
+        assert ds.dataset(out_dir, format='parquet', partitioning='hive').count_rows() == 3
+
+        writer = HistoryParquetWriter(out_dir)
+        writer.cancel()
+        stats = writer.write_all(records)
+        assert stats['cancelled'] and stats['rows'] == 0
+        assert ds.dataset(out_dir, format='parquet', partitioning='hive').count_rows() == 3
+        assert sorted(os.listdir(out_dir)) == ['day=2024-05-01', 'day=2024-05-02']
+
+
+def test_filtered_export_keeps_rows_outside_the_filter():
+    """Re-exporting part of a day merges into its partition instead of dropping the other rows"""
+    pytest.importorskip("pyarrow")
+    import pyarrow.dataset as ds
+    records = [
+        {'timestamp': '2024-05-01 09:00:00', 'window_title': 'SM-N950F', 'raw_text': 'HR 72'},
+        {'timestamp': '2024-05-01 10:00:00', 'window_title': 'SM-N950F', 'raw_text': 'HR 75'}
+    ]
+    with tempfile.TemporaryDirectory() as out_dir:
+        HistoryParquetWriter(out_dir).write_all(records)
+        for _ in range(2):
+            writer = HistoryParquetWriter(out_dir, replace_partitions=False)
+            stats = writer.write_all(filter_history(records, since='2024-05-01 10:00'))
+            assert stats['rows'] == 1 and stats['kept_rows'] == 1
+        table = ds.dataset(out_dir, format='parquet', partitioning='hive').to_table()
+        assert sorted(row['raw_text'] for row in table.to_pylist()) == ['HR 72', 'HR 75']
+
+
+if __name__ == "__main__":
+    test_csv_history_is_streamed_and_filtered()
+    test_parquet_dataset_is_partitioned_by_day_and_device()
+    test_export_replaces_partitions_instead_of_duplicating()
+    test_filtered_export_keeps_rows_outside_the_filter()
+    print("All history export tests passed")
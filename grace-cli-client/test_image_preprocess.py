@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script for the OCR upload preprocessing
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+pytest.importorskip('numpy')
+Image = pytest.importorskip('PIL.Image')
+
+from image_preprocess import MIN_DIMENSION, ImagePreprocessor, format_preprocess_report
+
+
+def screen(size=(400, 200)):
+    """Colored test frame with some dark 'text' on a light background"""
+    image = Image.new('RGB', size, (230, 240, 250))
+    for x in range(20, size[0] - 20, 40):
+        image.paste((20, 30, 120), (x, size[1] // 3, x + 20, size[1] // 2))
+    return image
+
+
+def test_grayscale_and_binarize_change_the_mode():
+    """Grayscale drops the color bands; binarization leaves only black and white"""
+    assert ImagePreprocessor().transform(screen()).mode == 'L'
+    assert ImagePreprocessor(grayscale=False, contrast=False).transform(screen()).mode == 'RGB'
+    binary = ImagePreprocessor(binarize=True).transform(screen())
+    assert sorted(color for _, color in binary.getcolors()) == [0, 255]
+
+
+def test_downscale_follows_the_dpi_ratio_and_never_upscales():
+    """96 -> 48 DPI halves both sides; a target above the source keeps the size"""
+    assert ImagePreprocessor(target_dpi=48).transform(screen((400, 200))).size == (200, 100)
+    assert ImagePreprocessor(target_dpi=300).transform(screen((400, 200))).size == (400, 200)
+    assert ImagePreprocessor().scale_factor(screen()) == 1.0
+
+
+def test_downscale_is_clamped_to_the_minimum_dimension():
+    """The short side never drops below what the OCR API accepts, even after rounding"""
+    preprocessor = ImagePreprocessor(target_dpi=12)
+    assert preprocessor.transform(screen((400, 100))).size == (200, MIN_DIMENSION)
+    for height in (97, 161, 289):
+        assert min(preprocessor.transform(screen((600, height))).size) == MIN_DIMENSION
+    assert preprocessor.transform(screen((60, 40))).size == (60, 40)
+
+
+def test_process_reports_sizes_and_keeps_stats():
+    """Each call reports original/encoded bytes and sizes; the totals add up in get_stats"""
+    preprocessor = ImagePreprocessor(target_dpi=48, image_format='jpg')
+    data, report = preprocessor.process(screen((400, 200)))
+    assert data[:2] == b'\xff\xd8'  # JPEG
+    assert report['original_bytes'] == 400 * 200 * 3 and report['encoded_bytes'] == len(data)
+    assert report['bytes_saved'] == report['original_bytes'] - len(data)
+    assert report['original_size'] == (400, 200) and report['encoded_size'] == (200, 100)
+    assert report['format'] == 'jpeg' and report['preprocess_ms'] >= 0
+    assert "JPEG 200x100" in format_preprocess_report(report, ocr_seconds=0.5)
+
+    png, _ = ImagePreprocessor(image_format='png').process(screen(), original_bytes=1000)
+    assert png.startswith(b'\x89PNG')
+    preprocessor.process(screen(), original_bytes=1000)
+    stats = preprocessor.get_stats()
+    assert stats['processed'] == 2 and stats['original_bytes'] == 400 * 200 * 3 + 1000
+    assert stats['bytes_saved'] == stats['original_bytes'] - stats['encoded_bytes']
+    preprocessor.reset_stats()
+    assert preprocessor.get_stats()['processed'] == 0
+    with pytest.raises(ValueError):
+        ImagePreprocessor(image_format='gif')
+
+
+if __name__ == "__main__":
+    test_grayscale_and_binarize_change_the_mode()
+    test_downscale_follows_the_dpi_ratio_and_never_upscales()
+    test_downscale_is_clamped_to_the_minimum_dimension()
+    test_process_reports_sizes_and_keeps_stats()
+    print("All image preprocess tests passed")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test script for the background file I/O worker
+"""
+
+import sys
+import os
+import time
+import threading
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from io_worker import IOWorker
+
+
+def test_jobs_run_in_order_off_the_caller_thread():
+    """Jobs run FIFO on the worker thread and report back through on_done"""
+    done = []
+    ran_on = []
+    caller = threading.current_thread()
+    worker = IOWorker(on_done=done.append)
+
+    def write(value):
+        time.sleep(0.01 if value % 2 else 0.0)
+        ran_on.append(threading.current_thread())
+        return value * 10
+
+    jobs = [worker.submit('csv_append', write, value, context={'value': value}) for value in range(5)]
+    assert worker.flush(timeout=5)
+    assert [job.result for job in done] == [0, 10, 20, 30, 40]
+    assert [job.context['value'] for job in done] == list(range(5))
+    assert all(thread is not caller for thread in ran_on)
+    assert all(job.ok and job.finished_at is not None for job in jobs)
+    worker.close()
+
+
+def test_errors_are_reported_and_close_rejects_jobs():
+    """A failing job is counted and surfaced; a closed worker takes no more jobs"""
+    done = []
+    worker = IOWorker(on_done=done.append)
+
+    def fail():
+        raise OSError("disk full")
+
+    worker.submit('json_write', fail)
+    worker.submit('cleanup', lambda: 'ok')
+    worker.close()
+    assert [job.error for job in done] == ["disk full", None]
+    stats = worker.get_stats()
+    assert stats['failed'] == 1 and stats['completed'] == 1 and stats['pending'] == 0
+    assert worker.submit('late', lambda: None) is None
+
+
+def test_writes_run_ahead_of_queued_cleanup():
+    """Lower priority values run first; equal priorities keep submission order"""
+    done = []
+    gate = threading.Event()
+    worker = IOWorker(on_done=done.append)
+    worker.submit('blocker', gate.wait)
+    worker.submit('cleanup', lambda: None, priority=10)
+    worker.submit('csv_row', lambda: None)
+    worker.submit('json_write', lambda: None)
+    gate.set()
+    worker.close()
+    assert [job.name for job in done] == ['blocker', 'csv_row', 'json_write', 'cleanup']
+
+
+if __name__ == "__main__":
+    test_jobs_run_in_order_off_the_caller_thread()
+    test_errors_are_reported_and_close_rejects_jobs()
+    test_writes_run_ahead_of_queued_cleanup()
+    print("All I/O worker tests passed")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script for the rule-based metric extraction
+"""
+
+import sys
+import os
+import json
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metric_rules import MetricExtractor, MetricRule, RuleSet, extract_numeric_metrics, load_rule_sets
+
+
+def test_text_rules_give_typed_converted_fields():
+    """Built-in rules type and unit-convert values; implausible numbers are ignored"""
+    extractor = MetricExtractor()
+    text = "Heart rate 72 bpm\nSteps: 1,200\nSpO2 98%\n12:45\nDistance 800 m\n350 kcal\nActive time 1h 23m"
+    assert extractor.extract(text) == {
+        'heart_rate': 72, 'steps': 1200, 'spo2': 98, 'distance_km': 0.8, 'calories': 350, 'active_minutes': 83.0
+    }
+    assert extractor.extract("Pulse 7 bpm") == {}
+    assert extractor.extract("Steps 1.234\nDistance 1.234 km") == {'steps': 1234, 'distance_km': 1.234}
+    assert extractor.extract("Steps: 12.345.678") == {} and extractor.extract("Steps 12.345") == {'steps': 12345}
+    assert extractor.extract('') == {}
+
+
+def test_label_proximity_uses_word_bounding_boxes():
+    """Big numbers above or beside their labels are paired by layout, not by text order"""
+    ocr_result = {'regions': [{'lines': [
+        {'boundingBox': '10,10,80,40', 'words': [{'text': '8,532'}]},
+        {'boundingBox': '100,10,40,40', 'words': [{'text': '64'}]},
+        {'boundingBox': '10,55,60,15', 'words': [{'text': 'Steps'}]},
+        {'boundingBox': '100,55,30,15', 'words': [{'text': 'Pulse'}]}
+    ]}]}
+    assert MetricExtractor().extract("8,532\n64\nSteps\nPulse", ocr_result) == {'steps': 8532, 'heart_rate': 64}
+
+
+def test_device_rule_sets_override_and_inherit_defaults():
+    """A matching device rule set replaces rules by name and keeps the other defaults"""
+    with tempfile.TemporaryDirectory() as tmp:
+        rules_path = os.path.join(tmp, "metric_rules.json")
+        rule_set = RuleSet('Mi Band', [MetricRule('heart_rate', 'int', [r'(?P<value>\d{2,3})\s*times/min'])],
+                           window_pattern='mi band')
+        with open(rules_path, 'w', encoding='utf-8') as rules_file:
+            json.dump({'rule_sets': [rule_set.to_dict()]}, rules_file)
+
+        extractor = MetricExtractor(load_rule_sets(rules_path))
+        text = "HR 70 bpm\n81 times/min\nSteps 10"
+        assert extractor.extract(text, window_title='Mi Band 7') == {'heart_rate': 81, 'steps': 10}
+        assert extractor.extract(text, window_title='SM-N950F') == {'heart_rate': 70, 'steps': 10}
+
+
+def test_numeric_metrics_merge_rules_with_generic_readings():
+    """Generic readings fill in labels no rule covers; thousands and decimal commas are understood"""
+    text = "Heart rate\n72 bpm\nSteps: 1,200\nSpO2 98%\n12:45\nTemp 36,6 C"
+    assert extract_numeric_metrics(text) == {'heart_rate': 72.0, 'steps': 1200.0, 'spo2': 98.0, 'temp': 36.6}
+    assert MetricExtractor().numeric_metrics("HR 72\nBattery 80") == {'heart_rate': 72.0, 'battery': 80.0}
+
+
+def test_gadgetbridge_rows_read_values_next_to_their_labels():
+    """Rows of screenshots/auto_data.csv (no bounding boxes) pair each tile's value with the label below it"""
+    row = ("SM-N950F | 6:50 0 a g @ | Gadgetbridge | 6 pm | 123 | Steps | 0:20 | Active time | Body Energy | "
+           "Dash board | 6 Jul | o | 470/06 | 92m | Distance | 0:00 | Sleep | Stress | V02 Max | 00 | Devices")
+    text = row.replace(' | ', '\n')
+    extractor = MetricExtractor()
+    expected = {'steps': 123, 'active_minutes': 20.0, 'distance_km': 0.092}
+    assert extractor.extract(text, window_title='SM-N950F') == expected
+    assert extractor.numeric_metrics(text, 'SM-N950F') == expected
+    assert extract_numeric_metrics(text) == {}
+    assert extractor.extract("Heart rate\n72") == {'heart_rate': 72}
+    assert extractor.numeric_metrics("Steps\n8532") == {'steps': 8532.0}
+
+
+def test_generic_readings_skip_ids_dates_and_run_on_lines():
+    """Model numbers, dates and lines mixing several readings are not generic readings"""
+    text = "SM-N950F\nDash board\n6 Jul\nGadgetbridge\n6 pm\nV02 Max\nHR 72 bpm Steps 1200\nActive time 1h 20m"
+    assert extract_numeric_metrics(text) == {}
+    assert MetricExtractor().numeric_metrics("Pulse 7\nTemp (C): 36,6") == {'temp_c': 36.6}
+
+
+if __name__ == "__main__":
+    test_text_rules_give_typed_converted_fields()
+    test_label_proximity_uses_word_bounding_boxes()
+    test_device_rule_sets_override_and_inherit_defaults()
+    test_numeric_metrics_merge_rules_with_generic_readings()
+    test_gadgetbridge_rows_read_values_next_to_their_labels()
+    test_generic_readings_skip_ids_dates_and_run_on_lines()
+    print("All metric rules tests passed")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test script for the on-disk OCR result cache
+"""
+
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ocr_cache import OCRResultCache, make_cache_key
+
+
+def test_cache_key_depends_on_ocr_parameters():
+    """Same pixels with different OCR parameters must not share an entry"""
+    image = b"fake-png-bytes"
+    base = make_cache_key(image, 'unk', True, 'v3.2')
+    assert base == make_cache_key(image, 'unk', True, 'v3.2')
+    assert base != make_cache_key(image, 'en', True, 'v3.2')
+    assert base != make_cache_key(image, 'unk', False, 'v3.2')
+    assert base != make_cache_key(image, 'unk', True, 'v4.0')
+    assert base != make_cache_key(image + b"x", 'unk', True, 'v3.2')
+
+
+def test_cache_survives_restart_and_counts_hits():
+    """Results are persisted to disk and hits/misses are counted"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = OCRResultCache(cache_dir)
+        assert cache.get("missing") is None
+        cache.put("key", {'regions': [{'lines': []}], 'language': 'en'})
+        cache.close()
+
+        reopened = OCRResultCache(cache_dir)
+        assert reopened.get("key") == {'regions': [{'lines': []}], 'language': 'en'}
+        stats = reopened.get_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 0
+        assert stats['entries'] == 1
+        reopened.close()
+
+
+def test_cache_evicts_least_recently_used():
+    """The entry limit evicts the entry that was used longest ago"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = OCRResultCache(cache_dir, max_entries=2)
+        cache.put("a", {'n': 1})
+        cache.put("b", {'n': 2})
+        cache.get("a")  # "b" is now the least recently used entry
+        cache.put("c", {'n': 3})
+
+        assert cache.get("b") is None
+        assert cache.get("a") == {'n': 1}
+        assert cache.get("c") == {'n': 3}
+        assert cache.get_stats()['evictions'] == 1
+        cache.close()
+
+
+if __name__ == "__main__":
+    test_cache_key_depends_on_ocr_parameters()
+    test_cache_survives_restart_and_counts_hits()
+    test_cache_evicts_least_recently_used()
+    print("All OCR cache tests passed")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script for the pooled OCR HTTP client
+"""
+
+import sys
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+requests = pytest.importorskip('requests')
+from requests.adapters import BaseAdapter
+
+from ocr_client import OCRClient
+
+
+class StubAdapter(BaseAdapter):
+    """Transport that records every request instead of sending it"""
+
+    def __init__(self, failures=()):
+        super().__init__()
+        self.sent = []
+        self.failures = list(failures)
+
+    def send(self, request, timeout=None, **kwargs):
+        self.sent.append((request, timeout))
+        if self.failures:
+            raise self.failures.pop(0)
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'{"regions": []}'
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+def stubbed_client(failures=()):
+    client = OCRClient(connect_timeout=2.0, read_timeout=9.0)
+    adapter = StubAdapter(failures)
+    client._session.mount("https://ocr.test", adapter)
+    return client, adapter
+
+
+def test_recognize_posts_image_with_timeouts():
+    """Image bytes go to the versioned OCR route with the key header and both timeouts"""
+    client, adapter = stubbed_client()
+    response = client.recognize("https://ocr.test/", "secret", b"png-bytes", language='en')
+    assert response.json() == {'regions': []}
+    request, timeout = adapter.sent[0]
+    assert request.url == "https://ocr.test/vision/v3.2/ocr?language=en&detectOrientation=true"
+    assert request.headers['Ocp-Apim-Subscription-Key'] == 'secret' and request.body == b"png-bytes"
+    assert timeout == (2.0, 9.0)
+
+    client.post("https://ocr.test/vision/v3.2/ocr", data=b"", timeout=1.5)
+    assert adapter.sent[1][1] == 1.5
+
+
+def test_failed_request_is_counted_and_not_retried():
+    """A transport error reaches the caller after one attempt; the session keeps working"""
+    client, adapter = stubbed_client([requests.ConnectionError("connection reset")])
+    with pytest.raises(requests.ConnectionError):
+        client.recognize("https://ocr.test", "secret", b"png")
+    assert len(adapter.sent) == 1
+    client.recognize("https://ocr.test", "secret", b"png")
+    stats = client.get_stats()['https://ocr.test']
+    assert stats['requests'] == 2 and stats['errors'] == 1
+    assert stats['avg_time'] == stats['total_time'] / 2
+
+
+class OCRHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        body = b'{"regions": []}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_connections_are_reused_across_calls():
+    """Consecutive calls to one endpoint share a single pooled keep-alive connection"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), OCRHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = OCRClient()
+    endpoint = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        for _ in range(3):
+            assert client.recognize(endpoint, "secret", b"png").status_code == 200
+        stats = client.get_stats()[endpoint]
+        assert stats['requests'] == 3 and stats['errors'] == 0
+        assert stats['connections_opened'] == 1 and stats['connections_reused'] == 2
+        assert stats['reuse_rate'] == pytest.approx(2 / 3)
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    test_recognize_posts_image_with_timeouts()
+    test_failed_request_is_counted_and_not_retried()
+    test_connections_are_reused_across_calls()
+    print("All OCR client tests passed")
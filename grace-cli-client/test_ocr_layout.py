@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test script for the OCR word-geometry layout
+"""
+
+import sys
+import os
+import re
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ocr_layout import Box, OCRLayout, get_layout, parse_number, region_box
+
+
+def _line(text, box):
+    return {'boundingBox': box, 'words': [{'boundingBox': box, 'text': text}]}
+
+
+# Two tiles: big numbers over small labels
+TILES = {'regions': [{'boundingBox': '10,10,130,60', 'lines': [
+    _line('8,532', '10,10,80,40'),
+    _line('64', '100,10,40,40'),
+    _line('Steps', '10,55,60,15'),
+    _line('bpm', '100,55,30,15')
+]}]}
+
+
+def test_layout_text_and_formats():
+    """Lines keep reading order for v3.2 regions and Read API polygons; the layout is parsed once"""
+    layout = get_layout(TILES)
+    assert layout.text == "8,532\n64\nSteps\nbpm"
+    assert get_layout(TILES) is layout
+    assert len(layout.words) == 4 and layout.extent == Box(10.0, 10.0, 130.0, 60.0)
+
+    read_result = {'analyzeResult': {'readResults': [{'lines': [
+        {'text': 'HR 72', 'boundingBox': [0, 0, 50, 0, 50, 10, 0, 10],
+         'words': [{'text': 'HR', 'boundingBox': [0, 0, 20, 0, 20, 10, 0, 10]},
+                   {'text': '72', 'boundingBox': [30, 0, 50, 0, 50, 10, 30, 10]}]}
+    ]}]}}
+    layout = OCRLayout.from_ocr_result(read_result)
+    assert layout.text == "HR 72" and layout.words[1].box == Box(30.0, 0.0, 20.0, 10.0)
+
+
+def test_nearest_and_value_near_label():
+    """The closest value is found on the requested side of a label only"""
+    layout = get_layout(TILES)
+    steps = re.compile(r'^steps$', re.IGNORECASE)
+    assert layout.value_near(steps, parse_number, ('above',)) == 8532.0
+    assert layout.value_near(steps, parse_number, ('below',)) is None
+    distance, item = layout.nearest(layout.lines[2].box, ('right',))
+    assert item.text == 'bpm' and distance == 30.0
+    assert layout.nearest(layout.lines[2].box, ('right',), max_distance=10) is None
+
+
+def test_numbers_inside_roi():
+    """Only numeric words inside the rectangle (or percent ROI region) are returned"""
+    layout = get_layout(TILES)
+    assert [value for value, _ in layout.numbers_in(Box(90, 0, 60, 60))] == [64.0]
+    assert region_box((50, 0, 50, 100), 200, 80) == Box(100.0, 0.0, 100.0, 80.0)
+    assert [value for value, _ in layout.numbers_in(region_box((0, 0, 50, 100), 200, 80), fully=True)] == [8532.0]
+
+
+if __name__ == "__main__":
+    test_layout_text_and_formats()
+    test_nearest_and_value_near_label()
+    test_numbers_inside_roi()
+    print("All OCR layout tests passed")
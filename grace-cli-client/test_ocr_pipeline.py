@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test script for the concurrent OCR pipeline
+"""
+
+import sys
+import os
+import time
+import threading
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ocr_pipeline import OCRPipeline
+
+
+def test_results_commit_in_capture_order():
+    """A fast response waits until every earlier capture is committed"""
+    committed = []
+    done = threading.Event()
+
+    def process(job):
+        # The first capture is the slowest one
+        time.sleep(0.2 if job.capture_id == 1 else 0.01)
+        if job.image_path == "broken.png":
+            raise RuntimeError("OCR API Error: 500")
+        return {'image': job.image_path}
+
+    def on_commit(job):
+        committed.append(job)
+        if len(committed) == 3:
+            done.set()
+
+    pipeline = OCRPipeline(process, on_commit, max_in_flight=3, max_pending=0)
+    first = pipeline.submit("a.png", "Phone", captured_at=1714557600.25)
+    pipeline.submit("broken.png", "Phone")
+    pipeline.submit("c.png", "Watch", {'mode': 'auto'})
+
+    assert done.wait(5)
+    pipeline.shutdown()
+
+    assert [job.capture_id for job in committed] == [1, 2, 3]
+    assert committed[0] is first and committed[0].result == {'image': "a.png"}
+    # Records are stamped with the grab time, not the (later) commit time
+    assert first.captured_at == 1714557600.25
+    assert committed[2].submitted_at <= committed[2].captured_at < committed[2].finished_at
+    assert not committed[1].ok and "500" in committed[1].error
+    assert committed[2].window_title == "Watch" and committed[2].context == {'mode': 'auto'}
+    assert pipeline.get_stats()['failed'] == 1
+
+
+def test_pipeline_rejects_when_full():
+    """Submissions beyond in-flight + pending capacity are rejected"""
+    release = threading.Event()
+    pipeline = OCRPipeline(lambda job: release.wait(5) and {}, lambda job: None, max_in_flight=1, max_pending=1)
+
+    assert pipeline.submit("1.png", "Phone") is not None
+    assert pipeline.submit("2.png", "Phone") is not None
+    assert pipeline.submit("3.png", "Phone") is None
+    assert pipeline.get_stats()['rejected'] == 1
+
+    release.set()
+    pipeline.shutdown()
+    assert not pipeline.busy
+
+
+if __name__ == "__main__":
+    test_results_commit_in_capture_order()
+    test_pipeline_rejects_when_full()
+    print("All OCR pipeline tests passed")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test script for the streaming metric backfill
+"""
+
+import sys
+import os
+import csv
+import json
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from capture_store import CaptureStore
+from segment_log import SegmentLog
+from reprocess import JSONLMetricsSink, ReprocessCheckpoint, SQLiteMetricsSink, discover_corpus, run_reprocess
+
+
+def _write_corpus(root):
+    with open(os.path.join(root, "auto_data.csv"), 'w', newline='', encoding='utf-8') as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=['timestamp', 'window_title', 'raw_text'])
+        writer.writeheader()
+        for second in range(5):
+            writer.writerow({'timestamp': f'2024-05-01 10:00:0{second}', 'window_title': 'Mi Band',
+                             'raw_text': f'HR | {70 + second} bpm'})
+    json_dir = os.path.join(root, "json")
+    os.makedirs(json_dir)
+    with open(os.path.join(json_dir, "auto_capture_1.json"), 'w', encoding='utf-8') as json_file:
+        json.dump({'timestamp': '2024-05-01 11:00:00', 'window_title': 'Mi Band', 'raw_text': 'Steps 8,532'},
+                  json_file)
+    with open(os.path.join(json_dir, "broken.json"), 'w', encoding='utf-8') as json_file:
+        json_file.write("{")
+
+
+class FailingSink(JSONLMetricsSink):
+    """Crashes after its first batch, like an interrupted run"""
+
+    def write(self, results):
+        if getattr(self, 'written', False):
+            raise RuntimeError("interrupted")
+        super().write(results)
+        self.written = True
+
+
+def test_interrupted_backfill_resumes_without_duplicates():
+    """A rerun continues after the last written batch; every capture is written exactly once"""
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = os.path.join(tmp, "screenshots")
+        os.makedirs(corpus)
+        _write_corpus(corpus)
+        sources = discover_corpus(corpus)
+        assert [source.kind for source in sources] == ['csv', 'json']
+        out_path = os.path.join(tmp, "metrics.jsonl")
+        checkpoint_path = os.path.join(tmp, "reprocess.checkpoint")
+
+        try:
+            run_reprocess(sources, FailingSink(out_path), ReprocessCheckpoint(checkpoint_path), workers=0,
+                          batch_size=2)
+            raise AssertionError("the failing sink should have interrupted the run")
+        except RuntimeError:
+            pass
+        checkpoint = ReprocessCheckpoint(checkpoint_path)
+        assert checkpoint.done(sources[0].key) == 2
+
+        stats = run_reprocess(sources, JSONLMetricsSink(out_path), checkpoint, workers=0, batch_size=2)
+        assert stats['resumed'] == 2 and stats['records'] == 5 and stats['invalid'] == 1
+        with open(out_path, encoding='utf-8') as out_file:
+            lines = [json.loads(line) for line in out_file]
+        assert [line['metrics'] for line in lines] == [{'heart_rate': 70 + second} for second in range(5)] + [
+            {'steps': 8532}
+        ]
+
+        # Everything done: nothing is read again
+        again = run_reprocess(sources, JSONLMetricsSink(out_path), ReprocessCheckpoint(checkpoint_path), workers=0)
+        assert again['records'] == 0
+        # Rows added later are backfilled by the next run
+        with open(os.path.join(corpus, "auto_data.csv"), 'a', newline='', encoding='utf-8') as csv_file:
+            csv.writer(csv_file).writerow(['2024-05-01 10:00:09', 'Mi Band', 'HR | 90 bpm'])
+        again = run_reprocess(sources, JSONLMetricsSink(out_path), ReprocessCheckpoint(checkpoint_path), workers=0)
+        assert again['records'] == 1 and again['with_metrics'] == 1
+        # Changed rules invalidate the checkpoint
+        assert ReprocessCheckpoint(checkpoint_path, fingerprint='other rules').stale
+
+
+def test_process_pool_writes_metrics_to_the_capture_store():
+    """Pool workers extract batches; results land in the SQLite metrics column"""
+    with tempfile.TemporaryDirectory() as tmp:
+        _write_corpus(tmp)
+        store = CaptureStore(os.path.join(tmp, "captures.db"))
+        stats = run_reprocess(discover_corpus(tmp), SQLiteMetricsSink(store),
+                              ReprocessCheckpoint(os.path.join(tmp, "reprocess.checkpoint")),
+                              workers=2, batch_size=2, max_in_flight=2)
+        assert stats['records'] == 7 and stats['with_metrics'] == 6
+        rows = list(store.query())
+        assert [row['metrics'] for row in rows][-1] == {'steps': 8532}
+        assert rows[0]['raw_text'] == 'HR\n70 bpm' and rows[0]['metrics'] == {'heart_rate': 70}
+        store.close()
+
+
+def test_segment_log_resumes_by_capture_id_after_pruning():
+    """Pruned log segments do not make the next run skip new records"""
+    with tempfile.TemporaryDirectory() as tmp:
+        log_dir = os.path.join(tmp, "logs")
+        log = SegmentLog(log_dir, max_segment_bytes=1, max_segment_age=0, compression=None)
+        for beat in range(3):
+            log.append({'timestamp': f'2024-05-01 10:00:0{beat}', 'raw_text': f'HR {70 + beat} bpm'})
+        sources = discover_corpus(tmp)
+        assert [source.kind for source in sources] == ['log']
+        checkpoint_path = os.path.join(tmp, "reprocess.checkpoint")
+        out_path = os.path.join(tmp, "metrics.jsonl")
+        assert run_reprocess(sources, JSONLMetricsSink(out_path), ReprocessCheckpoint(checkpoint_path),
+                             workers=0)['records'] == 3
+        assert ReprocessCheckpoint(checkpoint_path).done(sources[0].key) == 3
+
+        log.prune(keep_segments=0)
+        log.append({'timestamp': '2024-05-01 10:00:05', 'raw_text': 'HR 80 bpm'})
+        stats = run_reprocess(sources, JSONLMetricsSink(out_path), ReprocessCheckpoint(checkpoint_path), workers=0)
+        assert stats['records'] == 1 and stats['with_metrics'] == 1
+        log.close()
+
+
+if __name__ == "__main__":
+    test_interrupted_backfill_resumes_without_duplicates()
+    test_process_pool_writes_metrics_to_the_capture_store()
+    test_segment_log_resumes_by_capture_id_after_pruning()
+    print("All reprocess tests passed")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test script for the index-based screenshot retention
+"""
+
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from retention import RetentionIndex, delete_files
+
+
+def _write(path, size):
+    with open(path, 'wb') as image_file:
+        image_file.write(b'x' * size)
+
+
+def test_evicts_oldest_by_count_age_and_size():
+    """Eviction takes files from the old end until every limit holds"""
+    with tempfile.TemporaryDirectory() as tmp:
+        now = [1000.0]
+        index = RetentionIndex(os.path.join(tmp, "retention.journal"), [tmp], clock=lambda: now[0])
+        paths = []
+        for number in range(6):
+            path = os.path.join(tmp, f"shot_{number}.png")
+            _write(path, 100)
+            index.track(path, created=1000.0 + number * 60)
+            paths.append(path)
+        assert len(index) == 6 and index.total_bytes == 600
+
+        assert list(index.evict(max_count=4)) == paths[:2]
+        now[0] = 1000.0 + 5 * 60
+        evicted = index.evict(max_age=150)
+        assert evicted == {paths[2]: (1120.0, 100)}
+        # A file that could not be deleted goes back to the old end and is retried next pass
+        index.restore(evicted)
+        assert list(index.evict(max_age=150)) == paths[2:3]
+        assert list(index.evict_mode('size', 150 / (1024 * 1024))) == paths[3:5]
+        assert delete_files(paths[:5]) == (5, [])
+        assert [os.path.exists(path) for path in paths] == [False] * 5 + [True]
+        index.close()
+
+
+def test_journal_survives_restart_and_rebuilds_once():
+    """Tracked and evicted entries are replayed; a missing journal is rebuilt from one scan"""
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = os.path.join(tmp, "retention.journal")
+        old, new = os.path.join(tmp, "screenshot_1.png"), os.path.join(tmp, "screenshot_2.png")
+        _write(old, 10)
+        _write(new, 20)
+        os.utime(old, (1000, 1000))
+        _write(os.path.join(tmp, "notes.txt"), 5)
+
+        index = RetentionIndex(journal, [tmp], prefix='screenshot_')
+        assert len(index) == 2 and index.total_bytes == 30
+        index.restore(index.evict(max_count=1))
+        index.forget([new])
+        index.close()
+
+        reopened = RetentionIndex(journal, [tmp], prefix='screenshot_')
+        assert len(reopened) == 1 and list(reopened.evict(max_count=0)) == [old]
+        reopened.close()
+
+
+if __name__ == "__main__":
+    test_evicts_oldest_by_count_age_and_size()
+    test_journal_survives_restart_and_rebuilds_once()
+    print("All retention tests passed")
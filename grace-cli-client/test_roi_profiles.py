@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test script for region-of-interest cropping profiles
+"""
+
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from roi_profiles import ROIProfile, ROIProfileStore, parse_regions, format_regions
+
+
+def test_parse_and_format_regions():
+    """Regions round-trip through the text format used by the settings tab"""
+    regions = parse_regions("10,20,80,15\n10%, 45%, 80%, 15%; 0,90,50,10")
+    assert regions == [(10, 20, 80, 15), (10, 45, 80, 15), (0, 90, 50, 10)]
+    assert parse_regions(format_regions(regions)) == regions
+
+    for bad in ("10,20,80", "10,20,0,15", "50,20,60,15"):
+        try:
+            parse_regions(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"{bad!r} should be rejected")
+
+
+def test_grab_rect_covers_all_regions():
+    """Only the bounding box of the regions is grabbed from the screen"""
+    profile = ROIProfile("Heart rate", "gadgetbridge", [(10, 20, 30, 10), (50, 60, 40, 20)])
+    assert profile.bounds() == (10, 20, 80, 60)
+    assert profile.grab_rect(100, 200, 400, 800) == (140, 360, 320, 480)
+
+
+def test_array_crop_matches_pil_crop():
+    """A BGRX array (shared-memory grab) is cropped and stacked to the same pixels as its PIL image"""
+    np = pytest.importorskip('numpy')
+    pytest.importorskip('PIL')
+    from x11_capture import to_image
+    pixels = np.random.default_rng(7).integers(0, 256, size=(240, 320, 4), dtype=np.uint8)
+    profile = ROIProfile('band', 'Mi Band', [(10, 20, 80, 15), (0, 60, 50, 30)])
+    x, y, width, height = profile.grab_rect(0, 0, 320, 240)
+    for grabbed in (None, profile.bounds()):
+        source = pixels if grabbed is None else pixels[y:y + height, x:x + width]
+        stacked = profile.crop(source, grabbed)
+        assert not np.shares_memory(stacked, pixels)
+        assert np.array_equal(np.asarray(to_image(stacked)), np.asarray(profile.crop(to_image(source), grabbed)))
+
+
+def test_store_matches_by_title_and_persists():
+    """Profiles match case-insensitively and survive a reload"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "roi_profiles.json")
+        store = ROIProfileStore(path)
+        store.set_profile(ROIProfile("Mi Band", "mi fitness", [(0, 10, 100, 30)]))
+        store.set_profile(ROIProfile("Disabled", "scrcpy", [(0, 0, 50, 50)], enabled=False))
+        store.save()
+
+        reloaded = ROIProfileStore(path)
+        assert reloaded.match("Mi Fitness - Heart Rate").name == "Mi Band"
+        assert reloaded.match("scrcpy - SM-G991B") is None
+        assert reloaded.remove("Mi Band")
+        assert reloaded.match("Mi Fitness") is None
+
+
+if __name__ == "__main__":
+    test_parse_and_format_regions()
+    test_grab_rect_covers_all_regions()
+    test_array_crop_matches_pil_crop()
+    test_store_matches_by_title_and_persists()
+    print("All ROI profile tests passed")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script for the append-only JSONL segment log
+"""
+
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from segment_log import SegmentLog, read_segment_log
+
+
+def test_rotation_compression_and_lookup():
+    """Records stay reachable by ID and time across rotated, compressed segments"""
+    with tempfile.TemporaryDirectory() as log_dir:
+        log = SegmentLog(log_dir, max_segment_bytes=200, max_segment_age=0, compression='gzip')
+        ids = [log.append({'timestamp': f'2024-05-01 10:00:{second:02d}', 'raw_text': 'HR 72'},
+                          timestamp=1000.0 + second) for second in range(10)]
+        # Same-second captures no longer overwrite each other
+        assert ids == list(range(1, 11))
+        paths = log.segment_paths
+        assert len(paths) > 1
+        assert all(path.endswith('.jsonl.gz') for path in paths[:-1]) and paths[-1].endswith('.jsonl')
+
+        assert log.get(1)['timestamp'] == '2024-05-01 10:00:00'
+        assert log.get(7)['capture_id'] == 7
+        assert log.get(99) is None
+        assert [record['capture_id'] for record in log.iter_range(1003.0, 1005.0)] == [4, 5, 6]
+        assert len(list(log)) == 10
+
+        assert log.prune(keep_segments=1) == len(paths) - 2
+        assert len(log.segment_paths) == 2
+        log.close()
+
+
+def test_reopen_continues_ids_and_trims_torn_tail():
+    """A torn last line from a crash is dropped and IDs continue after the last indexed record"""
+    with tempfile.TemporaryDirectory() as log_dir:
+        log = SegmentLog(log_dir, compression=None)
+        log.append({'value': 1})
+        log.append({'value': 2})
+        active = log.segment_paths[-1]
+        log.close()
+        with open(active, 'ab') as segment:
+            segment.write(b'{"value": 3, "trunc')
+
+        reopened = SegmentLog(log_dir, compression=None)
+        assert reopened.next_id == 3
+        assert reopened.append({'value': 3}) == 3
+        assert [record['value'] for record in reopened] == [1, 2, 3]
+        reopened.close()
+
+
+def test_read_only_reader_leaves_a_live_log_alone():
+    """Readers of a log being appended to never trim it and see only indexed records"""
+    with tempfile.TemporaryDirectory() as log_dir:
+        log = SegmentLog(log_dir, compression=None)
+        for value in range(3):
+            log.append({'value': value})
+        active = log.segment_paths[-1]
+        # A line written by the appender whose index entry is not there yet
+        with open(active, 'ab') as segment:
+            segment.write(b'{"capture_id":4,"value":3}\n')
+        size = os.path.getsize(active)
+
+        assert [record['value'] for record in read_segment_log(log_dir)] == [0, 1, 2]
+        assert [record['capture_id'] for record in read_segment_log(log_dir, after_id=2)] == [3]
+        assert os.path.getsize(active) == size
+        log.close()
+
+
+if __name__ == "__main__":
+    test_rotation_compression_and_lookup()
+    test_reopen_continues_ids_and_trims_torn_tail()
+    test_read_only_reader_leaves_a_live_log_alone()
+    print("All segment log tests passed")
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Test script for the MIT-SHM capture structures (no X server needed)
+"""
+
+import sys
+import os
+import ctypes
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from shm_capture import XImage, XShmSegmentInfo, ShmCaptureEngine
+
+
+def test_struct_layouts_match_xlib():
+    """Field offsets of XImage and XShmSegmentInfo as laid out by Xlib on LP64"""
+    if ctypes.sizeof(ctypes.c_void_p) != 8 or ctypes.sizeof(ctypes.c_ulong) != 8:
+        pytest.skip("offsets are for LP64 platforms")
+    assert [(name, getattr(XImage, name).offset) for name in (
+        'width', 'format', 'data', 'byte_order', 'depth', 'bytes_per_line', 'bits_per_pixel', 'red_mask',
+        'blue_mask', 'obdata'
+    )] == [('width', 0), ('format', 12), ('data', 16), ('byte_order', 24), ('depth', 40), ('bytes_per_line', 44),
+           ('bits_per_pixel', 48), ('red_mask', 56), ('blue_mask', 72), ('obdata', 80)]
+    offsets = (XShmSegmentInfo.shmid.offset, XShmSegmentInfo.shmaddr.offset, XShmSegmentInfo.readOnly.offset)
+    assert offsets == (8, 16, 24)
+    assert ctypes.sizeof(XShmSegmentInfo) == 32
+
+
+def test_removed_windows_are_queued_for_release():
+    """Registry diffs only queue XIDs (never block on a grab); non-XID handles are ignored"""
+    from window_registry import WindowDiff, WindowInfo
+    engine = ShmCaptureEngine()
+    removed = [WindowInfo(0x3a00007, 'Mi Band', 0, 0, 10, 10, True, None),
+               WindowInfo('Notepad', 'Notepad', 0, 0, 10, 10, True, None)]
+    engine.on_windows_changed(WindowDiff([], removed, [], []))
+    assert engine._removed == {0x3a00007}
+    engine.close()
+    assert not engine._removed
+
+
+if __name__ == "__main__":
+    test_struct_layouts_match_xlib()
+    test_removed_windows_are_queued_for_release()
+    print("All SHM capture tests passed")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test script for the cached window registry
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from window_registry import WindowRegistry, window_handle
+
+
+class FakeWindow:
+    """Minimal PyWinCtl-like window"""
+
+    def __init__(self, handle, title, left=0, top=0, width=300, height=600):
+        self.handle = handle
+        self.title = title
+        self.left, self.top, self.width, self.height = left, top, width, height
+        self.visible = True
+
+    def getHandle(self):
+        return self.handle
+
+
+def test_enumerates_once_per_tick_and_publishes_diffs():
+    """Readers share one enumeration; refreshes publish added/removed/moved/retitled windows"""
+    now = [0.0]
+    desktop = [FakeWindow(1, 'scrcpy - Pixel 7'), FakeWindow(2, 'Terminal')]
+    calls = []
+
+    def enumerate_windows():
+        calls.append(now[0])
+        return list(desktop)
+
+    registry = WindowRegistry(enumerate_windows, max_age=2.0, clock=lambda: now[0])
+    diffs = []
+    unsubscribe = registry.subscribe(diffs.append)
+
+    assert [window.title for window in registry.windows()] == ['scrcpy - Pixel 7', 'Terminal']
+    assert registry.find('Terminal')[0].handle == 2 and registry.windows() and len(calls) == 1
+    assert [info.handle for info in diffs[0].added] == [1, 2]
+
+    # Nothing changed: no notification
+    now[0] = 3.0
+    assert not registry.refresh()
+    assert len(diffs) == 1 and len(calls) == 2
+
+    desktop[0].left = 50
+    desktop[0].title = 'scrcpy - Pixel 7 (USB)'
+    del desktop[1]
+    desktop.append(FakeWindow(3, 'Mi Band'))
+    diff = registry.refresh()
+    assert [info.handle for info in diff.added] == [3]
+    assert [info.handle for info in diff.removed] == [2]
+    assert [info.left for info in diff.moved] == [50] and [info.handle for info in diff.retitled] == [1]
+    assert diffs[-1] is diff
+
+    unsubscribe()
+    desktop.pop()
+    assert registry.refresh() and len(diffs) == 2
+    assert registry.get_stats()['enumerations'] == 4
+
+
+def test_lookup_maps_stale_objects_to_cached_windows():
+    """Stale combo entries resolve by handle first, then by title"""
+    live = FakeWindow(7, 'scrcpy', left=10)
+    registry = WindowRegistry(lambda: [live])
+    stale = FakeWindow(7, 'old title')
+    assert registry.lookup(stale) is live
+    assert registry.lookup(FakeWindow(99, 'scrcpy')) is live
+    assert registry.lookup(FakeWindow(99, 'gone')) is None
+    assert window_handle(type('W', (), {'_hWnd': 42, 'title': 'x'})()) == 42
+
+
+if __name__ == "__main__":
+    test_enumerates_once_per_tick_and_publishes_diffs()
+    test_lookup_maps_stale_objects_to_cached_windows()
+    print("All window registry tests passed")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test script for the X11 capture pixel helpers (no X server needed)
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from x11_capture import X11Capture, bgrx_array, to_image
+
+
+def test_bgrx_array_is_a_view_without_row_padding():
+    """Rows padded beyond width*4 bytes are sliced off without copying the buffer"""
+    np = pytest.importorskip('numpy')
+    # 2x3 pixels, 4 bytes of padding per row
+    data = bytearray(range(2 * (3 * 4 + 4)))
+    array = bgrx_array(data, 3, 2, bytes_per_line=16)
+    assert array.shape == (2, 3, 4)
+    assert array[1, 0].tolist() == [16, 17, 18, 19]
+    assert np.shares_memory(array, np.frombuffer(data, dtype=np.uint8))
+    assert bgrx_array(bytes(24), 3, 2).shape == (2, 3, 4)
+
+
+def test_to_image_converts_bgrx_to_rgb():
+    """Blue/red are swapped and the X byte dropped, also for non-contiguous views"""
+    pytest.importorskip('numpy')
+    pytest.importorskip('PIL')
+    data = bytearray([10, 20, 30, 0] * 3 + [0] * 4 + [40, 50, 60, 0] * 3 + [0] * 4)
+    image = to_image(bgrx_array(data, 3, 2, bytes_per_line=16))
+    assert image.mode == 'RGB' and image.size == (3, 2)
+    assert image.getpixel((0, 0)) == (30, 20, 10)
+    assert image.getpixel((2, 1)) == (60, 50, 40)
+
+
+def test_only_connection_errors_reconnect():
+    """A request error (e.g. BadMatch for a minimised window) keeps the display; a broken connection reconnects"""
+    capture = X11Capture()
+    frame = bytearray(16)
+    failures = [ValueError("Unsupported X11 pixel format (depth 16)")]
+
+    def get_image(xid, rect):
+        if failures:
+            raise failures.pop(0)
+        return memoryview(frame)
+
+    capture._get_image = get_image
+    try:
+        capture.grab(0x3a00007)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("request error swallowed")
+    assert capture.get_stats()['reconnects'] == 0 and capture.get_stats()['failures'] == 1
+
+    failures.append(ConnectionResetError("X server went away"))
+    assert capture.grab(0x3a00007).nbytes == 16
+    stats = capture.get_stats()
+    assert stats['reconnects'] == 1 and stats['grabs'] == 1
+
+
+if __name__ == "__main__":
+    test_bgrx_array_is_a_view_without_row_padding()
+    test_to_image_converts_bgrx_to_rgb()
+    test_only_connection_errors_reconnect()
+    print("All X11 capture tests passed")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test script for the event-driven X11 window tracking (no X server needed)
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from window_registry import WindowRegistry
+from x11_window_events import X11WindowWatcher
+
+
+class FakeWindow:
+    def __init__(self, xid, title, left=0):
+        self.xid, self.title, self.left, self.top, self.width, self.height = xid, title, left, 0, 300, 600
+        self.visible = True
+
+    def getHandle(self):
+        return self.xid
+
+
+class OfflineWatcher(X11WindowWatcher):
+    """Watcher without a display connection; _sync is fed client lists directly"""
+
+    def _watch(self, xid):
+        self.watched.append(xid)
+
+
+def test_events_update_registry_incrementally():
+    """Client list changes and configure events become registry diffs without enumerating"""
+    desktop = {1: FakeWindow(1, 'Terminal')}
+    enumerations = []
+
+    def enumerate_windows():
+        enumerations.append(1)
+        return list(desktop.values())
+
+    registry = WindowRegistry(enumerate_windows, max_age=0.0)
+    registry.refresh()
+    diffs = []
+    registry.subscribe(diffs.append)
+    watcher = OfflineWatcher(registry, make_window=lambda xid: desktop[xid])
+    watcher.watched = []
+    registry.live = True
+
+    assert not watcher._sync({1}, ())  # Baseline: nothing new
+    desktop[2] = FakeWindow(2, 'scrcpy - Pixel 7')
+    diff = watcher._sync({1, 2}, ())
+    assert [info.handle for info in diff.added] == [2] and watcher.watched == [1, 2]
+
+    desktop[2].left = 40
+    assert not watcher._sync({1, 2}, {1})  # Event without a real change: no notification
+    diff = watcher._sync({1, 2}, {2})
+    assert [info.left for info in diff.moved] == [40]
+
+    diff = watcher._sync({2}, ())
+    assert [info.handle for info in diff.removed] == [1]
+    assert [window.title for window in registry.windows()] == ['scrcpy - Pixel 7']
+    assert len(diffs) == 3 and len(enumerations) == 1
+
+
+if __name__ == "__main__":
+    test_events_update_registry_incrementally()
+    print("All X11 window event tests passed")
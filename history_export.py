@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Columnar (Parquet) export of capture history
+
+Analysts used to load auto_data.csv into pandas and re-split the " | " joined
+raw_text on every load. HistoryParquetWriter streams capture records into a
+Hive-partitioned Parquet dataset instead:
+
+• one folder per day and device: ``<out>/day=2024-05-01/device=SM-N950F/``
+  so a month of one device is read without touching anything else
+• typed columns: timestamp (timestamp[s]), window_title, raw_text (with its
+  original line breaks) and a ``metrics`` map of numeric readings from the
+  metric rule engine (metric_rules.py)
+• bounded memory: rows are buffered up to ``batch_rows`` in total and written
+  as row groups through at most ``max_open_files`` open Parquet writers, so
+  multi-million-row histories export in constant memory
+• repeatable: files are staged under ``<out>/_staging-<run>/`` (ignored by
+  Parquet readers) and each written day/device partition replaces its old
+  folder on close, so exporting twice never duplicates rows; a failed or
+  cancelled export leaves the dataset as it was
+• filtered exports (a time range or window subset) merge instead: rows of
+  the old partition that the export did not write again are kept
+
+Records come from any iterator of capture dicts - auto_data.csv
+(iter_csv_history), the SQLite capture store or a JSON segment log.
+
+pyarrow is optional; without it only the pure-python helpers are usable.
+"""
+
+import os
+import re
+import csv
+import time
+import shutil
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Iterable, Iterator, Callable, Tuple
+
+from metric_rules import get_metric_extractor
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+_UNSAFE_PATH = re.compile(r'[^A-Za-z0-9._-]+')
+
+
+def partition_value(value: str) -> str:
+    """Make a string safe to use as a Hive partition folder value"""
+    return _UNSAFE_PATH.sub('_', value or '').strip('_') or 'unknown'
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Parse a capture timestamp (``YYYY-MM-DD HH:MM:SS`` or ISO 8601); None if unparseable"""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value)
+    try:
+        return datetime.strptime(value, TIMESTAMP_FORMAT)
+    except (TypeError, ValueError):
+        try:
+            return datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            return None
+
+
+def iter_csv_history(csv_path: str) -> Iterator[Dict[str, Any]]:
+    """Stream auto_data.csv rows as capture dicts (raw_text with line breaks restored)"""
+    with open(csv_path, newline='', encoding='utf-8') as csv_file:
+        for row in csv.DictReader(csv_file):
+            raw_text = row.get('raw_text') or ''
+            yield {
+                'timestamp': row.get('timestamp', ''),
+                'window_title': row.get('window_title', ''),
+                'raw_text': '' if raw_text == 'No text detected' else raw_text.replace(' | ', '\n')
+            }
+
+
+def filter_history(records: Iterable[Dict[str, Any]], since: Optional[str] = None, until: Optional[str] = None,
+                   window_title: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Keep records within ``since``/``until`` (timestamp string prefixes) and matching a window substring"""
+    needle = window_title.lower() if window_title else None
+    for record in records:
+        timestamp = str(record.get('timestamp', ''))
+        if since and timestamp < since:
+            continue
+        if until and timestamp[:len(until)] > until:
+            continue
+        if needle and needle not in str(record.get('window_title', '')).lower():
+            continue
+        yield record
+
+
+class HistoryParquetWriter:
+    """Streams capture records into a day/device partitioned Parquet dataset"""
+
+    def __init__(self, out_dir: str, batch_rows: int = 50000, max_open_files: int = 16,
+                 compression: str = 'snappy',
+                 metric_extractor: Optional[Callable[[str, str], Dict[str, float]]] = None,
+                 device_of: Callable[[str], str] = lambda window_title: window_title,
+                 replace_partitions: bool = True):
+        """
+        Args:
+            out_dir: Dataset root folder
+            batch_rows: Rows buffered in memory (over all partitions) before row groups are written
+            max_open_files: Parquet files kept open at once; the least recently used is
+                closed and a later row of its partition starts a new part file
+            compression: Parquet codec ('snappy', 'zstd', 'gzip', 'none')
+            metric_extractor: Turns (raw_text, window_title) into {metric: value};
+                defaults to the built-in metric rules
+            device_of: Maps a window title to its device partition
+            replace_partitions: True when the records cover whole partitions (an unfiltered
+                export), so written partitions replace their old folder; False keeps the old
+                rows the export did not write again
+        """
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("pyarrow not installed. Please install: pip install pyarrow")
+        self.out_dir = out_dir
+        self.batch_rows = max(1, batch_rows)
+        self.max_open_files = max(1, max_open_files)
+        self.compression = compression
+        self.metric_extractor = metric_extractor or get_metric_extractor().numeric_metrics
+        self.device_of = device_of
+        self.replace_partitions = replace_partitions
+        self.schema = pa.schema([
+            ('timestamp', pa.timestamp('s')),
+            ('window_title', pa.string()),
+            ('raw_text', pa.string()),
+            ('metrics', pa.map_(pa.string(), pa.float64()))
+        ])
+        self._run = time.strftime('%Y%m%d%H%M%S')
+        self._staging = os.path.join(out_dir, f"_staging-{self._run}")
+        self._cancelled = threading.Event()
+        self._buffers: Dict[Tuple[str, str], Dict[str, List[Any]]] = {}
+        self._buffered = 0
+        self._writers: 'OrderedDict[Tuple[str, str], Any]' = OrderedDict()
+        self._parts: Dict[Tuple[str, str], int] = {}
+        self.files: List[str] = []
+        self.stats = {
+            'rows': 0,
+            'skipped': 0,
+            'row_groups': 0,
+            'files': 0,
+            'kept_rows': 0
+        }
+
+    def add(self, record: Dict[str, Any]):
+        """Buffer one capture record; row groups are written once ``batch_rows`` rows are buffered"""
+        timestamp = parse_timestamp(record.get('timestamp'))
+        if timestamp is None:
+            self.stats['skipped'] += 1
+            return
+        window_title = str(record.get('window_title') or 'Unknown')
+        raw_text = str(record.get('raw_text') or '')
+        key = (timestamp.strftime('%Y-%m-%d'), partition_value(self.device_of(window_title)))
+        columns = self._buffers.get(key)
+        if columns is None:
+            columns = self._buffers[key] = {name: [] for name in self.schema.names}
+        columns['timestamp'].append(timestamp)
+        columns['window_title'].append(window_title)
+        columns['raw_text'].append(raw_text)
+        columns['metrics'].append(list(self.metric_extractor(raw_text, window_title).items()))
+        self._buffered += 1
+        if self._buffered >= self.batch_rows:
+            self.flush()
+
+    def write_all(self, records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Add every record, then close the dataset; returns the stats
+
+        A failed or cancelled export is discarded (``stats['cancelled']`` tells them apart).
+        """
+        try:
+            for record in records:
+                if self._cancelled.is_set():
+                    break
+                self.add(record)
+        except BaseException:
+            self.abort()
+            raise
+        if self._cancelled.is_set():
+            self.abort()
+        else:
+            self.close()
+        return self.get_stats()
+
+    def cancel(self):
+        """Ask a running write_all (on another thread) to stop and discard its output"""
+        self._cancelled.set()
+
+    def flush(self):
+        """Write every buffered partition as a row group"""
+        for key, columns in self._buffers.items():
+            table = pa.Table.from_pydict(columns, schema=self.schema)
+            self._writer(key).write_table(table)
+            self.stats['rows'] += table.num_rows
+            self.stats['row_groups'] += 1
+        self._buffers.clear()
+        self._buffered = 0
+
+    def _writer(self, key: Tuple[str, str]):
+        """Open Parquet writer of a partition, closing the least recently used one if needed"""
+        writer = self._writers.get(key)
+        if writer is not None:
+            self._writers.move_to_end(key)
+            return writer
+        while len(self._writers) >= self.max_open_files:
+            _, oldest = self._writers.popitem(last=False)
+            oldest.close()
+        day, device = key
+        folder = os.path.join(self._staging, f"day={day}", f"device={device}")
+        os.makedirs(folder, exist_ok=True)
+        part = self._parts.get(key, 0)
+        self._parts[key] = part + 1
+        path = os.path.join(folder, f"part-{self._run}-{part:04d}.parquet")
+        writer = pq.ParquetWriter(path, self.schema,
+                                  compression=None if self.compression == 'none' else self.compression)
+        self._writers[key] = writer
+        self.files.append(path)
+        self.stats['files'] += 1
+        return writer
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats['partitions'] = len(self._parts)
+        stats['buffered'] = self._buffered
+        stats['cancelled'] = self._cancelled.is_set()
+        return stats
+
+    def close(self):
+        """Write the remaining rows, close every file and publish the written partitions"""
+        try:
+            self.flush()
+            self._close_writers()
+            if not self.replace_partitions:
+                self._keep_old_rows()
+        except BaseException:
+            self.abort()
+            raise
+        self._publish()
+
+    def abort(self):
+        """Close every file and delete the staged output, leaving the dataset untouched"""
+        self._buffers.clear()
+        self._buffered = 0
+        try:
+            self._close_writers()
+        finally:
+            shutil.rmtree(self._staging, ignore_errors=True)
+            self.files.clear()
+
+    def _close_writers(self):
+        while self._writers:
+            _, writer = self._writers.popitem(last=False)
+            writer.close()
+
+    def _keep_old_rows(self):
+        """Stage the rows of each existing partition that this export did not write again"""
+        key_columns = ['timestamp', 'window_title', 'raw_text']
+        for day, device in self._parts:
+            partition = os.path.join(f"day={day}", f"device={device}")
+            target = os.path.join(self.out_dir, partition)
+            if not os.path.isdir(target):
+                continue
+            staged = os.path.join(self._staging, partition)
+            written = set()
+            for name in os.listdir(staged):
+                table = pq.read_table(os.path.join(staged, name), columns=key_columns)
+                written.update(zip(*(table.column(column).to_pylist() for column in key_columns)))
+            old_files = sorted(name for name in os.listdir(target) if name.endswith('.parquet'))
+            if not old_files:
+                continue
+            old = pa.concat_tables([pq.read_table(os.path.join(target, name), schema=self.schema)
+                                    for name in old_files])
+            keys = zip(*(old.column(column).to_pylist() for column in key_columns))
+            kept = old.filter(pa.array([key not in written for key in keys], type=pa.bool_()))
+            if kept.num_rows:
+                pq.write_table(kept, os.path.join(staged, f"part-{self._run}-kept.parquet"),
+                               compression=None if self.compression == 'none' else self.compression)
+                self.stats['kept_rows'] += kept.num_rows
+
+    def _publish(self):
+        """Swap every staged partition folder in place of the dataset's old one
+
+        A merging export has already staged the old rows it keeps (see _keep_old_rows).
+        """
+        for day, device in self._parts:
+            partition = os.path.join(f"day={day}", f"device={device}")
+            staged = os.path.join(self._staging, partition)
+            target = os.path.join(self.out_dir, partition)
+            old = staged + '.old'
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if os.path.exists(target):
+                os.replace(target, old)
+            os.replace(staged, target)
+            shutil.rmtree(old, ignore_errors=True)
+        self.files = [os.path.join(self.out_dir, os.path.relpath(path, self._staging)) for path in self.files]
+        shutil.rmtree(self._staging, ignore_errors=True)
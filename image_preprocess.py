@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Client-side image preprocessing before OCR upload
+
+A full-resolution PNG of a mirrored phone screen is often several megabytes
+for a handful of numbers. ImagePreprocessor shrinks the upload in memory
+before it is sent to Azure:
+
+• grayscale   - drop color channels (OCR does not need them)
+• downscale   - resample from the source DPI to a target DPI (never upscales)
+• contrast    - stretch the histogram between the 1st and 99th percentile
+• binarize    - optional Otsu threshold to pure black/white
+• encode      - JPEG (fast, lossy), lossless WebP or PNG into a bytes buffer
+
+Every call returns a report with the original and encoded sizes and the time
+spent, so the savings can be weighed against the preprocessing cost.
+"""
+
+import io
+import os
+import time
+import threading
+from typing import Optional, Dict, Any, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+# Azure OCR rejects images smaller than 50x50 pixels
+MIN_DIMENSION = 50
+
+
+class ImagePreprocessor:
+    """Configurable in-memory preprocessing and encoding of OCR uploads"""
+
+    FORMATS = ('jpeg', 'webp', 'png')
+
+    def __init__(self, grayscale: bool = True, target_dpi: int = 0, source_dpi: int = 96,
+                 contrast: bool = True, binarize: bool = False, image_format: str = 'jpeg',
+                 jpeg_quality: int = 85):
+        image_format = image_format.lower()
+        if image_format == 'jpg':
+            image_format = 'jpeg'
+        if image_format not in self.FORMATS:
+            raise ValueError(f"Unknown OCR upload format: {image_format} (expected one of {', '.join(self.FORMATS)})")
+        self.grayscale = grayscale
+        self.target_dpi = target_dpi
+        self.source_dpi = source_dpi
+        self.contrast = contrast
+        self.binarize = binarize
+        self.image_format = image_format
+        self.jpeg_quality = jpeg_quality
+        self._lock = threading.Lock()
+        self.stats = {
+            'processed': 0,
+            'original_bytes': 0,
+            'encoded_bytes': 0,
+            'total_time': 0.0
+        }
+
+    @property
+    def available(self) -> bool:
+        """Whether Pillow and NumPy are installed"""
+        return NUMPY_AVAILABLE and Image is not None
+
+    def scale_factor(self, image: 'Image.Image') -> float:
+        """Downscale factor from the source DPI to the target DPI (1.0 = keep size)"""
+        if not self.target_dpi or self.target_dpi >= self.source_dpi:
+            return 1.0
+        factor = self.target_dpi / float(self.source_dpi)
+        # Never shrink below what the OCR API accepts
+        smallest = min(image.size)
+        if smallest * factor < MIN_DIMENSION:
+            factor = min(1.0, MIN_DIMENSION / float(smallest)) if smallest else 1.0
+        return factor
+
+    @staticmethod
+    def _stretch_contrast(pixels):
+        """Linear stretch between the 1st and 99th percentile"""
+        low, high = np.percentile(pixels, (1, 99))
+        if high - low < 1:
+            return pixels
+        stretched = (pixels.astype(np.float32) - low) * (255.0 / (high - low))
+        return np.clip(stretched, 0, 255).astype(np.uint8)
+
+    @staticmethod
+    def _otsu_threshold(gray) -> int:
+        """Otsu's threshold of a uint8 grayscale array"""
+        histogram = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+        total = gray.size
+        weight_background = np.cumsum(histogram)
+        weight_foreground = total - weight_background
+        cumulative_mean = np.cumsum(histogram * np.arange(256))
+        mean_background = cumulative_mean / np.maximum(weight_background, 1)
+        mean_foreground = (cumulative_mean[-1] - cumulative_mean) / np.maximum(weight_foreground, 1)
+        between_variance = weight_background * weight_foreground * (mean_background - mean_foreground) ** 2
+        return int(np.argmax(between_variance))
+
+    def transform(self, image: 'Image.Image') -> 'Image.Image':
+        """Apply grayscale, downscale, contrast and binarization to an image"""
+        factor = self.scale_factor(image)
+        if factor < 1.0:
+            # Rounded, not truncated: a side clamped to MIN_DIMENSION must not end up one pixel short
+            new_size = (max(1, round(image.width * factor)), max(1, round(image.height * factor)))
+            image = image.resize(new_size, Image.LANCZOS)
+
+        if self.grayscale or self.binarize:
+            image = image.convert('L')
+        elif image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+
+        if self.contrast or self.binarize:
+            pixels = np.asarray(image)
+            if self.contrast:
+                pixels = self._stretch_contrast(pixels)
+            if self.binarize:
+                pixels = np.where(pixels > self._otsu_threshold(pixels), 255, 0).astype(np.uint8)
+            image = Image.fromarray(pixels)
+
+        return image
+
+    def encode(self, image: 'Image.Image') -> bytes:
+        """Encode an image into the configured upload format"""
+        buffer = io.BytesIO()
+        if self.image_format == 'jpeg':
+            image.save(buffer, format='JPEG', quality=self.jpeg_quality, optimize=False)
+        elif self.image_format == 'webp':
+            image.save(buffer, format='WEBP', lossless=True, method=0)
+        else:
+            image.save(buffer, format='PNG', compress_level=1)
+        return buffer.getvalue()
+
+    def process(self, image: 'Image.Image', original_bytes: Optional[int] = None) -> Tuple[bytes, Dict[str, Any]]:
+        """Preprocess and encode an in-memory image
+
+        Args:
+            image: PIL image as captured
+            original_bytes: Size of the unprocessed upload; defaults to the
+                uncompressed frame size for images that were never encoded
+
+        Returns:
+            tuple: (encoded bytes, report dict)
+        """
+        started = time.perf_counter()
+        processed = self.transform(image)
+        data = self.encode(processed)
+        elapsed = time.perf_counter() - started
+
+        if original_bytes is None:
+            original_bytes = image.width * image.height * len(image.getbands())
+
+        report = {
+            'original_bytes': original_bytes,
+            'encoded_bytes': len(data),
+            'bytes_saved': original_bytes - len(data),
+            'preprocess_ms': elapsed * 1000.0,
+            'original_size': image.size,
+            'encoded_size': processed.size,
+            'format': self.image_format
+        }
+
+        with self._lock:
+            self.stats['processed'] += 1
+            self.stats['original_bytes'] += original_bytes
+            self.stats['encoded_bytes'] += len(data)
+            self.stats['total_time'] += elapsed
+
+        return data, report
+
+    def process_file(self, image_path: str) -> Tuple[bytes, Dict[str, Any]]:
+        """Preprocess and encode an image file"""
+        with Image.open(image_path) as image:
+            image.load()
+            return self.process(image, os.path.getsize(image_path))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return cumulative savings and preprocessing cost"""
+        with self._lock:
+            stats = dict(self.stats)
+        processed = stats['processed']
+        stats['bytes_saved'] = stats['original_bytes'] - stats['encoded_bytes']
+        stats['saved_ratio'] = (stats['bytes_saved'] / stats['original_bytes']) if stats['original_bytes'] else 0.0
+        stats['avg_preprocess_ms'] = (stats['total_time'] * 1000.0 / processed) if processed else 0.0
+        return stats
+
+    def reset_stats(self):
+        """Reset the cumulative counters"""
+        with self._lock:
+            for name in self.stats:
+                self.stats[name] = 0.0 if name == 'total_time' else 0
+
+
+def format_preprocess_report(report: Dict[str, Any], ocr_seconds: Optional[float] = None) -> str:
+    """One-line human readable summary of a preprocessing report"""
+    original = report['original_bytes']
+    encoded = report['encoded_bytes']
+    percent = (100.0 * report['bytes_saved'] / original) if original else 0.0
+    summary = (f"{original / 1024:.0f} KB -> {encoded / 1024:.0f} KB ({percent:.0f}% saved, "
+               f"{report['format'].upper()} {report['encoded_size'][0]}x{report['encoded_size'][1]}), "
+               f"+{report['preprocess_ms']:.0f} ms preprocessing")
+    if ocr_seconds is not None:
+        summary += f", OCR round-trip {ocr_seconds:.2f}s"
+    return summary
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Token-bucket I/O governor for USB-attached capture setups
+
+Heavy bursts of file I/O next to a phone mirrored over USB (scrcpy, Mi Band
+bridges) can make the link drop. The old protection slept a fixed time before
+and after every operation, whether or not the bus was busy. IOGovernor only
+delays an operation when it would exceed a budget:
+
+• a global bytes/s and ops/s token bucket shared by all file operations
+• per-operation-type ops/s (and optional bytes/s) budgets, e.g. deletes are
+  allowed less often than CSV appends
+• admission is priority ordered: when several operations wait, CSV/JSON
+  writes are let through before cleanup deletes
+• adaptive tuning: a rising error rate scales every rate down, a clean run
+  scales it back up to the configured budgets
+
+Buckets start full, so an idle bus admits a short burst without any delay.
+"""
+
+import time
+import heapq
+import itertools
+import threading
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import Optional, Dict, Any, Callable
+
+
+# Admission priorities (lower goes first)
+PRIORITY_WRITE = 0
+PRIORITY_DELETE = 5
+PRIORITY_CLEANUP = 10
+
+
+class TokenBucket:
+    """Token bucket that may be overdrawn; callers wait out the deficit
+
+    Not thread-safe on its own - IOGovernor serializes access.
+    """
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def _refill(self, now: float):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Take ``amount`` tokens; returns the seconds to wait until they are covered"""
+        if self.rate <= 0:
+            return 0.0  # Unlimited
+        self._refill(now)
+        self.tokens -= amount
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+    def set_rate(self, rate: float, now: float):
+        self._refill(now)
+        self.rate = rate
+
+
+@dataclass
+class OperationBudget:
+    """Rate budget of one operation type"""
+    ops_per_second: float
+    burst: int = 1
+    bytes_per_second: float = 0.0  # 0 = only the global bytes budget applies
+    priority: int = PRIORITY_WRITE
+
+
+# Budgets for maximum stability and for fast mode
+STABLE_BUDGETS = {
+    'file_write': OperationBudget(4.0, burst=3, priority=PRIORITY_WRITE),
+    'frame_write': OperationBudget(2.0, burst=2, priority=PRIORITY_WRITE),
+    'file_delete': OperationBudget(1.25, burst=1, priority=PRIORITY_DELETE),
+    'cleanup': OperationBudget(0.5, burst=1, priority=PRIORITY_CLEANUP)
+}
+
+FAST_BUDGETS = {
+    'file_write': OperationBudget(20.0, burst=10, priority=PRIORITY_WRITE),
+    'frame_write': OperationBudget(10.0, burst=5, priority=PRIORITY_WRITE),
+    'file_delete': OperationBudget(5.0, burst=3, priority=PRIORITY_DELETE),
+    'cleanup': OperationBudget(2.0, burst=1, priority=PRIORITY_CLEANUP)
+}
+
+
+class IOGovernor:
+    """Thread-safe bytes/s + ops/s admission control for file operations"""
+
+    def __init__(self, bytes_per_second: float = 4 * 1024 * 1024, ops_per_second: float = 20.0,
+                 budgets: Optional[Dict[str, OperationBudget]] = None, error_window: int = 20,
+                 backoff_error_rate: float = 0.2, min_scale: float = 0.1,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        """
+        Args:
+            bytes_per_second: Global byte budget (0 = unlimited)
+            ops_per_second: Global operation budget (0 = unlimited)
+            budgets: Per-operation-type budgets (defaults to STABLE_BUDGETS)
+            error_window: Number of recent outcomes the error rate is measured over
+            backoff_error_rate: Error rate at which all rates are halved
+            min_scale: Lowest fraction of the configured rates backoff goes to
+        """
+        self.clock = clock
+        self.sleep = sleep
+        self.bytes_per_second = bytes_per_second
+        self.ops_per_second = ops_per_second
+        self.backoff_error_rate = backoff_error_rate
+        self.min_scale = min_scale
+        self.scale = 1.0
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._waiters = []
+        self._outcomes = deque(maxlen=error_window)
+        now = clock()
+        self._bytes = TokenBucket(bytes_per_second, bytes_per_second, now)
+        self._ops = TokenBucket(ops_per_second, max(1.0, ops_per_second), now)
+        self.budgets: Dict[str, OperationBudget] = {}
+        self._op_buckets: Dict[str, TokenBucket] = {}
+        self._op_byte_buckets: Dict[str, TokenBucket] = {}
+        self.set_budgets(budgets or STABLE_BUDGETS)
+        self.stats = {
+            'operations': 0,
+            'errors': 0,
+            'throttled': 0,
+            'bytes': 0,
+            'total_wait': 0.0,
+            'max_wait': 0.0,
+            'last_error_time': 0.0
+        }
+
+    def set_budgets(self, budgets: Dict[str, OperationBudget]):
+        """Replace the per-operation budgets
+
+        Buckets of operation types that already exist keep their current fill,
+        so re-applying budgets does not hand out a fresh burst.
+        """
+        with self._cond:
+            now = self.clock()
+            self.budgets = {name: replace(budget) for name, budget in budgets.items()}
+            op_buckets, op_byte_buckets = {}, {}
+            for name, budget in self.budgets.items():
+                op_buckets[name] = self._resize(self._op_buckets.get(name), budget.ops_per_second, budget.burst, now)
+                if budget.bytes_per_second:
+                    op_byte_buckets[name] = self._resize(
+                        self._op_byte_buckets.get(name), budget.bytes_per_second, budget.bytes_per_second, now
+                    )
+            self._op_buckets = op_buckets
+            self._op_byte_buckets = op_byte_buckets
+
+    def _resize(self, bucket: Optional[TokenBucket], rate: float, capacity: float, now: float) -> TokenBucket:
+        """Reuse a bucket with a new rate/capacity, or create a full one"""
+        if bucket is None:
+            return TokenBucket(rate * self.scale, capacity, now)
+        bucket.set_rate(rate * self.scale, now)
+        bucket.capacity = capacity
+        bucket.tokens = min(bucket.tokens, capacity)
+        return bucket
+
+    def set_budget(self, operation_type: str, **changes):
+        """Adjust one operation budget, e.g. ``set_budget('file_delete', ops_per_second=1.0)``"""
+        budgets = dict(self.budgets)
+        budgets[operation_type] = replace(budgets.get(operation_type, OperationBudget(1.0)), **changes)
+        self.set_budgets(budgets)
+
+    def priority(self, operation_type: str) -> int:
+        budget = self.budgets.get(operation_type)
+        return budget.priority if budget else PRIORITY_WRITE
+
+    def _apply_scale(self, now: float):
+        """Push the adaptive scale into every bucket rate (lock held)"""
+        self._bytes.set_rate(self.bytes_per_second * self.scale, now)
+        self._ops.set_rate(self.ops_per_second * self.scale, now)
+        for name, budget in self.budgets.items():
+            self._op_buckets[name].set_rate(budget.ops_per_second * self.scale, now)
+            if name in self._op_byte_buckets:
+                self._op_byte_buckets[name].set_rate(budget.bytes_per_second * self.scale, now)
+
+    def acquire(self, operation_type: str, nbytes: int = 0) -> float:
+        """Block until the budgets admit one operation; returns the seconds waited"""
+        budget = self.budgets.get(operation_type)
+        ticket = (budget.priority if budget else PRIORITY_WRITE, next(self._seq))
+        with self._cond:
+            heapq.heappush(self._waiters, ticket)
+            # Higher-priority (and earlier) waiters reserve their tokens first
+            while self._waiters[0] != ticket:
+                self._cond.wait()
+            heapq.heappop(self._waiters)
+            now = self.clock()
+            delay = max(
+                self._ops.reserve(1, now),
+                self._bytes.reserve(nbytes, now) if nbytes else 0.0,
+                self._op_buckets[operation_type].reserve(1, now) if operation_type in self._op_buckets else 0.0,
+                self._op_byte_buckets[operation_type].reserve(nbytes, now)
+                if nbytes and operation_type in self._op_byte_buckets else 0.0
+            )
+            self.stats['operations'] += 1
+            self.stats['bytes'] += nbytes
+            self.stats['total_wait'] += delay
+            self.stats['max_wait'] = max(self.stats['max_wait'], delay)
+            if delay > 0:
+                self.stats['throttled'] += 1
+            self._cond.notify_all()
+        if delay > 0:
+            self.sleep(delay)
+        return delay
+
+    def record(self, success: bool):
+        """Feed an operation outcome into the adaptive rate control"""
+        with self._cond:
+            self._outcomes.append(success)
+            now = self.clock()
+            if not success:
+                self.stats['errors'] += 1
+                self.stats['last_error_time'] = now
+            window = len(self._outcomes)
+            errors = window - sum(self._outcomes)
+            if not success and errors / float(window) >= self.backoff_error_rate:
+                # Back off hard on a rising error rate
+                self.scale = max(self.min_scale, self.scale * 0.5)
+                self._apply_scale(now)
+            elif success and self.scale < 1.0 and window == self._outcomes.maxlen and errors == 0:
+                # A full window without errors: recover gradually
+                self.scale = min(1.0, self.scale * 1.25)
+                self._apply_scale(now)
+                self._outcomes.clear()
+
+    def run(self, operation_type: str, func: Callable[..., Any], *args, nbytes: int = 0, **kwargs) -> Any:
+        """Admit, run and record one operation; exceptions propagate after being recorded"""
+        self.acquire(operation_type, nbytes)
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.record(False)
+            raise
+        self.record(True)
+        return result
+
+    def error_rate(self) -> float:
+        """Share of failed operations in the recent window"""
+        with self._cond:
+            if not self._outcomes:
+                return 0.0
+            return 1.0 - sum(self._outcomes) / float(len(self._outcomes))
+
+    def seconds_since_error(self) -> Optional[float]:
+        """Seconds since the last failed operation, or None if none failed"""
+        with self._cond:
+            last = self.stats['last_error_time']
+            if not self.stats['errors']:
+                return None
+        return self.clock() - last
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return throughput counters, wait times and the adaptive scale"""
+        with self._cond:
+            stats = dict(self.stats)
+        stats.pop('last_error_time')
+        operations = stats['operations']
+        stats['avg_wait_ms'] = (stats['total_wait'] * 1000.0 / operations) if operations else 0.0
+        stats['max_wait_ms'] = stats.pop('max_wait') * 1000.0
+        stats['error_rate'] = self.error_rate()
+        stats['scale'] = self.scale
+        return stats
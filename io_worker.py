@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Background file I/O worker for Grace
+
+CSV rows, JSON dumps, screenshot writes/deletes and retention cleanup used to
+run inside Qt slots, together with the USB stability pauses between them, so
+every auto-capture froze the window for a second or more. IOWorker owns all of
+that work on one dedicated thread:
+
+• callers only enqueue a job (a function plus its arguments) and return
+• jobs run by priority, then in submission order: CSV rows keep capture
+  order, and queued cleanup deletes wait until pending writes are done
+• the finished job (result or error, queue wait and run time) is handed to an
+  ``on_done`` callback - in the GUI a Qt signal, which delivers it on the GUI
+  thread
+
+Job functions run off the GUI thread and must not touch widgets; they return
+whatever the completion handler needs (e.g. a status message).
+"""
+
+import time
+import queue
+import itertools
+import threading
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, Callable, Tuple
+
+
+@dataclass
+class IOJob:
+    """One unit of background file work"""
+    job_id: int
+    name: str  # Kind of work, e.g. 'auto_data', 'cleanup', 'frame_write'
+    func: Callable[..., Any] = field(repr=False)
+    args: Tuple[Any, ...] = field(default=(), repr=False)
+    kwargs: Dict[str, Any] = field(default_factory=dict, repr=False)
+    context: Dict[str, Any] = field(default_factory=dict)
+    priority: int = 0  # Lower runs first
+    submitted_at: float = field(default_factory=time.perf_counter)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Any = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def wait_time(self) -> float:
+        """Seconds the job spent queued"""
+        return (self.started_at or self.submitted_at) - self.submitted_at
+
+    @property
+    def run_time(self) -> float:
+        """Seconds the job spent running"""
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+
+class IOWorker:
+    """Single thread executing file I/O jobs by priority, FIFO within a priority"""
+
+    def __init__(self, on_done: Optional[Callable[[IOJob], None]] = None, name: str = "io-worker"):
+        """
+        Args:
+            on_done: Called with every finished job (from the worker thread)
+            name: Thread name
+        """
+        self.on_done = on_done
+        self._queue = queue.PriorityQueue()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._pending = 0
+        self._closed = False
+        self.stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'total_wait': 0.0,
+            'total_run': 0.0,
+            'max_wait': 0.0
+        }
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, name: str, func: Callable[..., Any], *args, context: Optional[Dict[str, Any]] = None,
+               priority: int = 0, **kwargs) -> Optional[IOJob]:
+        """Queue ``func(*args, **kwargs)``; returns None once the worker is closed
+
+        Args:
+            priority: Lower values run first (e.g. writes before cleanup deletes)
+        """
+        with self._lock:
+            if self._closed:
+                return None
+            job = IOJob(next(self._ids), name, func, args, kwargs, dict(context or {}), priority)
+            self._pending += 1
+            self.stats['submitted'] += 1
+        self._queue.put((priority, job.job_id, job))
+        return job
+
+    @property
+    def pending(self) -> int:
+        """Jobs queued or running"""
+        with self._lock:
+            return self._pending
+
+    def _run(self):
+        """Worker loop"""
+        while True:
+            _, _, job = self._queue.get()
+            if job is None:
+                return
+            job.started_at = time.perf_counter()
+            try:
+                job.result = job.func(*job.args, **job.kwargs)
+            except Exception as e:
+                job.error = str(e) or e.__class__.__name__
+            job.finished_at = time.perf_counter()
+
+            with self._lock:
+                self.stats['completed' if job.ok else 'failed'] += 1
+                self.stats['total_wait'] += job.wait_time
+                self.stats['total_run'] += job.run_time
+                self.stats['max_wait'] = max(self.stats['max_wait'], job.wait_time)
+
+            if self.on_done is not None:
+                try:
+                    self.on_done(job)
+                except Exception as e:
+                    print(f"DEBUG: I/O worker callback error for {job.name}: {e}")
+
+            with self._lock:
+                self._pending -= 1
+                if self._pending == 0:
+                    self._idle.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued job has finished; False on timeout"""
+        with self._lock:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return job counters and average queue wait / run time in milliseconds"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['pending'] = self._pending
+        finished = stats['completed'] + stats['failed']
+        stats['avg_wait_ms'] = (stats['total_wait'] * 1000.0 / finished) if finished else 0.0
+        stats['avg_run_ms'] = (stats['total_run'] * 1000.0 / finished) if finished else 0.0
+        stats['max_wait_ms'] = stats.pop('max_wait') * 1000.0
+        return stats
+
+    def reset_stats(self):
+        """Reset the cumulative counters"""
+        with self._lock:
+            for name in self.stats:
+                self.stats[name] = 0 if name in ('submitted', 'completed', 'failed') else 0.0
+
+    def close(self, wait: bool = True):
+        """Stop accepting jobs; with ``wait`` run the remaining ones first"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        if not wait:
+            # Drop everything that has not started yet
+            try:
+                while True:
+                    _, _, job = self._queue.get_nowait()
+                    if job is not None:
+                        with self._lock:
+                            self._pending -= 1
+            except queue.Empty:
+                pass
+            with self._lock:
+                self._idle.notify_all()
+        # Sorts after every job, so the remaining ones run first
+        self._queue.put((float('inf'), 0, None))
+        if wait:
+            self._thread.join()
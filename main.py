@@ -44,7 +44,7 @@ through automated screen capture and OCR processing using Azure Computer Vision
 🔍 DEPENDENCIES:
 • Core: PyQt5, PyWinCtl, requests, Pillow, pyautogui, mss
 • Windows: pywin32, dxcam (optional)
-• Linux: python3-xlib, xdotool, wmctrl, scrot
+• Linux: python3-xlib, numpy, xdotool, wmctrl
 • macOS: pyobjc, pyobjc-frameworks
 
 📋 CONFIGURATION:
@@ -71,11 +71,10 @@ import json
 import time
 import random
 import csv
-import glob
+import math
+import threading
 from datetime import datetime
-from typing import Optional, Dict, Any
-
-import pywinctl
+from typing import Optional, Dict, Any, Union
 
 # Cross-platform window management
 try:
@@ -95,14 +94,39 @@ from PyQt5.QtWidgets import (
     QPushButton, QTextEdit, QLabel, QWidget, QCheckBox,
     QSpinBox, QGroupBox, QMessageBox, QProgressBar,
     QComboBox, QDialog, QTreeWidget, QTreeWidgetItem, QDialogButtonBox,
-    QTableWidget, QTableWidgetItem, QAbstractItemView, QFrame, QSplitter, QTabWidget
+    QTableWidget, QTableWidgetItem, QAbstractItemView, QFrame, QSplitter, QTabWidget,
+    QLineEdit
 )
-from PyQt5.QtCore import QTimer, QThread, pyqtSignal, Qt, QPropertyAnimation, QEasingCurve
+from PyQt5.QtCore import QObject, QTimer, QThread, QEventLoop, pyqtSignal, Qt, QPropertyAnimation, QEasingCurve
 from PyQt5.QtGui import QFont, QIcon, QColor, QPalette, QLinearGradient, QPainter, QTransform
 import mss
 import numpy as np
 from PIL import Image
 
+from capture_session import get_capture_session
+from frame_change import FrameChangeDetector
+from ocr_cache import OCRResultCache, make_cache_key
+from ocr_client import get_ocr_client
+from ocr_pipeline import OCRPipeline, OCRJob
+from image_preprocess import ImagePreprocessor, format_preprocess_report
+from frame_store import CapturedFrame, persist_frame
+from roi_profiles import ROIProfile, ROIProfileStore, parse_regions, format_regions
+from capture_scheduler import FixedRateScheduler
+from io_worker import IOWorker, IOJob
+from csv_appender import get_csv_appender, close_all_appenders
+from capture_store import get_capture_store, close_all_stores, parse_storage_backends, file_sha256
+from segment_log import SegmentLog
+from history_export import PYARROW_AVAILABLE, HistoryParquetWriter, iter_csv_history
+from metric_rules import get_metric_extractor
+from ocr_layout import get_layout
+from retention import RetentionIndex, delete_files
+from window_registry import WindowDiff, get_window_registry, snapshot
+from x11_window_events import X11WindowWatcher, x11_events_available
+from device_classifier import get_device_classifier
+from x11_capture import get_x11_capture, x11_capture_available, x11_window_id
+from shm_capture import get_shm_capture_engine, shm_capture_available
+from io_governor import IOGovernor, STABLE_BUDGETS, FAST_BUDGETS, PRIORITY_DELETE, PRIORITY_CLEANUP
+
 # Modern JSON and text formatting libraries
 try:
     import pygments
@@ -197,7 +221,17 @@ try:
     from config import (
         AZURE_API_KEY, AZURE_ENDPOINT, DEFAULT_CAPTURE_INTERVAL,
         SCREENSHOTS_FOLDER, SCRCPY_WINDOW_TITLES, OCR_LANGUAGE, DETECT_ORIENTATION,
-        ENABLE_AUTO_DELETE_SCREENSHOTS
+        ENABLE_AUTO_DELETE_SCREENSHOTS, CHANGE_DETECTION_ENABLED, CHANGE_DETECTION_METHOD,
+        CHANGE_DETECTION_THRESHOLD, OCR_CACHE_ENABLED, OCR_CACHE_DIR, OCR_CACHE_MAX_ENTRIES,
+        OCR_CACHE_MAX_MB, OCR_CONNECT_TIMEOUT, OCR_READ_TIMEOUT, OCR_MAX_IN_FLIGHT, OCR_MAX_QUEUED,
+        OCR_PREPROCESS_ENABLED, OCR_PREPROCESS_GRAYSCALE, OCR_PREPROCESS_SOURCE_DPI,
+        OCR_PREPROCESS_TARGET_DPI, OCR_PREPROCESS_CONTRAST, OCR_PREPROCESS_BINARIZE,
+        OCR_PREPROCESS_FORMAT, OCR_PREPROCESS_JPEG_QUALITY, IN_MEMORY_CAPTURE,
+        ROI_CROPPING_ENABLED, ROI_PROFILES_FILE, AUTO_CAPTURE_OVERDUE_POLICY,
+        IO_GOVERNOR_BYTES_PER_SEC, IO_GOVERNOR_OPS_PER_SEC, CSV_FLUSH_ROWS, CSV_FLUSH_BYTES, CSV_FLUSH_INTERVAL,
+        CAPTURE_STORAGE_BACKENDS, CAPTURE_DB_PATH, JSON_LOG_MAX_SEGMENT_MB, JSON_LOG_MAX_SEGMENT_AGE,
+        JSON_LOG_COMPRESSION, JSON_LOG_KEEP_SEGMENTS, PARQUET_EXPORT_DIR, PARQUET_BATCH_ROWS,
+        METRIC_RULES_FILE, X11_EVENT_TRACKING, DEVICE_RULES_FILE, SHM_CAPTURE_ENABLED
     )
 except ImportError:
     print("ERROR: Configuration not found!")
@@ -207,6 +241,15 @@ except ImportError:
     print("3. Run the application again after setting up .env")
     sys.exit(1)
 
+# Azure Computer Vision OCR API version (part of the OCR cache key)
+AZURE_OCR_API_VERSION = "v3.2"
+
+# Columns of auto_data.csv
+AUTO_CSV_FIELDS = ['timestamp', 'window_title', 'raw_text']
+
+# One cached window enumeration shared by the window combo, device discovery, dialogs and captures
+window_registry = get_window_registry(gw.getAllWindows if WINDOW_MANAGER_AVAILABLE else (lambda: []), max_age=3.0)
+
 
 class InstantDeviceDialog(QDialog):
     """Dialog window to display ALL devices instantly in a simple list"""
@@ -298,8 +341,9 @@ class InstantDeviceDialog(QDialog):
                                   "Window manager not available. Please install PyWinCtl: pip install PyWinCtl")
                 return
             
-            # Get updated device list
-            all_windows = gw.getAllWindows()
+            # Get updated device list (one fresh enumeration, shared with the main window)
+            window_registry.refresh()
+            all_windows = window_registry.windows()
             self.device_list = []
             
             # Platform-specific filtering
@@ -432,6 +476,7 @@ class DeviceDiscoveryDialog(QDialog):
             'wearables': '⌚',
             'emulators': '🎮',
             'dev_tools': '🛠️',
+            'browsers': '🌐',
             'unknown_devices': '❓'
         }
         
@@ -479,48 +524,99 @@ class DeviceDiscoveryDialog(QDialog):
                 tips_item.addChild(tip_item)
 
 
+def run_ocr_request(image_path: str, api_key: str, endpoint: str,
+                    cache: Optional[OCRResultCache] = None) -> Dict[str, Any]:
+    """Recognize an image file with Azure OCR, consulting the result cache first
+    
+    Raises:
+        RuntimeError: If requests is missing or the API returns an error
+    """
+    with open(image_path, 'rb') as image_file:
+        image_data = image_file.read()
+    return recognize_image_bytes(image_data, api_key, endpoint, cache)
+
+
+def recognize_image_bytes(image_data: bytes, api_key: str, endpoint: str,
+                          cache: Optional[OCRResultCache] = None) -> Dict[str, Any]:
+    """Recognize an encoded image with Azure OCR, consulting the result cache first
+    
+    Raises:
+        RuntimeError: If requests is missing or the API returns an error
+    """
+    # Answer from the OCR cache if these exact pixels were recognized before
+    cache_key = None
+    if cache is not None:
+        cache_key = make_cache_key(image_data, OCR_LANGUAGE, DETECT_ORIENTATION, AZURE_OCR_API_VERSION)
+        cached_result = cache.get(cache_key)
+        if cached_result is not None:
+            return cached_result
+    
+    if not requests:
+        raise RuntimeError("requests library not installed. Please install: pip install requests")
+    
+    # Azure Computer Vision OCR API call over the shared keep-alive session
+    response = get_ocr_client(OCR_CONNECT_TIMEOUT, OCR_READ_TIMEOUT).recognize(
+        endpoint,
+        api_key,
+        image_data,
+        language=OCR_LANGUAGE,
+        detect_orientation=DETECT_ORIENTATION,
+        api_version=AZURE_OCR_API_VERSION
+    )
+    
+    if response.status_code != 200:
+        raise RuntimeError(f"OCR API Error: {response.status_code} - {response.text}")
+    
+    result = response.json()
+    if cache_key is not None:
+        try:
+            cache.put(cache_key, result)
+        except Exception as cache_error:
+            print(f"DEBUG: OCR cache store failed: {cache_error}")
+    return result
+
+
 class OCRWorker(QThread):
-    """Worker thread for OCR processing to avoid blocking the UI"""
+    """Worker thread for OCR processing to avoid blocking the UI
+    
+    If an OCRResultCache is given, it is consulted before the API call and
+    successful responses are stored in it.
+    """
     finished = pyqtSignal(dict)
     error = pyqtSignal(str)
     
-    def __init__(self, image_path: str, api_key: str, endpoint: str):
+    def __init__(self, image_path: str, api_key: str, endpoint: str, cache: Optional[OCRResultCache] = None):
         super().__init__()
         self.image_path = image_path
         self.api_key = api_key
         self.endpoint = endpoint
+        self.cache = cache
     
     def run(self):
         try:
-            if not requests:
-                self.error.emit("requests library not installed. Please install: pip install requests")
-                return
-                
-            # Azure Computer Vision OCR API call
-            headers = {
-                'Ocp-Apim-Subscription-Key': self.api_key,
-                'Content-Type': 'application/octet-stream'
-            }
-            
-            with open(self.image_path, 'rb') as image_file:
-                image_data = image_file.read()
-            
-            response = requests.post(
-                f"{self.endpoint}/vision/v3.2/ocr",
-                headers=headers,
-                data=image_data,
-                params={'language': OCR_LANGUAGE, 'detectOrientation': str(DETECT_ORIENTATION).lower()}
-            )
-            
-            if response.status_code == 200:
-                self.finished.emit(response.json())
-            else:
-                self.error.emit(f"OCR API Error: {response.status_code} - {response.text}")
-                
+            self.finished.emit(run_ocr_request(self.image_path, self.api_key, self.endpoint, self.cache))
+        except RuntimeError as e:
+            self.error.emit(str(e))
         except Exception as e:
             self.error.emit(f"OCR processing failed: {str(e)}")
 
 
+class OCRPipelineBridge(QObject):
+    """Hands committed OCR jobs from pipeline threads to the GUI thread"""
+    committed = pyqtSignal(object)
+
+
+class IOWorkerBridge(QObject):
+    """Hands finished I/O jobs and status messages from the I/O worker thread to the GUI thread"""
+    finished = pyqtSignal(object)
+    status = pyqtSignal(str, str)
+
+
+class WindowRegistryBridge(QObject):
+    """Hands window registry diffs from whichever thread refreshed to the GUI thread"""
+    changed = pyqtSignal(object)
+
+
 class HelpDocumentationDialog(QDialog):
     """Comprehensive help and documentation dialog"""
     
@@ -1112,101 +1208,71 @@ class USBStabilityManager:
     This class provides comprehensive USB stability management to prevent
     USB disconnections during auto-capture operations. It implements:
     
-    1. Intelligent file operation timing
-    2. Reduced I/O operation frequency
+    1. Rate-governed file operations (token buckets for bytes/s and ops/s,
+       per-operation budgets) instead of fixed sleeps
+    2. Priority admission - CSV/JSON writes ahead of cleanup deletes
     3. Graceful error handling
-    4. Auto-recovery mechanisms
-    5. Resource optimization
+    4. Adaptive backoff driven by the observed error rate
+    5. Device-specific budgets
     """
     
     def __init__(self, parent_app):
         self.app = parent_app
         self.is_stable_mode = True  # Default to stable mode
-        self.operation_delays = {
-            'file_write': 0.2,
-            'file_delete': 0.5,
-            'cleanup': 1.0,
-            'ocr_process': 0.3
-        }
-        self.max_concurrent_operations = 1
-        self.current_operations = 0
-        self.error_count = 0
-        self.last_error_time = 0
+        self.governor = IOGovernor(IO_GOVERNOR_BYTES_PER_SEC, IO_GOVERNOR_OPS_PER_SEC, STABLE_BUDGETS)
+        self._lock = threading.Lock()
+        self.error_count = 0  # Consecutive failed operations
         
     def enable_stability_mode(self):
         """Enable maximum USB stability mode"""
         self.is_stable_mode = True
-        self.operation_delays = {
-            'file_write': 0.3,
-            'file_delete': 0.8,
-            'cleanup': 2.0,
-            'ocr_process': 0.5
-        }
-        self.max_concurrent_operations = 1
+        self.governor.set_budgets(STABLE_BUDGETS)
         print("DEBUG: USB Stability - Maximum stability mode enabled")
         
     def disable_stability_mode(self):
         """Disable USB stability mode for faster operations"""
         self.is_stable_mode = False
-        self.operation_delays = {
-            'file_write': 0.1,
-            'file_delete': 0.2,
-            'cleanup': 0.5,
-            'ocr_process': 0.1
-        }
-        self.max_concurrent_operations = 3
+        self.governor.set_budgets(FAST_BUDGETS)
         print("DEBUG: USB Stability - Fast mode enabled")
         
-    def safe_file_operation(self, operation_type, operation_func, *args, **kwargs):
-        """Safely execute file operations with USB stability considerations"""
-        if self.current_operations >= self.max_concurrent_operations:
-            print(f"DEBUG: USB Stability - Operation queued: {operation_type}")
-            time.sleep(self.operation_delays.get(operation_type, 0.2))
-            
-        self.current_operations += 1
+    def safe_file_operation(self, operation_type, operation_func, *args, nbytes=0, **kwargs):
+        """Safely execute file operations with USB stability considerations
         
+        The governor only delays the operation when it would exceed the bytes/s,
+        ops/s or per-operation budget. Runs on the background I/O worker.
+        """
         try:
-            # Add delay before operation
-            if self.is_stable_mode:
-                time.sleep(self.operation_delays.get(operation_type, 0.2))
-            
-            # Execute operation
-            result = operation_func(*args, **kwargs)
-            
-            # Add delay after operation
-            if self.is_stable_mode:
-                time.sleep(self.operation_delays.get(operation_type, 0.2) * 0.5)
-            
-            self.error_count = 0  # Reset error count on success
-            return result
-            
+            result = self.governor.run(operation_type, operation_func, *args, nbytes=nbytes, **kwargs)
         except Exception as e:
-            self.error_count += 1
-            self.last_error_time = time.time()
+            with self._lock:
+                self.error_count += 1
+                error_count = self.error_count
             print(f"DEBUG: USB Stability - Operation failed: {operation_type}, Error: {e}")
             
             # Auto-enable stability mode if errors occur
-            if self.error_count >= 3:
+            if error_count >= 3 and not self.is_stable_mode:
                 self.enable_stability_mode()
-                self.app.update_status("🔌 Auto-enabled USB stability mode due to errors", "orange")
+                self.app.post_status("🔌 Auto-enabled USB stability mode due to errors", "orange")
             
             raise e
+        
+        with self._lock:
+            self.error_count = 0  # Reset error count on success
+        return result
             
-        finally:
-            self.current_operations = max(0, self.current_operations - 1)
-            
-    def safe_file_write(self, file_path, content, mode='w', encoding='utf-8'):
-        """Safely write to file with USB stability"""
+    def safe_file_write(self, file_path, content, mode='w', encoding='utf-8', sync=True):
+        """Safely write to file with USB stability (``sync`` forces it to disk with fsync)"""
+        if not isinstance(content, str):
+            content = str(content)
+        
         def write_operation():
             with open(file_path, mode, encoding=encoding) as f:
-                if isinstance(content, str):
-                    f.write(content)
-                else:
-                    f.write(str(content))
+                f.write(content)
                 f.flush()
-                os.fsync(f.fileno())  # Force write to disk
+                if sync:
+                    os.fsync(f.fileno())  # Force write to disk
                 
-        return self.safe_file_operation('file_write', write_operation)
+        return self.safe_file_operation('file_write', write_operation, nbytes=len(content.encode(encoding)))
         
     def safe_file_delete(self, file_path):
         """Safely delete file with USB stability"""
@@ -1235,7 +1301,8 @@ class USBStabilityManager:
             return False
             
         # Skip operations if there were recent errors
-        if self.error_count > 0 and (time.time() - self.last_error_time) < 30:
+        since_error = self.governor.seconds_since_error()
+        if since_error is not None and since_error < 30:
             return True
             
         # Skip deletion operations in maximum stability mode
@@ -1250,26 +1317,29 @@ class USBStabilityManager:
         
         if any(keyword in device_name for keyword in ['xiaomi', 'mi band', 'redmi']):
             # Xiaomi devices are more sensitive to USB operations
-            self.enable_stability_mode()
-            self.operation_delays['file_delete'] = 1.0
+            if not self.is_stable_mode:
+                self.enable_stability_mode()
+            self.governor.set_budget('file_delete', ops_per_second=1.0)
             print("DEBUG: USB Stability - Optimized for Xiaomi device")
             
         elif any(keyword in device_name for keyword in ['samsung', 'galaxy']):
             # Samsung devices are generally more stable
-            self.operation_delays['file_delete'] = 0.3
+            self.governor.set_budget('file_delete', ops_per_second=3.0)
             print("DEBUG: USB Stability - Optimized for Samsung device")
             
         elif any(keyword in device_name for keyword in ['scrcpy', 'android']):
             # Generic Android via scrcpy
-            self.operation_delays['file_delete'] = 0.4
+            self.governor.set_budget('file_delete', ops_per_second=2.5)
             print("DEBUG: USB Stability - Optimized for Android via scrcpy")
             
     def get_status_message(self):
         """Get current USB stability status message"""
+        stats = self.governor.get_stats()
+        throttle = f"Throttled: {stats['throttled']}/{stats['operations']}, Rate: {stats['scale'] * 100:.0f}%"
         if self.is_stable_mode:
-            return f"🔌 USB Stability Mode: ACTIVE (Errors: {self.error_count})"
+            return f"🔌 USB Stability Mode: ACTIVE (Errors: {stats['errors']}, {throttle})"
         else:
-            return f"⚡ Fast Mode: ACTIVE (Errors: {self.error_count})"
+            return f"⚡ Fast Mode: ACTIVE (Errors: {stats['errors']}, {throttle})"
 
 
 class SettingsDialog(QDialog):
@@ -1327,6 +1397,10 @@ class SettingsDialog(QDialog):
         self.api_tab = self.create_api_tab()
         self.tab_widget.addTab(self.api_tab, "🌐 API & Network Testing")
         
+        # ROI cropping profiles tab
+        self.roi_tab = self.create_roi_tab()
+        self.tab_widget.addTab(self.roi_tab, "✂️ ROI Profiles")
+        
         layout.addWidget(self.tab_widget)
         
         # Dialog buttons
@@ -1395,6 +1469,69 @@ class SettingsDialog(QDialog):
         
         metrics_layout.addLayout(perf_row2)
         
+        # Performance metrics row 3
+        perf_row3 = QHBoxLayout()
+        
+        # OCR cache hits/misses
+        self.cache_hits_label = QLabel("🗃️ OCR Cache: 0 hits / 0 misses")
+        self.cache_hits_label.setFont(QFont("Arial", 12, QFont.Bold))
+        self.cache_hits_label.setStyleSheet("color: #9C27B0; padding: 10px; border: 1px solid #555; border-radius: 4px;")
+        perf_row3.addWidget(self.cache_hits_label)
+        
+        # OCR cache size
+        self.cache_size_label = QLabel("💽 Cache Size: 0 entries")
+        self.cache_size_label.setFont(QFont("Arial", 12, QFont.Bold))
+        self.cache_size_label.setStyleSheet("color: #00BCD4; padding: 10px; border: 1px solid #555; border-radius: 4px;")
+        perf_row3.addWidget(self.cache_size_label)
+        
+        # HTTP connection reuse
+        self.connection_reuse_label = QLabel("🔌 Connections: 0 reused / 0 opened")
+        self.connection_reuse_label.setFont(QFont("Arial", 12, QFont.Bold))
+        self.connection_reuse_label.setStyleSheet("color: #8BC34A; padding: 10px; border: 1px solid #555; border-radius: 4px;")
+        perf_row3.addWidget(self.connection_reuse_label)
+        
+        metrics_layout.addLayout(perf_row3)
+        
+        # Performance metrics row 4
+        perf_row4 = QHBoxLayout()
+        
+        # Upload bytes saved by preprocessing
+        self.upload_saved_label = QLabel("📉 Upload Saved: -")
+        self.upload_saved_label.setFont(QFont("Arial", 12, QFont.Bold))
+        self.upload_saved_label.setStyleSheet("color: #3F51B5; padding: 10px; border: 1px solid #555; border-radius: 4px;")
+        perf_row4.addWidget(self.upload_saved_label)
+        
+        # Preprocessing cost
+        self.preprocess_time_label = QLabel("🧪 Preprocessing: -")
+        self.preprocess_time_label.setFont(QFont("Arial", 12, QFont.Bold))
+        self.preprocess_time_label.setStyleSheet("color: #795548; padding: 10px; border: 1px solid #555; border-radius: 4px;")
+        perf_row4.addWidget(self.preprocess_time_label)
+        
+        metrics_layout.addLayout(perf_row4)
+        
+        # Performance metrics row 5
+        perf_row5 = QHBoxLayout()
+        
+        # Auto-capture timing jitter
+        self.capture_jitter_label = QLabel("🎯 Capture Jitter: -")
+        self.capture_jitter_label.setFont(QFont("Arial", 12, QFont.Bold))
+        self.capture_jitter_label.setStyleSheet("color: #009688; padding: 10px; border: 1px solid #555; border-radius: 4px;")
+        perf_row5.addWidget(self.capture_jitter_label)
+        
+        # Auto-capture deadlines missed
+        self.missed_ticks_label = QLabel("⏭️ Missed Ticks: 0")
+        self.missed_ticks_label.setFont(QFont("Arial", 12, QFont.Bold))
+        self.missed_ticks_label.setStyleSheet("color: #E91E63; padding: 10px; border: 1px solid #555; border-radius: 4px;")
+        perf_row5.addWidget(self.missed_ticks_label)
+        
+        # Background file I/O queue
+        self.io_queue_label = QLabel("💾 I/O Queue: 0 pending")
+        self.io_queue_label.setFont(QFont("Arial", 12, QFont.Bold))
+        self.io_queue_label.setStyleSheet("color: #607D8B; padding: 10px; border: 1px solid #555; border-radius: 4px;")
+        perf_row5.addWidget(self.io_queue_label)
+        
+        metrics_layout.addLayout(perf_row5)
+        
         # Reset stats button
         self.reset_stats_btn = QPushButton("🔄 Reset Performance Statistics")
         self.reset_stats_btn.clicked.connect(self.reset_performance_stats)
@@ -1421,6 +1558,183 @@ class SettingsDialog(QDialog):
         
         return widget
     
+    def create_roi_tab(self):
+        """Create the tab for editing region-of-interest cropping profiles"""
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        
+        # Explanation
+        info_label = QLabel(
+            "Crop background captures of matching windows to the listed regions before OCR.\n"
+            "Regions are given in percent of the window: left, top, width, height (one per line)."
+        )
+        info_label.setWordWrap(True)
+        info_label.setStyleSheet("color: #ccc; padding: 8px;")
+        layout.addWidget(info_label)
+        
+        # Profile selection
+        profile_group = QGroupBox("✂️ Profile")
+        profile_layout = QVBoxLayout(profile_group)
+        
+        self.roi_profile_combo = QComboBox()
+        self.roi_profile_combo.currentIndexChanged.connect(self.load_roi_profile_into_form)
+        profile_layout.addWidget(self.roi_profile_combo)
+        
+        name_row = QHBoxLayout()
+        name_row.addWidget(QLabel("Name:"))
+        self.roi_name_edit = QLineEdit()
+        self.roi_name_edit.setPlaceholderText("e.g. Mi Band heart rate")
+        name_row.addWidget(self.roi_name_edit)
+        profile_layout.addLayout(name_row)
+        
+        pattern_row = QHBoxLayout()
+        pattern_row.addWidget(QLabel("Window title contains:"))
+        self.roi_pattern_edit = QLineEdit()
+        self.roi_pattern_edit.setPlaceholderText("e.g. Gadgetbridge")
+        pattern_row.addWidget(self.roi_pattern_edit)
+        self.roi_use_window_btn = QPushButton("🎯 Use Selected Window")
+        self.roi_use_window_btn.clicked.connect(self.fill_roi_pattern_from_window)
+        pattern_row.addWidget(self.roi_use_window_btn)
+        profile_layout.addLayout(pattern_row)
+        
+        profile_layout.addWidget(QLabel("Regions (left, top, width, height in %):"))
+        self.roi_regions_edit = QTextEdit()
+        self.roi_regions_edit.setPlaceholderText("10,20,80,15\n10,45,80,15")
+        self.roi_regions_edit.setMaximumHeight(120)
+        profile_layout.addWidget(self.roi_regions_edit)
+        
+        self.roi_enabled_checkbox = QCheckBox("Profile enabled")
+        self.roi_enabled_checkbox.setChecked(True)
+        profile_layout.addWidget(self.roi_enabled_checkbox)
+        
+        layout.addWidget(profile_group)
+        
+        # Actions
+        button_row = QHBoxLayout()
+        self.roi_save_btn = QPushButton("💾 Save Profile")
+        self.roi_save_btn.clicked.connect(self.save_roi_profile)
+        self.roi_save_btn.setStyleSheet("""
+            QPushButton {
+                background: qlineargradient(x1: 0, y1: 0, x2: 0, y2: 1,
+                                          stop: 0 #4CAF50, stop: 1 #388E3C);
+                color: white;
+                border: none;
+                padding: 10px 20px;
+                font-size: 12px;
+                font-weight: bold;
+                border-radius: 6px;
+            }
+        """)
+        button_row.addWidget(self.roi_save_btn)
+        
+        self.roi_delete_btn = QPushButton("🗑️ Delete Profile")
+        self.roi_delete_btn.clicked.connect(self.delete_roi_profile)
+        self.roi_delete_btn.setStyleSheet("""
+            QPushButton {
+                background: qlineargradient(x1: 0, y1: 0, x2: 0, y2: 1,
+                                          stop: 0 #F44336, stop: 1 #D32F2F);
+                color: white;
+                border: none;
+                padding: 10px 20px;
+                font-size: 12px;
+                font-weight: bold;
+                border-radius: 6px;
+            }
+        """)
+        button_row.addWidget(self.roi_delete_btn)
+        layout.addLayout(button_row)
+        
+        self.roi_status_label = QLabel("")
+        self.roi_status_label.setWordWrap(True)
+        layout.addWidget(self.roi_status_label)
+        
+        layout.addStretch()
+        
+        self.refresh_roi_profiles()
+        return widget
+    
+    def refresh_roi_profiles(self, select_name: str = None):
+        """Reload the profile list from the application's profile store"""
+        self.roi_profile_combo.blockSignals(True)
+        self.roi_profile_combo.clear()
+        self.roi_profile_combo.addItem("➕ New profile...", None)
+        for profile in self.parent_app.roi_profiles.profiles:
+            self.roi_profile_combo.addItem(f"{profile.name} ({profile.window_pattern})", profile.name)
+            if profile.name == select_name:
+                self.roi_profile_combo.setCurrentIndex(self.roi_profile_combo.count() - 1)
+        self.roi_profile_combo.blockSignals(False)
+        self.load_roi_profile_into_form()
+    
+    def load_roi_profile_into_form(self, index: int = None):
+        """Show the selected profile in the edit fields"""
+        name = self.roi_profile_combo.currentData()
+        profile = self.parent_app.roi_profiles.get(name) if name else None
+        self.roi_name_edit.setText(profile.name if profile else "")
+        self.roi_pattern_edit.setText(profile.window_pattern if profile else "")
+        self.roi_regions_edit.setPlainText(format_regions(profile.regions) if profile else "")
+        self.roi_enabled_checkbox.setChecked(profile.enabled if profile else True)
+        self.roi_delete_btn.setEnabled(profile is not None)
+    
+    def fill_roi_pattern_from_window(self):
+        """Use the window selected in the main window as the title pattern"""
+        window = self.parent_app.get_selected_window()
+        if window:
+            self.roi_pattern_edit.setText(window.title)
+            if not self.roi_name_edit.text().strip():
+                self.roi_name_edit.setText(window.title[:40])
+        else:
+            self.roi_status_label.setText("⚠️ Select a window in the main window first")
+            self.roi_status_label.setStyleSheet("color: #FF9800;")
+    
+    def save_roi_profile(self):
+        """Validate the form and save the profile"""
+        name = self.roi_name_edit.text().strip()
+        pattern = self.roi_pattern_edit.text().strip()
+        if not name or not pattern:
+            self.roi_status_label.setText("❌ Name and window title pattern are required")
+            self.roi_status_label.setStyleSheet("color: #F44336;")
+            return
+        try:
+            regions = parse_regions(self.roi_regions_edit.toPlainText())
+            if not regions:
+                raise ValueError("Add at least one region")
+        except ValueError as e:
+            self.roi_status_label.setText(f"❌ {e}")
+            self.roi_status_label.setStyleSheet("color: #F44336;")
+            return
+        
+        # Renaming replaces the profile that was being edited
+        previous_name = self.roi_profile_combo.currentData()
+        if previous_name and previous_name != name:
+            self.parent_app.roi_profiles.remove(previous_name)
+        
+        self.parent_app.roi_profiles.set_profile(
+            ROIProfile(name, pattern, regions, self.roi_enabled_checkbox.isChecked())
+        )
+        try:
+            self.parent_app.roi_profiles.save()
+            self.roi_status_label.setText(f"✅ Saved profile '{name}' ({len(regions)} region(s))")
+            self.roi_status_label.setStyleSheet("color: #4CAF50;")
+        except Exception as e:
+            self.roi_status_label.setText(f"❌ Could not save profiles: {e}")
+            self.roi_status_label.setStyleSheet("color: #F44336;")
+        self.refresh_roi_profiles(name)
+    
+    def delete_roi_profile(self):
+        """Delete the selected profile"""
+        name = self.roi_profile_combo.currentData()
+        if not name:
+            return
+        self.parent_app.roi_profiles.remove(name)
+        try:
+            self.parent_app.roi_profiles.save()
+            self.roi_status_label.setText(f"🗑️ Deleted profile '{name}'")
+            self.roi_status_label.setStyleSheet("color: #FF9800;")
+        except Exception as e:
+            self.roi_status_label.setText(f"❌ Could not save profiles: {e}")
+            self.roi_status_label.setStyleSheet("color: #F44336;")
+        self.refresh_roi_profiles()
+    
     def create_api_tab(self):
         """Create comprehensive API and network testing tab"""
         widget = QWidget()
@@ -1570,6 +1884,62 @@ class SettingsDialog(QDialog):
             minutes = (uptime_seconds % 3600) // 60
             seconds = uptime_seconds % 60
             self.uptime_label.setText(f"🕐 Session Uptime: {hours:02d}:{minutes:02d}:{seconds:02d}")
+            
+            # Update OCR cache counters
+            if self.parent_app.ocr_cache is not None:
+                cache_stats = self.parent_app.ocr_cache.get_stats()
+                self.cache_hits_label.setText(
+                    f"🗃️ OCR Cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+                    f"({cache_stats['hit_rate'] * 100:.0f}%)"
+                )
+                self.cache_size_label.setText(
+                    f"💽 Cache Size: {cache_stats['entries']} entries, {cache_stats['bytes'] / (1024 * 1024):.1f} MB"
+                )
+            else:
+                self.cache_hits_label.setText("🗃️ OCR Cache: Disabled")
+                self.cache_size_label.setText("💽 Cache Size: -")
+            
+            # Update upload preprocessing savings
+            if self.parent_app.image_preprocessor is not None:
+                prep_stats = self.parent_app.image_preprocessor.get_stats()
+                self.upload_saved_label.setText(
+                    f"📉 Upload Saved: {prep_stats['bytes_saved'] / (1024 * 1024):.1f} MB "
+                    f"({prep_stats['saved_ratio'] * 100:.0f}%)"
+                )
+                self.preprocess_time_label.setText(
+                    f"🧪 Preprocessing: {prep_stats['avg_preprocess_ms']:.0f} ms avg ({prep_stats['processed']} images)"
+                )
+            else:
+                self.upload_saved_label.setText("📉 Upload Saved: Preprocessing disabled")
+                self.preprocess_time_label.setText("🧪 Preprocessing: -")
+            
+            # Update auto-capture schedule accuracy
+            schedule_stats = self.parent_app.capture_scheduler.get_stats()
+            if schedule_stats['fired']:
+                self.capture_jitter_label.setText(
+                    f"🎯 Capture Jitter: {schedule_stats['jitter_mean_ms']:.0f} ms avg, "
+                    f"±{schedule_stats['jitter_std_ms']:.0f} ms, max {schedule_stats['max_lateness_ms']:.0f} ms"
+                )
+            else:
+                self.capture_jitter_label.setText("🎯 Capture Jitter: -")
+            self.missed_ticks_label.setText(
+                f"⏭️ Missed Ticks: {schedule_stats['missed']} ({schedule_stats['policy']})"
+            )
+            
+            # Update background I/O queue
+            io_stats = self.parent_app.io_worker.get_stats()
+            governor_stats = self.parent_app.usb_stability_manager.governor.get_stats()
+            self.io_queue_label.setText(
+                f"💾 I/O Queue: {io_stats['pending']} pending, {io_stats['avg_run_ms']:.0f} ms avg write, "
+                f"{governor_stats['throttled']} throttled"
+            )
+            
+            # Update HTTP connection reuse (summed over all OCR endpoints)
+            if requests:
+                endpoint_stats = get_ocr_client(OCR_CONNECT_TIMEOUT, OCR_READ_TIMEOUT).get_stats().values()
+                reused = sum(stats['connections_reused'] for stats in endpoint_stats)
+                opened = sum(stats['connections_opened'] for stats in endpoint_stats)
+                self.connection_reuse_label.setText(f"🔌 Connections: {reused} reused / {opened} opened")
     
     def update_api_latency_display(self, latency_text):
         """Update API latency display"""
@@ -1671,7 +2041,7 @@ class BiosensorApp(QMainWindow):
     
     🌟 Core Features:
     • Cross-platform window detection and management (PyWinCtl/pygetwindow)
-    • Multi-method screenshot capture (dxcam, mss, pyautogui, scrot)
+    • Multi-method screenshot capture (dxcam, mss, native X11, pyautogui)
     • Azure Computer Vision OCR integration
     • Real-time device discovery and categorization
     • Automated capture with configurable intervals
@@ -1683,13 +2053,13 @@ class BiosensorApp(QMainWindow):
     🔧 Platform Support:
     • Windows 10/11: Full feature support with dxcam acceleration
     • macOS 10.14+: PyObjC-based window management
-    • Linux (X11): xdotool, wmctrl, and scrot integration
+    • Linux (X11): xdotool and wmctrl integration, native XGetImage capture
     
     📦 Dependencies:
     • Core: PyQt5, requests, Pillow, pyautogui, mss
     • Cross-platform: PyWinCtl (primary), pygetwindow (fallback)
     • Windows-specific: pywin32, dxcam (optional)
-    • Linux-specific: python3-xlib, system tools (xdotool, wmctrl, scrot)
+    • Linux-specific: python3-xlib, system tools (xdotool, wmctrl)
     • macOS-specific: pyobjc, pyobjc-frameworks
     
     🎨 UI Features:
@@ -1721,11 +2091,13 @@ class BiosensorApp(QMainWindow):
         is_dark_theme (bool): Current theme state (True for dark, False for light)
         zoom_level (float): Current UI zoom level (0.5 to 2.0)
         screenshots_dir (str): Directory for storing captured screenshots
-        auto_timer (QTimer): Timer for automated capture intervals
+        auto_timer (QTimer): Single-shot timer armed for the next auto-capture deadline
+        capture_scheduler (FixedRateScheduler): Drift-free auto-capture deadlines and jitter stats
         refresh_timer (QTimer): Timer for window list refresh
         device_detection_timer (QTimer): Timer for device discovery
         last_device_count (int): Cache for device count change detection
-        ocr_worker (OCRWorker): Background thread for OCR processing
+        ocr_pipeline (OCRPipeline): Bounded concurrent OCR queue with in-order commit
+        io_worker (IOWorker): Background thread owning CSV/JSON/screenshot writes, deletes and cleanup
         azure_api_key (str): Azure Computer Vision API key
         azure_endpoint (str): Azure Computer Vision endpoint URL
         last_ocr_result (dict): Cache of most recent OCR result for export
@@ -1758,9 +2130,35 @@ class BiosensorApp(QMainWindow):
         os.makedirs(self.json_dir, exist_ok=True)
         os.makedirs(self.csv_dir, exist_ok=True)
         
-        # Timer for auto-capture
+        # Timer for auto-capture - re-armed for each absolute deadline of the scheduler
         self.auto_timer = QTimer()
-        self.auto_timer.timeout.connect(self.auto_capture)
+        self.auto_timer.setSingleShot(True)
+        self.auto_timer.setTimerType(Qt.PreciseTimer)
+        self.auto_timer.timeout.connect(self.on_auto_capture_timer)
+        try:
+            self.capture_scheduler = FixedRateScheduler(max(1, DEFAULT_CAPTURE_INTERVAL), AUTO_CAPTURE_OVERDUE_POLICY)
+        except ValueError as e:
+            print(f"DEBUG: {e} - falling back to 'skip'")
+            self.capture_scheduler = FixedRateScheduler(max(1, DEFAULT_CAPTURE_INTERVAL))
+        
+        # Cached window enumeration - timers refresh it, everyone else reads from it
+        self.window_registry = window_registry
+        self.window_bridge = WindowRegistryBridge()
+        self.window_bridge.changed.connect(self.on_windows_changed)
+        self.window_registry.subscribe(self.window_bridge.changed.emit)
+        self._window_change_pending = False
+        
+        # On X11 the registry follows window events instead of the polling timers below
+        self.window_watcher = None
+        if (PLATFORM == 'linux' and X11_EVENT_TRACKING and x11_events_available()
+                and hasattr(gw, 'Window')):
+            self.window_watcher = X11WindowWatcher(self.window_registry, make_window=gw.Window)
+            try:
+                self.window_watcher.start()
+                print("DEBUG: Following X11 window events - auto-scan needs no polling")
+            except Exception as e:
+                print(f"DEBUG: X11 window events unavailable ({e}) - using polling timers")
+                self.window_watcher = None
         
         # Timer for auto-refresh (detect new devices) - NOT started by default
         self.refresh_timer = QTimer()
@@ -1775,8 +2173,115 @@ class BiosensorApp(QMainWindow):
         # Store last known device count for change detection
         self.last_device_count = 0
         
-        # OCR worker thread
-        self.ocr_worker = None
+        # Device keywords and categories compiled once (built-in plus DEVICE_RULES_FILE), memoized per title
+        self.device_classifier = get_device_classifier(DEVICE_RULES_FILE)
+        
+        # Persistent screen capture session (one mss instance per thread)
+        self.capture_session = get_capture_session()
+        
+        # Native X11 capture by window id (replaces the scrot subprocess fallback on Linux)
+        self.x11_capture = get_x11_capture() if PLATFORM == 'linux' and x11_capture_available() else None
+        # Opt-in MIT-SHM capture: one persistent shared-memory segment per window, zero-copy frames
+        self.shm_capture = (get_shm_capture_engine() if SHM_CAPTURE_ENABLED and PLATFORM == 'linux'
+                            and shm_capture_available() else None)
+        if self.shm_capture is not None:
+            self.window_registry.subscribe(self.shm_capture.on_windows_changed)  # Free segments of closed windows
+        
+        # Frame change detection - skip OCR when the device screen has not changed
+        self.frame_change_detector = FrameChangeDetector(
+            CHANGE_DETECTION_METHOD, CHANGE_DETECTION_THRESHOLD, CHANGE_DETECTION_ENABLED
+        )
+        
+        # Persistent OCR result cache keyed by image content + OCR parameters
+        self.ocr_cache = None
+        if OCR_CACHE_ENABLED:
+            try:
+                self.ocr_cache = OCRResultCache(OCR_CACHE_DIR, OCR_CACHE_MAX_ENTRIES, OCR_CACHE_MAX_MB * 1024 * 1024)
+            except Exception as e:
+                print(f"DEBUG: OCR cache unavailable: {e}")
+        
+        # Optional in-memory preprocessing of OCR uploads
+        self.image_preprocessor = None
+        if OCR_PREPROCESS_ENABLED:
+            try:
+                self.image_preprocessor = ImagePreprocessor(
+                    grayscale=OCR_PREPROCESS_GRAYSCALE,
+                    target_dpi=OCR_PREPROCESS_TARGET_DPI,
+                    source_dpi=OCR_PREPROCESS_SOURCE_DPI,
+                    contrast=OCR_PREPROCESS_CONTRAST,
+                    binarize=OCR_PREPROCESS_BINARIZE,
+                    image_format=OCR_PREPROCESS_FORMAT,
+                    jpeg_quality=OCR_PREPROCESS_JPEG_QUALITY
+                )
+            except ValueError as e:
+                print(f"DEBUG: OCR preprocessing disabled: {e}")
+        
+        # Region-of-interest cropping profiles per window title
+        self.roi_profiles = ROIProfileStore(ROI_PROFILES_FILE)
+        
+        # Rule-based extraction of typed metrics (steps, heart rate, ...) per device
+        self.metric_extractor = get_metric_extractor(METRIC_RULES_FILE)
+        
+        # In-memory capture: frames go straight to OCR, disk writes happen in the background
+        self.in_memory_capture = IN_MEMORY_CAPTURE
+        
+        # Background I/O worker - file writes, deletes, cleanup and USB pacing never block the GUI
+        self.io_bridge = IOWorkerBridge()
+        self.io_bridge.finished.connect(self.on_io_job_finished)
+        self.io_bridge.status.connect(self.update_status)
+        self.io_worker = IOWorker(self.io_bridge.finished.emit)
+        # Long history exports get their own thread so they never hold up capture writes
+        self.export_worker = IOWorker(self.io_bridge.finished.emit, name="export-worker")
+        self.history_writer = None  # Running history export, cancelled on close
+        self.closing = False
+        
+        # Ordered index of captured screenshots - retention evicts from it instead of scanning the folders
+        self.retention = RetentionIndex(
+            os.path.join(self.screenshots_dir, "retention.journal"),
+            [os.path.join(self.screenshots_dir, "auto_captures"), os.path.join(self.screenshots_dir, "manual_captures")]
+        )
+        
+        # auto_data.csv stays open; rows are group-committed (one fsync per batch) within the USB I/O budget
+        self.auto_csv = get_csv_appender(
+            os.path.join(self.csv_dir, "auto_data.csv"), AUTO_CSV_FIELDS,
+            max_rows=CSV_FLUSH_ROWS, max_bytes=CSV_FLUSH_BYTES, max_delay=CSV_FLUSH_INTERVAL,
+            before_write=lambda nbytes: self.usb_stability_manager.governor.acquire('file_write', nbytes)
+        )
+        
+        # Backends auto-capture records are written to (csv, json, sqlite)
+        try:
+            self.storage_backends = parse_storage_backends(CAPTURE_STORAGE_BACKENDS)
+        except ValueError as e:
+            print(f"DEBUG: {e} - falling back to csv,json")
+            self.storage_backends = ('csv', 'json')
+        self.capture_store = None
+        if 'sqlite' in self.storage_backends:
+            try:
+                self.capture_store = get_capture_store(CAPTURE_DB_PATH)
+            except Exception as e:
+                print(f"DEBUG: Could not open capture database {CAPTURE_DB_PATH}: {e}")
+        
+        # Auto-capture JSON records go to a rotating JSONL segment log, not one file per capture
+        self.json_log = None
+        if 'json' in self.storage_backends:
+            try:
+                self.json_log = SegmentLog(
+                    os.path.join(self.json_dir, "auto_log"), "auto_capture",
+                    max_segment_bytes=JSON_LOG_MAX_SEGMENT_MB * 1024 * 1024,
+                    max_segment_age=JSON_LOG_MAX_SEGMENT_AGE,
+                    compression=None if JSON_LOG_COMPRESSION == 'none' else JSON_LOG_COMPRESSION,
+                    keep_segments=JSON_LOG_KEEP_SEGMENTS,
+                    before_write=lambda nbytes: self.usb_stability_manager.governor.acquire('file_write', nbytes)
+                )
+            except Exception as e:
+                print(f"DEBUG: Could not open JSON capture log: {e}")
+        
+        # OCR pipeline - bounded concurrent OCR calls, results committed in capture order
+        self.ocr_bridge = OCRPipelineBridge()
+        self.ocr_bridge.committed.connect(self.on_ocr_job_committed)
+        self.ocr_pipeline = OCRPipeline(
+            self.run_ocr_job, self.ocr_bridge.committed.emit, OCR_MAX_IN_FLIGHT, OCR_MAX_QUEUED
+        )
         
         # Navigation Alert System
         self.task_queue = []
@@ -2448,9 +2953,10 @@ class BiosensorApp(QMainWindow):
         self.deletion_mode_combo = QComboBox()
         self.deletion_mode_combo.addItem("🕐 By Time (minutes)", "time")
         self.deletion_mode_combo.addItem("📁 By Count (keep last N)", "count")
+        self.deletion_mode_combo.addItem("💾 By Size (keep last N MB)", "size")
         self.deletion_mode_combo.setCurrentIndex(0)  # Default to time-based
         self.deletion_mode_combo.currentTextChanged.connect(self.update_deletion_mode)
-        self.deletion_mode_combo.setToolTip("Choose deletion method: by time or by count")
+        self.deletion_mode_combo.setToolTip("Choose deletion method: by time, by count or by total size")
         usb_stability_layout.addWidget(self.deletion_mode_combo)
         
         # USB Stability Mode Toggle Button
@@ -2675,6 +3181,38 @@ class BiosensorApp(QMainWindow):
         self.json_export_btn.setEnabled(False)  # Initially disabled
         buttons_layout.addWidget(self.json_export_btn)
         
+        # History export button (whole capture history -> partitioned Parquet)
+        self.parquet_export_btn = QPushButton()
+        if MODERN_UI_AVAILABLE:
+            self.parquet_export_btn.setIcon(qta.icon('fa5s.database', color='white'))
+        self.parquet_export_btn.setText("🗂️ Export History")
+        self.parquet_export_btn.setToolTip("Export the capture history to Parquet, partitioned by day and device")
+        self.parquet_export_btn.clicked.connect(self.export_history_to_parquet)
+        self.parquet_export_btn.setStyleSheet("""
+            QPushButton {
+                background: qlineargradient(x1: 0, y1: 0, x2: 0, y2: 1,
+                                          stop: 0 #009688, stop: 1 #00796b);
+                color: white;
+                border: none;
+                padding: 10px 16px;
+                font-size: 12px;
+                font-weight: bold;
+                border-radius: 6px;
+            }
+            QPushButton:hover {
+                background: qlineargradient(x1: 0, y1: 0, x2: 0, y2: 1,
+                                          stop: 0 #00796b, stop: 1 #00695c);
+            }
+            QPushButton:disabled {
+                background: #666;
+                color: #999;
+            }
+        """)
+        self.parquet_export_btn.setEnabled(PYARROW_AVAILABLE)
+        if not PYARROW_AVAILABLE:
+            self.parquet_export_btn.setToolTip("Install pyarrow to export the capture history to Parquet")
+        buttons_layout.addWidget(self.parquet_export_btn)
+        
         # View Output Details button with modern styling
         self.view_details_btn = QPushButton()
         if MODERN_UI_AVAILABLE:
@@ -2779,6 +3317,7 @@ class BiosensorApp(QMainWindow):
             self.refresh_btn.setText("🔄 Scanning...")
             
             # Force immediate refresh
+            self.window_registry.refresh()
             self.refresh_windows()
             
             # Re-enable button
@@ -2796,6 +3335,12 @@ class BiosensorApp(QMainWindow):
             if self.auto_scan_btn.isChecked():
                 # Start auto-scanning
                 self.auto_scan_btn.setText("🔄 Auto-Scan: ON")
+                if self.window_watcher is not None and self.window_watcher.running:
+                    # Window events drive the updates - bring the list up to date once
+                    self.refresh_windows()
+                    self.auto_detect_devices()
+                    self.update_status("🔄 Auto-scan enabled - following window events", "green")
+                    return
                 self.refresh_timer.start(3000)  # Refresh every 3 seconds
                 self.device_detection_timer.start(2000)  # Device detection every 2 seconds
                 self.update_status("🔄 Auto-scan enabled - watching for new devices", "green")
@@ -2977,6 +3522,13 @@ class BiosensorApp(QMainWindow):
             self.last_capture_time = None
             self.last_api_time = None
             
+            if self.ocr_cache is not None:
+                self.ocr_cache.reset_stats()
+            if self.image_preprocessor is not None:
+                self.image_preprocessor.reset_stats()
+            self.capture_scheduler.reset_stats()
+            self.io_worker.reset_stats()
+            
             self.update_status("📊 Performance statistics reset", "blue")
             
         except Exception as e:
@@ -2994,34 +3546,49 @@ class BiosensorApp(QMainWindow):
             pass
     
     def auto_refresh_windows(self):
-        """Automatically refresh windows to detect new devices"""
+        """Automatically refresh windows to detect new devices
+        
+        One enumeration per tick; on_windows_changed updates the window list
+        only if the registry reports a change.
+        """
         try:
             # Only auto-refresh if no capture is in progress
-            if not hasattr(self, 'ocr_worker') or not self.ocr_worker or not self.ocr_worker.isRunning():
-                current_count = self.window_combo.count()
-                old_selection = self.window_combo.currentText() if self.window_combo.currentIndex() >= 0 else None
-                
-                # Get current window count for comparison
-                new_windows = self.get_all_windows()
-                
-                # Only refresh if window count changed significantly
-                if abs(len(new_windows) - (current_count - 4)) > 1:  # -4 for separators and placeholder
-                    self.refresh_windows()
-                    
-                    # Try to restore selection if it was valid
-                    if old_selection and old_selection not in ["🔍 Select a window to capture...", "❌ No windows found - Connect device and click Refresh"]:
-                        for i in range(self.window_combo.count()):
-                            if old_selection in self.window_combo.itemText(i):
-                                self.window_combo.setCurrentIndex(i)
-                                break
-        except:
-            pass  # Silently ignore auto-refresh errors
+            if not self.ocr_pipeline.busy:
+                self.window_registry.refresh()
+        except Exception as e:
+            print(f"DEBUG: Auto-refresh error: {e}")
+    
+    def on_windows_changed(self, diff: WindowDiff):
+        """Rebuild the window list when windows appeared, closed or were renamed (runs on the GUI thread)"""
+        try:
+            print(f"DEBUG: Windows changed - {len(diff.added)} added, {len(diff.removed)} removed, "
+                  f"{len(diff.moved)} moved, {len(diff.retitled)} retitled")
+            # Only while auto-scan is on; moves do not change the list
+            auto_scan_btn = getattr(self, 'auto_scan_btn', None)  # Not built yet for the startup baseline
+            if auto_scan_btn is None or not auto_scan_btn.isChecked() or not (diff.added or diff.removed or diff.retitled):
+                return
+            if not self._window_change_pending:
+                self._window_change_pending = True
+                self._apply_window_change()
+        except Exception as e:
+            print(f"DEBUG: Window change handling error: {e}")
+    
+    def _apply_window_change(self):
+        """Update the window list and device status for a pending change, once no capture is in progress"""
+        if self.ocr_pipeline.busy:
+            # Events do not repeat like a poll would - try again shortly
+            QTimer.singleShot(1000, self._apply_window_change)
+            return
+        self._window_change_pending = False
+        self.refresh_windows()  # Keeps the current selection
+        if self.window_watcher is not None and self.window_watcher.running:
+            self.auto_detect_devices()  # Replaces the device detection poll
     
     def auto_detect_devices(self):
         """Automatically detect new devices and update UI when changes occur"""
         try:
             # Only run if no capture is in progress
-            if hasattr(self, 'ocr_worker') and self.ocr_worker and self.ocr_worker.isRunning():
+            if self.ocr_pipeline.busy:
                 return
             
             # Get current device information
@@ -3062,6 +3629,21 @@ class BiosensorApp(QMainWindow):
         self.status_label.setText(message)
         self.status_label.setStyleSheet(f"color: {color}; font-weight: bold;")
     
+    def post_status(self, message: str, color: str = "black"):
+        """Update the status label from any thread (queued onto the GUI thread)"""
+        self.io_bridge.status.emit(message, color)
+    
+    def on_io_job_finished(self, job: IOJob):
+        """Handle a finished background I/O job (runs on the GUI thread)"""
+        callback = job.context.get('on_done')
+        if callback is not None:
+            callback(job)
+        elif not job.ok:
+            print(f"DEBUG: I/O job '{job.name}' failed: {job.error}")
+            self.update_status(f"⚠️ Background file operation failed: {job.error}", "orange")
+        if job.wait_time > 1.0:
+            print(f"DEBUG: I/O job '{job.name}' waited {job.wait_time:.1f}s in the queue")
+    
     def pause_all_operations(self):
         """Pause all timers and operations to prevent USB disconnection during capture"""
         try:
@@ -3078,7 +3660,8 @@ class BiosensorApp(QMainWindow):
             else:
                 self._device_timer_was_active = False
                 
-            if hasattr(self, 'auto_timer') and self.auto_timer.isActive():
+            # The capture schedule keeps running; deadlines that pass while paused count as missed
+            if hasattr(self, 'auto_timer') and self.capture_scheduler.running:
                 self.auto_timer.stop()
                 self._auto_timer_was_active = True
             else:
@@ -3091,10 +3674,12 @@ class BiosensorApp(QMainWindow):
     
     def resume_all_operations(self):
         """Resume all timers and operations after capture is complete"""
+        # Wait a moment before resuming to ensure device stability (without blocking the event loop)
+        QTimer.singleShot(1000, self._resume_paused_timers)
+    
+    def _resume_paused_timers(self):
+        """Restart the timers stopped by pause_all_operations"""
         try:
-            # Wait a moment before resuming to ensure device stability
-            time.sleep(1.0)
-            
             # Resume timers that were active
             if hasattr(self, '_refresh_timer_was_active') and self._refresh_timer_was_active:
                 if hasattr(self, 'refresh_timer'):
@@ -3105,9 +3690,9 @@ class BiosensorApp(QMainWindow):
                     self.device_detection_timer.start(2000)
                     
             if hasattr(self, '_auto_timer_was_active') and self._auto_timer_was_active:
-                if hasattr(self, 'auto_timer') and hasattr(self, 'interval_spinbox'):
-                    interval = self.interval_spinbox.value() * 1000
-                    self.auto_timer.start(interval)
+                if hasattr(self, 'auto_timer') and self.capture_scheduler.running:
+                    # Back onto the original grid rather than a fresh interval from now
+                    self.arm_auto_timer()
                     
             print("DEBUG: All operations resumed after capture")
             
@@ -3129,18 +3714,11 @@ class BiosensorApp(QMainWindow):
             
             # Method 1: Try MSS (most stable)
             try:
-                with mss.mss() as sct:
-                    monitor = {
-                        "top": window.top,
-                        "left": window.left,
-                        "width": window.width,
-                        "height": window.height
-                    }
-                    screenshot = sct.grab(monitor)
-                    # Save directly without any additional processing
-                    mss.tools.to_png(screenshot.rgb, screenshot.size, output=image_path)
-                    success = True
-                    print(f"DEBUG: Screenshot saved using MSS: {image_path}")
+                screenshot = self.capture_session.grab(window.left, window.top, window.width, window.height)
+                # Save directly without any additional processing
+                mss.tools.to_png(screenshot.rgb, screenshot.size, output=image_path)
+                success = True
+                print(f"DEBUG: Screenshot saved using MSS: {image_path}")
             except Exception as e:
                 print(f"DEBUG: MSS method failed: {e}")
             
@@ -3166,16 +3744,18 @@ class BiosensorApp(QMainWindow):
             print(f"DEBUG: Screenshot error: {e}")
             return None
     
-    def process_with_ocr_safe(self, image_path, task_name=None):
+    def process_with_ocr_safe(self, image_path, task_name=None, window_title="Unknown"):
         """Process image with OCR using minimal operations"""
         try:
-            self.update_status("🔍 Processing with OCR...", "blue")
+            # Queue the capture on the OCR pipeline
+            job = self.ocr_pipeline.submit(image_path, window_title, {'mode': 'manual', 'task_name': task_name})
+            if job is None:
+                self.update_status("⏳ OCR queue is full - please wait for pending captures", "orange")
+                if task_name:
+                    self.complete_task(task_name, False)
+                return
             
-            # Create and start OCR worker thread
-            self.ocr_worker = OCRWorker(image_path, self.azure_api_key, self.azure_endpoint)
-            self.ocr_worker.finished.connect(lambda result: self.on_ocr_finished_safe(result, task_name))
-            self.ocr_worker.error.connect(lambda error: self.on_ocr_error_safe(error, task_name))
-            self.ocr_worker.start()
+            self.update_status("🔍 Processing with OCR...", "blue")
             
             if task_name:
                 self.update_task_progress(80, "Processing OCR")
@@ -3190,13 +3770,7 @@ class BiosensorApp(QMainWindow):
         """Handle OCR completion with minimal file operations"""
         try:
             # Extract text from OCR result
-            raw_text = ""
-            if 'regions' in result:
-                for region in result['regions']:
-                    for line in region['lines']:
-                        for word in line['words']:
-                            raw_text += word['text'] + " "
-                        raw_text += "\n"
+            raw_text = self.extract_raw_text(result)
             
             # Store result for potential export
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -3238,8 +3812,8 @@ class BiosensorApp(QMainWindow):
             self.complete_task(task_name, False)
         print(f"DEBUG: OCR Error: {error_message}")
     
-    def display_ocr_results(self, raw_text, ocr_result):
-        """Display minimal OCR results preview"""
+    def display_ocr_results(self, raw_text, ocr_result, metrics=None):
+        """Display minimal OCR results preview (with the extracted metrics, if any)"""
         try:
             # Update status label with preview
             if raw_text.strip():
@@ -3271,11 +3845,12 @@ class BiosensorApp(QMainWindow):
             # Update quick stats
             char_count = len(raw_text)
             word_count = len(raw_text.split()) if raw_text.strip() else 0
-            regions_count = len(ocr_result.get('regions', []))
+            layout = get_layout(ocr_result)
             
-            self.quick_stats_label.setText(
-                f"📊 {char_count} chars | 📝 {word_count} words | 🔍 {regions_count} regions | 👁️ Click 'View Output Details' for full results"
-            )
+            stats_text = f"📊 {char_count} chars | 📝 {word_count} words | 🔍 {len(layout.lines)} lines"
+            if metrics:
+                stats_text += " | 📈 " + ", ".join(f"{name}: {value}" for name, value in metrics.items())
+            self.quick_stats_label.setText(f"{stats_text} | 👁️ Click 'View Output Details' for full results")
                 
         except Exception as e:
             self.ocr_status_label.setText(f"Error displaying results: {str(e)}")
@@ -3410,117 +3985,34 @@ class BiosensorApp(QMainWindow):
         self.update_task_queue_display()
         print("DEBUG: Cleared completed tasks from queue")
         
-    def get_newer_device_keywords(self) -> list:
-        """Get comprehensive list of modern device keywords for 2025"""
-        return [
-            # Samsung devices (all models)
-            'sm-', 'galaxy', 'samsung', 'note', 'tab s', 'galaxy watch', 'galaxy buds',
-            
-            # Apple devices
-            'iphone', 'ipad', 'apple watch', 'airpods', 'macbook', 'imac',
-            
-            # Google devices
-            'pixel', 'nexus', 'chromebook', 'nest', 'google tv',
-            
-            # Chinese brands (major players)
-            'xiaomi', 'redmi', 'poco', 'mi band', 'mi watch', 'mi pad',
-            'huawei', 'honor', 'mate', 'p30', 'p40', 'p50', 'p60', 'nova',
-            'oneplus', 'nord', 'oppo', 'find', 'reno', 'a series',
-            'vivo', 'iqoo', 'x series', 'y series', 'v series',
-            'realme', 'gt series', 'narzo',
-            
-            # Other major brands
-            'sony', 'xperia', 'lg', 'wing', 'velvet',
-            'motorola', 'moto', 'edge', 'razr',
-            'nokia', 'htc', 'asus', 'rog phone', 'zenfone',
-            'lenovo', 'legion phone', 'blackberry',
-            
-            # Wearables and IoT
-            'fitbit', 'garmin', 'amazfit', 'zepp', 'huami',
-            'apple watch', 'galaxy watch', 'wear os', 'tizen',
-            
-            # Tablets and 2-in-1s
-            'surface', 'ipad', 'tab', 'tablet', 'kindle', 'fire tablet',
-            
-            # Gaming devices
-            'steam deck', 'nintendo switch', 'rog ally', 'legion go',
-            
-            # Emulators and dev tools
-            'scrcpy', 'android', 'adb', 'usb debugging', 'emulator',
-            'bluestacks', 'nox', 'memu', 'ldplayer', 'gameloop', 'smartgaga',
-            'android studio', 'vysor', 'mirroring',
-            
-            # Generic terms
-            'phone', 'mobile', 'device', 'smart', 'wearable'
-        ]
-    
     def discover_newer_devices(self) -> dict:
         """Discover and categorize all newer devices connected to the system - Cross-platform implementation"""
-        device_info = {
-            'mobile_phones': [],
-            'tablets': [],
-            'wearables': [],
-            'emulators': [],
-            'dev_tools': [],
-            'unknown_devices': []
-        }
+        device_info = {category: [] for category in self.device_classifier.category_names}
         
         try:
             if not WINDOW_MANAGER_AVAILABLE:
                 print("ERROR: Window manager not available for device discovery")
                 return device_info
             
-            all_windows = gw.getAllWindows()
-            device_keywords = self.get_newer_device_keywords()
+            # Geometry comes from the registry snapshot - no per-window queries
+            window_infos = self.window_registry.snapshots()
             
-            for window in all_windows:
-                if not window.title or not window.title.strip():
+            for info in window_infos:
+                if not info.title.strip():
                     continue
-                    
-                title_lower = window.title.lower()
                 
-                # Check if it matches any device keyword
-                matched_keywords = [kw for kw in device_keywords if kw in title_lower]
+                # Matched device keywords and category in one pass (memoized per title)
+                classification = self.device_classifier.classify(info.title)
                 
-                if matched_keywords:
-                    # Cross-platform attribute handling
-                    try:
-                        width = getattr(window, 'width', getattr(window, 'size', [0, 0])[0] if hasattr(window, 'size') else 0)
-                        height = getattr(window, 'height', getattr(window, 'size', [0, 0])[1] if hasattr(window, 'size') else 0)
-                        left = getattr(window, 'left', getattr(window, 'topleft', [0, 0])[0] if hasattr(window, 'topleft') else 0)
-                        top = getattr(window, 'top', getattr(window, 'topleft', [0, 0])[1] if hasattr(window, 'topleft') else 0)
-                        visible = getattr(window, 'visible', getattr(window, 'isVisible', True))
-                        
-                        device_entry = {
-                            'title': window.title,
-                            'size': f"{width}x{height}",
-                            'position': f"({left}, {top})",
-                            'visible': visible,
-                            'matched_keywords': matched_keywords
-                        }
-                    except Exception as attr_error:
-                        print(f"DEBUG: Error getting window attributes: {attr_error}")
-                        device_entry = {
-                            'title': window.title,
-                            'size': "Unknown",
-                            'position': "Unknown",
-                            'visible': True,
-                            'matched_keywords': matched_keywords
-                        }
-                    
-                    # Categorize device
-                    if any(kw in title_lower for kw in ['phone', 'sm-', 'iphone', 'pixel', 'oneplus', 'xiaomi', 'huawei', 'oppo', 'vivo']):
-                        device_info['mobile_phones'].append(device_entry)
-                    elif any(kw in title_lower for kw in ['tablet', 'ipad', 'tab', 'surface']):
-                        device_info['tablets'].append(device_entry)
-                    elif any(kw in title_lower for kw in ['watch', 'band', 'fitbit', 'garmin', 'amazfit']):
-                        device_info['wearables'].append(device_entry)
-                    elif any(kw in title_lower for kw in ['emulator', 'bluestacks', 'nox', 'memu', 'ldplayer']):
-                        device_info['emulators'].append(device_entry)
-                    elif any(kw in title_lower for kw in ['scrcpy', 'adb', 'vysor', 'android studio']):
-                        device_info['dev_tools'].append(device_entry)
-                    else:
-                        device_info['unknown_devices'].append(device_entry)
+                if classification.is_device:
+                    device_entry = {
+                        'title': info.title,
+                        'size': f"{info.width}x{info.height}",
+                        'position': f"({info.left}, {info.top})",
+                        'visible': info.visible,
+                        'matched_keywords': list(classification.keywords)
+                    }
+                    device_info[classification.category].append(device_entry)
                         
         except Exception as e:
             print(f"DEBUG: Error in device discovery: {e} (Platform: {PLATFORM})")
@@ -3534,8 +4026,8 @@ class BiosensorApp(QMainWindow):
                 self.update_status("❌ Window manager not available. Install PyWinCtl: pip install PyWinCtl", "red")
                 return
             
-            # Get ALL windows immediately
-            all_windows = gw.getAllWindows()
+            # Get ALL windows immediately (from the shared registry cache)
+            all_windows = self.window_registry.windows()
             device_list = []
             
             # Platform-specific system window exclusions
@@ -3572,10 +4064,11 @@ class BiosensorApp(QMainWindow):
                 self.update_status("❌ Window manager not available. Install PyWinCtl: pip install PyWinCtl", "red")
                 return []
             
-            all_windows = gw.getAllWindows()
+            # Cached enumeration; sizes come from the snapshot instead of per-window queries
+            window_infos = self.window_registry.snapshots()
             visible_windows = []
             
-            print(f"DEBUG: Processing {len(all_windows)} total windows on {PLATFORM}...")
+            print(f"DEBUG: Processing {len(window_infos)} total windows on {PLATFORM}...")
             
             # Platform-specific system window exclusions
             excluded_titles = ['Program Manager', 'Desktop Window Manager']  # Windows
@@ -3585,33 +4078,19 @@ class BiosensorApp(QMainWindow):
             elif PLATFORM == 'darwin':  # macOS
                 excluded_titles.extend(['Dock', 'Menu Bar', 'Spotlight', 'SystemUIServer'])
             
-            for window in all_windows:
-                try:
-                    # Only skip completely empty titles
-                    if not window.title or not window.title.strip():
-                        continue
-                    
-                    # Skip platform-specific system windows
-                    if window.title in excluded_titles:
-                        continue
-                    
-                    # Cross-platform dimension checking
-                    try:
-                        width = getattr(window, 'width', getattr(window, 'size', [0, 0])[0] if hasattr(window, 'size') else 0)
-                        height = getattr(window, 'height', getattr(window, 'size', [0, 0])[1] if hasattr(window, 'size') else 0)
-                        
-                        # Add windows with reasonable dimensions
-                        if width > 0 and height > 0:
-                            visible_windows.append(window)
-                            print(f"DEBUG: Added window: {window.title} ({width}x{height})")
-                    except:
-                        # If we can't get dimensions, include it anyway
-                        visible_windows.append(window)
-                        print(f"DEBUG: Added window (no dims): {window.title}")
-                            
-                except Exception as window_error:
-                    print(f"DEBUG: Error processing window: {window_error}")
+            for info in window_infos:
+                # Only skip completely empty titles
+                if not info.title.strip():
+                    continue
+                
+                # Skip platform-specific system windows
+                if info.title in excluded_titles:
                     continue
+                
+                # Add windows with reasonable dimensions
+                if info.width > 0 and info.height > 0:
+                    visible_windows.append(info.window)
+                    print(f"DEBUG: Added window: {info.title} ({info.width}x{info.height})")
             
             # Sort windows by title
             visible_windows.sort(key=lambda w: w.title.lower())
@@ -3767,8 +4246,12 @@ class BiosensorApp(QMainWindow):
             self.update_status(f"⚠️ Could not activate window: {str(e)} (Platform: {PLATFORM})", "orange")
             return True  # Still try to capture
     
-    def take_screenshot_background(self, window) -> Optional[str]:
-        """Take screenshot without activating window (background capture)"""
+    def take_screenshot_background(self, window, in_memory: bool = False) -> Optional[Union[str, CapturedFrame]]:
+        """Take screenshot without activating window (background capture)
+        
+        With ``in_memory`` the grabbed image is returned as a CapturedFrame
+        instead of being written to disk; the caller decides whether to persist it.
+        """
         try:
             # Generate unique filename with appropriate directory
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -3790,14 +4273,8 @@ class BiosensorApp(QMainWindow):
             
             # Refresh window information to get current position
             try:
-                # Get fresh window list and find our target window
-                all_windows = pywinctl.getAllWindows() if WINDOW_MANAGER_AVAILABLE else gw.getAllWindows()
-                target_window = None
-                
-                for w in all_windows:
-                    if hasattr(w, 'title') and hasattr(window, 'title') and w.title == window.title:
-                        target_window = w
-                        break
+                # Current object for our target window from the registry cache (by handle, then title)
+                target_window = self.window_registry.lookup(window)
                 
                 if target_window:
                     window = target_window  # Use refreshed window object
@@ -3827,6 +4304,11 @@ class BiosensorApp(QMainWindow):
                 print(f"DEBUG: Window dimensions too small: {width}x{height}")
                 return None
             
+            # ROI profile for this window (crop to the configured regions before OCR)
+            roi_profile = self.roi_profiles.match(window.title) if ROI_CROPPING_ENABLED else None
+            if roi_profile:
+                print(f"DEBUG: Using ROI profile '{roi_profile.name}' ({len(roi_profile.regions)} regions)")
+            
             # Method 1: Windows - Use PrintWindow API for true background capture
             if PLATFORM == 'windows':
                 try:
@@ -3891,7 +4373,7 @@ class BiosensorApp(QMainWindow):
                                 is_blank = all(channel == (0, 0) for channel in extrema)
                                 
                                 if not is_blank:
-                                    img.save(filepath)
+                                    capture = self.store_background_capture(img, filepath, in_memory, window.title, roi_profile=roi_profile)
                                     
                                     # Cleanup
                                     win32gui.DeleteObject(saveBitMap.GetHandle())
@@ -3899,8 +4381,7 @@ class BiosensorApp(QMainWindow):
                                     mfcDC.DeleteDC()
                                     win32gui.ReleaseDC(hwnd, hwndDC)
                                     
-                                    self.update_status(f"✅ Background screenshot saved: {filename}", "green")
-                                    return filepath
+                                    return capture
                                 else:
                                     print("PrintWindow returned blank image, trying fallback...")
                             
@@ -3937,7 +4418,7 @@ class BiosensorApp(QMainWindow):
                                     is_blank = all(channel == (0, 0) for channel in extrema)
                                     
                                     if not is_blank:
-                                        img.save(filepath)
+                                        capture = self.store_background_capture(img, filepath, in_memory, window.title, roi_profile=roi_profile)
                                         
                                         # Cleanup
                                         win32gui.DeleteObject(saveBitMap.GetHandle())
@@ -3945,8 +4426,7 @@ class BiosensorApp(QMainWindow):
                                         mfcDC.DeleteDC()
                                         win32gui.ReleaseDC(hwnd, hwndDC)
                                         
-                                        self.update_status(f"✅ Background screenshot saved: {filename}", "green")
-                                        return filepath
+                                        return capture
                                 
                                 # Final cleanup
                                 win32gui.DeleteObject(saveBitMap.GetHandle())
@@ -3957,48 +4437,56 @@ class BiosensorApp(QMainWindow):
                 except Exception as e:
                     print(f"Windows PrintWindow failed: {e}")
             
-            # Method 2: Cross-platform MSS with window coordinates
+            # Method 1 (Linux, opt-in): MIT-SHM grab into the window's persistent segment
+            if self.shm_capture is not None:
+                try:
+                    xid = x11_window_id(window)
+                    if xid is not None:
+                        pixels = self.shm_capture.grab(xid)  # View of the segment, no copy
+                        if pixels[:, :, :3].any():
+                            return self.store_background_capture(pixels, filepath, in_memory, window.title,
+                                                                 "SHM", roi_profile)
+                        print("SHM capture returned a black image, trying fallback...")
+                except Exception as e:
+                    print(f"SHM capture failed: {e}")
+            
+            # Method 2: Cross-platform MSS with window coordinates (persistent session)
             try:
-                with mss.mss() as sct:
-                    monitor = {
-                        "top": top,
-                        "left": left,
-                        "width": width,
-                        "height": height
-                    }
-                    
-                    # Grab the screenshot
-                    sct_img = sct.grab(monitor)
-                    
-                    # Convert to PIL Image
-                    img = Image.frombytes("RGB", sct_img.size, sct_img.bgra, "raw", "BGRX")
-                    
-                    # Check if image is not just black
-                    if img.getextrema() != ((0, 0), (0, 0), (0, 0)):
-                        img.save(filepath)
-                        self.update_status(f"✅ Background screenshot saved (MSS): {filename}", "green")
-                        return filepath
-                    else:
-                        print("MSS captured black image, trying fallback...")
+                # With an ROI profile only the bounding box of its regions is grabbed
+                if roi_profile:
+                    img = self.capture_session.grab_image(*roi_profile.grab_rect(left, top, width, height))
+                    grabbed = roi_profile.bounds()
+                else:
+                    img = self.capture_session.grab_image(left, top, width, height)
+                    grabbed = None
+                
+                # Check if image is not just black
+                if img.getextrema() != ((0, 0), (0, 0), (0, 0)):
+                    return self.store_background_capture(img, filepath, in_memory, window.title, "MSS",
+                                                         roi_profile, grabbed)
+                else:
+                    print("MSS captured black image, trying fallback...")
                     
             except Exception as e:
                 print(f"MSS failed: {e}")
             
-            # Method 3: Linux-specific screenshot methods
-            if PLATFORM == 'linux':
+            # Method 3: Linux - read the window's pixels by XID (XGetImage, no subprocess)
+            if self.x11_capture is not None:
                 try:
-                    import subprocess
-                    scrot_cmd = [
-                        "scrot", 
-                        "-a", f"{left},{top},{width},{height}",
-                        filepath
-                    ]
-                    result = subprocess.run(scrot_cmd, capture_output=True, text=True)
-                    if result.returncode == 0 and os.path.exists(filepath):
-                        self.update_status(f"✅ Background screenshot saved (scrot): {filename}", "green")
-                        return filepath
+                    xid = x11_window_id(window)  # Native handle cached by the window registry
+                    if xid is not None:
+                        if roi_profile:
+                            img = self.x11_capture.grab_window_image(xid, roi_profile.grab_rect(0, 0, width, height))
+                            grabbed = roi_profile.bounds()
+                        else:
+                            img = self.x11_capture.grab_window_image(xid)
+                            grabbed = None
+                        if img.getextrema() != ((0, 0), (0, 0), (0, 0)):
+                            return self.store_background_capture(img, filepath, in_memory, window.title, "X11",
+                                                                 roi_profile, grabbed)
+                        print("X11 capture returned a black image, trying fallback...")
                 except Exception as e:
-                    print(f"scrot failed: {e}")
+                    print(f"X11 capture failed: {e}")
             
             # Method 4: Fallback to pyautogui (may require activation)
             try:
@@ -4007,9 +4495,8 @@ class BiosensorApp(QMainWindow):
                 # Check if screenshot is not just black
                 extrema = screenshot.getextrema()
                 if extrema != ((0, 0), (0, 0), (0, 0)):
-                    screenshot.save(filepath)
-                    self.update_status(f"✅ Background screenshot saved (PyAutoGUI): {filename}", "green")
-                    return filepath
+                    return self.store_background_capture(screenshot, filepath, in_memory, window.title, "PyAutoGUI",
+                                                         roi_profile)
                 else:
                     self.update_status("⚠️ Captured image appears to be black/empty", "orange")
                     # Save anyway for debugging
@@ -4026,6 +4513,31 @@ class BiosensorApp(QMainWindow):
             self.update_status(f"❌ Background screenshot failed: {str(e)} (Platform: {PLATFORM})", "red")
             return None
     
+    def store_background_capture(self, img, filepath: str, in_memory: bool, window_title: str = "",
+                                 method: str = None, roi_profile: Optional[ROIProfile] = None,
+                                 grabbed=None) -> Union[str, CapturedFrame]:
+        """Save a background capture to disk, or hand it over as an in-memory frame
+        
+        Args:
+            img: PIL image, or BGRX NumPy array (SHM capture) - kept as the frame's pixels
+            roi_profile: Crop the image to this profile's regions first
+            grabbed: Part of the window (percent) the image covers, if not all of it
+        """
+        if roi_profile:
+            img = roi_profile.crop(img, grabbed)
+        method_label = f" ({method})" if method else ""
+        frame = CapturedFrame(None, filepath, window_title, pixels=img) if hasattr(img, 'shape') else None
+        if in_memory:
+            self.update_status(f"✅ Background frame captured in memory{method_label}: {window_title}", "green")
+            return frame or CapturedFrame(img, filepath, window_title)
+        
+        if frame is not None:
+            persist_frame(frame)
+        else:
+            img.save(filepath)
+        self.update_status(f"✅ Background screenshot saved{method_label}: {os.path.basename(filepath)}", "green")
+        return filepath
+    
     def take_screenshot(self, window) -> Optional[str]:
         """Take screenshot with automatic window activation"""
         try:
@@ -4034,34 +4546,16 @@ class BiosensorApp(QMainWindow):
             self.activate_window(window)
             
             # Step 2: Refresh window position (in case it moved) - Cross-platform
-            if WINDOW_MANAGER_AVAILABLE:
-                try:
-                    # Use PyWinCtl for cross-platform window refresh
-                    all_windows = pywinctl.getAllWindows()
-                    for w in all_windows:
-                        if hasattr(w, 'title') and w.title == window.title:
-                            # Check if window has valid dimensions
-                            width = getattr(w, 'width', getattr(w, 'size', [0, 0])[0] if hasattr(w, 'size') else 0)
-                            height = getattr(w, 'height', getattr(w, 'size', [0, 0])[1] if hasattr(w, 'size') else 0)
-                            visible = getattr(w, 'visible', getattr(w, 'isVisible', True))
-                            
-                            if visible and width > 0 and height > 0:
-                                window = w  # Use updated window object
-                                break
-                except Exception as e:
-                    print(f"Window refresh failed: {e}")
-                    pass  # Use original window if refresh fails
-            else:
-                # Fallback for systems without PyWinCtl
-                try:
-                    if hasattr(gw, 'getWindowsWithTitle'):
-                        window_list = gw.getWindowsWithTitle(window.title)
-                        for w in window_list:
-                            if w.visible and w.width > 0 and w.height > 0:
-                                window = w  # Use updated window object
-                                break
-                except:
-                    pass  # Use original window if refresh fails
+            try:
+                # Current object from the registry cache; its geometry is read live below
+                current = self.window_registry.lookup(window)
+                if current is not None:
+                    info = snapshot(current)
+                    if info.visible and info.width > 0 and info.height > 0:
+                        window = current  # Use updated window object
+            except Exception as e:
+                print(f"Window refresh failed: {e}")
+                pass  # Use original window if refresh fails
             
             # Step 3: Validate window region - Cross-platform attribute handling
             try:
@@ -4124,49 +4618,35 @@ class BiosensorApp(QMainWindow):
                 except Exception as e:
                     print(f"DXcam failed: {e}")
             
-            # Method 2: MSS (ultra-fast cross-platform)
+            # Method 2: MSS (ultra-fast cross-platform, persistent session)
             try:
-                with mss.mss() as sct:
-                    monitor = {
-                        "top": top,
-                        "left": left,
-                        "width": width,
-                        "height": height
-                    }
-                    
-                    # Grab the screenshot
-                    sct_img = sct.grab(monitor)
-                    
-                    # Convert to PIL Image
-                    img = Image.frombytes("RGB", sct_img.size, sct_img.bgra, "raw", "BGRX")
-                    
-                    # Check if image is not just black
-                    if img.getextrema() != ((0, 0), (0, 0), (0, 0)):
-                        img.save(filepath)
-                        self.update_status(f"✅ Screenshot saved (MSS): {filename}", "green")
-                        return filepath
-                    else:
-                        print("MSS captured black image, trying fallback...")
+                img = self.capture_session.grab_image(left, top, width, height)
+                
+                # Check if image is not just black
+                if img.getextrema() != ((0, 0), (0, 0), (0, 0)):
+                    img.save(filepath)
+                    self.update_status(f"✅ Screenshot saved (MSS): {filename}", "green")
+                    return filepath
+                else:
+                    print("MSS captured black image, trying fallback...")
                     
             except Exception as e:
                 print(f"MSS failed: {e}")
             
-            # Method 3: Linux-specific screenshot methods
-            if PLATFORM == "Linux":
+            # Method 3: Linux - read the window's pixels by XID (XGetImage, no subprocess)
+            if self.x11_capture is not None:
                 try:
-                    # Try using scrot for Linux
-                    import subprocess
-                    scrot_cmd = [
-                        "scrot", 
-                        "-a", f"{left},{top},{width},{height}",
-                        filepath
-                    ]
-                    result = subprocess.run(scrot_cmd, capture_output=True, text=True)
-                    if result.returncode == 0 and os.path.exists(filepath):
-                        self.update_status(f"✅ Screenshot saved (scrot): {filename}", "green")
+                    xid = x11_window_id(window)
+                    if xid is not None:
+                        img = self.x11_capture.grab_window_image(xid)
+                    else:
+                        img = self.x11_capture.grab_screen_image(left, top, width, height)
+                    if img.getextrema() != ((0, 0), (0, 0), (0, 0)):
+                        img.save(filepath)
+                        self.update_status(f"✅ Screenshot saved (X11): {filename}", "green")
                         return filepath
                 except Exception as e:
-                    print(f"scrot failed: {e}")
+                    print(f"X11 capture failed: {e}")
             
             # Method 4: Fallback to pyautogui with window activation (cross-platform)
             try:
@@ -4197,8 +4677,20 @@ class BiosensorApp(QMainWindow):
             self.update_status(f"❌ Screenshot failed: {str(e)} (Platform: {PLATFORM})", "red")
             return None
     
-    def process_with_ocr(self, image_path: str):
-        """Process image with Azure OCR API"""
+    def process_with_ocr(self, image_path: Optional[str], window_title: str = "Unknown", frame_signature=None,
+                         reuse: Optional[Dict[str, Any]] = None, frame: Optional[CapturedFrame] = None):
+        """Queue an image on the OCR pipeline
+        
+        Everything the result handler needs (image path, window, capture mode,
+        change-detection signature) travels with the job, so a slow response
+        can never pick up the state of a newer capture.
+        
+        Args:
+            reuse: Previous OCR payload for a frame change detection found
+                unchanged; it is committed in order without calling the API
+            frame: In-memory capture to upload instead of reading ``image_path``
+                (which is None when the frame is not persisted)
+        """
         if not self.azure_api_key:
             self.update_status("❌ Azure API key not configured", "red")
             self.ocr_status_label.setText("⚠️ Please configure your Azure Computer Vision API key and endpoint in your .env file.")
@@ -4214,34 +4706,98 @@ class BiosensorApp(QMainWindow):
             """)
             return
         
-        # Store current image path for potential deletion after CSV export
-        self.current_image_path = image_path
-        
-        self.update_status("🔄 Processing with OCR...", "blue")
-        self.progress_bar.setVisible(True)
-        self.progress_bar.setRange(0, 0)  # Indeterminate progress
+        context = {
+            'mode': 'auto' if self.auto_checkbox.isChecked() else 'single',
+            'frame_signature': frame_signature,
+            'reuse': reuse,
+            'frame': frame
+        }
+        job = self.ocr_pipeline.submit(image_path, window_title, context,
+                                       captured_at=frame.captured_at if frame is not None else None)
+        if job is None:
+            stats = self.ocr_pipeline.get_stats()
+            self.update_status(f"⏳ OCR backlog full ({stats['outstanding']} pending) - capture skipped", "orange")
+            return
         
-        # Start OCR worker thread
-        self.ocr_worker = OCRWorker(image_path, self.azure_api_key, self.azure_endpoint)
-        self.ocr_worker.finished.connect(self.on_ocr_finished)
-        self.ocr_worker.error.connect(self.on_ocr_error)
-        self.ocr_worker.start()
+        if reuse is None:
+            self.update_status(f"🔄 Processing with OCR... (capture #{job.capture_id})", "blue")
+            self.progress_bar.setVisible(True)
+            self.progress_bar.setRange(0, 0)  # Indeterminate progress
+    
+    def run_ocr_job(self, job: OCRJob) -> Dict[str, Any]:
+        """OCR one pipeline job (runs on a pipeline thread)"""
+        if job.context.get('reuse') is not None:
+            return job.context['reuse']['result']
+        frame = job.context.get('frame')
+        if frame is not None:
+            # Encode the in-memory frame once and upload it without touching the disk
+            if self.image_preprocessor is not None:
+                image_data, report = self.image_preprocessor.process(frame.to_image())
+                job.context['preprocess'] = report
+            else:
+                image_data = frame.encode_png()
+            return recognize_image_bytes(image_data, self.azure_api_key, self.azure_endpoint, self.ocr_cache)
+        if self.image_preprocessor is not None:
+            image_data, report = self.image_preprocessor.process_file(job.image_path)
+            job.context['preprocess'] = report
+            return recognize_image_bytes(image_data, self.azure_api_key, self.azure_endpoint, self.ocr_cache)
+        return run_ocr_request(job.image_path, self.azure_api_key, self.azure_endpoint, self.ocr_cache)
+    
+    def on_ocr_job_committed(self, job: OCRJob):
+        """Dispatch a committed pipeline job (GUI thread, capture order)"""
+        if not self.ocr_pipeline.busy:
+            self.progress_bar.setVisible(False)
+        
+        # Release the in-memory frame; the frame writer holds its own reference if persisting
+        job.context.pop('frame', None)
+        
+        if job.context.get('preprocess'):
+            print(f"DEBUG: Capture #{job.capture_id} upload: "
+                  f"{format_preprocess_report(job.context['preprocess'], job.latency)}")
+        
+        mode = job.context.get('mode')
+        if mode == 'manual':
+            if job.ok:
+                self.on_ocr_finished_safe(job.result, job.context.get('task_name'))
+            else:
+                self.on_ocr_error_safe(job.error, job.context.get('task_name'))
+        elif job.context.get('reuse') is not None:
+            self.reuse_unchanged_result(job)
+        elif job.ok:
+            self.on_ocr_finished(job.result, job)
+        else:
+            self.on_ocr_error(job.error)
     
-    def on_ocr_finished(self, result: Dict[Any, Any]):
+    def on_ocr_finished(self, result: Dict[Any, Any], job: OCRJob):
         """Handle successful OCR result"""
-        self.progress_bar.setVisible(False)
-        self.update_status("✅ OCR processing completed", "green")
+        self.update_status(f"✅ OCR processing completed (capture #{job.capture_id}, {job.latency:.1f}s)", "green")
         
         # Extract raw text from OCR result
         raw_text = self.extract_raw_text(result)
         
-        # Store last result for manual export
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        # Typed metrics from the device's rule set
+        try:
+            metrics = self.metric_extractor.extract(raw_text, window_title=job.window_title or '',
+                                                    layout=get_layout(result))
+        except Exception as e:
+            print(f"DEBUG: Metric extraction failed: {e}")
+            metrics = {}
+        
+        # Make this frame the change-detection reference for its window
+        if job.context.get('frame_signature') is not None:
+            self.frame_change_detector.commit(
+                job.window_title, job.context['frame_signature'],
+                {'result': result, 'raw_text': raw_text, 'metrics': metrics}
+            )
+        
+        # Store last result for manual export (stamped with the capture time, not the OCR commit time)
+        timestamp = datetime.fromtimestamp(job.captured_at).strftime('%Y-%m-%d %H:%M:%S')
         self.last_ocr_result = {
             'result': result,
             'raw_text': raw_text,
+            'metrics': metrics,
             'timestamp': timestamp,
-            'image_path': getattr(self, 'current_image_path', None)
+            'image_path': job.image_path
         }
         
         # Enable export buttons
@@ -4250,16 +4806,45 @@ class BiosensorApp(QMainWindow):
         self.view_details_btn.setEnabled(True)
         
         # Display results using new minimal preview approach
-        self.display_ocr_results(raw_text, result)
+        self.display_ocr_results(raw_text, result, metrics)
         
-        # Save to CSV based on capture mode
-        image_path = getattr(self, 'current_image_path', None)
-        if self.auto_checkbox.isChecked():
+        # Save to CSV based on the capture mode at capture time
+        if job.context.get('mode') == 'auto':
             # Auto-capture mode: save to auto_data.csv and JSON
-            self.save_auto_data(raw_text, timestamp, image_path)
+            self.save_auto_data(raw_text, timestamp, job.image_path, window_title=job.window_title, metrics=metrics,
+                                timestamp_ms=int(job.captured_at * 1000))
         else:
             # Manual capture mode: save to single_screenshot_time.csv
-            self.save_manual_capture(raw_text, timestamp, image_path)
+            self.save_manual_capture(raw_text, timestamp, job.image_path, window_title=job.window_title)
+    
+    def reuse_unchanged_result(self, job: OCRJob):
+        """Record an auto-capture whose screen matches the last OCR'd frame without calling the API"""
+        try:
+            previous = job.context['reuse']
+            distance = previous.get('distance', 0.0)
+            image_path = job.image_path
+            raw_text = previous['raw_text']
+            metrics = previous.get('metrics', {})
+            timestamp = datetime.fromtimestamp(job.captured_at).strftime('%Y-%m-%d %H:%M:%S')
+            
+            self.last_ocr_result = {
+                'result': previous['result'],
+                'raw_text': raw_text,
+                'metrics': metrics,
+                'timestamp': timestamp,
+                'image_path': image_path,
+                'unchanged': True
+            }
+            
+            self.display_ocr_results(raw_text, previous['result'], metrics)
+            self.update_status(f"♻️ Screen unchanged (difference {distance:.2f}) - reused previous OCR result", "blue")
+            
+            # Cheap record: CSV row only, no per-capture JSON dump
+            self.save_auto_data(raw_text, timestamp, image_path, unchanged=True, window_title=job.window_title,
+                                metrics=metrics, timestamp_ms=int(job.captured_at * 1000))
+            
+        except Exception as e:
+            self.update_status(f"❌ Failed to reuse OCR result: {str(e)}", "red")
     
     def extract_raw_text(self, ocr_result: Dict[Any, Any]) -> str:
         """Extract raw text from OCR result"""
@@ -4267,30 +4852,9 @@ class BiosensorApp(QMainWindow):
             raw_text_lines = []
             
             # Handle different Azure Computer Vision API response formats
-            if 'analyzeResult' in ocr_result:
-                # Document Intelligence / Read API v3.2+ format
-                analyze_result = ocr_result['analyzeResult']
-                if 'readResults' in analyze_result:
-                    for page in analyze_result['readResults']:
-                        for line in page.get('lines', []):
-                            raw_text_lines.append(line.get('text', ''))
-                elif 'pages' in analyze_result:
-                    for page in analyze_result['pages']:
-                        for line in page.get('lines', []):
-                            raw_text_lines.append(line.get('text', ''))
-            elif 'readResult' in ocr_result:
-                # Read API v3.0/3.1 format
-                for page in ocr_result['readResult']['pages']:
-                    for line in page.get('lines', []):
-                        raw_text_lines.append(line.get('text', ''))
-            elif 'regions' in ocr_result:
-                # OCR API v3.2 format (this is what we're actually using)
-                for region in ocr_result['regions']:
-                    for line in region.get('lines', []):
-                        # Extract text from words in each line
-                        line_text = ' '.join([word.get('text', '') for word in line.get('words', [])])
-                        if line_text.strip():
-                            raw_text_lines.append(line_text)
+            if 'analyzeResult' in ocr_result or 'readResult' in ocr_result or 'regions' in ocr_result:
+                # Read API and OCR API v3.2 formats: parsed once into the shared layout
+                raw_text_lines = get_layout(ocr_result).text_lines
             else:
                 # Fallback: recursively search for any 'text' fields
                 def find_text_recursive(obj, texts):
@@ -4318,57 +4882,77 @@ class BiosensorApp(QMainWindow):
         except Exception as e:
             return f"Error extracting text: {str(e)}"
     
-    def save_to_csv(self, raw_text: str, timestamp: str, image_path: str = None):
-        """Save only raw data to CSV file in proper format"""
+    def save_to_csv(self, raw_text: str, timestamp: str, image_path: str = None, on_done=None):
+        """Queue a raw data row for auto_data.csv on the I/O worker
+        
+        Args:
+            on_done: Optional GUI-thread callback receiving the finished IOJob
+        """
+        # Get current window info (widgets are only read on the GUI thread)
+        window = self.get_selected_window()
+        window_title = window.title if window else "Unknown"
+        self.io_worker.submit('csv_row', self._write_csv_row, raw_text, timestamp, window_title, image_path,
+                              context={'on_done': on_done} if on_done else None)
+    
+    def _write_csv_row(self, raw_text: str, timestamp: str, window_title: str, image_path: str = None):
+        """Append a raw data row to auto_data.csv and commit it (runs on the I/O worker)"""
+        csv_file_path = self.auto_csv.path
+        
+        # Prepare simplified CSV row data (only raw data)
+        csv_data = {
+            'timestamp': timestamp,
+            'window_title': window_title,
+            'raw_text': raw_text.replace('\n', ' | ') if raw_text.strip() else 'No text detected'
+        }
+        
+        # Explicit exports are committed right away, together with any buffered auto-capture rows
+        self.auto_csv.append(csv_data)
+        self.auto_csv.flush()
+        
+        self.post_status(f"📊 Raw data saved to auto_data.csv", "green")
+        
+        # Auto-delete screenshot after saving to CSV (with enhanced logging)
+        if image_path and os.path.exists(image_path):
+            try:
+                print(f"DEBUG: Attempting to delete screenshot: {image_path}")
+                os.remove(image_path)
+                print(f"DEBUG: Successfully deleted screenshot: {image_path}")
+                self.post_status(f"🗑️ Screenshot deleted: {os.path.basename(image_path)}", "gray")
+            except Exception as delete_error:
+                print(f"DEBUG: Failed to delete screenshot: {str(delete_error)}")
+                self.post_status(f"⚠️ Could not delete screenshot: {str(delete_error)}", "orange")
+        else:
+            print(f"DEBUG: Screenshot not deleted - path: {image_path}, exists: {os.path.exists(image_path) if image_path else 'N/A'}")
+        
+        return csv_file_path
+    
+    def _persist_frame(self, frame: CapturedFrame) -> int:
+        """Write an in-memory frame to disk within the USB I/O budget (runs on the I/O worker)"""
+        nbytes = len(frame.encode_png())
+        written = self.usb_stability_manager.safe_file_operation('frame_write', persist_frame, frame, nbytes=nbytes)
+        self.retention.track(frame.path, size=written, created=frame.captured_at)
+        return written
+    
+    def save_manual_capture(self, raw_text: str, timestamp: str, image_path: str = None, window_title: str = None):
+        """Queue manual capture data for separate CSV and JSON files in dedicated directory"""
         try:
-            csv_file_path = os.path.join(self.csv_dir, "auto_data.csv")
-            
-            # Get current window info
-            window = self.get_selected_window()
-            window_title = window.title if window else "Unknown"
-            
-            # Prepare simplified CSV row data (only raw data)
-            csv_data = {
-                'timestamp': timestamp,
-                'window_title': window_title,
-                'raw_text': raw_text.replace('\n', ' | ') if raw_text.strip() else 'No text detected'
-            }
-            
-            # Check if file exists to determine if we need headers
-            file_exists = os.path.exists(csv_file_path)
-            
-            # Write to CSV file
-            with open(csv_file_path, 'a', newline='', encoding='utf-8') as csvfile:
-                fieldnames = ['timestamp', 'window_title', 'raw_text']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                
-                # Write header if file is new
-                if not file_exists:
-                    writer.writeheader()
-                
-                # Write data row
-                writer.writerow(csv_data)
+            # Get window title (callers pass the window the image was captured from)
+            if window_title is None:
+                window = self.get_selected_window()
+                window_title = window.title if window else "Unknown"
             
-            self.update_status(f"📊 Raw data saved to auto_data.csv", "green")
+            full_ocr_result = self.last_ocr_result['result'] if getattr(self, 'last_ocr_result', None) else None
             
-            # Auto-delete screenshot after saving to CSV (with enhanced logging)
-            if image_path and os.path.exists(image_path):
-                try:
-                    print(f"DEBUG: Attempting to delete screenshot: {image_path}")
-                    os.remove(image_path)
-                    print(f"DEBUG: Successfully deleted screenshot: {image_path}")
-                    self.update_status(f"🗑️ Screenshot deleted: {os.path.basename(image_path)}", "gray")
-                except Exception as delete_error:
-                    print(f"DEBUG: Failed to delete screenshot: {str(delete_error)}")
-                    self.update_status(f"⚠️ Could not delete screenshot: {str(delete_error)}", "orange")
-            else:
-                print(f"DEBUG: Screenshot not deleted - path: {image_path}, exists: {os.path.exists(image_path) if image_path else 'N/A'}")
+            # File writes and screenshot cleanup happen on the I/O worker
+            self.io_worker.submit('manual_capture', self._write_manual_capture, raw_text, timestamp,
+                                  window_title, image_path, full_ocr_result, self.screenshot_cleanup_settings())
             
         except Exception as e:
-            self.update_status(f"❌ Failed to save CSV: {str(e)}", "red")
+            self.update_status(f"❌ Failed to save manual capture: {str(e)}", "red")
     
-    def save_manual_capture(self, raw_text: str, timestamp: str, image_path: str = None):
-        """Save manual capture data to separate CSV and JSON files in dedicated directory"""
+    def _write_manual_capture(self, raw_text: str, timestamp: str, window_title: str, image_path: Optional[str],
+                              full_ocr_result: Optional[Dict[str, Any]], cleanup_settings):
+        """Write manual capture CSV/JSON files and clean up old screenshots (runs on the I/O worker)"""
         try:
             # Create manual captures directory
             manual_images_dir = os.path.join(self.screenshots_dir, "manual_images")
@@ -4378,15 +4962,10 @@ class BiosensorApp(QMainWindow):
             os.makedirs(manual_csv_dir, exist_ok=True)
             os.makedirs(manual_json_dir, exist_ok=True)
             
-            # Get window title
-            window = self.get_selected_window()
-            window_title = window.title if window else "Unknown"
-            
             # Save to separate CSV file for manual captures with dynamic filename
             timestamp_safe = timestamp.replace(':', '-').replace(' ', '_')
             csv_filename = f"manual_capture_{timestamp_safe}.csv"
             csv_path = os.path.join(manual_csv_dir, csv_filename)
-            file_exists = os.path.exists(csv_path)
             
             csv_data = {
                 'timestamp': timestamp,
@@ -4401,276 +4980,234 @@ class BiosensorApp(QMainWindow):
                 writer.writerow(csv_data)
             
             # Save to JSON file in manual captures directory
-            if hasattr(self, 'last_ocr_result') and self.last_ocr_result:
+            if full_ocr_result is not None:
                 export_data = {
                     'timestamp': timestamp,
                     'window_title': window_title,
                     'raw_text': raw_text,
-                    'full_ocr_result': self.last_ocr_result['result'],
+                    'full_ocr_result': full_ocr_result,
                     'image_path': image_path
                 }
                 
-                json_timestamp_safe = timestamp.replace(':', '-').replace(' ', '_')
-                json_filename = f"manual_capture_{json_timestamp_safe}.json"
+                json_filename = f"manual_capture_{timestamp_safe}.json"
                 json_path = os.path.join(manual_json_dir, json_filename)
                 
                 with open(json_path, 'w', encoding='utf-8') as json_file:
                     json.dump(export_data, json_file, indent=2, ensure_ascii=False)
                 
-                self.update_status(f"📋 Manual capture saved: {csv_filename} and {json_filename}", "green")
+                self.post_status(f"📋 Manual capture saved: {csv_filename} and {json_filename}", "green")
             else:
-                self.update_status(f"📋 Manual capture saved: {csv_filename}", "green")
+                self.post_status(f"📋 Manual capture saved: {csv_filename}", "green")
             
-            # Clean up old screenshots (keep only last 5)
-            self.cleanup_old_screenshots()
+            # Clean up old screenshots (keep only last 5) once queued writes are done
+            self.io_worker.submit('cleanup', self.usb_stability_manager.safe_cleanup, self._cleanup_screenshots,
+                                  *cleanup_settings, priority=PRIORITY_CLEANUP)
             
             # Keep screenshot for manual captures (don't auto-delete)
             if image_path and os.path.exists(image_path):
-                self.update_status(f"📸 Screenshot preserved: {os.path.basename(image_path)}", "blue")
+                self.post_status(f"📸 Screenshot preserved: {os.path.basename(image_path)}", "blue")
             
         except Exception as e:
-            self.update_status(f"❌ Failed to save manual capture: {str(e)}", "red")
+            self.post_status(f"❌ Failed to save manual capture: {str(e)}", "red")
+    
+    def screenshot_cleanup_settings(self):
+        """Current screenshot retention settings as (mode, value) - read on the GUI thread"""
+        deletion_mode = self.deletion_mode_combo.currentData() if hasattr(self, 'deletion_mode_combo') else "count"
+        deletion_value = self.deletion_interval_spinbox.value() if hasattr(self, 'deletion_interval_spinbox') else 5
+        return deletion_mode, deletion_value
     
     def cleanup_old_screenshots(self):
-        """Clean up old screenshots based on custom time interval or count"""
+        """Queue cleanup of old screenshots based on custom time interval or count"""
+        self.io_worker.submit('cleanup', self._cleanup_screenshots, *self.screenshot_cleanup_settings(),
+                              priority=PRIORITY_CLEANUP)
+    
+    def _cleanup_screenshots(self, deletion_mode: str, deletion_value: int):
+        """Delete old screenshots by age, count or total size (runs on the I/O worker)
+        
+        The oldest entries are taken from the retention index, so a pass costs
+        one unlink per evicted file instead of a scan of both capture folders.
+        """
         try:
-            # Get all screenshot files in the auto and manual subdirectories
-            auto_images_dir = os.path.join(self.screenshots_dir, "auto_captures")
-            manual_images_dir = os.path.join(self.screenshots_dir, "manual_captures")
-            
-            screenshot_patterns = []
-            # Add patterns for auto-capture directory
-            if os.path.exists(auto_images_dir):
-                screenshot_patterns.extend([
-                    os.path.join(auto_images_dir, "*.png"),
-                    os.path.join(auto_images_dir, "*.jpg"),
-                    os.path.join(auto_images_dir, "*.jpeg"),
-                    os.path.join(auto_images_dir, "*.bmp")
-                ])
-            # Add patterns for manual capture directory
-            if os.path.exists(manual_images_dir):
-                screenshot_patterns.extend([
-                    os.path.join(manual_images_dir, "*.png"),
-                    os.path.join(manual_images_dir, "*.jpg"),
-                    os.path.join(manual_images_dir, "*.jpeg"),
-                    os.path.join(manual_images_dir, "*.bmp")
-                ])
-            
-            all_screenshots = []
-            for pattern in screenshot_patterns:
-                all_screenshots.extend(glob.glob(pattern))
-            
-            if len(all_screenshots) == 0:
-                return  # No screenshots to clean up
-            
-            # Get deletion mode and settings
-            deletion_mode = self.deletion_mode_combo.currentData() if hasattr(self, 'deletion_mode_combo') else "count"
-            deletion_value = self.deletion_interval_spinbox.value() if hasattr(self, 'deletion_interval_spinbox') else 5
-            
-            screenshots_to_delete = []
-            deleted_count = 0
-            
-            if deletion_mode == "time":
-                # Delete screenshots older than specified time interval
-                import time
-                current_time = time.time()
-                time_threshold = deletion_value * 60  # Convert minutes to seconds
-                
-                for screenshot_path in all_screenshots:
-                    try:
-                        file_modified_time = os.path.getmtime(screenshot_path)
-                        if (current_time - file_modified_time) > time_threshold:
-                            screenshots_to_delete.append(screenshot_path)
-                    except Exception as e:
-                        print(f"DEBUG: Error checking file time for {screenshot_path}: {e}")
-                
-                # Delete old screenshots
-                for screenshot_path in screenshots_to_delete:
-                    try:
-                        os.remove(screenshot_path)
-                        deleted_count += 1
-                        print(f"DEBUG: Cleaned up old screenshot (time-based): {os.path.basename(screenshot_path)}")
-                    except Exception as delete_error:
-                        print(f"DEBUG: Failed to delete old screenshot {screenshot_path}: {delete_error}")
-                
-                if deleted_count > 0:
-                    self.update_status(f"🧹 Cleaned up {deleted_count} screenshots older than {deletion_value} minutes", "blue")
-                
-            else:  # count mode
-                # Keep only the most recent N screenshots
-                if len(all_screenshots) <= deletion_value:
-                    return  # No cleanup needed
-                
-                # Sort by modification time (newest first)
-                all_screenshots.sort(key=lambda x: os.path.getmtime(x), reverse=True)
-                
-                # Keep only the first N (newest), delete the rest
-                screenshots_to_delete = all_screenshots[deletion_value:]
-                
-                for screenshot_path in screenshots_to_delete:
-                    try:
-                        os.remove(screenshot_path)
-                        deleted_count += 1
-                        print(f"DEBUG: Cleaned up old screenshot (count-based): {os.path.basename(screenshot_path)}")
-                    except Exception as delete_error:
-                        print(f"DEBUG: Failed to delete old screenshot {screenshot_path}: {delete_error}")
-                
-                if deleted_count > 0:
-                    self.update_status(f"🧹 Cleaned up {deleted_count} old screenshots (keeping last {deletion_value} files)", "blue")
+            evicted = self.retention.evict_mode(deletion_mode, deletion_value)
+            if not evicted:
+                return  # No cleanup needed
+            
+            deleted_count, failed = delete_files(evicted)
+            # Retried on a later pass, in their original place
+            self.retention.restore({path: evicted[path] for path in failed})
+            print(f"DEBUG: Cleaned up {deleted_count} old screenshot(s) ({deletion_mode}-based)")
+            
+            if deleted_count > 0:
+                if deletion_mode == "time":
+                    self.post_status(f"🧹 Cleaned up {deleted_count} screenshots older than {deletion_value} minutes", "blue")
+                elif deletion_mode == "size":
+                    self.post_status(f"🧹 Cleaned up {deleted_count} old screenshots (keeping {deletion_value} MB)", "blue")
+                else:
+                    self.post_status(f"🧹 Cleaned up {deleted_count} old screenshots (keeping last {deletion_value} files)", "blue")
                 
         except Exception as e:
             print(f"DEBUG: Screenshot cleanup error: {e}")
-            self.update_status(f"⚠️ Screenshot cleanup warning: {str(e)}", "orange")
+            self.post_status(f"⚠️ Screenshot cleanup warning: {str(e)}", "orange")
     
-    def save_auto_data(self, raw_text: str, timestamp: str, image_path: str = None):
-        """Save data to both CSV and JSON files when auto-capture is active
-        
-        Enhanced with comprehensive USB stability management:
-        - Intelligent file operation timing
-        - Reduced concurrent I/O operations
-        - Error recovery mechanisms
-        - Device-specific optimizations
+    def save_auto_data(self, raw_text: str, timestamp: str, image_path: str = None, unchanged: bool = False,
+                       window_title: str = None, metrics: Optional[Dict[str, Any]] = None,
+                       timestamp_ms: Optional[int] = None):
+        """Queue saving of auto-capture data to the configured storage backends (CSV, JSON, SQLite)
+        
+        Frames flagged ``unchanged`` by change detection only get a CSV row /
+        database row without payload; the full OCR payload is already stored
+        with the reference frame.
+        
+        Everything touching the disk - including the USB stability pacing
+        between operations - runs on the background I/O worker; this method
+        only snapshots the GUI state the write needs and enqueues it.
         """
         try:
-            # Get window title
-            window = self.get_selected_window()
-            window_title = window.title if window else "Unknown"
+            # Get window title (callers pass the window the image was captured from)
+            if window_title is None:
+                window = self.get_selected_window()
+                window_title = window.title if window else "Unknown"
             
-            # USB STABILITY: Use managed delay based on device type
-            if hasattr(self, 'usb_stability_manager'):
-                stability_delay = self.usb_stability_manager.operation_delays.get('file_write', 0.2)
-                time.sleep(stability_delay)
-            else:
-                time.sleep(0.1)
+            full_ocr_result = None
+            if not unchanged and getattr(self, 'last_ocr_result', None):
+                full_ocr_result = self.last_ocr_result['result']
             
-            # Save to CSV with proper error handling
-            csv_path = os.path.join(self.csv_dir, "auto_data.csv")
-            file_exists = os.path.exists(csv_path)
+            # Clean up old screenshots with USB stability-aware frequency
+            if not hasattr(self, '_cleanup_counter'):
+                self._cleanup_counter = 0
+            self._cleanup_counter += 1
             
-            csv_data = {
-                'timestamp': timestamp,
-                'window_title': window_title,
-                'raw_text': raw_text.replace('\n', ' | ') if raw_text.strip() else 'No text detected'
-            }
+            # Get optimal cleanup frequency from USB stability manager
+            cleanup_frequency = 10  # Default
+            if hasattr(self, 'usb_stability_manager'):
+                cleanup_frequency = self.usb_stability_manager.get_optimal_cleanup_frequency()
+            cleanup_settings = None
+            if self._cleanup_counter % cleanup_frequency == 0:
+                cleanup_settings = self.screenshot_cleanup_settings()
             
-            try:
-                with open(csv_path, 'a', newline='', encoding='utf-8') as csvfile:
-                    fieldnames = ['timestamp', 'window_title', 'raw_text']
-                    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                    if not file_exists:
-                        writer.writeheader()
-                    writer.writerow(csv_data)
-                    csvfile.flush()  # Ensure data is written immediately
-                    
-            except Exception as csv_error:
-                print(f"DEBUG: CSV write error: {csv_error}")
-                self.update_status(f"⚠️ CSV save failed: {str(csv_error)}", "orange")
-                return  # Don't continue if CSV fails
+            self.io_worker.submit(
+                'auto_data', self._write_auto_data, raw_text, timestamp, window_title, image_path,
+                full_ocr_result, cleanup_settings, getattr(self, 'enable_auto_delete_screenshots', False),
+                self._cleanup_counter, metrics, timestamp_ms
+            )
             
-            # USB STABILITY FIX 2: Delay between major file operations
-            time.sleep(0.15)
+        except Exception as e:
+            print(f"DEBUG: Critical error in save_auto_data: {e}")
+            self.update_status(f"❌ Failed to save auto data: {str(e)}", "red")
+    
+    def _write_auto_data(self, raw_text: str, timestamp: str, window_title: str, image_path: Optional[str],
+                         full_ocr_result: Optional[Dict[str, Any]], cleanup_settings, auto_delete_enabled: bool,
+                         capture_count: int, metrics: Optional[Dict[str, Any]] = None,
+                         timestamp_ms: Optional[int] = None):
+        """Write one auto-capture record and queue screenshot retention (runs on the I/O worker)
+        
+        Enhanced with comprehensive USB stability management:
+        - Writes paced by the token-bucket I/O governor, not fixed sleeps
+        - Cleanup and deletes queued behind pending writes
+        - Error recovery mechanisms
+        - Device-specific optimizations
+        """
+        try:
+            saved = []
             
-            # Save to JSON (only if CSV succeeded)
-            json_saved = False
-            if hasattr(self, 'last_ocr_result') and self.last_ocr_result:
+            # CSV row (buffered: group-committed within the USB I/O budget by the appender)
+            if 'csv' in self.storage_backends:
+                csv_data = {
+                    'timestamp': timestamp,
+                    'window_title': window_title,
+                    'raw_text': raw_text.replace('\n', ' | ') if raw_text.strip() else 'No text detected'
+                }
+                try:
+                    self.auto_csv.append(csv_data)
+                    saved.append(os.path.basename(self.auto_csv.path))
+                except Exception as csv_error:
+                    print(f"DEBUG: CSV write error: {csv_error}")
+                    self.post_status(f"⚠️ CSV save failed: {str(csv_error)}", "orange")
+            
+            # JSON record in the segment log (frames with a new OCR result only)
+            if self.json_log is not None and full_ocr_result is not None:
                 try:
                     export_data = {
                         'timestamp': timestamp,
                         'window_title': window_title,
                         'raw_text': raw_text,
-                        'full_ocr_result': self.last_ocr_result['result'],
+                        'metrics': metrics or {},
+                        'full_ocr_result': full_ocr_result,
                         'image_path': image_path
                     }
                     
-                    timestamp_safe = timestamp.replace(':', '-').replace(' ', '_')
-                    json_filename = f"auto_capture_{timestamp_safe}.json"
-                    json_path = os.path.join(self.json_dir, json_filename)
-                    
-                    with open(json_path, 'w', encoding='utf-8') as json_file:
-                        json.dump(export_data, json_file, indent=2, ensure_ascii=False)
-                        json_file.flush()  # Ensure data is written immediately
-                    
-                    json_saved = True
-                    self.update_status(f"💾 Auto-saved to CSV and JSON: {os.path.basename(csv_path)}, {json_filename}", "green")
+                    capture_id = self.json_log.append(export_data)
+                    saved.append(f"JSON log #{capture_id}")
                     
                 except Exception as json_error:
                     print(f"DEBUG: JSON write error: {json_error}")
-                    self.update_status(f"💾 CSV saved successfully, JSON failed: {str(json_error)}", "orange")
-            
-            if not json_saved:
-                self.update_status(f"💾 Auto-saved to CSV: {os.path.basename(csv_path)}", "green")
-            
-            # USB STABILITY: Use managed delay before cleanup operations
-            if hasattr(self, 'usb_stability_manager'):
-                cleanup_delay = self.usb_stability_manager.operation_delays.get('cleanup', 0.5)
-                time.sleep(cleanup_delay)
-            else:
-                time.sleep(0.2)
-            
-            # Clean up old screenshots with USB stability-aware frequency
-            if not hasattr(self, '_cleanup_counter'):
-                self._cleanup_counter = 0
-            self._cleanup_counter += 1
+                    self.post_status(f"⚠️ JSON save failed: {str(json_error)}", "orange")
             
-            # Get optimal cleanup frequency from USB stability manager
-            cleanup_frequency = 10  # Default
-            if hasattr(self, 'usb_stability_manager'):
-                cleanup_frequency = self.usb_stability_manager.get_optimal_cleanup_frequency()
-            
-            if self._cleanup_counter % cleanup_frequency == 0:
+            # SQLite capture database (indexed, compressed OCR payload)
+            if self.capture_store is not None:
                 try:
-                    if hasattr(self, 'usb_stability_manager'):
-                        self.usb_stability_manager.safe_cleanup(self.cleanup_old_screenshots)
-                    else:
-                        self.cleanup_old_screenshots()
-                except Exception as cleanup_error:
-                    print(f"DEBUG: Screenshot cleanup error: {cleanup_error}")
-                    # Don't fail the operation if cleanup fails
+                    self.usb_stability_manager.safe_file_operation(
+                        'file_write', self.capture_store.add, timestamp, window_title, raw_text,
+                        image_path=image_path, image_hash=file_sha256(image_path), payload=full_ocr_result,
+                        metrics=metrics, timestamp_ms=timestamp_ms, nbytes=len(raw_text.encode('utf-8'))
+                    )
+                    saved.append(os.path.basename(self.capture_store.db_path))
+                except Exception as db_error:
+                    print(f"DEBUG: Capture database write error: {db_error}")
+                    self.post_status(f"⚠️ Database save failed: {str(db_error)}", "orange")
+            
+            if not saved:
+                return  # Keep the screenshot if the record could not be stored anywhere
+            self.post_status(f"💾 Auto-saved to {', '.join(saved)}", "green")
+            
+            # Retention work is queued behind any pending writes
+            if cleanup_settings is not None:
+                self.io_worker.submit('cleanup', self.usb_stability_manager.safe_cleanup, self._cleanup_screenshots,
+                                      *cleanup_settings, priority=PRIORITY_CLEANUP)
+            if image_path:
+                self.io_worker.submit('screenshot_delete', self._retire_auto_screenshot, image_path,
+                                      auto_delete_enabled, capture_count, priority=PRIORITY_DELETE)
             
+        except Exception as e:
+            print(f"DEBUG: Critical error in save_auto_data: {e}")
+            self.post_status(f"❌ Failed to save auto data: {str(e)}", "red")
+    
+    def _retire_auto_screenshot(self, image_path: str, auto_delete_enabled: bool, capture_count: int):
+        """Delete or keep an auto-capture screenshot (runs on the I/O worker after pending writes)"""
+        try:
             # USB STABILITY: Intelligent screenshot deletion management
-            auto_delete_enabled = getattr(self, 'enable_auto_delete_screenshots', False)
-            
-            if auto_delete_enabled and image_path and os.path.exists(image_path):
+            if auto_delete_enabled and os.path.exists(image_path):
                 # Check if we should skip deletion for USB stability
-                if hasattr(self, 'usb_stability_manager') and self.usb_stability_manager.should_skip_operation('file_delete'):
+                if self.usb_stability_manager.should_skip_operation('file_delete'):
                     print(f"DEBUG: Screenshot deletion skipped for USB stability: {image_path}")
-                    if self._cleanup_counter % 5 == 0:
-                        self.update_status(f"🔌 Screenshot deletion skipped for USB stability", "blue")
+                    if capture_count % 5 == 0:
+                        self.post_status(f"🔌 Screenshot deletion skipped for USB stability", "blue")
                 else:
                     try:
                         # Use USB stability manager for safe deletion
-                        if hasattr(self, 'usb_stability_manager'):
-                            success = self.usb_stability_manager.safe_file_delete(image_path)
-                            if success:
-                                print(f"DEBUG: Screenshot safely deleted: {image_path}")
-                                self.update_status(f"🗑️ Screenshot auto-deleted: {os.path.basename(image_path)}", "gray")
-                            else:
-                                print(f"DEBUG: Screenshot not found for deletion: {image_path}")
+                        success = self.usb_stability_manager.safe_file_delete(image_path)
+                        self.retention.forget([image_path])
+                        if success:
+                            print(f"DEBUG: Screenshot safely deleted: {image_path}")
+                            self.post_status(f"🗑️ Screenshot auto-deleted: {os.path.basename(image_path)}", "gray")
                         else:
-                            # Fallback to regular deletion with delay
-                            time.sleep(0.3)
-                            os.remove(image_path)
-                            print(f"DEBUG: Screenshot deleted successfully: {image_path}")
-                            self.update_status(f"🗑️ Screenshot auto-deleted: {os.path.basename(image_path)}", "gray")
+                            print(f"DEBUG: Screenshot not found for deletion: {image_path}")
                     except Exception as delete_error:
                         print(f"DEBUG: Failed to delete screenshot: {image_path}, Error: {delete_error}")
                         # Don't fail the entire operation if deletion fails
-                        self.update_status(f"⚠️ Screenshot deletion failed, continuing...", "orange")
-            elif image_path and os.path.exists(image_path):
+                        self.post_status(f"⚠️ Screenshot deletion failed, continuing...", "orange")
+            elif os.path.exists(image_path):
                 if not auto_delete_enabled:
                     print(f"DEBUG: Auto-deletion disabled for USB stability - preserving: {image_path}")
                     # Only show this message occasionally to avoid spam
-                    if self._cleanup_counter % 5 == 0:
-                        stability_status = ""
-                        if hasattr(self, 'usb_stability_manager'):
-                            stability_status = f" ({self.usb_stability_manager.get_status_message()})"
-                        self.update_status(f"💾 Screenshots preserved (auto-delete disabled){stability_status}", "blue")
-                else:
-                    print(f"DEBUG: Screenshot not found for deletion - path: {image_path}")
+                    if capture_count % 5 == 0:
+                        stability_status = f" ({self.usb_stability_manager.get_status_message()})"
+                        self.post_status(f"💾 Screenshots preserved (auto-delete disabled){stability_status}", "blue")
+            else:
+                print(f"DEBUG: Screenshot not found for deletion - path: {image_path}")
             
         except Exception as e:
-            print(f"DEBUG: Critical error in save_auto_data: {e}")
-            self.update_status(f"❌ Failed to save auto data: {str(e)}", "red")
+            print(f"DEBUG: Screenshot retention error: {e}")
     
     def on_ocr_error(self, error_message: str):
         """Handle OCR error"""
@@ -4749,16 +5286,50 @@ class BiosensorApp(QMainWindow):
             
             # Step 2: Take background screenshot (no activation)
             self.update_task_progress(40, "Taking background screenshot")
-            image_path = self.take_screenshot_background(window)
-            if not image_path:
+            capture = self.take_screenshot_background(window, in_memory=self.in_memory_capture)
+            if not capture:
                 self.complete_task(task_name, False)
                 return
             
+            # In-memory frames are only written to disk when retention keeps them,
+            # and then asynchronously (auto-delete would remove them right after OCR)
+            frame = None
+            if isinstance(capture, CapturedFrame):
+                frame = capture
+                image_path = None
+                if not getattr(self, 'enable_auto_delete_screenshots', False):
+                    # The writer thread needs pixels that the next SHM grab will not overwrite
+                    if self.io_worker.submit('frame_write', self._persist_frame, frame.detach()):
+                        image_path = frame.path
+            else:
+                image_path = capture
+                self.retention.track(image_path)
+            
             self.update_task_progress(60, "Background screenshot captured")
             
-            # Step 3: Process with OCR
-            self.update_task_progress(70, "Starting OCR")
-            self.process_with_ocr(image_path)
+            # Step 3: Compare with the last OCR'd frame of this window (auto-capture only)
+            signature = None
+            reuse = None
+            if self.auto_checkbox.isChecked() and self.frame_change_detector.enabled:
+                try:
+                    changed, signature, distance = self.frame_change_detector.check(
+                        window.title, frame.content if frame is not None else image_path
+                    )
+                    previous = self.frame_change_detector.last_result(window.title)
+                    if not changed and previous is not None:
+                        reuse = dict(previous, distance=distance)
+                except Exception as e:
+                    print(f"DEBUG: Change detection error: {e}")
+            
+            # Step 4: Queue for OCR; unchanged screens reuse the previous result
+            # but still pass through the pipeline to keep storage in capture order
+            if reuse is not None:
+                self.update_task_progress(70, "Screen unchanged - reusing OCR")
+                self.process_with_ocr(image_path, window.title, reuse=reuse)
+            else:
+                self.update_task_progress(70, "Starting OCR")
+                self.process_with_ocr(image_path, window.title, signature,
+                                      frame=frame.detach() if frame is not None else None)
             
             # Update performance metrics for auto capture
             self.total_captures += 1
@@ -4841,12 +5412,13 @@ class BiosensorApp(QMainWindow):
             if not image_path:
                 self.complete_task(task_name, False)
                 return
+            self.retention.track(image_path)
             
             self.update_task_progress(60, "Screenshot captured")
             
             # Step 3: Process with OCR (minimal operations)
             self.update_task_progress(70, "Starting OCR")
-            self.process_with_ocr_safe(image_path, task_name)
+            self.process_with_ocr_safe(image_path, task_name, window.title)
             
             # Update performance metrics for manual capture
             self.total_captures += 1
@@ -4872,6 +5444,23 @@ class BiosensorApp(QMainWindow):
         """Legacy method - redirects to capture_selected_window"""
         self.capture_selected_window()
     
+    def arm_auto_timer(self):
+        """Arm the single-shot auto-capture timer for the scheduler's next deadline"""
+        delay_ms = int(math.ceil(self.capture_scheduler.time_until_next() * 1000))
+        self.auto_timer.start(max(0, delay_ms))
+    
+    def on_auto_capture_timer(self):
+        """Auto-capture timer fired - run the due tick and re-arm for the next deadline"""
+        tick = self.capture_scheduler.poll()
+        if self.capture_scheduler.running:
+            self.arm_auto_timer()
+        if tick is None:
+            return
+        if tick.missed:
+            print(f"DEBUG: Auto-capture fell behind - {tick.missed} tick(s) missed "
+                  f"({self.capture_scheduler.overdue_policy})")
+        self.auto_capture()
+    
     def auto_capture(self):
         """Perform automatic capture with USB stability management - Uses background capture by default"""
         if self.auto_checkbox.isChecked():
@@ -4895,9 +5484,13 @@ class BiosensorApp(QMainWindow):
     def toggle_auto_capture(self, state):
         """Toggle auto-capture timer"""
         if state == Qt.Checked:
-            interval = self.interval_spinbox.value() * 1000  # Convert to milliseconds
+            interval = self.interval_spinbox.value()
             if interval > 0:  # Ensure valid interval
-                self.auto_timer.start(interval)
+                # Deadlines are t0 + n * interval, independent of how long each capture takes
+                self.capture_scheduler.set_interval(interval)
+                self.capture_scheduler.reset_stats()
+                self.capture_scheduler.start()
+                self.arm_auto_timer()
                 self.update_status(f"🔄 Auto-capture enabled (every {self.interval_spinbox.value()}s)", "blue")
                 self.stop_auto_btn.setEnabled(True)  # Enable stop button
             else:
@@ -4905,26 +5498,28 @@ class BiosensorApp(QMainWindow):
                 self.update_status(f"❌ Invalid interval: {self.interval_spinbox.value()}s", "red")
         else:
             self.auto_timer.stop()
+            self.capture_scheduler.stop()
             self.update_status("⏹️ Auto-capture disabled", "orange")
             self.stop_auto_btn.setEnabled(False)  # Disable stop button
     
     def stop_auto_capture(self):
         """Stop auto-capture and uncheck the checkbox"""
         self.auto_timer.stop()
+        self.capture_scheduler.stop()
         self.auto_checkbox.setChecked(False)  # This will trigger toggle_auto_capture
         self.update_status("⏹️ Auto-capture stopped by user", "orange")
     
     def update_capture_interval(self, value):
         """Update the capture interval when spinbox value changes"""
-        if self.auto_timer.isActive():
-            # If auto-capture is running, restart the timer with new interval
-            interval = value * 1000  # Convert to milliseconds
-            if interval > 0:
-                self.auto_timer.stop()
-                self.auto_timer.start(interval)
+        if self.capture_scheduler.running:
+            # If auto-capture is running, restart the schedule with the new interval
+            if value > 0:
+                self.capture_scheduler.set_interval(value)
+                self.arm_auto_timer()
                 self.update_status(f"🔄 Auto-capture interval updated to {value}s", "blue")
             else:
                 self.auto_timer.stop()
+                self.capture_scheduler.stop()
                 self.auto_checkbox.setChecked(False)
                 self.update_status(f"❌ Invalid interval: {value}s", "red")
     
@@ -4938,6 +5533,10 @@ class BiosensorApp(QMainWindow):
                 interval = self.deletion_interval_spinbox.value()
                 self.update_status(f"🔌 Screenshot auto-deletion enabled (every {interval} minutes)", "orange")
                 print(f"DEBUG: USB stability mode disabled - screenshots will be auto-deleted every {interval} minutes")
+            elif deletion_mode == "size":
+                size_mb = self.deletion_interval_spinbox.value()
+                self.update_status(f"🔌 Screenshot auto-deletion enabled (keep last {size_mb} MB)", "orange")
+                print(f"DEBUG: USB stability mode disabled - will keep the newest {size_mb} MB of screenshots")
             else:
                 count = self.deletion_interval_spinbox.value()
                 self.update_status(f"🔌 Screenshot auto-deletion enabled (keep last {count} files)", "orange")
@@ -4954,6 +5553,11 @@ class BiosensorApp(QMainWindow):
             self.deletion_interval_spinbox.setValue(60)  # Default to 60 minutes
             self.deletion_interval_spinbox.setSuffix(" minutes")
             self.deletion_interval_spinbox.setToolTip("Screenshots older than this time will be automatically deleted")
+        elif mode == "size":
+            self.deletion_interval_spinbox.setRange(1, 100000)  # 1 MB to ~100 GB
+            self.deletion_interval_spinbox.setValue(500)  # Default to keep 500 MB
+            self.deletion_interval_spinbox.setSuffix(" MB")
+            self.deletion_interval_spinbox.setToolTip("Total size of the most recent screenshots to keep")
         else:  # count mode
             self.deletion_interval_spinbox.setRange(1, 100)  # Keep 1 to 100 files
             self.deletion_interval_spinbox.setValue(5)  # Default to keep last 5 files
@@ -4989,19 +5593,21 @@ class BiosensorApp(QMainWindow):
         try:
             raw_text = self.last_ocr_result['raw_text']
             timestamp = self.last_ocr_result['timestamp']
-            image_path = self.last_ocr_result.get('image_path', None)
             
-            # Save to CSV (without auto-deleting screenshot for manual export)
-            self.save_to_csv(raw_text, timestamp, None)  # Don't delete screenshot for manual export
-            
-            # Show success message
-            csv_path = os.path.join(self.csv_dir, "auto_data.csv")
-            QMessageBox.information(self, "Export Successful", 
-                                  f"Raw data exported to CSV successfully!\n\nFile location:\n{csv_path}")
+            # Save to CSV on the I/O worker (without auto-deleting screenshot for manual export)
+            self.save_to_csv(raw_text, timestamp, None, on_done=self.on_csv_export_finished)
             
         except Exception as e:
             QMessageBox.critical(self, "Export Error", f"Failed to export to CSV:\n{str(e)}")
     
+    def on_csv_export_finished(self, job: IOJob):
+        """Report a finished manual CSV export"""
+        if job.ok:
+            QMessageBox.information(self, "Export Successful", 
+                                  f"Raw data exported to CSV successfully!\n\nFile location:\n{job.result}")
+        else:
+            QMessageBox.critical(self, "Export Error", f"Failed to export to CSV:\n{job.error}")
+    
     def export_last_result_to_json(self):
         """Export the last OCR result to JSON file"""
         if not hasattr(self, 'last_ocr_result') or not self.last_ocr_result:
@@ -5014,6 +5620,8 @@ class BiosensorApp(QMainWindow):
                 'timestamp': self.last_ocr_result['timestamp'],
                 'window_title': self.get_selected_window().title if self.get_selected_window() else "Unknown",
                 'raw_text': self.last_ocr_result['raw_text'],
+                'metrics': self.last_ocr_result.get('metrics', {}),
+                'layout': get_layout(self.last_ocr_result['result']).to_dict(),
                 'full_ocr_result': self.last_ocr_result['result'],
                 'image_path': self.last_ocr_result.get('image_path', None)
             }
@@ -5023,19 +5631,82 @@ class BiosensorApp(QMainWindow):
             json_filename = f"ocr_export_{timestamp_safe}.json"
             json_path = os.path.join(self.json_dir, json_filename)
             
-            # Write JSON file
-            with open(json_path, 'w', encoding='utf-8') as json_file:
-                json.dump(export_data, json_file, indent=2, ensure_ascii=False)
-            
-            # Show success message
-            QMessageBox.information(self, "Export Successful", 
-                                  f"OCR data exported to JSON successfully!\n\nFile location:\n{json_path}")
-            
-            self.update_status(f"📄 JSON exported: {json_filename}", "green")
+            # Write JSON file on the I/O worker
+            self.io_worker.submit('json_export', self._write_json_file, json_path, export_data,
+                                  context={'on_done': self.on_json_export_finished})
             
         except Exception as e:
             QMessageBox.critical(self, "Export Error", f"Failed to export to JSON:\n{str(e)}")
     
+    @staticmethod
+    def _write_json_file(json_path: str, export_data: Dict[str, Any]) -> str:
+        """Write an export JSON file (runs on the I/O worker)"""
+        with open(json_path, 'w', encoding='utf-8') as json_file:
+            json.dump(export_data, json_file, indent=2, ensure_ascii=False)
+        return json_path
+    
+    def on_json_export_finished(self, job: IOJob):
+        """Report a finished manual JSON export"""
+        if job.ok:
+            QMessageBox.information(self, "Export Successful", 
+                                  f"OCR data exported to JSON successfully!\n\nFile location:\n{job.result}")
+            self.update_status(f"📄 JSON exported: {os.path.basename(job.result)}", "green")
+        else:
+            QMessageBox.critical(self, "Export Error", f"Failed to export to JSON:\n{job.error}")
+    
+    def export_history_to_parquet(self):
+        """Export the whole capture history to a day/device partitioned Parquet dataset"""
+        if not PYARROW_AVAILABLE:
+            QMessageBox.warning(self, "pyarrow Missing", "Parquet export needs pyarrow.\n\nInstall it with: pip install pyarrow")
+            return
+        if self.export_worker.pending:
+            self.update_status("🗂️ History export already running...", "blue")
+            return
+        
+        self.parquet_export_btn.setEnabled(False)
+        self.update_status("🗂️ Exporting capture history to Parquet...", "blue")
+        self.export_worker.submit('parquet_export', self._write_parquet_history, PARQUET_EXPORT_DIR,
+                                  context={'on_done': self.on_parquet_export_finished})
+    
+    def _write_parquet_history(self, out_dir: str) -> Dict[str, Any]:
+        """Stream the capture history into Parquet (runs on the export worker)
+        
+        The SQLite capture store is the source when enabled, auto_data.csv otherwise.
+        """
+        if self.capture_store is not None:
+            records = self.capture_store.query()
+            source = os.path.basename(self.capture_store.db_path)
+        else:
+            self.auto_csv.flush()  # Include rows still buffered by the appender
+            if not os.path.exists(self.auto_csv.path):
+                raise FileNotFoundError(f"No capture history found ({self.auto_csv.path})")
+            records = iter_csv_history(self.auto_csv.path)
+            source = os.path.basename(self.auto_csv.path)
+        self.history_writer = HistoryParquetWriter(out_dir, batch_rows=PARQUET_BATCH_ROWS,
+                                                   metric_extractor=self.metric_extractor.numeric_metrics)
+        try:
+            stats = self.history_writer.write_all(records)
+        finally:
+            self.history_writer = None
+        stats['source'] = source
+        stats['out_dir'] = out_dir
+        return stats
+    
+    def on_parquet_export_finished(self, job: IOJob):
+        """Report a finished history export"""
+        self.parquet_export_btn.setEnabled(True)
+        if job.ok:
+            stats = job.result
+            self.update_status(f"🗂️ Exported {stats['rows']} captures to Parquet ({job.run_time:.1f}s)", "green")
+            QMessageBox.information(self, "Export Successful",
+                                  f"Capture history exported to Parquet!\n\n"
+                                  f"Source: {stats['source']}\n"
+                                  f"Rows: {stats['rows']} ({stats['skipped']} skipped)\n"
+                                  f"Partitions (day/device): {stats['partitions']}\n\n"
+                                  f"Folder:\n{stats['out_dir']}")
+        else:
+            QMessageBox.critical(self, "Export Error", f"Failed to export history to Parquet:\n{job.error}")
+    
     def clear_results(self):
         """Clear the results preview and reset UI"""
         self.ocr_status_label.setText("No OCR results yet. Capture a window to see results.")
@@ -5131,13 +5802,48 @@ class BiosensorApp(QMainWindow):
     
     def closeEvent(self, event):
         """Handle application close"""
+        if self.closing:
+            # Close requested again while the OCR pipeline drains below
+            event.ignore()
+            return
+        self.closing = True
         if self.auto_timer.isActive():
             self.auto_timer.stop()
         if self.refresh_timer.isActive():
             self.refresh_timer.stop()
-        if self.ocr_worker and self.ocr_worker.isRunning():
-            self.ocr_worker.quit()
-            self.ocr_worker.wait()
+        if self.window_watcher is not None:
+            self.window_watcher.stop()
+        history_writer = self.history_writer
+        if history_writer is not None:
+            history_writer.cancel()  # Discard a running history export instead of waiting for it
+        
+        # Committed jobs reach on_ocr_job_committed through a queued signal, so keep the
+        # event loop running until the last captures are saved, then deliver the final emits
+        self.ocr_pipeline.shutdown(wait=False)
+        if self.ocr_pipeline.busy:
+            self.update_status(f"⏳ Finishing {self.ocr_pipeline.outstanding} OCR capture(s) before closing...", "blue")
+        while self.ocr_pipeline.busy:
+            QApplication.processEvents(QEventLoop.AllEvents, 50)
+            time.sleep(0.01)
+        self.ocr_pipeline.shutdown(wait=True)
+        QApplication.processEvents()
+        
+        self.io_worker.close(wait=True)
+        self.export_worker.close(wait=True)
+        self.retention.close()
+        close_all_appenders()  # Commit buffered CSV rows
+        close_all_stores()
+        if self.json_log is not None:
+            self.json_log.close()
+        self.capture_session.close()
+        if self.x11_capture is not None:
+            self.x11_capture.close()
+        if self.shm_capture is not None:
+            self.shm_capture.close()
+        if self.ocr_cache is not None:
+            self.ocr_cache.close()
+        if requests:
+            get_ocr_client(OCR_CONNECT_TIMEOUT, OCR_READ_TIMEOUT).close()
         event.accept()
 
 
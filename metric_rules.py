@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+Rule-based metric extraction for OCR'd biosensor screens
+
+OCR text used to be stored only as one flattened string, so the values we
+actually care about (steps, heart rate, distance, active time, SpO2) had to
+be picked out by hand. MetricExtractor turns a capture into typed fields:
+
+• text rules: precompiled regular expressions over the OCR text, e.g.
+  ``Steps 8,532`` or ``72 bpm``; all rules of a rule set are merged into one
+  alternation, so a capture is scanned once
+• label-proximity rules: a label line (``Steps``) and the nearest line right
+  of, below or above it that holds only a value, looked up in the spatial
+  index of the capture's OCRLayout (ocr_layout.py) - the
+  large-number-over-small-label tiles of fitness apps; without bounding
+  boxes (CSV history) the text line right below or above the label is used
+• typed values: int, float (unit-converted, e.g. m/mi to km), duration
+  (minutes) or text
+• per-device rule sets matched by window title, which inherit and override
+  the default rules; extra rule sets are loaded from a JSON file
+
+Text rules alone work on historical CSV rows (no bounding boxes), which keeps
+backfills at thousands of captures per second.
+"""
+
+import os
+import re
+import json
+import threading
+from typing import Optional, List, Dict, Any, Tuple
+
+from ocr_layout import DIRECTIONS, OCRLayout, get_layout, parse_number
+
+FIELD_TYPES = ('int', 'float', 'duration', 'text')
+
+# Where label-proximity rules look for a value unless a rule says otherwise
+DEFAULT_DIRECTIONS = ('right', 'below', 'above')
+
+_NUMBER = r'[-+]?\d+(?:[.,]\d+)*'
+# Generic readings: words that start with a letter (``SpO2``, ``Heart rate``), a number without
+# leading zeros (``00`` is a placeholder) and at most a known unit - not dates or clock times
+_GENERIC_LABEL = r'[A-Za-z][A-Za-z0-9]+(?:[ /()-]+[A-Za-z][A-Za-z0-9]*)*\)?'
+_GENERIC_NUMBER = r'[-+]?(?:0|[1-9]\d*)(?:[.,]\d+)*'
+_GENERIC_UNIT = r'(?:%|°\s*[CF]?|bpm|k?cal|kg|lbs?|km|mi|ms|m|mmhg|mg/dl|min|[CFhs])?'
+_LABEL_VALUE = re.compile(rf'^\s*({_GENERIC_LABEL})\s*(?:[:=]\s*|\s+)({_GENERIC_NUMBER})\s*{_GENERIC_UNIT}\s*$',
+                          re.IGNORECASE)
+# Dot thousands grouping of localized apps ("12.345 steps"), read as such by int fields
+_DOT_THOUSANDS = re.compile(r'[-+]?\d{1,3}(?:\.\d{3})+')
+_VALUE_ONLY = re.compile(rf'^\s*({_GENERIC_NUMBER})\s*{_GENERIC_UNIT}\s*$', re.IGNORECASE)
+_LABEL_ONLY = re.compile(rf'^\s*({_GENERIC_LABEL})\s*:?\s*$')
+_DURATION_HM = re.compile(r'(?:(\d+)\s*h(?:ours?|rs?)?)?\s*(?:(\d+)\s*m(?:in(?:utes?|s)?)?)?', re.IGNORECASE)
+_DURATION_CLOCK = re.compile(r'(\d{1,2}):(\d{2})(?::(\d{2}))?')
+
+
+def parse_duration(text: str) -> Optional[float]:
+    """Parse ``1h 23m``, ``83 min`` or ``1:23`` (h:mm) / ``1:23:45`` into minutes"""
+    text = text.strip()
+    clock = _DURATION_CLOCK.fullmatch(text)
+    if clock:
+        hours, minutes, seconds = int(clock.group(1)), int(clock.group(2)), int(clock.group(3) or 0)
+        return hours * 60 + minutes + seconds / 60.0
+    match = _DURATION_HM.fullmatch(text)
+    if match and (match.group(1) or match.group(2)):
+        return float(int(match.group(1) or 0) * 60 + int(match.group(2) or 0))
+    return None
+
+
+def _metric_name(label: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '_', label.lower()).strip('_')
+
+
+def extract_numeric_metrics(raw_text: str) -> Dict[str, float]:
+    """Generic numeric readings from OCR text as {label: value}, without rules
+
+    Understands ``Label 72``, ``Label: 72 bpm`` on one line and a label line
+    followed by a line holding only the number (and a common unit). The first
+    reading of a label wins.
+    """
+    metrics: Dict[str, float] = {}
+    pending_label = None
+    for line in (raw_text or '').splitlines():
+        match = _LABEL_VALUE.match(line)
+        if match:
+            label, value = match.group(1), match.group(2)
+        else:
+            value_match = _VALUE_ONLY.match(line)
+            if value_match and pending_label:
+                label, value = pending_label, value_match.group(1)
+            else:
+                label_match = _LABEL_ONLY.match(line)
+                pending_label = label_match.group(1) if label_match else None
+                continue
+        pending_label = None
+        name = _metric_name(label)
+        number = parse_number(value)
+        if name and number is not None and name not in metrics:
+            metrics[name] = number
+    return metrics
+
+
+class MetricRule:
+    """How one typed field is found in a capture"""
+
+    def __init__(self, name: str, type: str = 'float', patterns: Optional[List[str]] = None,
+                 labels: Optional[List[str]] = None, directions: Optional[List[str]] = None,
+                 max_distance: float = 4.0, units: Optional[Dict[str, float]] = None,
+                 minimum: Optional[float] = None, maximum: Optional[float] = None):
+        """
+        Args:
+            name: Field name, e.g. 'heart_rate'
+            type: One of FIELD_TYPES
+            patterns: Regexes (case-insensitive) with a ``(?P<value>...)`` group and an
+                optional ``(?P<unit>...)`` group, tried against the OCR text (lines
+                joined by newlines - note that ``\\s`` also matches a line break)
+            labels: Regexes for label lines used by the proximity rule
+            directions: Where the value sits relative to its label (DIRECTIONS)
+            max_distance: Proximity search distance in label heights
+            units: Multipliers to the field's canonical unit by (lower-case) unit text
+            minimum / maximum: Plausible range; values outside are ignored
+        """
+        if type not in FIELD_TYPES:
+            raise ValueError(f"Rule '{name}': unknown type '{type}' (expected one of {', '.join(FIELD_TYPES)})")
+        for pattern in patterns or []:
+            if '(?P<value>' not in pattern:
+                raise ValueError(f"Rule '{name}': pattern '{pattern}' has no (?P<value>...) group")
+            re.compile(pattern)
+        self.name = name
+        self.type = type
+        self.patterns = list(patterns or [])
+        self.labels = list(labels or [])
+        self.directions = tuple(direction for direction in (directions or DEFAULT_DIRECTIONS) if direction in DIRECTIONS)
+        self.max_distance = max_distance
+        self.units = {unit.lower(): float(factor) for unit, factor in (units or {}).items()}
+        self.minimum = minimum
+        self.maximum = maximum
+        self.label_regex = re.compile(rf"^\s*(?:{'|'.join(self.labels)})\s*:?\s*$", re.IGNORECASE) if self.labels else None
+        units_alternation = '|'.join(re.escape(unit) for unit in sorted(self.units, key=len, reverse=True))
+        unit_group = rf'\s*(?P<unit>{units_alternation})?' if self.units else r'\s*[A-Za-z%°/]*'
+        value_pattern = r'\d+\s*h(?:\s*\d+\s*m\w*)?|\d+\s*m\w*|\d{1,2}:\d{2}(?::\d{2})?' if type == 'duration' \
+            else r'.+?' if type == 'text' else _NUMBER
+        # A line that holds only a value (for the proximity rule)
+        self.value_regex = re.compile(rf'^\s*(?P<value>{value_pattern}){unit_group}\s*$', re.IGNORECASE)
+
+    def convert(self, value: str, unit: Optional[str] = None) -> Any:
+        """Typed, unit-converted value of a match, or None if it does not parse or is implausible"""
+        if self.type == 'text':
+            return value.strip() or None
+        if self.type == 'int' and _DOT_THOUSANDS.fullmatch(value.strip()):
+            value = value.replace('.', '')
+        number = parse_duration(value) if self.type == 'duration' else parse_number(value)
+        if number is None:
+            return None
+        if unit and self.units:
+            number *= self.units.get(unit.lower(), 1.0)
+        if (self.minimum is not None and number < self.minimum) or (self.maximum is not None and number > self.maximum):
+            return None
+        return int(round(number)) if self.type == 'int' else round(number, 3)
+
+    def parse_value(self, text: str) -> Any:
+        """Typed value of a line that holds only a value (and unit), else None"""
+        match = self.value_regex.match(text)
+        return self.convert(match.group('value'), match.groupdict().get('unit')) if match else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {'name': self.name, 'type': self.type, 'patterns': self.patterns, 'labels': self.labels,
+                'directions': list(self.directions), 'max_distance': self.max_distance}
+        if self.units:
+            data['units'] = self.units
+        if self.minimum is not None:
+            data['minimum'] = self.minimum
+        if self.maximum is not None:
+            data['maximum'] = self.maximum
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'MetricRule':
+        return cls(data['name'], data.get('type', 'float'), data.get('patterns'), data.get('labels'),
+                   data.get('directions'), data.get('max_distance', 4.0), data.get('units'),
+                   data.get('minimum'), data.get('maximum'))
+
+
+# Horizontal whitespace only: a value on the next line belongs to another tile
+_GAP = r'[ \t]*'
+
+# Built-in rules, used for every window unless a device rule set overrides them
+DEFAULT_RULES = [
+    MetricRule('steps', 'int', [
+        rf'\bsteps?\b{_GAP}[:=]?{_GAP}(?P<value>\d[\d,.]*)',
+        rf'(?P<value>\d[\d,.]*){_GAP}steps?\b'
+    ], labels=[r'steps?'], minimum=0, maximum=200000),
+    MetricRule('heart_rate', 'int', [
+        rf'\b(?:heart{_GAP}rate|hr|pulse)\b{_GAP}[:=]?{_GAP}(?P<value>\d{{2,3}})\b',
+        rf'(?P<value>\d{{2,3}}){_GAP}bpm\b'
+    ], labels=[rf'heart{_GAP}rate', r'hr', r'pulse', r'bpm'], minimum=25, maximum=250),
+    MetricRule('spo2', 'int', [
+        rf'\b(?:spo2|sp02|blood{_GAP}oxygen|oxygen)\b{_GAP}[:=]?{_GAP}(?P<value>\d{{2,3}}){_GAP}%?'
+    ], labels=[r'spo2', r'sp02', rf'blood{_GAP}oxygen'], minimum=50, maximum=100),
+    MetricRule('distance_km', 'float', [
+        rf'\b(?:distance|dist)\b{_GAP}[:=]?{_GAP}(?P<value>\d[\d,.]*){_GAP}(?P<unit>km|mi|m)\b',
+        rf'(?P<value>\d[\d,.]*){_GAP}(?P<unit>km|mi)\b'
+    ], labels=[r'distance', r'dist'], units={'km': 1.0, 'm': 0.001, 'mi': 1.609344}, minimum=0),
+    MetricRule('calories', 'int', [
+        rf'\b(?:calories|kcal)\b{_GAP}[:=]?{_GAP}(?P<value>\d[\d,.]*)',
+        rf'(?P<value>\d[\d,.]*){_GAP}k?cal\b'
+    ], labels=[r'calories', r'kcal'], minimum=0),
+    MetricRule('active_minutes', 'duration', [
+        rf'\b(?:active{_GAP}time|activity{_GAP}time|exercise{_GAP}time|active)\b{_GAP}[:=]?{_GAP}'
+        rf'(?P<value>\d+{_GAP}h(?:{_GAP}\d+{_GAP}m(?:in)?)?|\d+{_GAP}min|\d{{1,2}}:\d{{2}})'
+    ], labels=[rf'active{_GAP}time', rf'activity{_GAP}time', rf'exercise{_GAP}time', r'active'], minimum=0)
+]
+
+
+class RuleSet:
+    """Rules for windows whose title contains a pattern (empty pattern = default rule set)"""
+
+    def __init__(self, name: str, rules: List[MetricRule], window_pattern: str = '', inherit: bool = True,
+                 enabled: bool = True):
+        """
+        Args:
+            inherit: Also apply the default rules that this set does not override by name
+        """
+        self.name = name
+        self.rules = list(rules)
+        self.window_pattern = window_pattern
+        self.inherit = inherit
+        self.enabled = enabled
+
+    def matches(self, window_title: str) -> bool:
+        """Case-insensitive substring match against a window title"""
+        return bool(self.enabled and self.window_pattern and
+                    self.window_pattern.lower() in (window_title or '').lower())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'name': self.name, 'window_pattern': self.window_pattern, 'inherit': self.inherit,
+                'enabled': self.enabled, 'rules': [rule.to_dict() for rule in self.rules]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'RuleSet':
+        return cls(data['name'], [MetricRule.from_dict(rule) for rule in data.get('rules', [])],
+                   data.get('window_pattern', ''), data.get('inherit', True), data.get('enabled', True))
+
+
+class CompiledRuleSet:
+    """Effective rules of a rule set with all text patterns merged into one regex"""
+
+    def __init__(self, rules: List[MetricRule]):
+        self.rules = rules
+        alternatives = []
+        self._groups: Dict[str, Tuple[int, str, str]] = {}
+        for rule_index, rule in enumerate(rules):
+            for pattern_index, pattern in enumerate(rule.patterns):
+                key = f"{rule_index}_{pattern_index}"
+                renamed = pattern.replace('(?P<value>', f'(?P<v{key}>').replace('(?P<unit>', f'(?P<u{key}>')
+                alternatives.append(f'(?P<r{key}>{renamed})')
+                self._groups[f'r{key}'] = (rule_index, f'v{key}', f'u{key}')
+        self.combined = re.compile('|'.join(alternatives), re.IGNORECASE) if alternatives else None
+        self.patterns = [[re.compile(pattern, re.IGNORECASE) for pattern in rule.patterns] for rule in rules]
+        self.has_labels = any(rule.label_regex is not None for rule in rules)
+
+    def extract_text(self, text: str) -> Dict[str, Any]:
+        """Apply the text rules; the first plausible match of each rule wins"""
+        fields: Dict[str, Any] = {}
+        if self.combined is None or not text:
+            return fields
+        # One pass over the text for every rule ...
+        for match in self.combined.finditer(text):
+            rule_index, value_group, unit_group = self._groups[match.lastgroup]
+            rule = self.rules[rule_index]
+            if rule.name in fields:
+                continue
+            groups = match.groupdict()
+            value = rule.convert(groups[value_group], groups.get(unit_group))
+            if value is not None:
+                fields[rule.name] = value
+        # ... then the rules whose match was shadowed by an overlapping one get their own search
+        for rule_index, rule in enumerate(self.rules):
+            if rule.name in fields:
+                continue
+            for pattern in self.patterns[rule_index]:
+                for match in pattern.finditer(text):
+                    value = rule.convert(match.group('value'), match.groupdict().get('unit'))
+                    if value is not None:
+                        fields[rule.name] = value
+                        break
+                if rule.name in fields:
+                    break
+        return fields
+
+    def extract_lines(self, text: str, skip: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply the label-proximity rules to plain OCR text: the line below or above a label line"""
+        fields: Dict[str, Any] = {}
+        lines = text.splitlines()
+        for rule in self.rules:
+            if rule.name in skip or rule.label_regex is None:
+                continue
+            offsets = [1 if direction == 'below' else -1 for direction in rule.directions
+                       if direction in ('below', 'above')]
+            for index, line in enumerate(lines):
+                if not rule.label_regex.match(line):
+                    continue
+                for offset in offsets:
+                    if 0 <= index + offset < len(lines):
+                        value = rule.parse_value(lines[index + offset])
+                        if value is not None:
+                            fields[rule.name] = value
+                            break
+                if rule.name in fields:
+                    break
+        return fields
+
+    def extract_layout(self, layout: OCRLayout, skip: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply the label-proximity rules to the lines of an OCR layout"""
+        fields: Dict[str, Any] = {}
+        for rule in self.rules:
+            if rule.name in skip or rule.label_regex is None:
+                continue
+            value = layout.value_near(rule.label_regex, rule.parse_value, rule.directions, rule.max_distance)
+            if value is not None:
+                fields[rule.name] = value
+        return fields
+
+
+class MetricExtractor:
+    """Turns OCR output into typed metric fields using per-device rule sets"""
+
+    def __init__(self, rule_sets: Optional[List[RuleSet]] = None, default_rules: Optional[List[MetricRule]] = None):
+        self.default_rules = list(DEFAULT_RULES if default_rules is None else default_rules)
+        self.rule_sets = list(rule_sets or [])
+        self._lock = threading.Lock()
+        self._compiled: Dict[Optional[str], CompiledRuleSet] = {}
+        self._by_title: Dict[str, CompiledRuleSet] = {}
+
+    def _compile(self, rule_set: Optional[RuleSet]) -> CompiledRuleSet:
+        name = rule_set.name if rule_set else None
+        compiled = self._compiled.get(name)
+        if compiled is None:
+            if rule_set is None:
+                rules = self.default_rules
+            else:
+                overridden = {rule.name for rule in rule_set.rules}
+                inherited = [rule for rule in self.default_rules if rule.name not in overridden] if rule_set.inherit else []
+                rules = rule_set.rules + inherited
+            compiled = self._compiled[name] = CompiledRuleSet(rules)
+        return compiled
+
+    def rules_for(self, window_title: str = '') -> CompiledRuleSet:
+        """Compiled rules of the first rule set matching the window (memoized per title)"""
+        with self._lock:
+            compiled = self._by_title.get(window_title)
+            if compiled is None:
+                rule_set = next((rule_set for rule_set in self.rule_sets if rule_set.matches(window_title)), None)
+                compiled = self._by_title[window_title] = self._compile(rule_set)
+            return compiled
+
+    def extract(self, raw_text: str = '', ocr_result: Optional[Dict[str, Any]] = None,
+                window_title: str = '', layout: Optional[OCRLayout] = None) -> Dict[str, Any]:
+        """Typed fields of one capture
+
+        Text rules run on ``raw_text``; label-proximity rules fill in the
+        fields they left empty, using the capture's layout (or an OCR payload
+        with bounding boxes, see get_layout) when given and the text lines
+        next to each label otherwise.
+        """
+        compiled = self.rules_for(window_title)
+        fields = compiled.extract_text(raw_text or '')
+        if compiled.has_labels and len(fields) < len(compiled.rules):
+            if layout is not None or ocr_result:
+                fields.update(compiled.extract_layout(layout or get_layout(ocr_result), fields))
+            else:
+                fields.update(compiled.extract_lines(raw_text or '', fields))
+        return fields
+
+    def numeric_metrics(self, raw_text: str = '', window_title: str = '') -> Dict[str, float]:
+        """Rule fields plus generic ``label value`` readings, as floats
+
+        A generic reading whose label belongs to a rule is only used when that
+        rule found no value itself, and then under the rule's name and range.
+        """
+        compiled = self.rules_for(window_title)
+        metrics = {name: float(value) for name, value in self.extract(raw_text, window_title=window_title).items()
+                   if not isinstance(value, str)}
+        for name, value in extract_numeric_metrics(raw_text).items():
+            label = name.replace('_', ' ')
+            rule = next((rule for rule in compiled.rules
+                         if rule.label_regex is not None and rule.label_regex.match(label)), None)
+            if rule is None:
+                metrics.setdefault(name, value)
+            elif rule.name not in metrics and rule.type != 'text':
+                number = rule.convert(str(value))
+                if number is not None:
+                    metrics[rule.name] = float(number)
+        return metrics
+
+
+def load_rule_sets(path: str) -> List[RuleSet]:
+    """Rule sets from a JSON file ``{"rule_sets": [...]}``; a missing file means none"""
+    if not path or not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as rules_file:
+        data = json.load(rules_file)
+    return [RuleSet.from_dict(entry) for entry in data.get('rule_sets', [])]
+
+
+_extractors: Dict[str, MetricExtractor] = {}
+_extractors_lock = threading.Lock()
+
+
+def get_metric_extractor(rules_path: Optional[str] = None) -> MetricExtractor:
+    """Shared extractor with the built-in rules plus the rule sets of ``rules_path``
+
+    A rules file that cannot be parsed is reported and ignored.
+    """
+    key = os.path.abspath(rules_path) if rules_path else ''
+    with _extractors_lock:
+        extractor = _extractors.get(key)
+        if extractor is None:
+            try:
+                rule_sets = load_rule_sets(rules_path) if rules_path else []
+            except Exception as e:
+                print(f"DEBUG: Could not load metric rules from {rules_path}: {e}")
+                rule_sets = []
+            extractor = _extractors[key] = MetricExtractor(rule_sets)
+        return extractor
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Content-addressed OCR result cache for Grace
+
+Azure OCR results are cached on disk, keyed by a SHA-256 hash of the image
+bytes together with the OCR parameters that affect the result (language,
+orientation detection and API version). Identical pixels recognized earlier
+are answered from the cache without a network call.
+
+The cache lives in a single SQLite file so it survives restarts and can be
+shared by the GUI and CLI. Entries are evicted least-recently-used first
+whenever the entry count or the total payload size exceeds its limit.
+"""
+
+import os
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+from typing import Optional, Dict, Any
+
+
+def make_cache_key(image_data: bytes, language: str, detect_orientation: bool, api_version: str) -> str:
+    """Build the cache key for an image and the OCR parameters used to recognize it"""
+    digest = hashlib.sha256(image_data)
+    digest.update(f"|{language}|{str(detect_orientation).lower()}|{api_version}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+class OCRResultCache:
+    """Persistent LRU cache of OCR API responses"""
+
+    def __init__(self, cache_dir: str, max_entries: int = 5000, max_bytes: int = 100 * 1024 * 1024):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.db_path = os.path.join(cache_dir, "ocr_cache.sqlite3")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ocr_cache ("
+            " key TEXT PRIMARY KEY,"
+            " payload BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_ocr_cache_last_access ON ocr_cache (last_access)")
+        self._conn.commit()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0
+        }
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached OCR result for ``key``, or None on a miss"""
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM ocr_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+
+            self._conn.execute("UPDATE ocr_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.stats['hits'] += 1
+
+        return json.loads(zlib.decompress(row[0]).decode('utf-8'))
+
+    def put(self, key: str, result: Dict[str, Any]):
+        """Store an OCR result and evict old entries if the cache is over its limits"""
+        payload = zlib.compress(json.dumps(result, ensure_ascii=False).encode('utf-8'))
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ocr_cache (key, payload, size, created, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), now, now)
+            )
+            self.stats['stores'] += 1
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop least-recently-used entries until both limits are satisfied (lock held)"""
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ocr_cache").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM ocr_cache ORDER BY last_access ASC"):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            victims.append((key,))
+            count -= 1
+            total -= size
+
+        self._conn.executemany("DELETE FROM ocr_cache WHERE key = ?", victims)
+        self.stats['evictions'] += len(victims)
+
+    def clear(self):
+        """Remove every cached result"""
+        with self._lock:
+            self._conn.execute("DELETE FROM ocr_cache")
+            self._conn.commit()
+
+    def reset_stats(self):
+        """Reset the hit/miss counters without touching cached entries"""
+        with self._lock:
+            for name in self.stats:
+                self.stats[name] = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return counters plus the current entry count and size"""
+        with self._lock:
+            stats = dict(self.stats)
+            count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ocr_cache").fetchone()
+        lookups = stats['hits'] + stats['misses']
+        stats['entries'] = count
+        stats['bytes'] = total
+        stats['hit_rate'] = (stats['hits'] / lookups) if lookups else 0.0
+        return stats
+
+    def close(self):
+        """Close the underlying database"""
+        with self._lock:
+            self._conn.close()
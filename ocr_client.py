@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Pooled HTTP client for Azure OCR calls
+
+Shared by the PyQt5 application (main.py) and the CLI client
+(grace-cli-client/grace_cli.py).
+
+A bare ``requests.post`` opens a new TCP connection and TLS session for every
+capture. OCRClient keeps one ``requests.Session`` with a keep-alive connection
+pool for the lifetime of the process, applies explicit connect/read timeouts
+to every call and records per-endpoint statistics, including how many
+requests were served over an already open connection.
+
+requests.Session is used from several worker threads at once; the underlying
+urllib3 connection pool is thread-safe and our own counters are guarded by a
+lock.
+"""
+
+import time
+import threading
+from typing import Dict, Any
+from urllib.parse import urlsplit
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    requests = None
+    HTTPAdapter = None
+    REQUESTS_AVAILABLE = False
+
+
+DEFAULT_API_VERSION = "v3.2"
+
+
+class OCRClient:
+    """Thread-safe keep-alive client for the Azure Computer Vision OCR endpoint"""
+
+    def __init__(self, connect_timeout: float = 5.0, read_timeout: float = 30.0,
+                 pool_connections: int = 4, pool_maxsize: int = 8):
+        if not REQUESTS_AVAILABLE:
+            raise RuntimeError("requests library not installed. Please install: pip install requests")
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._lock = threading.Lock()
+        self._adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self._session = requests.Session()
+        self._session.mount("https://", self._adapter)
+        self._session.mount("http://", self._adapter)
+        self._endpoints: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def _endpoint_key(url: str) -> str:
+        """scheme://host[:port] of a URL - one connection pool per key"""
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def _pool_counters(self, url: str):
+        """(connections opened, requests sent) of the urllib3 pools serving ``url``
+
+        Pools are matched by scheme, host and port: requests keys its pools with
+        extra TLS settings, so ``connection_from_url`` would open an empty one.
+        """
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        try:
+            pools = self._adapter.poolmanager.pools
+            opened = sent = 0
+            for key in pools.keys():
+                if (key.key_scheme, key.key_host, key.key_port) == (parts.scheme, parts.hostname, port):
+                    pool = pools.get(key)
+                    if pool is not None:
+                        opened += pool.num_connections
+                        sent += pool.num_requests
+            return opened, sent
+        except Exception:
+            return None
+
+    def post(self, url: str, **kwargs):
+        """POST through the shared session with the client's timeouts
+
+        An explicit ``timeout`` keyword overrides the configured one.
+        """
+        kwargs.setdefault('timeout', (self.connect_timeout, self.read_timeout))
+        endpoint = self._endpoint_key(url)
+        started = time.perf_counter()
+
+        try:
+            response = self._session.post(url, **kwargs)
+        except Exception:
+            self._record(endpoint, url, time.perf_counter() - started, error=True)
+            raise
+
+        self._record(endpoint, url, time.perf_counter() - started, error=False)
+        return response
+
+    def recognize(self, endpoint: str, api_key: str, image_data: bytes, language: str = 'unk',
+                  detect_orientation: bool = True, api_version: str = DEFAULT_API_VERSION):
+        """Send image bytes to the Azure OCR API and return the raw response"""
+        headers = {
+            'Ocp-Apim-Subscription-Key': api_key,
+            'Content-Type': 'application/octet-stream'
+        }
+        params = {'language': language, 'detectOrientation': str(detect_orientation).lower()}
+        return self.post(f"{endpoint.rstrip('/')}/vision/{api_version}/ocr",
+                         headers=headers, params=params, data=image_data)
+
+    def _record(self, endpoint: str, url: str, elapsed: float, error: bool):
+        """Update the per-endpoint counters after a request"""
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint, {
+                'requests': 0,
+                'errors': 0,
+                'total_time': 0.0,
+                'connections_opened': 0,
+                'connections_reused': 0
+            })
+            stats['requests'] += 1
+            stats['total_time'] += elapsed
+            if error:
+                stats['errors'] += 1
+
+            counters = self._pool_counters(url)
+            if counters is not None:
+                opened, sent = counters
+                stats['connections_opened'] = opened
+                stats['connections_reused'] = max(0, sent - opened)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return a snapshot of the per-endpoint statistics"""
+        with self._lock:
+            snapshot = {endpoint: dict(stats) for endpoint, stats in self._endpoints.items()}
+        for stats in snapshot.values():
+            count = stats['requests']
+            stats['avg_time'] = (stats['total_time'] / count) if count else 0.0
+            stats['reuse_rate'] = (stats['connections_reused'] / count) if count else 0.0
+        return snapshot
+
+    def close(self):
+        """Close every pooled connection"""
+        self._session.close()
+
+
+_ocr_client = None
+_ocr_client_lock = threading.Lock()
+
+
+def get_ocr_client(connect_timeout: float = 5.0, read_timeout: float = 30.0) -> OCRClient:
+    """Return the process-wide OCR client
+
+    The timeouts only apply when the client is created by the first call.
+    """
+    global _ocr_client
+    with _ocr_client_lock:
+        if _ocr_client is None:
+            _ocr_client = OCRClient(connect_timeout, read_timeout)
+        return _ocr_client
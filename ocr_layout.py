@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Word-geometry layout of an OCR result
+
+The Azure responses carry a bounding box for every region, line and word,
+but the text extractors flattened them into plain text and the metric rules
+re-walked the nested dicts for every lookup. OCRLayout parses a result once:
+
+• lines and words in reading order, each with a (left, top, width, height)
+  box; ``text`` is the same newline-joined text the extractors produced
+• a uniform grid index over the boxes (cell size from the typical line
+  height), so "nearest value below the 'Steps' label" or "all numbers inside
+  this rectangle" only visit the cells they cover instead of every word
+• v3.2 ``regions/lines/words`` as well as Read API ``readResults``/``pages``
+
+get_layout() memoizes the layout of the most recent results, so extraction,
+display and export of one capture share a single parse.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Tuple, Callable, Iterator, NamedTuple
+
+DIRECTIONS = ('right', 'below', 'above', 'left')
+
+_NUMBER = re.compile(r'[-+]?\d+(?:[.,]\d+)*')
+_THOUSANDS = re.compile(r'[-+]?\d{1,3}(?:,\d{3})+')
+
+# Layouts kept by get_layout()
+LAYOUT_CACHE_SIZE = 64
+
+
+class Box(NamedTuple):
+    """Axis-aligned rectangle in image pixels"""
+    left: float
+    top: float
+    width: float
+    height: float
+
+    @property
+    def right(self) -> float:
+        return self.left + self.width
+
+    @property
+    def bottom(self) -> float:
+        return self.top + self.height
+
+    def intersects(self, other: 'Box') -> bool:
+        return (self.left < other.right and other.left < self.right and
+                self.top < other.bottom and other.top < self.bottom)
+
+    def contains(self, other: 'Box') -> bool:
+        return (self.left <= other.left and other.right <= self.right and
+                self.top <= other.top and other.bottom <= self.bottom)
+
+
+class LayoutItem(NamedTuple):
+    """One OCR line or word"""
+    text: str
+    box: Box
+    index: int  # Reading-order position among the items of its kind
+    line: int  # Reading-order position of the line (the line itself for lines)
+
+
+def parse_box(value: Any) -> Optional[Box]:
+    """Box of an Azure ``boundingBox`` ("x,y,w,h" or an 8-value polygon) or ``polygon``"""
+    try:
+        values = [float(number) for number in (value.split(',') if isinstance(value, str) else value)]
+    except (TypeError, ValueError, AttributeError):
+        return None
+    if len(values) == 4:
+        return Box(*values)
+    if len(values) == 8:
+        xs, ys = values[0::2], values[1::2]
+        return Box(min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys))
+    return None
+
+
+def parse_number(text: str) -> Optional[float]:
+    """Parse an OCR'd number: ``1,200`` is a thousands separator, ``36,6`` a decimal comma"""
+    text = text.strip()
+    if _THOUSANDS.fullmatch(text):
+        text = text.replace(',', '')
+    try:
+        return float(text.replace(',', '.'))
+    except ValueError:
+        return None
+
+
+def region_box(region: Tuple[float, float, float, float], width: float, height: float) -> Box:
+    """Pixel box of an ROI profile region (percent of the image size)"""
+    left, top, region_width, region_height = region
+    return Box(left * width / 100.0, top * height / 100.0, region_width * width / 100.0,
+               region_height * height / 100.0)
+
+
+class GridIndex:
+    """Uniform grid of boxes; range queries visit only the cells they overlap"""
+
+    def __init__(self, items: List[LayoutItem], cell_size: float):
+        self.cell_size = max(1.0, cell_size)
+        self.items = items
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+        for position, item in enumerate(items):
+            for cell in self._cells_of(item.box):
+                self._cells.setdefault(cell, []).append(position)
+
+    def _cells_of(self, box: Box) -> Iterator[Tuple[int, int]]:
+        size = self.cell_size
+        for column in range(int(box.left // size), int(box.right // size) + 1):
+            for row in range(int(box.top // size), int(box.bottom // size) + 1):
+                yield column, row
+
+    def query(self, box: Box) -> List[LayoutItem]:
+        """Items whose box intersects ``box``, in reading order"""
+        found = set()
+        for cell in self._cells_of(box):
+            for position in self._cells.get(cell, ()):
+                if position not in found and self.items[position].box.intersects(box):
+                    found.add(position)
+        return [self.items[position] for position in sorted(found)]
+
+
+def _gap(origin: Box, box: Box, direction: str) -> Optional[float]:
+    """Distance from ``origin`` to ``box`` in a direction, or None if ``box`` is not on that side"""
+    if direction in ('right', 'left'):
+        if not (box.top < origin.bottom and origin.top < box.bottom):
+            return None
+        gap = box.left - origin.right if direction == 'right' else origin.left - box.right
+    else:
+        if not (box.left < origin.right and origin.left < box.right):
+            return None
+        gap = box.top - origin.bottom if direction == 'below' else origin.top - box.bottom
+    return gap if gap >= 0 else None
+
+
+class OCRLayout:
+    """Lines and words of one OCR result with a spatial index over their boxes"""
+
+    def __init__(self, lines: List[Tuple[str, Optional[Box], List[Tuple[str, Optional[Box]]]]]):
+        """
+        Args:
+            lines: (text, box, [(word text, word box), ...]) in reading order;
+                items without a box are kept for ``text`` but not indexed
+        """
+        self.text_lines = [text.strip() for text, _, _ in lines if text.strip()]
+        self.lines: List[LayoutItem] = []
+        self.words: List[LayoutItem] = []
+        for text, box, words in lines:
+            text = text.strip()
+            if not text or box is None:
+                continue
+            line_index = len(self.lines)
+            self.lines.append(LayoutItem(text, box, line_index, line_index))
+            for word_text, word_box in words:
+                if word_text.strip() and word_box is not None:
+                    self.words.append(LayoutItem(word_text.strip(), word_box, len(self.words), line_index))
+        heights = sorted(line.box.height for line in self.lines)
+        # About two lines per cell: a label's neighbours are one or two cells away
+        cell_size = 2 * heights[len(heights) // 2] if heights else 32.0
+        self._line_index = GridIndex(self.lines, cell_size)
+        self._word_index = GridIndex(self.words, cell_size)
+        if self.lines:
+            left = min(line.box.left for line in self.lines)
+            top = min(line.box.top for line in self.lines)
+            self.extent = Box(left, top, max(line.box.right for line in self.lines) - left,
+                              max(line.box.bottom for line in self.lines) - top)
+        else:
+            self.extent = Box(0.0, 0.0, 0.0, 0.0)
+
+    @classmethod
+    def from_ocr_result(cls, ocr_result: Optional[Dict[str, Any]]) -> 'OCRLayout':
+        """Parse a v3.2 OCR or Read API result"""
+        lines = []
+        if not ocr_result:
+            return cls(lines)
+        if 'regions' in ocr_result:
+            for region in ocr_result.get('regions', []):
+                for line in region.get('lines', []):
+                    words = [(word.get('text', ''), parse_box(word.get('boundingBox')))
+                             for word in line.get('words', [])]
+                    lines.append((' '.join(text for text, _ in words), parse_box(line.get('boundingBox')), words))
+            return cls(lines)
+        pages = []
+        if 'analyzeResult' in ocr_result:
+            analyze_result = ocr_result['analyzeResult']
+            pages = analyze_result.get('readResults', analyze_result.get('pages', []))
+        elif 'readResult' in ocr_result:
+            pages = ocr_result['readResult'].get('pages', [])
+        for page in pages:
+            for line in page.get('lines', []):
+                words = [(word.get('text', word.get('content', '')),
+                          parse_box(word.get('boundingBox', word.get('polygon'))))
+                         for word in line.get('words', [])]
+                lines.append((line.get('text', line.get('content', '')),
+                              parse_box(line.get('boundingBox', line.get('polygon'))), words))
+        return cls(lines)
+
+    @property
+    def text(self) -> str:
+        """Newline-joined text of all lines"""
+        return '\n'.join(self.text_lines)
+
+    def _index(self, kind: str) -> GridIndex:
+        if kind not in ('line', 'word'):
+            raise ValueError(f"Unknown layout item kind '{kind}' (expected 'line' or 'word')")
+        return self._line_index if kind == 'line' else self._word_index
+
+    def within(self, box: Box, kind: str = 'word', fully: bool = False) -> List[LayoutItem]:
+        """Items intersecting (or with ``fully``, contained in) a pixel box"""
+        items = self._index(kind).query(box)
+        return [item for item in items if box.contains(item.box)] if fully else items
+
+    def numbers_in(self, box: Box, fully: bool = False) -> List[Tuple[float, LayoutItem]]:
+        """Numeric words inside a pixel box (see region_box for ROI profile regions)"""
+        numbers = []
+        for item in self.within(box, 'word', fully):
+            match = _NUMBER.search(item.text)
+            value = parse_number(match.group(0)) if match else None
+            if value is not None:
+                numbers.append((value, item))
+        return numbers
+
+    def find(self, pattern: 're.Pattern', kind: str = 'line') -> List[LayoutItem]:
+        """Items whose whole text matches a compiled regex (e.g. label lines)"""
+        items = self.lines if kind == 'line' else self.words
+        return [item for item in items if pattern.match(item.text)]
+
+    def nearest(self, origin: Box, directions: Tuple[str, ...] = DIRECTIONS, max_distance: Optional[float] = None,
+                kind: str = 'line', predicate: Optional[Callable[[LayoutItem], bool]] = None
+                ) -> Optional[Tuple[float, LayoutItem]]:
+        """Closest item beside ``origin`` in one of ``directions`` (overlapping its row or column)
+
+        The search band around ``origin`` doubles from one grid cell until a
+        match is found or ``max_distance`` / the layout extent is exceeded, so
+        only nearby cells are visited.
+
+        Returns:
+            (distance, item) or None
+        """
+        index = self._index(kind)
+        limit = max_distance if max_distance is not None else max(self.extent.width, self.extent.height)
+        reach = min(index.cell_size, limit)
+        while True:
+            best = None
+            for direction in directions:
+                if direction == 'right':
+                    band = Box(origin.right, origin.top, reach, origin.height)
+                elif direction == 'left':
+                    band = Box(origin.left - reach, origin.top, reach, origin.height)
+                elif direction == 'below':
+                    band = Box(origin.left, origin.bottom, origin.width, reach)
+                elif direction == 'above':
+                    band = Box(origin.left, origin.top - reach, origin.width, reach)
+                else:
+                    raise ValueError(f"Unknown direction '{direction}' (expected one of {', '.join(DIRECTIONS)})")
+                # Touching boxes have a zero gap; widen the band by a hair to include them
+                band = Box(band.left - 0.5, band.top - 0.5, band.width + 1.0, band.height + 1.0)
+                for item in index.query(band):
+                    if item.box == origin:
+                        continue
+                    gap = _gap(origin, item.box, direction)
+                    if gap is None or gap > reach or (best is not None and gap >= best[0]):
+                        continue
+                    if predicate is None or predicate(item):
+                        best = (gap, item)
+            if best is not None or reach >= limit:
+                return best
+            reach = min(reach * 2, limit)
+
+    def value_near(self, label: 're.Pattern', parse: Callable[[str], Any],
+                   directions: Tuple[str, ...] = DIRECTIONS, max_distance: float = 4.0) -> Any:
+        """Parsed value of the line closest to a label line, e.g. the number below "Steps"
+
+        Args:
+            label: Compiled regex matching the whole label line
+            parse: Returns the value of a candidate line's text, or None if it is not a value
+            max_distance: Search distance in multiples of the label's height
+        """
+        best = None
+        for label_item in self.find(label):
+            parsed = {}
+
+            def is_value(item: LayoutItem) -> bool:
+                parsed[item.index] = parse(item.text)
+                return parsed[item.index] is not None
+
+            found = self.nearest(label_item.box, directions, max_distance * max(label_item.box.height, 1.0),
+                                 predicate=is_value)
+            if found is not None and (best is None or found[0] < best[0]):
+                best = (found[0], parsed[found[1].index])
+        return best[1] if best is not None else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Lines with their boxes and words, for JSON exports"""
+        words_of: Dict[int, List[Dict[str, Any]]] = {}
+        for word in self.words:
+            words_of.setdefault(word.line, []).append({'text': word.text, 'box': list(word.box)})
+        return {'lines': [{'text': line.text, 'box': list(line.box), 'words': words_of.get(line.index, [])}
+                          for line in self.lines]}
+
+
+_layouts: 'OrderedDict[int, Tuple[Dict[str, Any], OCRLayout]]' = OrderedDict()
+_layouts_lock = threading.Lock()
+
+
+def get_layout(ocr_result: Optional[Dict[str, Any]]) -> OCRLayout:
+    """Layout of an OCR result, parsed once and shared by every caller holding the same result dict"""
+    if not ocr_result:
+        return OCRLayout([])
+    key = id(ocr_result)
+    with _layouts_lock:
+        cached = _layouts.get(key)
+        # The result is kept referenced, so its id cannot be reused while cached
+        if cached is not None and cached[0] is ocr_result:
+            _layouts.move_to_end(key)
+            return cached[1]
+    layout = OCRLayout.from_ocr_result(ocr_result)
+    with _layouts_lock:
+        _layouts[key] = (ocr_result, layout)
+        _layouts.move_to_end(key)
+        while len(_layouts) > LAYOUT_CACHE_SIZE:
+            _layouts.popitem(last=False)
+    return layout
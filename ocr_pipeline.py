@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Concurrent OCR pipeline for Grace
+
+Capturing a frame takes milliseconds, an Azure OCR round-trip can take
+seconds. Running one OCR thread per capture and overwriting the previous one
+lets slow responses race each other and pick up state that belongs to a
+newer capture.
+
+OCRPipeline decouples the two:
+
+• every submitted capture becomes an OCRJob with its own capture ID, image
+  path, window title and caller context - nothing is read back from mutable
+  application state when the result arrives
+• at most ``max_in_flight`` jobs run concurrently on a thread pool, and at
+  most ``max_pending`` more may wait; further submissions are rejected so a
+  slow endpoint cannot build an unbounded backlog
+• finished jobs are committed strictly in capture order - a fast response
+  waits in a small reorder buffer until every earlier capture is committed
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, Callable
+
+
+@dataclass
+class OCRJob:
+    """One capture travelling through the OCR pipeline"""
+    capture_id: int
+    image_path: str
+    window_title: str
+    context: Dict[str, Any] = field(default_factory=dict)
+    captured_at: float = 0.0  # When the frame was grabbed; stamps the stored record
+    submitted_at: float = 0.0
+    started_at: float = 0.0
+    finished_at: float = 0.0
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the job produced a result"""
+        return self.error is None and self.result is not None
+
+    @property
+    def latency(self) -> float:
+        """Seconds from submission to completion"""
+        return max(0.0, self.finished_at - self.submitted_at)
+
+
+class OCRPipeline:
+    """Bounded thread-pool OCR queue with in-order result commit
+
+    Args:
+        process: ``process(job) -> dict`` performing the OCR call; runs on a
+            pool thread and signals failure by raising
+        on_commit: ``on_commit(job)`` called once per job in capture order;
+            runs on the pool thread that completed the head of the queue, so
+            GUI callers should hand the job over to their own thread
+        max_in_flight: concurrent OCR calls
+        max_pending: jobs allowed to wait for a free worker
+    """
+
+    def __init__(self, process: Callable[[OCRJob], Dict[str, Any]], on_commit: Callable[[OCRJob], None],
+                 max_in_flight: int = 2, max_pending: int = 4):
+        self._process = process
+        self._on_commit = on_commit
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_pending = max(0, max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="ocr-pipeline")
+        self._lock = threading.Lock()
+        self._commit_lock = threading.Lock()
+        self._next_capture_id = 1
+        self._next_commit_id = 1
+        self._finished: Dict[int, OCRJob] = {}
+        self._outstanding = 0
+        self._closed = False
+        self.stats = {
+            'submitted': 0,
+            'committed': 0,
+            'failed': 0,
+            'rejected': 0,
+            'max_outstanding': 0,
+            'total_latency': 0.0
+        }
+
+    @property
+    def outstanding(self) -> int:
+        """Jobs submitted but not yet committed"""
+        with self._lock:
+            return self._outstanding
+
+    @property
+    def busy(self) -> bool:
+        """Whether any job is still waiting, running or awaiting commit"""
+        return self.outstanding > 0
+
+    def submit(self, image_path: str, window_title: str, context: Optional[Dict[str, Any]] = None,
+               captured_at: Optional[float] = None) -> Optional[OCRJob]:
+        """Queue a capture for OCR
+
+        Args:
+            captured_at: Epoch time the frame was grabbed; defaults to now
+
+        Returns:
+            OCRJob or None if the pipeline is full or shut down.
+        """
+        with self._lock:
+            if self._closed or self._outstanding >= self.max_in_flight + self.max_pending:
+                self.stats['rejected'] += 1
+                return None
+
+            now = time.time()
+            job = OCRJob(
+                capture_id=self._next_capture_id,
+                image_path=image_path,
+                window_title=window_title,
+                context=dict(context or {}),
+                captured_at=captured_at or now,
+                submitted_at=now
+            )
+            self._next_capture_id += 1
+            self._outstanding += 1
+            self.stats['submitted'] += 1
+            self.stats['max_outstanding'] = max(self.stats['max_outstanding'], self._outstanding)
+
+        self._executor.submit(self._run, job)
+        return job
+
+    def _run(self, job: OCRJob):
+        """Execute one job on a pool thread"""
+        job.started_at = time.time()
+        try:
+            job.result = self._process(job)
+        except Exception as e:
+            job.error = str(e)
+        job.finished_at = time.time()
+        self._complete(job)
+
+    def _complete(self, job: OCRJob):
+        """Park a finished job and commit every job that is now in order"""
+        with self._commit_lock:
+            with self._lock:
+                self._finished[job.capture_id] = job
+
+            while True:
+                with self._lock:
+                    ready = self._finished.pop(self._next_commit_id, None)
+                    if ready is None:
+                        return
+                    self._next_commit_id += 1
+                    self._outstanding -= 1
+                    self.stats['committed'] += 1
+                    self.stats['total_latency'] += ready.latency
+                    if not ready.ok:
+                        self.stats['failed'] += 1
+
+                try:
+                    self._on_commit(ready)
+                except Exception as e:
+                    print(f"DEBUG: OCR pipeline commit error for capture {ready.capture_id}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return a snapshot of the pipeline counters"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['outstanding'] = self._outstanding
+        committed = stats['committed']
+        stats['avg_latency'] = (stats['total_latency'] / committed) if committed else 0.0
+        return stats
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting jobs; optionally wait for queued jobs to commit"""
+        with self._lock:
+            self._closed = True
+        self._executor.shutdown(wait=wait)
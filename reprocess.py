@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Streaming metric backfill over the capture history
+
+Whenever the metric rules change, the structured metrics of past captures
+should be recomputed - without paying for OCR again. run_reprocess() streams
+the existing corpus through the extraction stage:
+
+• sources: auto_data.csv style files, per-capture JSON files and JSON segment
+  logs (discover_corpus() finds them the way ``grace_cli.py migrate`` does)
+• a generator pipeline: records are read lazily and cut into batches; at most
+  ``max_in_flight`` batches exist at any time, so memory stays constant
+  however large the corpus is
+• batches are extracted in a process pool (the extractor is built once per
+  worker) and their results written in corpus order
+• a checkpoint file records how far each source is done (records of a CSV
+  file or JSON folder, the last capture ID of a segment log); an interrupted
+  run resumes after the last written batch, a later run picks up records
+  added since, and a changed rules file starts the backfill over
+• results go to a sink: the SQLite capture store (metrics column) or a JSONL file
+"""
+
+import os
+import csv
+import json
+import hashlib
+import itertools
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Callable, NamedTuple, Tuple
+
+from metric_rules import MetricExtractor, get_metric_extractor
+from segment_log import read_segment_log
+
+
+class CorpusSource(NamedTuple):
+    """One stream of historical capture records"""
+    kind: str  # 'csv', 'json' (a folder of per-capture files) or 'log' (a segment log)
+    path: str
+    prefix: str = ''  # Segment log prefix
+
+    @property
+    def key(self) -> str:
+        """Checkpoint key"""
+        return f"{self.kind}:{os.path.abspath(self.path)}" + (f":{self.prefix}" if self.prefix else '')
+
+
+def discover_corpus(root: str, exclude_dirs: Iterable[str] = ()) -> List[CorpusSource]:
+    """CSV files, folders of JSON capture files and segment logs below ``root``
+
+    Args:
+        exclude_dirs: Folders to leave out (e.g. the OCR cache)
+    """
+    excluded = [os.path.abspath(path) for path in exclude_dirs]
+    csv_files, json_dirs, logs = [], set(), set()
+    for directory, subdirs, files in os.walk(root):
+        if any(os.path.abspath(directory) == path or os.path.abspath(directory).startswith(path + os.sep)
+               for path in excluded):
+            subdirs[:] = []
+            continue
+        for name in files:
+            if name.endswith('.csv'):
+                csv_files.append(os.path.join(directory, name))
+            elif name.endswith('.json'):
+                json_dirs.add(directory)
+            elif name.endswith('.idx') and '-' in name:
+                logs.add((directory, name[:-len('.idx')].rsplit('-', 1)[0]))
+    return ([CorpusSource('csv', path) for path in sorted(csv_files)] +
+            [CorpusSource('json', path) for path in sorted(json_dirs)] +
+            [CorpusSource('log', directory, prefix) for directory, prefix in sorted(logs)])
+
+
+def _record(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalized capture record of a JSON capture or log record"""
+    payload = data.get('full_ocr_result', data.get('ocr_result'))
+    return {
+        'timestamp': str(data.get('timestamp', '')),
+        'window_title': data.get('window_title') or '',
+        'raw_text': data.get('raw_text') or '',
+        'ocr_result': payload if isinstance(payload, dict) else None
+    }
+
+
+def _iter_records(source: CorpusSource) -> Iterator[Optional[Dict[str, Any]]]:
+    """Records of a CSV file or JSON folder in a stable order"""
+    if source.kind == 'csv':
+        with open(source.path, newline='', encoding='utf-8') as csv_file:
+            for row in csv.DictReader(csv_file):
+                raw_text = row.get('raw_text') or ''
+                yield {
+                    'timestamp': row.get('timestamp', ''),
+                    'window_title': row.get('window_title') or '',
+                    'raw_text': '' if raw_text == 'No text detected' else raw_text.replace(' | ', '\n'),
+                    'ocr_result': None
+                } if row.get('timestamp') else None
+    else:
+        names = sorted(name for name in os.listdir(source.path) if name.endswith('.json'))
+        for name in names:
+            try:
+                with open(os.path.join(source.path, name), encoding='utf-8') as json_file:
+                    data = json.load(json_file)
+            except (OSError, ValueError):
+                yield None
+                continue
+            yield _record(data) if isinstance(data, dict) and data.get('timestamp') else None
+
+
+def iter_source(source: CorpusSource, done: int = 0) -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+    """``(progress, record)`` pairs of a source after the checkpointed progress ``done``
+
+    Progress is the record position for CSV files and JSON folders and the
+    capture ID for segment logs (positions there shift when old segments are
+    pruned). Unreadable JSON files and rows without a timestamp are yielded as
+    None records so progress stays stable; callers skip them.
+    """
+    if source.kind in ('csv', 'json'):
+        yield from itertools.islice(enumerate(_iter_records(source), start=1), done, None)
+    elif source.kind == 'log':
+        for data in read_segment_log(source.path, source.prefix, after_id=done):
+            yield data['capture_id'], _record(data) if data.get('timestamp') else None
+    else:
+        raise ValueError(f"Unknown corpus source kind '{source.kind}'")
+
+
+def batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Lists of up to ``size`` consecutive items"""
+    iterator = iter(items)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def rules_fingerprint(rules_path: Optional[str]) -> str:
+    """Hash of the rules file (empty for the built-in rules only)"""
+    if not rules_path or not os.path.exists(rules_path):
+        return ''
+    with open(rules_path, 'rb') as rules_file:
+        return hashlib.sha256(rules_file.read()).hexdigest()
+
+
+class ReprocessCheckpoint:
+    """Per-source progress of a backfill, saved atomically as JSON"""
+
+    def __init__(self, path: str, fingerprint: str = ''):
+        """
+        Args:
+            fingerprint: Rules fingerprint; progress recorded under different rules is discarded
+        """
+        self.path = path
+        self.fingerprint = fingerprint
+        self.sources: Dict[str, Dict[str, Any]] = {}
+        self.stale = False
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as checkpoint_file:
+                data = json.load(checkpoint_file)
+            if data.get('rules') == fingerprint:
+                self.sources = data.get('sources', {})
+            else:
+                self.stale = True
+
+    def done(self, key: str) -> int:
+        """Progress of a source (see iter_source); 0 = nothing done"""
+        return self.sources.get(key, {}).get('done', 0)
+
+    def advance(self, key: str, done: int):
+        self.sources[key] = {'done': done}
+
+    def save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as checkpoint_file:
+            json.dump({'rules': self.fingerprint, 'sources': self.sources}, checkpoint_file, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """Forget all progress (and delete the file)"""
+        self.sources = {}
+        self.stale = False
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class JSONLMetricsSink:
+    """Appends one ``{timestamp, window_title, metrics}`` line per capture"""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def write(self, results: List[Dict[str, Any]]):
+        self._file.write(''.join(
+            json.dumps({'timestamp': result['timestamp'], 'window_title': result['window_title'],
+                        'metrics': result['metrics']}, ensure_ascii=False) + '\n'
+            for result in results
+        ))
+        # Durable before the checkpoint moves past these records
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+class SQLiteMetricsSink:
+    """Stores recomputed metrics in the capture database (rows are created if missing)"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def write(self, results: List[Dict[str, Any]]):
+        self.store.update_metrics(results)
+
+    def close(self):
+        pass
+
+
+# Extractor of a pool worker process, built once by _init_worker
+_worker_extractor: Optional[MetricExtractor] = None
+
+
+def _init_worker(rules_path: Optional[str]):
+    global _worker_extractor
+    _worker_extractor = get_metric_extractor(rules_path)
+
+
+def _extract_batch(records: List[Optional[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Metrics of a batch of records (runs in a worker process)"""
+    results = []
+    for record in records:
+        if record is None:
+            continue
+        results.append({
+            'timestamp': record['timestamp'],
+            'window_title': record['window_title'],
+            'raw_text': record['raw_text'],
+            'metrics': _worker_extractor.extract(record['raw_text'], record['ocr_result'], record['window_title'])
+        })
+    return results
+
+
+def run_reprocess(sources: Iterable[CorpusSource], sink, checkpoint: ReprocessCheckpoint,
+                  rules_path: Optional[str] = None, workers: Optional[int] = None, batch_size: int = 500,
+                  max_in_flight: Optional[int] = None,
+                  progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """Recompute the metrics of every source record not yet covered by the checkpoint
+
+    Args:
+        sink: Object with ``write(results)`` and ``close()`` (JSONLMetricsSink, SQLiteMetricsSink)
+        workers: Worker processes (None = CPU count, 0 = extract in this process)
+        batch_size: Records per batch (one pool task, one sink write, one checkpoint save)
+        max_in_flight: Batches submitted but not yet written (default: 2 per worker)
+        progress: Called with the running stats after every written batch
+
+    Returns:
+        Stats: sources, records (processed now), resumed (CSV/JSON records skipped as
+        already done), invalid (unreadable / no timestamp), with_metrics, batches
+    """
+    stats = {'sources': 0, 'records': 0, 'resumed': 0, 'invalid': 0, 'with_metrics': 0, 'batches': 0}
+    executor = None
+    if workers != 0:
+        workers = workers or os.cpu_count() or 1
+        executor = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(rules_path,))
+        max_in_flight = max_in_flight or 2 * workers
+    else:
+        _init_worker(rules_path)
+        max_in_flight = max_in_flight or 1
+    pending = deque()
+
+    def drain_one():
+        key, done, count, future = pending.popleft()
+        results = future.result()
+        sink.write(results)
+        checkpoint.advance(key, done)
+        checkpoint.save()
+        stats['records'] += count
+        stats['invalid'] += count - len(results)
+        stats['with_metrics'] += sum(1 for result in results if result['metrics'])
+        stats['batches'] += 1
+        if progress is not None:
+            progress(dict(stats))
+
+    try:
+        for source in sources:
+            stats['sources'] += 1
+            done = checkpoint.done(source.key)
+            if source.kind != 'log':
+                stats['resumed'] += done
+            for batch in batched(iter_source(source, done), batch_size):
+                records = [record for _, record in batch]
+                if executor is not None:
+                    future = executor.submit(_extract_batch, records)
+                else:
+                    future = Future()
+                    future.set_result(_extract_batch(records))
+                pending.append((source.key, batch[-1][0], len(batch), future))
+                while len(pending) >= max_in_flight:
+                    drain_one()
+        while pending:
+            drain_one()
+    finally:
+        if executor is not None:
+            # Batches not written yet are redone by the next run
+            for _, _, _, future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+        sink.close()
+    return stats
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Index-based screenshot retention
+
+Retention used to glob every image extension in the capture folders and stat
+each file inside a sort key on every cleanup pass - O(n log n) syscalls once
+auto-delete is off and tens of thousands of screenshots pile up.
+RetentionIndex keeps an ordered index of captured files instead:
+
+• files are tracked as they are written (one stat at most), oldest first
+• evict() drops entries from the old end by count, age or total bytes in
+  O(k) for k evicted files; the caller deletes the returned batch (on the
+  background I/O worker)
+• the index is persisted as an append-only journal (``+`` / ``-`` lines)
+  that is compacted when mostly dead, so tracking a file is one small append
+• on first use, or when the journal is lost, the folders are scanned once
+  to rebuild the index
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Iterable, Tuple, Callable
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+RETENTION_MODES = ('count', 'time', 'size')
+
+
+class RetentionIndex:
+    """Ordered (oldest first) index of screenshot files with count/age/size eviction"""
+
+    def __init__(self, journal_path: str, roots: Iterable[str] = (), extensions: Tuple[str, ...] = IMAGE_EXTENSIONS,
+                 prefix: str = '', clock: Callable[[], float] = time.time):
+        """
+        Args:
+            journal_path: Persisted index (append-only journal)
+            roots: Folders scanned (non-recursively) when the index is rebuilt
+            extensions: File extensions that count as screenshots when rebuilding
+            prefix: Only files whose name starts with this when rebuilding
+        """
+        self.journal_path = journal_path
+        self.roots = [str(root) for root in roots]
+        self.extensions = tuple(extension.lower() for extension in extensions)
+        self.prefix = prefix
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, Tuple[float, int]]' = OrderedDict()  # path -> (created, bytes)
+        self._total_bytes = 0
+        self._dead = 0  # Journal lines that no longer describe a live entry
+        self._journal = None
+        self.stats = {
+            'tracked': 0,
+            'evicted': 0,
+            'evicted_bytes': 0,
+            'compactions': 0
+        }
+        if os.path.exists(journal_path):
+            self._load()
+        else:
+            self.rebuild()
+
+    def _load(self):
+        with open(self.journal_path, 'r', encoding='utf-8') as journal:
+            for line in journal:
+                line = line.rstrip('\n')
+                if line.startswith('+ '):
+                    try:
+                        created, size, path = line[2:].split(' ', 2)
+                        self._add(path, float(created), int(size))
+                    except ValueError:
+                        self._dead += 1  # Torn last line of a crash
+                elif line.startswith('- '):
+                    self._dead += 2 if self._remove(line[2:]) else 1
+        self._journal = open(self.journal_path, 'a', encoding='utf-8')
+
+    def rebuild(self):
+        """Scan the roots once and rewrite the index (oldest file first)"""
+        found = []
+        for root in self.roots:
+            if not os.path.isdir(root):
+                continue
+            with os.scandir(root) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if (entry.is_file() and name.startswith(self.prefix) and
+                            name.lower().endswith(self.extensions)):
+                        stat = entry.stat()
+                        found.append((stat.st_mtime, stat.st_size, entry.path))
+        found.sort()
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+            for created, size, path in found:
+                self._add(path, created, size)
+            self._rewrite()
+
+    def _add(self, path: str, created: float, size: int):
+        previous = self._entries.pop(path, None)
+        if previous is not None:
+            self._total_bytes -= previous[1]
+            self._dead += 1
+        self._entries[path] = (created, size)
+        self._total_bytes += size
+
+    def _remove(self, path: str) -> bool:
+        entry = self._entries.pop(path, None)
+        if entry is None:
+            return False
+        self._total_bytes -= entry[1]
+        return True
+
+    def _append(self, lines: List[str]):
+        self._journal.write(''.join(lines))
+        self._journal.flush()
+
+    def _rewrite(self):
+        """Compact the journal to one line per live entry"""
+        if self._journal is not None:
+            self._journal.close()
+        directory = os.path.dirname(os.path.abspath(self.journal_path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = self.journal_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as journal:
+            journal.writelines(f"+ {created:.3f} {size} {path}\n" for path, (created, size) in self._entries.items())
+        os.replace(tmp_path, self.journal_path)
+        self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        self._dead = 0
+
+    def _maybe_compact(self):
+        if self._dead > 1024 and self._dead > len(self._entries):
+            self._rewrite()
+            self.stats['compactions'] += 1
+
+    def track(self, path: str, size: Optional[int] = None, created: Optional[float] = None):
+        """Add a newly written file as the newest entry (stats it if ``size`` is not given)"""
+        path = str(path)
+        if size is None:
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                return  # Not written (any more) - nothing to retain
+        created = self.clock() if created is None else created
+        with self._lock:
+            self._add(path, created, size)
+            self._append([f"+ {created:.3f} {size} {path}\n"])
+            self.stats['tracked'] += 1
+            self._maybe_compact()
+
+    def forget(self, paths: Iterable[str]):
+        """Drop files deleted by someone else (e.g. auto-delete after OCR)"""
+        with self._lock:
+            removed = [str(path) for path in paths if self._remove(str(path))]
+            if removed:
+                self._append([f"- {path}\n" for path in removed])
+                self._dead += 2 * len(removed)
+                self._maybe_compact()
+
+    def evict(self, max_count: Optional[int] = None, max_age: Optional[float] = None,
+              max_bytes: Optional[int] = None) -> Dict[str, Tuple[float, int]]:
+        """Remove the oldest entries until every given limit holds
+
+        Returns the evicted files to delete, oldest first, as ``{path: (created, bytes)}``
+        (hand the ones that could not be deleted back to restore()).
+
+        Args:
+            max_count: Files to keep
+            max_age: Seconds; older files are evicted
+            max_bytes: Total size to keep
+        """
+        evicted: Dict[str, Tuple[float, int]] = {}
+        freed = 0
+        with self._lock:
+            cutoff = self.clock() - max_age if max_age is not None else None
+            while self._entries:
+                path, (created, size) = next(iter(self._entries.items()))
+                if not ((max_count is not None and len(self._entries) > max_count) or
+                        (cutoff is not None and created < cutoff) or
+                        (max_bytes is not None and self._total_bytes > max_bytes)):
+                    break
+                self._remove(path)
+                evicted[path] = (created, size)
+                freed += size
+            if evicted:
+                self._append([f"- {path}\n" for path in evicted])
+                self._dead += 2 * len(evicted)
+                self.stats['evicted'] += len(evicted)
+                self.stats['evicted_bytes'] += freed
+                self._maybe_compact()
+        return evicted
+
+    def restore(self, entries: Dict[str, Tuple[float, int]]):
+        """Put evicted entries that could not be deleted back at their place (the old end)
+
+        They keep their creation time, so the next pass retries them.
+        """
+        if not entries:
+            return
+        with self._lock:
+            for path, (created, size) in reversed(list(entries.items())):
+                self._add(path, created, size)
+                self._entries.move_to_end(path, last=False)
+            # The journal replays in file order: rewrite it so they stay at the old end
+            self._rewrite()
+
+    def evict_mode(self, mode: str, value: float) -> Dict[str, Tuple[float, int]]:
+        """evict() for a GUI/CLI retention setting: 'count' (files), 'time' (minutes) or 'size' (MB)"""
+        if mode == 'time':
+            return self.evict(max_age=value * 60)
+        if mode == 'size':
+            return self.evict(max_bytes=int(value * 1024 * 1024))
+        if mode == 'count':
+            return self.evict(max_count=int(value))
+        raise ValueError(f"Unknown retention mode '{mode}' (expected one of {', '.join(RETENTION_MODES)})")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats['files'] = len(self._entries)
+            stats['bytes'] = self._total_bytes
+        return stats
+
+    def reset_stats(self):
+        with self._lock:
+            for name in self.stats:
+                self.stats[name] = 0
+
+    def close(self):
+        """Compact and close the journal"""
+        with self._lock:
+            if self._journal is None:
+                return
+            if self._dead:
+                self._rewrite()
+            self._journal.close()
+            self._journal = None
+
+
+def delete_files(paths: Iterable[str], remove: Callable[[str], Any] = os.remove) -> Tuple[int, List[str]]:
+    """Delete a batch of evicted files; returns (deleted, failed paths) - missing files count as deleted"""
+    deleted, failed = 0, []
+    for path in paths:
+        try:
+            remove(path)
+            deleted += 1
+        except FileNotFoundError:
+            deleted += 1
+        except OSError as e:
+            print(f"DEBUG: Failed to delete old screenshot {path}: {e}")
+            failed.append(path)
+    return deleted, failed
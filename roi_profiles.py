@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Region-of-interest cropping profiles for Grace
+
+Most of a mirrored Gadgetbridge or Mi Band screen is chrome (status bar,
+navigation bar, icons); only a few tiles carry the metrics we log. An ROI
+profile names one or more rectangles of a window, matched by window title.
+Captures of a matching window are cropped to those rectangles before OCR:
+
+• the capture only grabs the bounding box of all regions
+• each region is cut out and the regions are stacked into a single image,
+  so one OCR call still covers every tile
+
+Regions are stored in percent of the window size (left, top, width, height)
+so a profile keeps working when the mirrored window is resized. Profiles are
+saved as JSON next to the other Grace settings.
+"""
+
+import os
+import json
+import threading
+from typing import Optional, List, Dict, Any, Tuple
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+Region = Tuple[float, float, float, float]  # left, top, width, height in percent
+
+# Vertical gap between stacked regions, so OCR does not merge their lines
+STACK_GAP = 12
+
+# Azure OCR rejects images smaller than 50x50 pixels
+MIN_DIMENSION = 50
+
+
+def parse_regions(text: str) -> List[Region]:
+    """Parse regions from text, one ``left,top,width,height`` rectangle per line or ';'
+
+    Raises:
+        ValueError: If a rectangle is malformed or lies outside the window
+    """
+    regions = []
+    for chunk in text.replace(';', '\n').splitlines():
+        chunk = chunk.strip()
+        if not chunk:
+            continue
+        parts = [part.strip().rstrip('%') for part in chunk.split(',')]
+        if len(parts) != 4:
+            raise ValueError(f"Region '{chunk}' must have 4 values: left, top, width, height")
+        left, top, width, height = (float(part) for part in parts)
+        if width <= 0 or height <= 0:
+            raise ValueError(f"Region '{chunk}' must have a positive width and height")
+        if left < 0 or top < 0 or left + width > 100 or top + height > 100:
+            raise ValueError(f"Region '{chunk}' must lie within 0-100% of the window")
+        regions.append((left, top, width, height))
+    return regions
+
+
+def format_regions(regions: List[Region]) -> str:
+    """Inverse of parse_regions (one rectangle per line)"""
+    return "\n".join(",".join(f"{value:g}" for value in region) for region in regions)
+
+
+class ROIProfile:
+    """Named set of crop rectangles for windows whose title contains a pattern"""
+
+    def __init__(self, name: str, window_pattern: str, regions: List[Region], enabled: bool = True):
+        self.name = name
+        self.window_pattern = window_pattern
+        self.regions = [tuple(float(value) for value in region) for region in regions]
+        self.enabled = enabled
+
+    def matches(self, window_title: str) -> bool:
+        """Case-insensitive substring match against a window title"""
+        return bool(self.enabled and self.regions and self.window_pattern and
+                    self.window_pattern.lower() in (window_title or "").lower())
+
+    def bounds(self) -> Region:
+        """Bounding box of all regions, in percent"""
+        left = min(region[0] for region in self.regions)
+        top = min(region[1] for region in self.regions)
+        right = max(region[0] + region[2] for region in self.regions)
+        bottom = max(region[1] + region[3] for region in self.regions)
+        return left, top, right - left, bottom - top
+
+    def grab_rect(self, left: int, top: int, width: int, height: int) -> Tuple[int, int, int, int]:
+        """Screen rectangle covering every region of a window at the given position"""
+        b_left, b_top, b_width, b_height = self.bounds()
+        x0 = left + int(width * b_left / 100.0)
+        y0 = top + int(height * b_top / 100.0)
+        x1 = left + int(round(width * (b_left + b_width) / 100.0))
+        y1 = top + int(round(height * (b_top + b_height) / 100.0))
+        return x0, y0, max(1, x1 - x0), max(1, y1 - y0)
+
+    def crop(self, image, grabbed: Optional[Region] = None):
+        """Cut the regions out of a capture and stack them into one image
+
+        Args:
+            image: PIL image of the window, or of the part of it given by ``grabbed``;
+                a NumPy (height, width, channels) array is cropped by slicing and
+                stacked into a new array
+            grabbed: Area of the window (percent) that ``image`` covers;
+                defaults to the whole window
+        """
+        is_array = hasattr(image, 'shape')
+        image_width, image_height = (image.shape[1], image.shape[0]) if is_array else image.size
+        g_left, g_top, g_width, g_height = grabbed or (0.0, 0.0, 100.0, 100.0)
+        # Pixels per percent of the window, measured on the grabbed area
+        x_scale = image_width / g_width
+        y_scale = image_height / g_height
+
+        boxes = []
+        for left, top, width, height in self.regions:
+            box = (
+                max(0, int((left - g_left) * x_scale)),
+                max(0, int((top - g_top) * y_scale)),
+                min(image_width, int(round((left + width - g_left) * x_scale))),
+                min(image_height, int(round((top + height - g_top) * y_scale)))
+            )
+            if box[2] > box[0] and box[3] > box[1]:
+                boxes.append(box)
+
+        if not boxes:
+            return image
+        if is_array:
+            return self._stack_array(image, boxes)
+        crops = [image.crop(box) for box in boxes]
+
+        # Stack the regions top to bottom on a white canvas of at least the API minimum size
+        stacked = Image.new(image.mode, (
+            max(MIN_DIMENSION, max(crop.width for crop in crops)),
+            max(MIN_DIMENSION, sum(crop.height for crop in crops) + STACK_GAP * (len(crops) - 1))
+        ), 'white')
+        y = 0
+        for crop in crops:
+            stacked.paste(crop, (0, y))
+            y += crop.height + STACK_GAP
+        return stacked
+
+    @staticmethod
+    def _stack_array(image, boxes):
+        """crop() for arrays: the regions are sliced as views and copied once, into the stacked canvas"""
+        crops = [image[top:bottom, left:right] for left, top, right, bottom in boxes]
+        stacked = np.full((
+            max(MIN_DIMENSION, sum(crop.shape[0] for crop in crops) + STACK_GAP * (len(crops) - 1)),
+            max(MIN_DIMENSION, max(crop.shape[1] for crop in crops))
+        ) + image.shape[2:], 255, dtype=image.dtype)
+        y = 0
+        for crop in crops:
+            stacked[y:y + crop.shape[0], :crop.shape[1]] = crop
+            y += crop.shape[0] + STACK_GAP
+        return stacked
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'window_pattern': self.window_pattern,
+            'regions': [list(region) for region in self.regions],
+            'enabled': self.enabled
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ROIProfile':
+        return cls(data['name'], data.get('window_pattern', ''), data.get('regions', []), data.get('enabled', True))
+
+
+class ROIProfileStore:
+    """ROI profiles persisted in a JSON file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.profiles: List[ROIProfile] = []
+        self.load()
+
+    def load(self):
+        """(Re)load profiles from disk; a missing file means no profiles"""
+        profiles = []
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as profile_file:
+                    data = json.load(profile_file)
+                profiles = [ROIProfile.from_dict(entry) for entry in data.get('profiles', [])]
+            except Exception as e:
+                print(f"DEBUG: Could not load ROI profiles from {self.path}: {e}")
+        with self._lock:
+            self.profiles = profiles
+
+    def save(self):
+        """Write all profiles to disk"""
+        with self._lock:
+            data = {'profiles': [profile.to_dict() for profile in self.profiles]}
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as profile_file:
+            json.dump(data, profile_file, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def match(self, window_title: str) -> Optional[ROIProfile]:
+        """First enabled profile whose pattern matches the window title"""
+        with self._lock:
+            for profile in self.profiles:
+                if profile.matches(window_title):
+                    return profile
+        return None
+
+    def get(self, name: str) -> Optional[ROIProfile]:
+        with self._lock:
+            for profile in self.profiles:
+                if profile.name == name:
+                    return profile
+        return None
+
+    def set_profile(self, profile: ROIProfile):
+        """Add a profile or replace the one with the same name"""
+        with self._lock:
+            self.profiles = [existing for existing in self.profiles if existing.name != profile.name]
+            self.profiles.append(profile)
+
+    def remove(self, name: str) -> bool:
+        with self._lock:
+            count = len(self.profiles)
+            self.profiles = [profile for profile in self.profiles if profile.name != name]
+            return len(self.profiles) != count
@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""
+Append-only JSONL segment log for capture records
+
+Writing one pretty-printed JSON file per auto-capture produced tens of
+thousands of files a day in a single directory, and two captures within the
+same second overwrote each other. SegmentLog appends records as single JSON
+lines to a small number of segment files instead:
+
+• every record gets a monotonically increasing capture ID, so nothing is
+  ever overwritten
+• the active segment is closed once it reaches ``max_segment_bytes`` or is
+  ``max_segment_age`` seconds old; closed segments can be compressed with
+  gzip or zstd (zstandard package) in place
+• each segment has a sidecar ``.idx`` file of fixed-size
+  (capture ID, time, offset, length) entries, so a record can be found by ID
+  or time without scanning the segment
+• retention drops whole segments (``keep_segments``), so directory size and
+  cleanup cost stay bounded
+
+Segments are named ``<prefix>-<first capture ID>.jsonl[.gz|.zst]``. After a
+crash the active segment is trimmed back to its last indexed record.
+A ``read_only`` log never repairs, renames or opens anything for writing and
+sees only indexed records, so it is safe on a log another process appends to.
+"""
+
+import os
+import gzip
+import json
+import time
+import bisect
+import struct
+import threading
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List, Iterator, Tuple, Callable
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+
+# capture ID, time (epoch seconds), byte offset in the uncompressed segment, line length
+_INDEX_ENTRY = struct.Struct('<QdQI')
+
+COMPRESSIONS = (None, 'gzip', 'zstd')
+_SUFFIXES = {None: '.jsonl', 'gzip': '.jsonl.gz', 'zstd': '.jsonl.zst'}
+
+
+@dataclass
+class Segment:
+    """One segment file and its sidecar index"""
+    first_id: int
+    path: str
+    compression: Optional[str] = None
+    entries: Optional[List[Tuple[int, float, int, int]]] = field(default=None, repr=False)
+
+    @property
+    def index_path(self) -> str:
+        return self.path[:-len(_SUFFIXES[self.compression])] + '.idx'
+
+
+def _read_index(index_path: str) -> List[Tuple[int, float, int, int]]:
+    if not os.path.exists(index_path):
+        return []
+    with open(index_path, 'rb') as index_file:
+        data = index_file.read()
+    usable = len(data) - len(data) % _INDEX_ENTRY.size  # Drop a torn trailing entry
+    return list(_INDEX_ENTRY.iter_unpack(data[:usable]))
+
+
+class SegmentLog:
+    """Thread-safe segmented JSONL log with an offset index per segment"""
+
+    def __init__(self, directory: str, prefix: str = "captures", max_segment_bytes: int = 64 * 1024 * 1024,
+                 max_segment_age: float = 3600.0, compression: Optional[str] = 'gzip', keep_segments: int = 0,
+                 fsync: bool = False, before_write: Optional[Callable[[int], Any]] = None,
+                 clock: Callable[[], float] = time.time, read_only: bool = False):
+        """
+        Args:
+            directory: Folder holding the segments (created if missing)
+            prefix: Segment file name prefix
+            max_segment_bytes: Close the active segment once it is this large (0 = no limit)
+            max_segment_age: Close the active segment once its first record is this many
+                seconds old (0 = no limit)
+            compression: None, 'gzip' or 'zstd' for closed segments ('zstd' falls back
+                to gzip without the zstandard package)
+            keep_segments: Delete the oldest closed segments beyond this many (0 = keep all)
+            fsync: fsync the segment and index after every append
+            before_write: Called with the byte count just before each append
+                (e.g. to charge an I/O budget)
+            clock: Wall-clock time source for record times
+            read_only: Only read the records indexed when the log is opened
+        """
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression: {compression} (expected none, gzip or zstd)")
+        if compression == 'zstd' and not ZSTD_AVAILABLE:
+            print("DEBUG: zstandard not installed - compressing log segments with gzip")
+            compression = 'gzip'
+        self.directory = directory
+        self.prefix = prefix
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age = max_segment_age
+        self.compression = compression
+        self.keep_segments = keep_segments
+        self.fsync = fsync
+        self.before_write = before_write
+        self.clock = clock
+        self.read_only = read_only
+        self._lock = threading.Lock()
+        self._segments: List[Segment] = []
+        self._active: Optional[Segment] = None
+        self._file = None
+        self._index_file = None
+        self._size = 0
+        self._next_id = 1
+        self._closed = False
+        self.stats = {
+            'appended': 0,
+            'bytes': 0,
+            'rotations': 0,
+            'pruned': 0
+        }
+        if not read_only:
+            os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    # ----------------------------------------------------------------- opening
+
+    def _load(self):
+        """Discover existing segments and reopen (and repair) the active one"""
+        found: Dict[int, Segment] = {}
+        names = os.listdir(self.directory) if os.path.isdir(self.directory) else []
+        for name in names:
+            if not name.startswith(self.prefix + '-'):
+                continue
+            for compression, suffix in _SUFFIXES.items():
+                if name.endswith(suffix):
+                    stem = name[len(self.prefix) + 1:-len(suffix)]
+                    if not stem.isdigit():
+                        break
+                    first_id = int(stem)
+                    path = os.path.join(self.directory, name)
+                    existing = found.get(first_id)
+                    if existing is not None and self.read_only:
+                        # Mid-compression: both files hold the same records, read the compressed one
+                        if compression is None:
+                            break
+                    elif existing is not None and existing.compression is None:
+                        # Compression finished but the plain file was not removed yet
+                        os.remove(existing.path)
+                    elif existing is not None:
+                        os.remove(path)
+                        break
+                    found[first_id] = Segment(first_id, path, compression)
+                    break
+        self._segments = [found[first_id] for first_id in sorted(found)]
+
+        if self.read_only:
+            if self._segments and self._segments[-1].compression is None:
+                # Possibly being appended to: only records whose line is complete
+                segment = self._segments[-1]
+                size = os.path.getsize(segment.path) if os.path.exists(segment.path) else 0
+                segment.entries = [entry for entry in _read_index(segment.index_path)
+                                   if entry[2] + entry[3] <= size]
+            if self._segments:
+                entries = self._entries(self._segments[-1])
+                self._next_id = entries[-1][0] + 1 if entries else self._segments[-1].first_id
+        elif self._segments and self._segments[-1].compression is None:
+            self._open_active(self._segments[-1])
+        elif self._segments:
+            entries = self._entries(self._segments[-1])
+            self._next_id = entries[-1][0] + 1 if entries else self._segments[-1].first_id
+
+    def _open_active(self, segment: Segment):
+        """Make ``segment`` the active segment, trimming anything not covered by its index"""
+        entries = _read_index(segment.index_path)
+        size = os.path.getsize(segment.path) if os.path.exists(segment.path) else 0
+        valid = [entry for entry in entries if entry[2] + entry[3] <= size]
+        end = valid[-1][2] + valid[-1][3] if valid else 0
+        if end < size or len(valid) != len(entries) or (entries and os.path.getsize(segment.index_path)
+                                                        != len(entries) * _INDEX_ENTRY.size):
+            print(f"DEBUG: Repairing log segment {os.path.basename(segment.path)} after an unclean shutdown")
+            with open(segment.path, 'ab') as data_file:
+                data_file.truncate(end)
+            with open(segment.index_path, 'wb') as index_file:
+                index_file.write(b''.join(_INDEX_ENTRY.pack(*entry) for entry in valid))
+        segment.entries = valid
+        self._active = segment
+        self._file = open(segment.path, 'ab')
+        self._index_file = open(segment.index_path, 'ab')
+        self._size = end
+        self._next_id = valid[-1][0] + 1 if valid else segment.first_id
+
+    def _start_segment(self):
+        path = os.path.join(self.directory, f"{self.prefix}-{self._next_id:012d}.jsonl")
+        segment = Segment(self._next_id, path)
+        self._segments.append(segment)
+        self._open_active(segment)
+
+    # ----------------------------------------------------------------- writing
+
+    def append(self, record: Dict[str, Any], timestamp: Optional[float] = None) -> int:
+        """Append one record; returns its capture ID (also stored as ``capture_id``)
+
+        Args:
+            timestamp: Record time in epoch seconds for time lookups (default: now)
+        """
+        timestamp = self.clock() if timestamp is None else timestamp
+        if 'capture_id' in record:
+            record = {key: value for key, value in record.items() if key != 'capture_id'}
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        if self.before_write is not None:
+            self.before_write(len(line))
+        with self._lock:
+            if self._closed or self.read_only:
+                raise ValueError(f"Segment log in {self.directory} is {'closed' if self._closed else 'read-only'}")
+            if self._active is not None and self._should_rotate(timestamp):
+                self._rotate()
+            if self._active is None:
+                self._start_segment()
+            capture_id = self._next_id
+            # The ID is spliced into the serialized object so it is not encoded twice
+            line = (b'{"capture_id":%d,' % capture_id + line[1:] if len(line) > 2
+                    else b'{"capture_id":%d}' % capture_id) + b'\n'
+            entry = (capture_id, float(timestamp), self._size, len(line))
+            self._file.write(line)
+            self._file.flush()
+            self._index_file.write(_INDEX_ENTRY.pack(*entry))
+            self._index_file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+                os.fsync(self._index_file.fileno())
+            self._active.entries.append(entry)
+            self._size += len(line)
+            self._next_id += 1
+            self.stats['appended'] += 1
+            self.stats['bytes'] += len(line)
+            return capture_id
+
+    def _should_rotate(self, now: float) -> bool:
+        entries = self._active.entries
+        if not entries:
+            return False
+        if self.max_segment_bytes and self._size >= self.max_segment_bytes:
+            return True
+        return bool(self.max_segment_age) and now - entries[0][1] >= self.max_segment_age
+
+    def rotate(self):
+        """Close (and compress) the active segment now; the next append starts a new one"""
+        if self.read_only:
+            raise ValueError(f"Segment log in {self.directory} is read-only")
+        with self._lock:
+            if self._active is not None and self._active.entries:
+                self._rotate()
+
+    def _rotate(self):
+        """Close the active segment, compress it and apply retention (lock held)"""
+        segment = self._active
+        self._close_files()
+        self._active = None
+        self.stats['rotations'] += 1
+        if self.compression is not None:
+            try:
+                self._compress(segment)
+            except Exception as e:
+                print(f"DEBUG: Could not compress log segment {segment.path}: {e}")
+        if self.keep_segments:
+            self._prune(self.keep_segments)
+
+    def _compress(self, segment: Segment):
+        """Compress a closed segment next to itself, then replace the plain file"""
+        target = segment.path + _SUFFIXES[self.compression][len('.jsonl'):]
+        temp = target + '.tmp'
+        with open(segment.path, 'rb') as source:
+            if self.compression == 'zstd':
+                with open(temp, 'wb') as raw:
+                    with zstandard.ZstdCompressor().stream_writer(raw) as writer:
+                        for chunk in iter(lambda: source.read(1024 * 1024), b''):
+                            writer.write(chunk)
+            else:
+                with gzip.open(temp, 'wb') as writer:
+                    for chunk in iter(lambda: source.read(1024 * 1024), b''):
+                        writer.write(chunk)
+        os.replace(temp, target)
+        os.remove(segment.path)
+        segment.path = target
+        segment.compression = self.compression
+
+    def prune(self, keep_segments: int) -> int:
+        """Delete the oldest closed segments beyond ``keep_segments``; returns how many were deleted"""
+        if self.read_only:
+            raise ValueError(f"Segment log in {self.directory} is read-only")
+        with self._lock:
+            return self._prune(keep_segments)
+
+    def _prune(self, keep_segments: int) -> int:
+        closed = [segment for segment in self._segments if segment is not self._active]
+        victims = closed[:max(0, len(closed) - keep_segments)]
+        for segment in victims:
+            for path in (segment.path, segment.index_path):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self._segments.remove(segment)
+        self.stats['pruned'] += len(victims)
+        return len(victims)
+
+    # ----------------------------------------------------------------- reading
+
+    def _entries(self, segment: Segment) -> List[Tuple[int, float, int, int]]:
+        if segment.entries is None:
+            segment.entries = _read_index(segment.index_path)
+        return segment.entries
+
+    @staticmethod
+    def _open_reader(path: str, compression: Optional[str]):
+        if compression == 'zstd':
+            return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+        if compression == 'gzip':
+            return gzip.open(path, 'rb')
+        return open(path, 'rb')
+
+    def _snapshot(self, segment: Segment, entries: List[Tuple[int, float, int, int]]):
+        """What a reader needs to decode ``entries`` without holding the lock (lock held)
+
+        Indexed records never change, so they can be read while appends go on;
+        a reader that already opened a segment keeps reading it even if the
+        segment is compressed or pruned meanwhile.
+        """
+        if segment is self._active:
+            self._file.flush()
+        return segment.path, segment.compression, list(entries)
+
+    def _read_entries(self, path: str, compression: Optional[str],
+                      entries: List[Tuple[int, float, int, int]]) -> Iterator[Dict[str, Any]]:
+        """Decode the records of ``entries`` (ascending offsets) from one segment file"""
+        if not entries:
+            return
+        with self._open_reader(path, compression) as reader:
+            position = 0
+            for _, _, offset, length in entries:
+                if offset != position:
+                    # Forward seek (decompresses through for gzip/zstd)
+                    reader.seek(offset)
+                line = reader.read(length)
+                position = offset + length
+                yield json.loads(line.decode('utf-8'))
+
+    def get(self, capture_id: int) -> Optional[Dict[str, Any]]:
+        """Record with this capture ID, or None"""
+        with self._lock:
+            position = bisect.bisect_right([segment.first_id for segment in self._segments], capture_id) - 1
+            if position < 0:
+                return None
+            segment = self._segments[position]
+            entries = self._entries(segment)
+            slot = bisect.bisect_left(entries, (capture_id,))
+            if slot >= len(entries) or entries[slot][0] != capture_id:
+                return None
+            snapshot = self._snapshot(segment, entries[slot:slot + 1])
+        return next(self._read_entries(*snapshot))
+
+    def iter_range(self, since: Optional[float] = None, until: Optional[float] = None,
+                   after_id: int = 0) -> Iterator[Dict[str, Any]]:
+        """Records with ``since <= time <= until`` (epoch seconds), oldest first
+
+        Segments whose index shows no record in the range are not opened.
+
+        Args:
+            after_id: Only records with a greater capture ID (resuming a reader)
+        """
+        with self._lock:
+            segments = list(self._segments)
+        for segment in segments:
+            with self._lock:
+                if segment not in self._segments:
+                    continue  # Pruned meanwhile
+                try:
+                    entries = [entry for entry in self._entries(segment) if entry[0] > after_id and
+                               (since is None or entry[1] >= since) and (until is None or entry[1] <= until)]
+                except OSError:
+                    continue
+                snapshot = self._snapshot(segment, entries)
+            try:
+                yield from self._read_entries(*snapshot)
+            except FileNotFoundError:
+                continue  # Pruned or compressed before it was opened
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.iter_range()
+
+    @property
+    def segment_paths(self) -> List[str]:
+        with self._lock:
+            return [segment.path for segment in self._segments]
+
+    @property
+    def next_id(self) -> int:
+        with self._lock:
+            return self._next_id
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return append counters plus the current segment count"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['segments'] = len(self._segments)
+            stats['active_bytes'] = self._size if self._active is not None else 0
+        return stats
+
+    def reset_stats(self):
+        with self._lock:
+            for name in self.stats:
+                self.stats[name] = 0
+
+    # ----------------------------------------------------------------- closing
+
+    def _close_files(self):
+        for handle in (self._file, self._index_file):
+            if handle is not None:
+                try:
+                    handle.flush()
+                    os.fsync(handle.fileno())
+                    handle.close()
+                except Exception:
+                    pass
+        self._file = self._index_file = None
+
+    def close(self):
+        """Flush and close the active segment (it stays active for the next run)"""
+        with self._lock:
+            self._closed = True
+            self._close_files()
+            self._active = None
+
+
+def read_segment_log(directory: str, prefix: str = "captures", after_id: int = 0) -> Iterator[Dict[str, Any]]:
+    """Iterate the records of an existing segment log without writing to it
+
+    Read-only: safe on a log the GUI or the daemon is appending to (records
+    not indexed yet are left out).
+
+    Args:
+        after_id: Only records with a greater capture ID
+    """
+    log = SegmentLog(directory, prefix, compression=None, read_only=True)
+    try:
+        yield from log.iter_range(after_id=after_id)
+    finally:
+        log.close()
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+MIT-SHM capture of tracked windows into persistent shared-memory segments
+
+X11Capture asks the server for every frame with XGetImage: the pixels are
+serialized over the X socket into a new reply buffer each time. For windows
+that are captured over and over (the auto-capture loop) ShmCaptureEngine
+uses the MIT-SHM extension instead:
+
+• each tracked window (XID) gets one System V shared-memory segment attached
+  to the X server, sized to the window geometry - XShmGetImage copies the
+  pixels straight into it, nothing goes through the socket
+• the segment is kept between captures and reallocated only when the window
+  is resized; segments of windows the registry reports as removed, or whose
+  grab failed, are freed
+• grab() returns a NumPy (height, width, 4) BGRX view of the segment - no
+  copy; change detection, ROI crop and PNG encoding read the view directly
+• a view is only valid until the next grab of the same window: frames that
+  leave the capture thread are detached (copied) first, see CapturedFrame
+
+libX11/libXext are called through ctypes (python-xlib has no MIT-SHM
+support). Like X11Capture, the window's own drawable (its XID) is read, so
+another window on top never shows up in the frame; covered parts are only
+correct under a compositing manager. X errors are trapped only around the
+engine's own requests - the previous error handler is restored after each.
+Opt-in via ``SHM_CAPTURE_ENABLED``.
+"""
+
+import os
+import ctypes
+import ctypes.util
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Iterable
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+ZPIXMAP = 2
+IPC_PRIVATE = 0
+IPC_CREAT = 0o1000
+IPC_RMID = 0
+ALL_PLANES = ctypes.c_ulong(-1).value
+
+
+class XImage(ctypes.Structure):
+    """Leading fields of Xlib's XImage (the function table that follows is not needed)"""
+    _fields_ = [
+        ('width', ctypes.c_int), ('height', ctypes.c_int), ('xoffset', ctypes.c_int), ('format', ctypes.c_int),
+        ('data', ctypes.c_void_p), ('byte_order', ctypes.c_int), ('bitmap_unit', ctypes.c_int),
+        ('bitmap_bit_order', ctypes.c_int), ('bitmap_pad', ctypes.c_int), ('depth', ctypes.c_int),
+        ('bytes_per_line', ctypes.c_int), ('bits_per_pixel', ctypes.c_int), ('red_mask', ctypes.c_ulong),
+        ('green_mask', ctypes.c_ulong), ('blue_mask', ctypes.c_ulong), ('obdata', ctypes.c_void_p)
+    ]
+
+
+class XShmSegmentInfo(ctypes.Structure):
+    _fields_ = [('shmseg', ctypes.c_ulong), ('shmid', ctypes.c_int), ('shmaddr', ctypes.c_void_p),
+                ('readOnly', ctypes.c_int)]
+
+
+XErrorHandler = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p)
+
+_libs = None
+_libs_lock = threading.Lock()
+_x_errors = [0]
+
+
+@XErrorHandler
+def _on_x_error(display, event):
+    # The default handler exits the process (e.g. BadWindow for a window closed mid-capture)
+    _x_errors[0] += 1
+    return 0
+
+
+@contextmanager
+def _trapped_x_errors(x11):
+    """Count X errors in _x_errors while the block runs, then restore the previous handler
+
+    Requests made inside must be synced (XSync) so their errors arrive before the block ends.
+    """
+    previous = x11.XSetErrorHandler(ctypes.cast(_on_x_error, ctypes.c_void_p))
+    try:
+        yield
+    finally:
+        x11.XSetErrorHandler(previous)
+
+
+def _load_libraries():
+    """libX11, libXext and libc with their prototypes, or None if one is missing"""
+    global _libs
+    with _libs_lock:
+        if _libs is not None:
+            return _libs or None
+        try:
+            paths = [ctypes.util.find_library(name) for name in ('X11', 'Xext', 'c')]
+            if not all(paths):
+                raise OSError("libX11/libXext not found")
+            x11, xext, libc = (ctypes.CDLL(path, use_errno=True) for path in paths)
+        except OSError:
+            _libs = ()
+            return None
+
+        vp, ulong, c_int, c_uint = ctypes.c_void_p, ctypes.c_ulong, ctypes.c_int, ctypes.c_uint
+        image_p, info_p = ctypes.POINTER(XImage), ctypes.POINTER(XShmSegmentInfo)
+        for lib, name, restype, argtypes in [
+            (x11, 'XOpenDisplay', vp, [ctypes.c_char_p]),
+            (x11, 'XCloseDisplay', c_int, [vp]),
+            (x11, 'XDefaultScreen', c_int, [vp]),
+            (x11, 'XDefaultRootWindow', ulong, [vp]),
+            (x11, 'XDefaultVisual', vp, [vp, c_int]),
+            (x11, 'XDefaultDepth', c_int, [vp, c_int]),
+            (x11, 'XDisplayWidth', c_int, [vp, c_int]),
+            (x11, 'XDisplayHeight', c_int, [vp, c_int]),
+            (x11, 'XGetGeometry', c_int, [vp, ulong, ctypes.POINTER(ulong), ctypes.POINTER(c_int),
+                                          ctypes.POINTER(c_int), ctypes.POINTER(c_uint), ctypes.POINTER(c_uint),
+                                          ctypes.POINTER(c_uint), ctypes.POINTER(c_uint)]),
+            (x11, 'XTranslateCoordinates', c_int, [vp, ulong, ulong, c_int, c_int, ctypes.POINTER(c_int),
+                                                   ctypes.POINTER(c_int), ctypes.POINTER(ulong)]),
+            (x11, 'XSync', c_int, [vp, c_int]),
+            (x11, 'XDestroyImage', c_int, [image_p]),
+            (x11, 'XSetErrorHandler', vp, [vp]),
+            (xext, 'XShmQueryExtension', c_int, [vp]),
+            (xext, 'XShmCreateImage', image_p, [vp, vp, c_uint, c_int, vp, info_p, c_uint, c_uint]),
+            (xext, 'XShmAttach', c_int, [vp, info_p]),
+            (xext, 'XShmDetach', c_int, [vp, info_p]),
+            (xext, 'XShmGetImage', c_int, [vp, ulong, image_p, c_int, c_int, ulong]),
+            (libc, 'shmget', c_int, [c_int, ctypes.c_size_t, c_int]),
+            (libc, 'shmat', vp, [c_int, vp, c_int]),
+            (libc, 'shmdt', c_int, [vp]),
+            (libc, 'shmctl', c_int, [c_int, c_int, vp]),
+        ]:
+            function = getattr(lib, name)
+            function.restype, function.argtypes = restype, argtypes
+        _libs = (x11, xext, libc)
+        return _libs
+
+
+def shm_capture_available() -> bool:
+    """NumPy, libX11 and libXext are present and the session is X11 (not Wayland)"""
+    return (NUMPY_AVAILABLE and bool(os.environ.get('DISPLAY')) and
+            os.environ.get('XDG_SESSION_TYPE', '').lower() != 'wayland' and _load_libraries() is not None)
+
+
+class ShmSegment:
+    """Shared-memory XImage of one window size, attached to the X server"""
+
+    def __init__(self, display, visual, depth: int, width: int, height: int):
+        x11, xext, libc = _load_libraries()
+        self.display = display
+        self.width, self.height, self.depth = width, height, depth
+        self.info = XShmSegmentInfo()  # Referenced by the XImage, kept alive with it
+        self.image = xext.XShmCreateImage(display, visual, depth, ZPIXMAP, None, ctypes.byref(self.info),
+                                          width, height)
+        if not self.image:
+            raise RuntimeError("XShmCreateImage failed")
+        ximage = self.image.contents
+        if ximage.bits_per_pixel != 32:
+            x11.XDestroyImage(self.image)
+            raise ValueError(f"Unsupported X11 pixel format ({ximage.bits_per_pixel} bits per pixel)")
+        self.nbytes = ximage.bytes_per_line * height
+        self.info.shmid = libc.shmget(IPC_PRIVATE, self.nbytes, IPC_CREAT | 0o600)
+        if self.info.shmid < 0:
+            x11.XDestroyImage(self.image)
+            raise OSError(ctypes.get_errno(), "shmget failed")
+        address = libc.shmat(self.info.shmid, None, 0)
+        if address in (None, ctypes.c_void_p(-1).value):
+            libc.shmctl(self.info.shmid, IPC_RMID, None)
+            x11.XDestroyImage(self.image)
+            raise OSError(ctypes.get_errno(), "shmat failed")
+        self.info.shmaddr = ximage.data = address
+        self.info.readOnly = 0
+        xext.XShmAttach(display, ctypes.byref(self.info))
+        x11.XSync(display, 0)
+        # Marked for removal now; the kernel frees it once the server and we have detached
+        libc.shmctl(self.info.shmid, IPC_RMID, None)
+
+        buffer = (ctypes.c_uint8 * self.nbytes).from_address(address)
+        # Unmapped only when the last view of the buffer is gone, so stale views never dangle
+        weakref.finalize(buffer, libc.shmdt, ctypes.c_void_p(address))
+        rows = np.frombuffer(buffer, dtype=np.uint8).reshape(height, ximage.bytes_per_line // 4, 4)
+        self.pixels = rows[:, :width]
+
+    def release(self):
+        """Detach the segment from the X server and free the XImage"""
+        x11, xext, _ = _load_libraries()
+        if self.image is None:
+            return
+        xext.XShmDetach(self.display, ctypes.byref(self.info))
+        x11.XSync(self.display, 0)
+        self.image.contents.data = None  # The memory is not XImage's to free
+        x11.XDestroyImage(self.image)
+        self.image = None
+        self.pixels = None
+
+
+class ShmCaptureEngine:
+    """Persistent per-window MIT-SHM segments; grab() returns zero-copy BGRX views"""
+
+    def __init__(self, display_name: Optional[str] = None):
+        self.display_name = display_name
+        self._lock = threading.Lock()
+        self._display = None
+        self._segments: Dict[int, ShmSegment] = {}
+        self._removed = set()  # XIDs of closed windows, freed by the next grab (see on_windows_changed)
+        self._removed_lock = threading.Lock()
+        self.stats = {
+            'grabs': 0,
+            'allocations': 0,
+            'reallocations': 0,
+            'releases': 0,
+            'failures': 0,
+            'bytes': 0
+        }
+
+    @property
+    def available(self) -> bool:
+        return shm_capture_available()
+
+    def _open(self):
+        if self._display is not None:
+            return self._display
+        if not NUMPY_AVAILABLE or _load_libraries() is None:
+            raise RuntimeError("SHM capture needs numpy, libX11 and libXext (pip install numpy)")
+        x11, xext, _ = _load_libraries()
+        display = x11.XOpenDisplay(self.display_name.encode() if self.display_name else None)
+        if not display:
+            raise RuntimeError(f"Cannot open X display {self.display_name or os.environ.get('DISPLAY', '')}")
+        if not xext.XShmQueryExtension(display):
+            x11.XCloseDisplay(display)
+            raise RuntimeError("X server does not support MIT-SHM")
+        self._display = display
+        screen = x11.XDefaultScreen(display)
+        self._root = x11.XDefaultRootWindow(display)
+        self._visual = x11.XDefaultVisual(display, screen)
+        self._screen_size = (x11.XDisplayWidth(display, screen), x11.XDisplayHeight(display, screen))
+        return display
+
+    def _window_rect(self, xid: int):
+        """Part of a window that is on screen, as ``(x, y, width, height, depth)`` in window coordinates"""
+        x11 = _load_libraries()[0]
+        root, child = ctypes.c_ulong(), ctypes.c_ulong()
+        x, y, left, top = ctypes.c_int(), ctypes.c_int(), ctypes.c_int(), ctypes.c_int()
+        width, height, border, depth = ctypes.c_uint(), ctypes.c_uint(), ctypes.c_uint(), ctypes.c_uint()
+        errors = _x_errors[0]
+        x11.XGetGeometry(self._display, xid, ctypes.byref(root), ctypes.byref(x), ctypes.byref(y),
+                         ctypes.byref(width), ctypes.byref(height), ctypes.byref(border), ctypes.byref(depth))
+        x11.XTranslateCoordinates(self._display, xid, self._root, 0, 0, ctypes.byref(left), ctypes.byref(top),
+                                  ctypes.byref(child))
+        x11.XSync(self._display, 0)
+        if _x_errors[0] != errors:
+            raise RuntimeError(f"Window {xid:#x} is gone")
+        # Reading a window drawable outside the screen is a BadMatch
+        screen_width, screen_height = self._screen_size
+        x0, y0 = max(0, -left.value), max(0, -top.value)
+        x1 = min(width.value, screen_width - left.value)
+        y1 = min(height.value, screen_height - top.value)
+        if x1 <= x0 or y1 <= y0:
+            raise RuntimeError(f"Window {xid:#x} is off screen")
+        return x0, y0, x1 - x0, y1 - y0, depth.value
+
+    def grab(self, xid: int):
+        """Pixels of a window as a (height, width, 4) BGRX view of its shared-memory segment
+
+        The view is overwritten by the next grab of the same window; copy it
+        (or detach the frame) before handing it to another thread. A failed
+        grab frees the window's segment.
+        """
+        x11, xext, _ = _load_libraries() or (None, None, None)
+        with self._lock:
+            try:
+                display = self._open()
+                with _trapped_x_errors(x11):
+                    self._release_removed()
+                    x, y, width, height, depth = self._window_rect(xid)
+                    segment = self._segments.get(xid)
+                    if segment is None or (segment.width, segment.height, segment.depth) != (width, height, depth):
+                        if segment is not None:
+                            del self._segments[xid]
+                            segment.release()
+                            self.stats['reallocations'] += 1
+                        segment = self._segments[xid] = ShmSegment(display, self._visual, depth, width, height)
+                        self.stats['allocations'] += 1
+                    errors = _x_errors[0]
+                    ok = xext.XShmGetImage(display, xid, segment.image, x, y, ALL_PLANES)
+                    x11.XSync(display, 0)
+                    if not ok or _x_errors[0] != errors:
+                        raise RuntimeError(f"XShmGetImage failed for window {xid:#x}")
+            except Exception:
+                self.stats['failures'] += 1
+                if self._display is not None:
+                    with _trapped_x_errors(x11):
+                        self._release(xid)
+                raise
+            self.stats['grabs'] += 1
+            self.stats['bytes'] += segment.nbytes
+            return segment.pixels
+
+    def _release(self, xid: int):
+        """Free the segment of a window (engine lock and error trap held)"""
+        segment = self._segments.pop(xid, None)
+        if segment is not None:
+            segment.release()
+            self.stats['releases'] += 1
+
+    def _release_removed(self):
+        with self._removed_lock:
+            removed, self._removed = self._removed, set()
+        for xid in removed:
+            self._release(xid)
+
+    def release(self, xids: Iterable[int]):
+        """Free the segments of windows that are no longer tracked (at the next grab or close)
+
+        Never blocks on a running grab, so it is safe to call from window registry callbacks.
+        """
+        with self._removed_lock:
+            self._removed.update(xid for xid in xids if isinstance(xid, int))
+
+    def on_windows_changed(self, diff):
+        """Window registry subscriber: frees the segments of removed windows"""
+        if diff.removed:
+            self.release(info.handle for info in diff.removed)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats['segments'] = len(self._segments)
+            stats['segment_bytes'] = sum(segment.nbytes for segment in self._segments.values())
+        return stats
+
+    def reset_stats(self):
+        with self._lock:
+            for name in self.stats:
+                self.stats[name] = 0
+
+    def close(self):
+        """Release every segment and close the display connection"""
+        with self._lock:
+            with self._removed_lock:
+                self._removed.clear()
+            segments, self._segments = list(self._segments.values()), {}
+            if self._display is None:
+                return
+            x11 = _load_libraries()[0]
+            with _trapped_x_errors(x11):
+                for segment in segments:
+                    segment.release()
+                x11.XCloseDisplay(self._display)
+            self._display = None
+
+
+_shm_capture_engine = None
+_shm_capture_engine_lock = threading.Lock()
+
+
+def get_shm_capture_engine() -> ShmCaptureEngine:
+    """Process-wide MIT-SHM capture engine"""
+    global _shm_capture_engine
+    with _shm_capture_engine_lock:
+        if _shm_capture_engine is None:
+            _shm_capture_engine = ShmCaptureEngine()
+        return _shm_capture_engine
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Cached window registry with change notifications
+
+Window lists used to come from independent ``getAllWindows()`` calls - the
+window combo, device discovery, the device dialog and every capture each paid
+for a full enumeration (expensive on a busy X11 desktop), several times per
+auto-scan tick. WindowRegistry enumerates once and serves everyone else:
+
+• refresh() enumerates at most once per ``max_age`` seconds; concurrent
+  callers wait for the running enumeration instead of starting their own
+• window objects are cached by native handle (X11 window id, HWND, ...), so
+  a window keeps its identity across refreshes even if its title changes
+• each refresh is diffed against the previous one - added, removed, moved
+  (geometry) and retitled windows - and non-empty diffs are published to
+  subscribers
+• lookup() maps a possibly stale window object (e.g. the one stored in the
+  window combo) to the current cached object without enumerating again
+• event-driven backends (x11_window_events.py) keep the cache current with
+  apply() and mark it ``live`` - reads then never enumerate
+"""
+
+import time
+import threading
+from typing import Optional, List, Dict, Any, Callable, NamedTuple, Iterable
+
+
+class WindowInfo(NamedTuple):
+    """Snapshot of a window taken at enumeration time"""
+    handle: Any
+    title: str
+    left: int
+    top: int
+    width: int
+    height: int
+    visible: bool
+    window: Any  # The native window object (PyWinCtl / pygetwindow)
+
+
+class WindowDiff(NamedTuple):
+    """Changes between two consecutive enumerations"""
+    added: List[WindowInfo]
+    removed: List[WindowInfo]
+    moved: List[WindowInfo]  # Position or size changed
+    retitled: List[WindowInfo]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.moved or self.retitled)
+
+
+EMPTY_DIFF = WindowDiff([], [], [], [])
+
+
+def window_handle(window: Any) -> Any:
+    """Native handle of a PyWinCtl/pygetwindow window (falls back to the title)"""
+    try:
+        if hasattr(window, 'getHandle'):
+            handle = window.getHandle()
+            handle = getattr(handle, 'id', handle)  # python-xlib Window resource -> XID
+            if handle is not None:
+                return handle
+    except Exception:
+        pass
+    for attribute in ('_hWnd', '_hwnd', 'id'):
+        handle = getattr(window, attribute, None)
+        if handle is not None:
+            return handle
+    return ('title', getattr(window, 'title', None))
+
+
+def snapshot(window: Any, handle: Any = None) -> WindowInfo:
+    """WindowInfo of a window object; attributes that cannot be read become 0/True"""
+    def read(name, fallback_name=None, index=0, default=0):
+        try:
+            value = getattr(window, name, None)
+            if value is None and fallback_name is not None:
+                value = getattr(window, fallback_name)[index]
+            return int(value) if value is not None else default
+        except Exception:
+            return default
+
+    try:
+        visible = getattr(window, 'visible', getattr(window, 'isVisible', True))
+        visible = bool(visible() if callable(visible) else visible)
+    except Exception:
+        visible = True
+    return WindowInfo(
+        handle=window_handle(window) if handle is None else handle,
+        title=(getattr(window, 'title', '') or ''),
+        left=read('left', 'topleft', 0),
+        top=read('top', 'topleft', 1),
+        width=read('width', 'size', 0),
+        height=read('height', 'size', 1),
+        visible=visible,
+        window=window
+    )
+
+
+def diff_snapshots(old: Dict[Any, WindowInfo], new: Dict[Any, WindowInfo]) -> WindowDiff:
+    """WindowDiff between two handle -> WindowInfo maps"""
+    added, moved, retitled = [], [], []
+    for handle, info in new.items():
+        previous = old.get(handle)
+        if previous is None:
+            added.append(info)
+            continue
+        if (previous.left, previous.top, previous.width, previous.height) != (info.left, info.top, info.width, info.height):
+            moved.append(info)
+        if previous.title != info.title:
+            retitled.append(info)
+    removed = [info for handle, info in old.items() if handle not in new]
+    return WindowDiff(added, removed, moved, retitled)
+
+
+class WindowRegistry:
+    """Single source of window lists, refreshed at most once per ``max_age`` seconds"""
+
+    def __init__(self, enumerate_windows: Callable[[], Iterable[Any]], max_age: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            enumerate_windows: Full enumeration, e.g. ``pywinctl.getAllWindows``
+            max_age: Seconds a cached enumeration is served before windows() refreshes it
+        """
+        self.enumerate_windows = enumerate_windows
+        self.max_age = max_age
+        self.clock = clock
+        self._lock = threading.RLock()
+        self._windows: Dict[Any, WindowInfo] = {}  # handle -> snapshot, enumeration order
+        self._refreshed_at: Optional[float] = None
+        self.live = False  # Set while an event backend keeps the cache current
+        self._subscribers: List[Callable[[WindowDiff], None]] = []
+        self.stats = {
+            'enumerations': 0,
+            'cache_hits': 0,
+            'changes_published': 0,
+            'errors': 0
+        }
+
+    def subscribe(self, callback: Callable[[WindowDiff], None]) -> Callable[[], None]:
+        """Call ``callback(diff)`` after every refresh that changed something; returns an unsubscribe function
+
+        Callbacks run on the thread that refreshed, with the registry lock
+        held - they must not block; GUI code should hand the diff over to its
+        own thread (e.g. through a Qt signal).
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+        return lambda: self.unsubscribe(callback)
+
+    def unsubscribe(self, callback: Callable[[WindowDiff], None]):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    @property
+    def is_stale(self) -> bool:
+        if self.live and self._refreshed_at is not None:
+            return False
+        return self._refreshed_at is None or self.clock() - self._refreshed_at >= self.max_age
+
+    def refresh(self, force: bool = True) -> WindowDiff:
+        """Enumerate the windows (unless the cache is still fresh and ``force`` is off) and publish the diff"""
+        with self._lock:
+            if not force and not self.is_stale:
+                self.stats['cache_hits'] += 1
+                return EMPTY_DIFF
+            try:
+                windows = list(self.enumerate_windows())
+            except Exception as e:
+                self.stats['errors'] += 1
+                print(f"DEBUG: Window enumeration failed: {e}")
+                return EMPTY_DIFF
+            current = {}
+            for window in windows:
+                info = snapshot(window)
+                current.setdefault(info.handle, info)
+            self.stats['enumerations'] += 1
+            return self._replace(current)
+
+    def apply(self, updated: Iterable[WindowInfo], removed: Iterable[Any] = ()) -> WindowDiff:
+        """Update single windows without an enumeration (used by event-driven backends)
+
+        Args:
+            updated: Fresh snapshots of new or changed windows
+            removed: Handles of windows that went away
+        """
+        with self._lock:
+            current = dict(self._windows)
+            for handle in removed:
+                current.pop(handle, None)
+            for info in updated:
+                current[info.handle] = info
+            return self._replace(current)
+
+    def _replace(self, current: Dict[Any, WindowInfo]) -> WindowDiff:
+        """Swap in a new window map and publish the diff (called with the lock held)"""
+        diff = diff_snapshots(self._windows, current)
+        self._windows = current
+        self._refreshed_at = self.clock()
+        if diff:
+            self.stats['changes_published'] += 1
+            for callback in list(self._subscribers):
+                try:
+                    callback(diff)
+                except Exception as e:
+                    print(f"DEBUG: Window registry subscriber failed: {e}")
+        return diff
+
+    def snapshots(self) -> List[WindowInfo]:
+        """Cached snapshots (refreshed first if older than ``max_age``)"""
+        self.refresh(force=False)
+        with self._lock:
+            return list(self._windows.values())
+
+    def windows(self) -> List[Any]:
+        """Cached native window objects, in enumeration order"""
+        return [info.window for info in self.snapshots()]
+
+    def get(self, handle: Any) -> Optional[WindowInfo]:
+        """Cached snapshot of a window by native handle (no enumeration)"""
+        with self._lock:
+            return self._windows.get(handle)
+
+    def find(self, title: str) -> List[WindowInfo]:
+        """Cached windows with exactly this title"""
+        return [info for info in self.snapshots() if info.title == title]
+
+    def lookup(self, window: Any) -> Optional[Any]:
+        """Current cached object for a (possibly stale) window object - by handle, then by title"""
+        self.refresh(force=False)
+        info = self.get(window_handle(window))
+        if info is None:
+            matches = self.find(getattr(window, 'title', None))
+            info = matches[0] if matches else None
+        return info.window if info is not None else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats['windows'] = len(self._windows)
+            stats['age'] = None if self._refreshed_at is None else self.clock() - self._refreshed_at
+        return stats
+
+    def reset_stats(self):
+        with self._lock:
+            for name in self.stats:
+                self.stats[name] = 0
+
+
+_registries: Dict[int, WindowRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_window_registry(enumerate_windows: Callable[[], Iterable[Any]], max_age: float = 1.0) -> WindowRegistry:
+    """Shared registry per enumeration function (GUI dialogs and capture code share one cache)"""
+    with _registries_lock:
+        registry = _registries.get(id(enumerate_windows))
+        if registry is None:
+            registry = WindowRegistry(enumerate_windows, max_age)
+            _registries[id(enumerate_windows)] = registry
+        return registry
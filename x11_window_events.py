@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Event-driven X11 window tracking
+
+On Linux the auto-scan timers re-enumerated every window every 2-3 seconds
+even when nothing changed. X11WindowWatcher keeps the window registry current
+from X events instead (python-xlib, its own display connection):
+
+• the root window's ``_NET_CLIENT_LIST`` property (PropertyNotify) tells when
+  top-level windows appear or go away - only the added/removed XIDs are
+  looked at, nothing is enumerated
+• every client window is watched for ConfigureNotify (moved/resized) and
+  ``_NET_WM_NAME`` / ``WM_NAME`` changes (retitled)
+• events are drained in batches and applied to the registry in one update,
+  which publishes a diff only if something really changed
+• the thread sleeps in select() between events - idle CPU is ~0 and a new
+  scrcpy window shows up as soon as the window manager lists it
+• while the watcher runs, registry reads never enumerate (``registry.live``)
+"""
+
+import os
+import select
+import threading
+from typing import Optional, Dict, Any, Callable, Iterable, Set
+
+from window_registry import WindowRegistry, snapshot
+
+try:
+    from Xlib import X, Xatom
+    from Xlib import display as xdisplay
+    from Xlib import error as xerror
+    XLIB_AVAILABLE = True
+except ImportError:
+    XLIB_AVAILABLE = False
+
+
+def x11_events_available() -> bool:
+    """python-xlib is installed and the session is X11 (not Wayland)"""
+    return (XLIB_AVAILABLE and bool(os.environ.get('DISPLAY')) and
+            os.environ.get('XDG_SESSION_TYPE', '').lower() != 'wayland')
+
+
+class X11WindowWatcher:
+    """Background thread that applies X11 window events to a WindowRegistry"""
+
+    def __init__(self, registry: WindowRegistry, make_window: Callable[[int], Any],
+                 display_name: Optional[str] = None):
+        """
+        Args:
+            registry: Registry to keep current
+            make_window: Native window object for an XID (e.g. ``pywinctl.Window``)
+            display_name: X display (default: $DISPLAY)
+        """
+        self.registry = registry
+        self.make_window = make_window
+        self.display_name = display_name
+        self._display = None
+        self._atoms: Dict[str, int] = {}
+        self._clients: Set[int] = set()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._wake_r = self._wake_w = None
+        self.stats = {
+            'events': 0,
+            'batches': 0,
+            'added': 0,
+            'removed': 0,
+            'updated': 0
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Open the display, take one full enumeration and start following events"""
+        if self.running:
+            return
+        if not XLIB_AVAILABLE:
+            raise RuntimeError("python-xlib is not installed (pip install python3-xlib)")
+        self._display = xdisplay.Display(self.display_name)
+        root = self._display.screen().root
+        for name in ('_NET_CLIENT_LIST', '_NET_WM_NAME'):
+            self._atoms[name] = self._display.intern_atom(name)
+        self._atoms['WM_NAME'] = Xatom.WM_NAME
+        root.change_attributes(event_mask=X.PropertyChangeMask)
+        # Baseline: one enumeration, then only changes
+        self.registry.refresh()
+        self._clients = set()
+        self._sync(self._client_list(), ())
+        self._display.flush()
+        self._stop.clear()
+        self._wake_r, self._wake_w = os.pipe()
+        self.registry.live = True
+        self._thread = threading.Thread(target=self._run, name="x11-window-events", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the thread; registry reads go back to (cached) enumeration"""
+        self.registry.live = False
+        if self._thread is None:
+            return
+        self._stop.set()
+        os.write(self._wake_w, b'x')
+        self._thread.join(timeout=2.0)
+        self._thread = None
+        for fd in (self._wake_r, self._wake_w):
+            os.close(fd)
+        try:
+            self._display.close()
+        except Exception:
+            pass
+        self._display = None
+
+    def _client_list(self) -> Set[int]:
+        prop = self._display.screen().root.get_full_property(self._atoms['_NET_CLIENT_LIST'], X.AnyPropertyType)
+        return set(prop.value) if prop is not None else set()
+
+    def _watch(self, xid: int):
+        """Ask for geometry and title events of a client window"""
+        window = self._display.create_resource_object('window', xid)
+        window.change_attributes(event_mask=X.StructureNotifyMask | X.PropertyChangeMask,
+                                 onerror=xerror.CatchError())
+
+    def _sync(self, clients: Iterable[int], dirty: Iterable[int]):
+        """Apply a new client list and a set of changed windows to the registry"""
+        clients = set(clients)
+        added = clients - self._clients
+        removed = self._clients - clients
+        for xid in added:
+            self._watch(xid)
+        self._clients = clients
+        updated = []
+        for xid in added | (set(dirty) & clients):
+            info = self.registry.get(xid)
+            try:
+                window = info.window if info is not None else self.make_window(xid)
+                updated.append(snapshot(window, handle=xid))
+            except Exception as e:
+                print(f"DEBUG: Could not read window {xid:#x}: {e}")
+        self.stats['added'] += len(added)
+        self.stats['removed'] += len(removed)
+        self.stats['updated'] += len(updated)
+        return self.registry.apply(updated, removed)
+
+    def _run(self):
+        display_fd = self._display.fileno()
+        while not self._stop.is_set():
+            try:
+                # Sleep until the X server or stop() has something for us
+                if not self._display.pending_events():
+                    readable, _, _ = select.select([display_fd, self._wake_r], [], [])
+                    if self._wake_r in readable:
+                        break
+                client_list_changed, dirty = False, set()
+                while self._display.pending_events():
+                    event = self._display.next_event()
+                    self.stats['events'] += 1
+                    if event.type == X.PropertyNotify:
+                        if event.atom == self._atoms['_NET_CLIENT_LIST']:
+                            client_list_changed = True
+                        elif event.atom in (self._atoms['_NET_WM_NAME'], self._atoms['WM_NAME']):
+                            dirty.add(event.window.id)
+                    elif event.type == X.ConfigureNotify:
+                        dirty.add(event.window.id)
+                if client_list_changed or dirty:
+                    self._sync(self._client_list() if client_list_changed else self._clients, dirty)
+                    self.stats['batches'] += 1
+            except Exception as e:
+                print(f"DEBUG: X11 window event error: {e}")
+                if self._stop.wait(1.0):
+                    break
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats['clients'] = len(self._clients)
+        stats['running'] = self.running
+        return stats
+
+    def reset_stats(self):
+        for name in self.stats:
+            self.stats[name] = 0